@@ -1,9 +1,7 @@
-from workers import CheckWorker
+from workers import ToolProbeService
 
 
 class AppState:
 
-    java_check_worker = CheckWorker(["java", "--version"])
-    wsl_check_worker = CheckWorker(["wsl", "--version"])
-    kraken2_check_worker = CheckWorker(["wsl", "which", "kraken2"])
-    krona_check_worker = CheckWorker(["wsl", "which", "ktImportText"])
+    # Comprueba en paralelo qué programas externos están instalados
+    tool_probe_service = ToolProbeService()
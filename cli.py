@@ -0,0 +1,545 @@
+"""
+Headless command line interface of TranscriptoHub.
+
+Runs the same job specs as the desktop application without Qt widgets,
+so it can be used from scripts, cron or a server without a display:
+
+    python -m cli run specs.jsonl --jobs 4
+    python -m cli trimmomatic --jar trimmomatic.jar --in1 a_R1.fastq --in2 a_R2.fastq --out-dir trimmed --sliding-window 4:20
+    python -m cli kraken2 --db k2_standard --report a_report.txt a.fastq --print-spec >> specs.jsonl
+    python main.py --headless run specs.jsonl
+    python -m cli qc a_R1.fastq.gz a_R2.fastq.gz --out-dir reports --processes 4
+    python -m cli krona a_report.txt b_report.txt -o lote.krona.html
+    python -m cli sortmerna --ref smr.fasta --reads a.fastq --workdir sorted --other --compress zstd
+
+Every tool subcommand accepts --print-spec (print the JSON job spec instead
+of running it) and --dry-run (print the command line instead of running it).
+
+The qc subcommand is the built-in FASTQ quality control (jobs.fastq_qc):
+it runs in process and writes FastQC-compatible report zips. Likewise
+krona writes the Krona chart of one or more Kraken2 reports in process
+(utils.krona_html), without KronaTools; KronaJobSpec runs it.
+
+trimmomatic and sortmerna accept --compress gzip|zstd for their read
+outputs. The tools write gzip themselves; with zstd the tool is run
+through the wrap subcommand, which compresses the outputs once it
+finishes (jobs.compression). wrap also decompresses zstd inputs for the
+tools that cannot read them.
+
+Results are cached by the content of the inputs and the parameters, so an
+identical run is restored instead of repeated. The cache lives in
+--cache-dir (or $TRANSCRIPTOHUB_CACHE_DIR) and --no-cache disables it.
+
+Each tool runs in its own process group under the policy of its spec
+(jobs.supervision): it is stopped, with every process it started, when
+its output matches a fatal error, after --timeout seconds or after
+--idle-timeout seconds without output.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+from jobs import fastq_qc
+from jobs import (
+    JobSpec,
+    TrimmomaticJobSpec,
+    IlluminaClip,
+    SlidingWindow,
+    FastQCJobSpec,
+    SortMeRnaJobSpec,
+    KrakenJobSpec,
+    KrakenDatabaseCache,
+    SortMeRnaIndexCache,
+    ResultCache,
+    CompressionPolicy,
+    load_job_specs,
+    run_job_specs,
+    run_wrapped,
+)
+
+
+def _base_name(file: Path) -> str:
+    name = file.name
+    for suffix in (".gz", ".zst"):
+        name = name.removesuffix(suffix)
+    return Path(name).stem
+
+
+def _illumina_clip(value: str) -> IlluminaClip:
+    """
+    ADAPTER:SEED_MISMATCHES:PALINDROME:SIMPLE[:MIN_ADAPTER_LENGTH[:KEEP_BOTH_READS]]
+    """
+    parts = value.split(":")
+
+    # The adapter may be a Windows path with a drive letter (C:\...),
+    # so the values are taken from the right
+    count = 0
+    while count < min(5, len(parts) - 1) and (
+        parts[-1 - count].isdigit() or parts[-1 - count].lower() in ("true", "false")
+    ):
+        count += 1
+
+    adapter = ":".join(parts[: len(parts) - count])
+    values = parts[len(parts) - count :]
+
+    if len(values) < 3:
+        raise argparse.ArgumentTypeError(
+            "expected ADAPTER:SEED_MISMATCHES:PALINDROME:SIMPLE"
+        )
+
+    return IlluminaClip(
+        adapter=Path(adapter),
+        seed_mismatches=int(values[0]),
+        palindrome_clip_threshold=int(values[1]),
+        simple_clip_threshold=int(values[2]),
+        min_adapter_length=int(values[3]) if len(values) > 3 else 0,
+        keep_both_reads=len(values) > 4 and values[4].lower() == "true",
+    )
+
+
+def _sliding_window(value: str) -> SlidingWindow:
+    try:
+        window_size, quality_threshold = value.split(":")
+        return SlidingWindow(
+            window_size=int(window_size), quality_threshold=int(quality_threshold)
+        )
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected WINDOW_SIZE:QUALITY_THRESHOLD")
+
+
+def _compression_policy(args: argparse.Namespace) -> CompressionPolicy:
+    return CompressionPolicy(
+        method=args.compress,
+        level=args.compress_level,
+        threads=args.compress_threads,
+    )
+
+
+# spec builders
+
+
+def _trimmomatic_specs(args: argparse.Namespace) -> list[JobSpec]:
+    out_dir: Path = args.out_dir
+    name = _base_name(args.in1)
+
+    if args.in2 is None:
+        output_files = [out_dir / f"{name}_trimmed.fastq"]
+    else:
+        output_files = [
+            out_dir / f"{name}_trimmed_1paired.fastq",
+            out_dir / f"{name}_trimmed_1unpaired.fastq",
+            out_dir / f"{name}_trimmed_2paired.fastq",
+            out_dir / f"{name}_trimmed_2unpaired.fastq",
+        ]
+
+    spec = TrimmomaticJobSpec(
+        jar=args.jar,
+        java=args.java,
+        input_file_1=args.in1,
+        input_file_2=args.in2,
+        output_files=output_files,
+        threads=args.threads,
+        phred=args.phred,
+        illumina_clip=args.illumina_clip,
+        sliding_window=args.sliding_window,
+        leading=args.leading,
+        trailing=args.trailing,
+        minlen=args.minlen,
+        crop=args.crop,
+        headcrop=args.headcrop,
+        compression=_compression_policy(args),
+    )
+
+    if not spec.has_steps:
+        raise SystemExit("trimmomatic: at least one trimming step is required")
+
+    return [spec]
+
+
+def _fastqc_specs(args: argparse.Namespace) -> list[JobSpec]:
+    return [
+        FastQCJobSpec(
+            executable=args.executable,
+            input_file=file,
+            output_dir=args.out_dir,
+            threads=args.threads,
+            engine="builtin" if args.builtin else "fastqc",
+        )
+        for file in args.files
+    ]
+
+
+def _sortmerna_specs(args: argparse.Namespace) -> list[JobSpec]:
+    specs = [
+        SortMeRnaJobSpec(
+            executable=args.executable,
+            references=args.ref,
+            reads=args.reads,
+            workdir=args.workdir,
+            idx_dir=args.idx_dir,
+            threads=args.threads,
+            other=args.other,
+            sam=args.sam,
+            sq=args.sq,
+            blast=args.blast,
+            num_alignments=args.num_alignments,
+            min_lis=args.min_lis,
+            no_best=args.no_best,
+            paired=args.paired,
+            compression=_compression_policy(args),
+        )
+    ]
+
+    if args.shared_index and not (args.print_spec or args.dry_run):
+        index_cache = SortMeRnaIndexCache()
+        index_cache.build(args.ref, args.executable, args.threads)
+        specs = [index_cache.apply(spec) for spec in specs]
+
+    return specs
+
+
+def _kraken2_specs(args: argparse.Namespace) -> list[JobSpec]:
+    specs = [
+        KrakenJobSpec(
+            database=args.db,
+            input_file_1=args.files[0],
+            input_file_2=args.files[1] if len(args.files) > 1 else None,
+            report_file=args.report,
+            output=args.output,
+            threads=args.threads,
+            wsl=args.wsl,
+            quick=args.quick,
+            memory_mapping=args.memory_mapping,
+            confidence=args.confidence,
+            minimum_hit_groups=args.minimum_hit_groups,
+            minimum_base_quality=args.minimum_base_quality,
+        )
+    ]
+
+    if args.preload and not (args.print_spec or args.dry_run):
+        database_cache = KrakenDatabaseCache(wsl=args.wsl)
+        database_cache.prepare(args.db)
+        specs = [database_cache.apply(spec) for spec in specs]
+
+    return specs
+
+
+def _run_qc(args: argparse.Namespace) -> int:
+    return fastq_qc.main(args.files, args.out_dir, args.processes)
+
+
+def _run_krona(args: argparse.Namespace) -> int:
+    from utils.krona_html import write_krona_html_for_reports
+
+    output_file = write_krona_html_for_reports(args.reports, args.output)
+    print(f"Krona chart written: {output_file}")
+    return 0
+
+
+def _run_wrap(args: argparse.Namespace) -> int:
+    command = args.tool_command
+    if command and command[0] == "--":
+        command = command[1:]
+
+    if not command:
+        raise SystemExit("wrap: expected a command after --")
+
+    return run_wrapped(
+        command,
+        CompressionPolicy(method=args.method, level=args.level, threads=args.threads),
+        outputs=args.output,
+        output_folders=args.output_dir,
+        staged=[(Path(source), Path(path)) for source, path in args.stage],
+    )
+
+
+# parser
+
+
+def _add_common_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--print-spec",
+        action="store_true",
+        help="print the job spec as JSON Lines instead of running it",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the command line instead of running it",
+    )
+    _add_cache_arguments(parser)
+    _add_supervision_arguments(parser)
+
+
+def _add_compression_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--compress",
+        choices=["none", "gzip", "zstd"],
+        default="none",
+        help="compress the read outputs (zstd files are seekable)",
+    )
+    parser.add_argument("--compress-level", type=int)
+    parser.add_argument(
+        "--compress-threads",
+        type=int,
+        default=0,
+        help="zstd compression threads (default: one per CPU)",
+    )
+
+
+def _default_cache_dir() -> Path:
+    if "TRANSCRIPTOHUB_CACHE_DIR" in os.environ:
+        return Path(os.environ["TRANSCRIPTOHUB_CACHE_DIR"])
+    return Path.home() / ".cache" / "transcriptohub" / "results"
+
+
+def _add_cache_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=_default_cache_dir(),
+        help="folder of the result cache",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=20,
+        help="maximum size of the result cache in GB",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always run the tools, without reading or writing the cache",
+    )
+
+
+def _add_supervision_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="stop a job that runs for more than this many seconds",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        help="stop a job that writes no output for this many seconds",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="transcriptohub",
+        description="Ejecuta las herramientas de TranscriptoHub sin interfaz gráfica.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # run
+
+    run_parser = subparsers.add_parser(
+        "run", help="run job specs from JSON / JSON Lines files"
+    )
+    run_parser.add_argument("specs", nargs="+", type=Path)
+    run_parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of jobs run at once"
+    )
+    run_parser.add_argument("--dry-run", action="store_true")
+    _add_cache_arguments(run_parser)
+    _add_supervision_arguments(run_parser)
+
+    # trimmomatic
+
+    trimmomatic_parser = subparsers.add_parser("trimmomatic")
+    trimmomatic_parser.add_argument("--jar", type=Path, required=True)
+    trimmomatic_parser.add_argument("--java", default="java")
+    trimmomatic_parser.add_argument("--in1", type=Path, required=True)
+    trimmomatic_parser.add_argument("--in2", type=Path)
+    trimmomatic_parser.add_argument("--out-dir", type=Path, default=Path("."))
+    trimmomatic_parser.add_argument("-t", "--threads", type=int, default=1)
+    trimmomatic_parser.add_argument("--phred", type=int, choices=[33, 64], default=33)
+    trimmomatic_parser.add_argument("--illumina-clip", type=_illumina_clip)
+    trimmomatic_parser.add_argument("--sliding-window", type=_sliding_window)
+    for step in ("leading", "trailing", "minlen", "crop", "headcrop"):
+        trimmomatic_parser.add_argument(f"--{step}", type=int)
+    _add_compression_arguments(trimmomatic_parser)
+    _add_common_arguments(trimmomatic_parser)
+    trimmomatic_parser.set_defaults(build_specs=_trimmomatic_specs)
+
+    # fastqc
+
+    fastqc_parser = subparsers.add_parser("fastqc")
+    fastqc_parser.add_argument("files", nargs="+", type=Path)
+    fastqc_parser.add_argument("--executable", default="fastqc")
+    fastqc_parser.add_argument("--out-dir", type=Path, default=Path("."))
+    fastqc_parser.add_argument("-t", "--threads", type=int)
+    fastqc_parser.add_argument(
+        "--builtin",
+        action="store_true",
+        help="use the built-in quality control instead of FastQC",
+    )
+    _add_common_arguments(fastqc_parser)
+    fastqc_parser.set_defaults(build_specs=_fastqc_specs)
+
+    # qc
+
+    qc_parser = subparsers.add_parser(
+        "qc", help="built-in FASTQ quality control, without FastQC or Java"
+    )
+    qc_parser.add_argument("files", nargs="+", type=Path)
+    qc_parser.add_argument("--out-dir", type=Path, default=Path("."))
+    qc_parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        help="worker processes for large files (default: one per CPU)",
+    )
+    qc_parser.set_defaults(run=_run_qc)
+
+    # wrap
+
+    wrap_parser = subparsers.add_parser(
+        "wrap",
+        help="run a tool, decompressing its zstd inputs and compressing its outputs",
+    )
+    wrap_parser.add_argument(
+        "--method", choices=["none", "gzip", "zstd"], default="none"
+    )
+    wrap_parser.add_argument("--level", type=int)
+    wrap_parser.add_argument("--threads", type=int, default=0)
+    wrap_parser.add_argument(
+        "--output",
+        type=Path,
+        action="append",
+        default=[],
+        help="file written by the tool, compressed once it finishes",
+    )
+    wrap_parser.add_argument(
+        "--output-dir",
+        type=Path,
+        action="append",
+        default=[],
+        help="folder whose sequence files are compressed once the tool finishes",
+    )
+    wrap_parser.add_argument(
+        "--stage",
+        nargs=2,
+        action="append",
+        default=[],
+        metavar=("SOURCE", "PATH"),
+        help="decompress SOURCE to PATH for the duration of the run",
+    )
+    wrap_parser.add_argument("tool_command", nargs=argparse.REMAINDER)
+    wrap_parser.set_defaults(run=_run_wrap)
+
+    # sortmerna
+
+    sortmerna_parser = subparsers.add_parser("sortmerna")
+    sortmerna_parser.add_argument("--executable", default="sortmerna")
+    sortmerna_parser.add_argument("--ref", type=Path, action="append", required=True)
+    sortmerna_parser.add_argument("--reads", type=Path, action="append", required=True)
+    sortmerna_parser.add_argument("--workdir", type=Path, required=True)
+    sortmerna_parser.add_argument("--idx-dir", type=Path)
+    sortmerna_parser.add_argument(
+        "--shared-index",
+        action="store_true",
+        help="index the references once into <ref folder>/.idx and reuse it",
+    )
+    sortmerna_parser.add_argument("-t", "--threads", type=int, default=1)
+    sortmerna_parser.add_argument("--other", action="store_true")
+    sortmerna_parser.add_argument("--sam", action="store_true")
+    sortmerna_parser.add_argument("--sq", action="store_true")
+    sortmerna_parser.add_argument("--blast")
+    sortmerna_parser.add_argument("--num-alignments", type=int)
+    sortmerna_parser.add_argument("--min-lis", type=int)
+    sortmerna_parser.add_argument("--no-best", action="store_true")
+    sortmerna_parser.add_argument("--paired", action="store_true")
+    _add_compression_arguments(sortmerna_parser)
+    _add_common_arguments(sortmerna_parser)
+    sortmerna_parser.set_defaults(build_specs=_sortmerna_specs)
+
+    # kraken2
+
+    kraken_parser = subparsers.add_parser("kraken2")
+    kraken_parser.add_argument("files", nargs="+", type=Path)
+    kraken_parser.add_argument("--db", type=Path, required=True)
+    kraken_parser.add_argument("--report", type=Path, required=True)
+    kraken_parser.add_argument("--output", default="-")
+    kraken_parser.add_argument("-t", "--threads", type=int, default=1)
+    kraken_parser.add_argument("--wsl", action="store_true")
+    kraken_parser.add_argument("--quick", action="store_true")
+    kraken_parser.add_argument("--memory-mapping", action="store_true")
+    kraken_parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="keep the database in /dev/shm or the page cache for later runs",
+    )
+    kraken_parser.add_argument("--confidence", type=float)
+    kraken_parser.add_argument("--minimum-hit-groups", type=int)
+    kraken_parser.add_argument("--minimum-base-quality", type=int)
+    _add_common_arguments(kraken_parser)
+    kraken_parser.set_defaults(build_specs=_kraken2_specs)
+
+    # krona
+
+    krona_parser = subparsers.add_parser(
+        "krona", help="Krona chart of Kraken2 reports, without KronaTools"
+    )
+    krona_parser.add_argument("reports", nargs="+", type=Path)
+    krona_parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="chart to write (default: <report>.krona.html of the first report)",
+    )
+    krona_parser.set_defaults(run=_run_krona)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if hasattr(args, "run"):
+        return args.run(args)
+
+    if args.command == "run":
+        specs = [spec for path in args.specs for spec in load_job_specs(path)]
+    else:
+        if args.command == "kraken2" and len(args.files) > 2:
+            raise SystemExit("kraken2: expected one or two input files")
+        specs = args.build_specs(args)
+
+        if args.print_spec:
+            for spec in specs:
+                print(spec.model_dump_json(exclude_none=True))
+            return 0
+
+    if args.dry_run:
+        for spec in specs:
+            program, arguments = spec.to_command()
+            print(program, " ".join(arguments))
+        return 0
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(args.cache_dir, int(args.cache_size * 1024**3))
+
+    exit_codes = run_job_specs(
+        specs,
+        jobs=getattr(args, "jobs", 1),
+        cache=cache,
+        timeout=args.timeout,
+        idle_timeout=args.idle_timeout,
+    )
+
+    failed = sum(1 for exit_code in exit_codes if exit_code != 0)
+    if failed:
+        print(f"{failed} of {len(specs)} jobs failed", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
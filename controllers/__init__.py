@@ -9,3 +9,5 @@ from .settings_panel_controller import SettingsPanelController
 from .database_manager_controller import DatabaseManagerController
 from .kraken_database_manager_controller import KrakenDatabaseManagerController
 from .support_window_controller import SupportWindowController
+from .batch_run_controller import BatchRunController
+from .pipeline_run_controller import PipelineRunController
@@ -0,0 +1,219 @@
+from pathlib import Path
+from typing import Callable, Optional
+from PySide6.QtWidgets import (
+    QWidget,
+    QMenu,
+    QFileDialog,
+    QMessageBox,
+    QProgressDialog,
+    QPushButton,
+)
+from PySide6.QtGui import QCursor
+from PySide6.QtCore import Qt
+from utils import (
+    get_result_cache,
+    get_sequence_file_base_name,
+    pair_sample_files,
+    read_sample_sheet,
+)
+from workers import BatchQueue, BatchJob
+
+
+class BatchRunController:
+    """
+    Controller for running one tool over many samples at once.
+
+    The samples come from a multi-selection in `FileSelectorDialog` or from
+    a CSV/TSV sample sheet. Each panel provides a callable that turns a
+    sample (name, read 1, read 2) into a `BatchJob`; jobs are executed by a
+    `BatchQueue` that shares the CPU budget between them.
+    """
+
+    def __init__(
+        self,
+        view: QWidget,
+        get_files: Callable[[], list[Path]],
+        create_job: Callable[[str, Path, Optional[Path]], Optional[BatchJob]],
+        is_paired: Callable[[], bool] = lambda: False,
+        max_concurrent_jobs: Optional[int] = None,
+        on_finished: Optional[Callable[[], None]] = None,
+    ):
+        self.view = view
+        self.get_files = get_files
+        self.create_job = create_job
+        self.is_paired = is_paired
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.on_finished = on_finished
+
+        self.queue: Optional[BatchQueue] = None
+
+    # source selection
+
+    def open_menu(self):
+        """
+        Muestra un menú para elegir el origen de las muestras del lote.
+        """
+        menu = QMenu(self.view)
+        menu.addAction("Seleccionar archivos del espacio de trabajo").triggered.connect(
+            self.select_files
+        )
+        menu.addAction("Cargar hoja de muestras (CSV/TSV)").triggered.connect(
+            self.select_sample_sheet
+        )
+        menu.exec(QCursor.pos())
+
+    def select_files(self):
+        from views.widgets import FileSelectorDialog
+
+        file_selector_dialog = FileSelectorDialog(
+            icon=":/assets/file.svg",
+            files=self.get_files(),
+            parent=self.view,
+            filters=True,
+            multiple=True,
+        )
+        result = file_selector_dialog.exec_()
+
+        if result != FileSelectorDialog.DialogCode.Accepted:
+            print(Path(__file__).name, "-", "FileSelectorDialog rejected")
+            return
+
+        self.run(self._samples_from_files(list(file_selector_dialog.checked_files)))
+
+    def select_sample_sheet(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self.view,
+            "Seleccionar hoja de muestras",
+            "",
+            "Sample sheet (*.csv *.tsv *.txt)",
+        )
+
+        if not file_path:
+            return
+
+        try:
+            samples = read_sample_sheet(Path(file_path))
+        except Exception as e:
+            QMessageBox.warning(
+                self.view, "Error", f"No se pudo leer la hoja de muestras:\n{e}"
+            )
+            return
+
+        self.run(self._samples_from_sheet(samples))
+
+    def _samples_from_files(
+        self, files: list[Path]
+    ) -> list[tuple[str, Path, Optional[Path]]]:
+        if self.is_paired():
+            return pair_sample_files(files)
+        return [(get_sequence_file_base_name(f), f, None) for f in files]
+
+    def _samples_from_sheet(
+        self, samples: list[tuple[str, Path, Optional[Path]]]
+    ) -> list[tuple[str, Path, Optional[Path]]]:
+        if self.is_paired():
+            return samples
+        return [(name, file_1, None) for name, file_1, _ in samples]
+
+    # execution
+
+    def run(self, samples: list[tuple[str, Path, Optional[Path]]]):
+        if self.queue is not None and self.queue.is_running():
+            QMessageBox.warning(
+                self.view, "Error", "Ya hay un lote en ejecución en este panel."
+            )
+            return
+
+        if self.is_paired():
+            unpaired = [name for name, _, file_2 in samples if file_2 is None]
+            samples = [sample for sample in samples if sample[2] is not None]
+
+            if unpaired:
+                QMessageBox.warning(
+                    self.view,
+                    "Muestras sin pareja",
+                    "Se omitirán las siguientes muestras sin archivo R2:\n"
+                    + "\n".join(unpaired),
+                )
+
+        if not samples:
+            return
+
+        self.queue = self._create_queue()
+
+        for name, file_1, file_2 in samples:
+            self._add_sample(name, file_1, file_2)
+
+        self._show_progress()
+
+        self.queue.progress_changed.connect(self._on_progress_changed)
+        self.queue.job_started.connect(
+            lambda name, threads: print(
+                Path(__file__).name, "-", f"{name} running with {threads} threads"
+            )
+        )
+        self.queue.finished.connect(self._on_finished)
+        self.queue.start()
+
+        print(
+            Path(__file__).name,
+            "-",
+            f"Batch started with {len(samples)} samples "
+            f"and a budget of {self.queue.cpu_budget} CPUs",
+        )
+
+    def _create_queue(self) -> BatchQueue:
+        return BatchQueue(
+            max_concurrent_jobs=self.max_concurrent_jobs,
+            result_cache=get_result_cache(),
+            parent=self.view,
+        )
+
+    def _add_sample(self, name: str, file_1: Path, file_2: Optional[Path]):
+        job = self.create_job(name, file_1, file_2)
+        if job is not None:
+            self.queue.add_job(job)
+
+    def cancel(self):
+        if self.queue is not None:
+            self.queue.cancel()
+
+    def _show_progress(self):
+        self.progress = QProgressDialog(
+            "Procesando lote...",
+            "Cancel",
+            0,
+            0,
+            self.view,
+        )
+        self.progress.setWindowTitle("Procesamiento por lotes")
+        self.progress.setMinimumDuration(0)
+        self.progress.setAutoClose(False)
+        self.progress.setAutoReset(False)
+        self.progress.setCancelButton(QPushButton("Cancel", self.progress))
+        self.progress.setMinimumWidth(400)
+        self.progress.setWindowModality(Qt.WindowModality.NonModal)
+        self.progress.canceled.connect(self.cancel)
+        self.progress.show()
+
+    def _on_progress_changed(self, done: int, total: int):
+        self.progress.setMaximum(total)
+        self.progress.setValue(done)
+        self.progress.setLabelText(f"Procesando lote: {done}/{total} trabajos")
+
+    def _on_finished(self):
+        failed = self.queue.failed_jobs if self.queue is not None else []
+
+        self.progress.close()
+
+        if failed:
+            QMessageBox.warning(
+                self.view,
+                "Lote finalizado con errores",
+                "Fallaron los siguientes trabajos:\n" + "\n".join(failed),
+            )
+
+        print(Path(__file__).name, "-", "Batch finished.")
+
+        if self.on_finished is not None:
+            self.on_finished()
@@ -9,12 +9,12 @@ from utils import (
     clear_layout,
     strip_any_suffix,
 )
-from workers import DownloadWorker, UngzipWorker, UntarWorker, FilenameWorker
+from workers import DownloadExtractWorker, FilenameWorker
 
 
 class DatabaseManagerController:
 
-    _workers: list[DownloadWorker | UngzipWorker | UntarWorker] = []
+    _workers: list[DownloadExtractWorker] = []
 
     def __init__(
         self,
@@ -24,6 +24,7 @@ class DatabaseManagerController:
         db_folder: Path,
         add_database: Callable[[str, str], None],
         remove_database_by_link: Callable[[str], None],
+        on_database_installed: Optional[Callable[[Path], None]] = None,
     ):
         self.view = view
         self.available_db = available_db
@@ -31,6 +32,8 @@ class DatabaseManagerController:
         self.db_folder = db_folder
         self.add_database = add_database
         self.remove_database_by_link = remove_database_by_link
+        # Called with the extracted folder or saved file of each download
+        self.on_database_installed = on_database_installed
 
         self._load_databases()
         self.view.add_button.clicked.connect(self.download_new_database)
@@ -233,21 +236,19 @@ class DatabaseManagerController:
     def _download_database(self, link: str, name: Optional[str] = None):
         self._show_download_progress(name)
 
-        worker = DownloadWorker(link, self.db_folder.as_posix(), parent=self.view)
+        # Los .tar(.gz) se extraen en la carpeta mientras se descargan
+        worker = DownloadExtractWorker(
+            link, self.db_folder.as_posix(), parent=self.view
+        )
 
         worker.progress_changed.connect(self.progress.setValue)
         worker.file_name_signal.connect(self.on_download_file_name)
         worker.finished_signal.connect(
             lambda path, w=worker: self._on_download_finished(Path(path), w)
         )
-        worker.error.connect(lambda error: print(Path(__file__).name, "error:", error))
+        worker.error.connect(lambda error, w=worker: self._on_download_error(error, w))
 
-        self.progress.canceled.connect(
-            lambda: (
-                worker.terminate(),
-                self.progress.deleteLater(),
-            )
-        )
+        self.progress.canceled.connect(worker.cancel)
 
         self._workers.append(worker)
         worker.start()
@@ -255,97 +256,18 @@ class DatabaseManagerController:
     def on_download_file_name(self, name: str):
         self.progress.setLabelText(f"Downloading database: {name}")
 
-    def _on_download_finished(self, path: Path, worker: DownloadWorker):
+    def _on_download_finished(self, path: Path, worker: DownloadExtractWorker):
+        print(Path(__file__).name, "-", "database extracted:", path)
         self.progress.setLabelText("Database downloaded")
         self._workers.remove(worker)
-        self.check_suffix(path)
-
-    # ungzip
-
-    def _ungzip_database(self, file: Path):
-        """
-        Unzips a gzip file and emits progress signals.
-        If the file is successfully unzipped, it checks the suffix of the file.
-        """
-        print(Path(__file__).name, "-", "ungzip database:", file)
-
-        worker = UngzipWorker(file)
-
-        worker.progress.connect(self.progress.setValue)
-        worker.finished.connect(
-            lambda path, src=file, w=worker: self._on_ungzip_finished(src, path, w)
-        )
-        worker.error.connect(
-            lambda error: print(Path(__file__).name, "error:", error),
-        )
-
-        self.progress.setLabelText("Ungzipping database...")
-        self._workers.append(worker)
-        worker.start()
-
-    def _on_ungzip_finished(self, src: Path, path: Path, worker: UngzipWorker):
-        """
-        Callback for when the ungzip worker finishes.
-        It checks the suffix of the file to determine the next action.
-        """
-        src.unlink(missing_ok=True)
-        self.progress.setLabelText("Gzip extraction completed")
-        self._workers.remove(worker)
-        self.check_suffix(path)
-
-    # untar
-
-    def _untar_database(self, file: Path):
-        worker = UntarWorker(file, file.parent)
-
-        worker.progress_changed.connect(self.progress.setValue)
-        worker.finished.connect(
-            lambda path, src=file, w=worker: self._on_untar_finished(src, path, w)
-        )
-        worker.error.connect(
-            lambda error: print(Path(__file__).name, "error:", error),
-        )
+        self._load_databases()
+        self.progress.close()
 
-        self.progress.setLabelText("Untarring database...")
-        self._workers.append(worker)
-        worker.start()
+        if self.on_database_installed is not None:
+            self.on_database_installed(path)
 
-    def _on_untar_finished(self, src: Path, path: Path, worker: UntarWorker):
-        """
-        Callback for when the untar worker finishes.
-        It checks the suffix of the file to determine the next action.
-        """
-        src.unlink(missing_ok=True)
-        self.progress.setLabelText("Tar extraction completed")
+    def _on_download_error(self, error: str, worker: DownloadExtractWorker):
+        print(Path(__file__).name, "error:", error)
         self._workers.remove(worker)
-        self.check_suffix(path)
-
-    # check suffix
-
-    def check_suffix(self, file: Path):
-        """
-        Checks the suffix of the file name and returns the appropriate suffix.
-        """
-        print(Path(__file__).name, "-", "check suffix:", file.suffix)
-
-        if file.is_file() and file.suffix == ".tar":
-            print(Path(__file__).name, "-", "untar database")
-            self._untar_database(file)
-            return
-
-        if file.is_file() and file.suffix == ".gz":
-            print(Path(__file__).name, "-", "ungzip database")
-            self._ungzip_database(file)
-            return
-
-        if file.is_file() and file.suffix:
-            QMessageBox.warning(
-                self.view,
-                "Error",
-                f"Unsupported file type: {file.suffix}. Please use .tar or .gz files.",
-            )
-            print(Path(__file__).name, "-", "unsupported file type:", file.suffix)
-
-        print(Path(__file__).name, "-", "no suffix found, deleting file")
         self._load_databases()
-        self.progress.close(),
+        self.progress.close()
@@ -1,22 +1,34 @@
-import re
-import json
 from pathlib import Path
 from typing import Optional, Tuple
-from PySide6.QtCore import QProcess
+from PySide6.QtCore import QThreadPool
 from views.main_window.panels.fastqc_panel import FastqcPanel
 from utils import (
     to_unc_path,
     get_source_files_paths,
     get_trimmed_files_paths,
-    extract_fastqc_data,
+    read_fastqc_data,
+    extract_fastqc_chart,
+    render_fastqc_chart,
+    CHART_FILES,
+    FastQCModule,
+    get_fastqc_builtin_engine_from_settings,
+    set_fastqc_builtin_engine_in_settings,
     get_current_workspace_folder_path,
     get_fastqc_file_path,
     get_fastqc_folder_path,
+    get_result_cache,
 )
+from jobs import ExitEvent, FastQCJobSpec, LogEvent, ProgressEvent
+from workers import BatchJob, GenericWorker, JobSupervisor
+from .batch_run_controller import BatchRunController
 
 
 class FastQCPanelController:
     selected_input_file: Optional[Path] = None
+    report_zip: Optional[Path] = None
+    running_spec: Optional[FastQCJobSpec] = None
+    checking_spec: Optional[FastQCJobSpec] = None
+    report_modules: dict[str, FastQCModule] = {}
 
     """
     Controller for handling FastQC panel operations.
@@ -30,10 +42,10 @@ class FastQCPanelController:
         """
         self.view = view
 
-        self.process = QProcess()
-        self.process.readyReadStandardOutput.connect(self.on_stdout)
-        self.process.readyReadStandardError.connect(self.ou_stderr)
-        self.process.finished.connect(self.on_finished)
+        self.supervisor = JobSupervisor(self.view)
+        self.supervisor.progress.connect(self.on_progress)
+        self.supervisor.log.connect(self.on_log)
+        self.supervisor.exited.connect(self.on_finished)
 
         self.view.body.input_file_widget.select_file_button.clicked.connect(
             self.open_files_window
@@ -43,6 +55,22 @@ class FastQCPanelController:
         )
         self.view.head.cli_push_button.clicked.connect(self._open_cli_dialog)
         self.view.head.user_manual_button.clicked.connect(self.open_user_manual)
+        self.view.head.builtin_engine_button.setChecked(
+            get_fastqc_builtin_engine_from_settings()
+        )
+        self.view.head.builtin_engine_button.toggled.connect(
+            set_fastqc_builtin_engine_in_settings
+        )
+        self._connect_summary_buttons()
+
+        # batch
+
+        self.batch_run_controller = BatchRunController(
+            self.view,
+            get_files=lambda: get_source_files_paths() + get_trimmed_files_paths(),
+            create_job=self._create_batch_job,
+        )
+        self.view.head.batch_button.clicked.connect(self.batch_run_controller.open_menu)
 
     def _open_cli_dialog(self):
         if self.selected_input_file is None:
@@ -77,19 +105,36 @@ class FastQCPanelController:
             print("No file path provided.")
             return
 
-        report_path = Path(workspace) / "reports" / file.stem
+        spec = self.create_job_spec(file)
+        self.checking_spec = spec
 
-        if report_path.exists() and report_path.is_dir() and any(report_path.iterdir()):
-            print(Path(__file__).name, "-", f"Report already exists for {file}.")
-
-            self.view.body.main_layout.removeWidget(self.view.body.report_content_area)
-            self.view.body.main_layout.addWidget(
-                self.view.body.report_content_area, 1, 1, 2, 1
+        # The report is reused only if FastQC already analysed a file with the
+        # same content and options, not just one with the same name. Restoring
+        # copies the cached files, so it runs in the thread pool
+        self.restore_worker = GenericWorker(get_result_cache().restore, spec)
+        self.restore_worker.signals.finished.connect(
+            lambda restored, s=spec: self._on_report_restored(s, bool(restored))
+        )
+        self.restore_worker.signals.error.connect(
+            lambda error, s=spec: (
+                print(Path(__file__).name, "-", "Error restoring the report:", error),
+                self._on_report_restored(s, False),
             )
-            self.view.body.basic_statistics_report_widget.setVisible(True)
-            self.view.body.report_content_area.setCurrentIndex(2)
+        )
+        QThreadPool.globalInstance().start(self.restore_worker)
+
+    def _on_report_restored(self, spec: FastQCJobSpec, restored: bool):
+        # Another file was selected in the meantime
+        if spec is not self.checking_spec:
+            return
+
+        file = spec.input_file
+
+        if restored:
+            print(Path(__file__).name, "-", f"Report already exists for {file}.")
 
-            self.get_fastqc_results(report_path)
+            self._remove_html_report(spec.output_dir / f"{spec.report_name}.html")
+            self._show_report(spec)
 
         else:
             print(f"No report found for {file}. Generating report...")
@@ -102,199 +147,239 @@ class FastQCPanelController:
             self.view.body.report_content_area.setCurrentIndex(1)
             self.generate_report(file)
 
-    def get_fastqc_results(self, report_path: Path):
-        print(Path(__file__).name, "-", f"Getting FastQC results for {report_path}...")
+    def _show_report(self, spec: FastQCJobSpec):
+        self.view.body.main_layout.removeWidget(self.view.body.report_content_area)
+        self.view.body.main_layout.addWidget(
+            self.view.body.report_content_area, 1, 1, 2, 1
+        )
+        self.view.body.basic_statistics_report_widget.setVisible(True)
+        self.view.body.report_content_area.setCurrentIndex(2)
 
-        basic_statistics_path = report_path / "basic_statistics.json"
-        if basic_statistics_path.exists():
-            with basic_statistics_path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.view.body.basic_statistics_report_widget.set_filename(
-                    data[0]["Value"]
-                )
-                self.view.body.basic_statistics_report_widget.set_filetype(
-                    data[1]["Value"]
-                )
-                self.view.body.basic_statistics_report_widget.set_encoding(
-                    data[2]["Value"]
-                )
-                self.view.body.basic_statistics_report_widget.set_total_sequences(
-                    data[3]["Value"]
-                )
-                self.view.body.basic_statistics_report_widget.set_sequences_flagged_as_poor_quality(
-                    data[4]["Value"]
-                )
-                self.view.body.basic_statistics_report_widget.set_sequence_length(
-                    data[5]["Value"]
-                )
-                self.view.body.basic_statistics_report_widget.set_percent_gc(
-                    data[6]["Value"]
-                )
+        self.get_fastqc_results(spec.outputs[0])
 
-        self.view.body.summary_list_widget.per_base_sequence_quality_push_button.setEnabled(
-            True
-        )
-        self.view.body.summary_list_widget.per_sequence_quality_scores_push_button.setEnabled(
-            True
-        )
-        self.view.body.summary_list_widget.per_base_sequence_content_push_button.setEnabled(
-            True
-        )
-        self.view.body.summary_list_widget.per_sequence_gc_content_push_button.setEnabled(
-            True
-        )
-        self.view.body.summary_list_widget.per_base_n_content.setEnabled(True)
-        self.view.body.summary_list_widget.sequence_length_distribution_push_button.setEnabled(
-            True
-        )
-        self.view.body.summary_list_widget.sequence_duplication_levels_push_button.setEnabled(
-            True
-        )
-        self.view.body.summary_list_widget.overrepresented_sequences_push_button.setEnabled(
-            True
-        )
-        self.view.body.summary_list_widget.adapter_content_push_button.setEnabled(True)
+    def get_fastqc_results(self, report_zip: Path):
+        """
+        Read the FastQC results from the report zip in the background.
+        """
+        print(Path(__file__).name, "-", f"Getting FastQC results for {report_zip}...")
 
-        self.view.body.summary_list_widget.per_base_sequence_quality_push_button.clicked.connect(
-            lambda: self.show_report_chart(
-                report_path / "per_base_sequence_quality.png"
-            )
-        )
+        self.report_zip = report_zip
+        self.report_modules = {}
 
-        self.view.body.summary_list_widget.per_sequence_quality_scores_push_button.clicked.connect(
-            lambda: self.show_report_chart(
-                report_path / "per_sequence_quality_scores.png"
-            )
+        self.report_worker = GenericWorker(read_fastqc_data, report_zip)
+        self.report_worker.signals.finished.connect(
+            lambda modules: self._on_fastqc_results_loaded(report_zip, modules)
         )
-
-        self.view.body.summary_list_widget.per_base_sequence_content_push_button.clicked.connect(
-            lambda: self.show_report_chart(
-                report_path / "per_base_sequence_content.png"
+        self.report_worker.signals.error.connect(
+            lambda error: print(
+                Path(__file__).name, "-", "Error reading the FastQC results:", error
             )
         )
+        QThreadPool.globalInstance().start(self.report_worker)
+
+    def _on_fastqc_results_loaded(
+        self, report_zip: Path, modules: dict[str, FastQCModule]
+    ):
+        if report_zip != self.report_zip:
+            return  # Results of a previously selected file
+
+        self.report_modules = modules
+
+        basic_statistics = modules.get("Basic Statistics")
+        if basic_statistics is not None:
+            data = basic_statistics.as_dict()
+            widget = self.view.body.basic_statistics_report_widget
+            widget.set_filename(str(data.get("Filename", "")))
+            widget.set_filetype(str(data.get("File type", "")))
+            widget.set_encoding(str(data.get("Encoding", "")))
+            widget.set_total_sequences(data.get("Total Sequences", ""))
+            widget.set_sequences_flagged_as_poor_quality(
+                data.get("Sequences flagged as poor quality", "")
+            )
+            widget.set_sequence_length(str(data.get("Sequence length", "")))
+            widget.set_percent_gc(str(data.get("%GC", "")))
+
+        for button, _ in self._summary_buttons():
+            button.setEnabled(True)
+
+    def _summary_buttons(self):
+        summary = self.view.body.summary_list_widget
+        return [
+            (
+                summary.per_base_sequence_quality_push_button,
+                "Per base sequence quality",
+            ),
+            (
+                summary.per_sequence_quality_scores_push_button,
+                "Per sequence quality scores",
+            ),
+            (
+                summary.per_base_sequence_content_push_button,
+                "Per base sequence content",
+            ),
+            (summary.per_sequence_gc_content_push_button, "Per sequence GC content"),
+            (summary.per_base_n_content, "Per base N content"),
+            (
+                summary.sequence_length_distribution_push_button,
+                "Sequence Length Distribution",
+            ),
+            (
+                summary.sequence_duplication_levels_push_button,
+                "Sequence Duplication Levels",
+            ),
+            (
+                summary.overrepresented_sequences_push_button,
+                "Overrepresented sequences",
+            ),
+            (summary.adapter_content_push_button, "Adapter Content"),
+        ]
 
-        self.view.body.summary_list_widget.per_sequence_gc_content_push_button.clicked.connect(
-            lambda: self.show_report_chart(report_path / "per_sequence_gc_content.png")
-        )
-
-        self.view.body.summary_list_widget.per_base_n_content.clicked.connect(
-            lambda: self.show_report_chart(report_path / "per_base_n_content.png")
-        )
+    def _connect_summary_buttons(self):
+        for button, module in self._summary_buttons():
+            if module == "Overrepresented sequences":
+                button.clicked.connect(
+                    lambda _=False, m=module: self.show_report_table(m)
+                )
+            else:
+                button.clicked.connect(
+                    lambda _=False, m=module: self.show_report_chart(m)
+                )
 
-        self.view.body.summary_list_widget.sequence_length_distribution_push_button.clicked.connect(
-            lambda: self.show_report_chart(
-                report_path / "sequence_length_distribution.png"
-            )
-        )
+    def show_report_chart(self, module: str):
+        """
+        Show the chart of a module, extracted from the report zip on demand.
+        """
+        chart_path = None
 
-        self.view.body.summary_list_widget.sequence_duplication_levels_push_button.clicked.connect(
-            lambda: self.show_report_chart(
-                report_path / "sequence_duplication_levels.png"
+        if self.report_zip is not None and self.report_zip.exists():
+            chart_path = extract_fastqc_chart(
+                self.report_zip, module, self.report_zip.parent
             )
-        )
 
-        self.view.body.summary_list_widget.overrepresented_sequences_push_button.clicked.connect(
-            lambda: self.show_report_table(
-                report_path / "overrepresented_sequences.json"
+        # Reports of the built-in engine have no images: the chart is drawn
+        # from the module table
+        if chart_path is None and module in self.report_modules:
+            chart_path = render_fastqc_chart(
+                self.report_modules[module],
+                self.report_zip.parent / CHART_FILES[module],
             )
-        )
 
-        self.view.body.summary_list_widget.adapter_content_push_button.clicked.connect(
-            lambda: self.show_report_chart(report_path / "adapter_content.png")
-        )
-
-    def show_report_chart(self, chart_path: Path):
-        if not chart_path.exists():
+        if chart_path is None:
             self.view.body.report_content_area.setCurrentIndex(2)
             return
 
         self.view.body.report_chart_widget.set_chart(chart_path)
         self.view.body.report_content_area.setCurrentIndex(3)
 
-    def show_report_table(self, table_data_path: Path):
-        if not table_data_path.exists():
+    def show_report_table(self, module: str):
+        table = self.report_modules.get(module)
+
+        if table is None:
             self.view.body.report_content_area.setCurrentIndex(2)
             return
 
-        with table_data_path.open("r", encoding="utf-8") as f:
-            table_data = json.load(f)
-            table_data = list(
-                map(
-                    lambda x: (
-                        x["Sequence"],
-                        x["Count"],
-                        x["Percentage"],
-                        x["Possible Source"],
-                    ),
-                    table_data,
-                )
-            )
-            self.view.body.report_table_widget.set_table_data(table_data)
-            self.view.body.report_content_area.setCurrentIndex(4)
+        self.view.body.report_table_widget.set_table_data(
+            [tuple(row[:4]) for row in table.rows]
+        )
+        self.view.body.report_content_area.setCurrentIndex(4)
 
-    def _generate_command(self, file_path) -> Tuple[str, list[str]]:
+    def create_job_spec(
+        self, file_path, threads: Optional[int] = None
+    ) -> FastQCJobSpec:
         output_dir = (
             Path(get_current_workspace_folder_path()) / "reports" / Path(file_path).stem
         )
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        arguments = [
-            f"{file_path}",
-            f"--outdir={to_unc_path(output_dir.as_posix())}",
-        ]
-
-        fastqc_file_path = get_fastqc_file_path().as_posix()
+        fastqc_file_path = get_fastqc_file_path()
 
-        return (
-            fastqc_file_path,
-            arguments,
+        return FastQCJobSpec(
+            executable=fastqc_file_path.as_posix() if fastqc_file_path else "fastqc",
+            input_file=Path(file_path),
+            output_dir=Path(to_unc_path(output_dir.as_posix())),
+            threads=threads,
+            engine="builtin" if get_fastqc_builtin_engine_from_settings() else "fastqc",
+            working_directory=get_fastqc_folder_path(),
         )
 
+    def _generate_command(
+        self, file_path, threads: Optional[int] = None
+    ) -> Tuple[str, list[str]]:
+        return self.create_job_spec(file_path, threads).to_command()
+
     def generate_report(self, file_path):
-        self.process.setWorkingDirectory(get_fastqc_folder_path().as_posix())
-        self.process.start(*self._generate_command(file_path))
+        self.running_spec = self.create_job_spec(file_path)
+
+        # The built-in engine does not need FastQC to be installed
+        self.supervisor.start(
+            *self.running_spec.to_command(),
+            self.running_spec.supervisor_policy(),
+            self.running_spec.working_directory,
+        )
 
-    def on_stdout(self):
+    def on_progress(self, event: ProgressEvent):
         """
-        Reads the standard output from the FastQC process and updates the view.
+        Updates the view with the progress reported by the FastQC process.
         """
-        if "Analysis complete" in self.process.readAllStandardOutput().data().decode():
+        if event.message.startswith("Analysis complete"):
             print(Path(__file__).name, "-", "FastQC analysis complete.")
 
-    def ou_stderr(self):
+        if event.percent is not None:
+            progress = int(event.percent)
+            self.view.body.report_generation_widget.progress_bar.setValue(progress)
+            print(f"Progress: {progress}%")
+
+    def on_log(self, event: LogEvent):
         """
-        Reads the standard error from the FastQC process and updates the view.
+        Prints the FastQC errors to the console.
         """
-        error = self.process.readAllStandardError().data().decode()
-        """ print("FastQC output:", output) """
-        progress_match = re.search(r"(\d+)%", error)
+        if event.stream == "stderr":
+            print(Path(__file__).name, "-", "FastQC:", event.line)
 
-        if progress_match:
-            progress = int(progress_match.group(1))
-            self.view.body.report_generation_widget.progress_bar.setValue(progress)
-            print(f"Progress: {progress}%")
+    def _create_batch_job(
+        self, name: str, input_file: Path, _: Optional[Path] = None
+    ) -> BatchJob:
+        """
+        Create a batch job for FastQC. FastQC analyses one file per thread,
+        so each job gets a single thread and the queue runs several at once.
+        """
 
-    def on_finished(self, exit_code, exit_status):
-        if exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0:
-            input_file_path = Path(self.process.arguments()[0])
+        def build(threads: int) -> Tuple[str, list[str]]:
+            job.spec = self.create_job_spec(input_file, threads)
+            return job.spec.to_command()
+
+        job = BatchJob(
+            name=name,
+            build=build,
+            max_threads=1,
+            working_directory=get_fastqc_folder_path(),
+            on_finished=lambda exit_code: (
+                self._remove_html_report(
+                    job.spec.output_dir / f"{job.spec.report_name}.html"
+                )
+                if exit_code == 0
+                else None
+            ),
+        )
 
-            output_dir = (
-                get_current_workspace_folder_path() / "reports" / input_file_path.stem
-            )
-            output_dir.mkdir(parents=True, exist_ok=True)
+        return job
 
-            input_file_path = input_file_path.with_name(input_file_path.stem + "_fastqc").with_suffix(".html")
+    def _remove_html_report(self, html_report: Path):
+        """
+        The report zip is the only artifact kept: it already holds the HTML
+        report, the charts and fastqc_data.txt.
+        """
+        html_report.unlink(missing_ok=True)
 
-            extract_fastqc_data(
-                input_file_path.as_posix(),
-                output_dir,
-            )
+    def on_finished(self, event: ExitEvent):
+        if event.ok:
+            spec = self.running_spec
 
-            self.check_existing_report(
-                Path(get_current_workspace_folder_path())
-                / "reports"
-                / Path(self.process.arguments()[0]).stem
-            )
+            self.store_worker = GenericWorker(get_result_cache().store, spec)
+            QThreadPool.globalInstance().start(self.store_worker)
+            self._remove_html_report(spec.output_dir / f"{spec.report_name}.html")
+
+            self._show_report(spec)
 
     def open_files_window(self):
         """Open the FilesWindow."""
@@ -331,8 +416,8 @@ class FastQCPanelController:
         """
         Cancels the report generation process.
         """
-        if self.process.state() == QProcess.ProcessState.Running:
-            self.process.kill()
+        if self.supervisor.is_running():
+            self.supervisor.cancel()
             print(Path(__file__).name, "-", "Report generation cancelled.")
             self.view.body.basic_statistics_report_widget.setVisible(False)
             self.view.body.main_layout.removeWidget(self.view.body.report_content_area)
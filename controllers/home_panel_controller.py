@@ -3,8 +3,10 @@ import shutil
 from pathlib import Path
 from typing import Optional
 from PySide6.QtWidgets import QFileDialog, QProgressDialog
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThreadPool
 from utils import (
+    SEQUENCE_FILE_EXTENSIONS,
+    describe_sequence_file,
     get_current_workspace,
     get_current_workspace_source_folder_path,
     get_trimmed_files_paths,
@@ -12,10 +14,20 @@ from utils import (
     get_source_files_paths,
     get_krakened_files_paths,
     get_fastqc_output_folder_path_by_file,
+    mark_workspace_folders_dirty,
+    WorkspaceWatcher,
 )
 from views.main_window.panels.home_panel import HomePanel
-from views.main_window.panels.home_panel.widgets import WorkspaceFileItemWidget
-from workers import MoveFileWorker
+from jobs import remove_sequence_index
+from workers import MoveFileWorker, GenericWorker
+
+
+def _build_sequence_index(file: Path):
+    # Imported in the worker thread: it loads NumPy, which is kept out of
+    # the startup path
+    from jobs import build_sequence_index
+
+    return build_sequence_index(file)
 
 
 class HomePanelController:
@@ -24,6 +36,22 @@ class HomePanelController:
 
         self.view = view
 
+        # Sequence files (source and trimmed) whose summary is listed
+        self._sequence_files: set[Path] = set()
+        self._index_workers: dict[Path, GenericWorker] = {}
+
+        file_list_view = self.view.content.files_area.file_list_widget.file_list_view
+        file_list_view.files_model.describe = self._describe_file
+        file_list_view.files_model.details_missing.connect(self._index_file)
+        file_list_view.open_requested.connect(
+            lambda f: os.startfile(f.parent.as_posix())
+        )
+        file_list_view.delete_requested.connect(self.show_delete_source_file_dialog)
+
+        # Mantiene al día el índice del workspace y refresca el listado
+        self.workspace_watcher = WorkspaceWatcher(self.view)
+        self.workspace_watcher.changed.connect(lambda: self.load_workspace_files())
+
         self.load_workspace_files()
 
         self.view.header.user_manual_button.clicked.connect(self.open_user_manual)
@@ -41,16 +69,16 @@ class HomePanelController:
         # filter buttons
 
         self.view.content.files_area.file_list_widget.all_button.clicked.connect(
-            lambda: self.load_workspace_files()
+            lambda: file_list_view.set_filter(None)
         )
         self.view.content.files_area.file_list_widget.trimmed_button.clicked.connect(
-            lambda: self.load_workspace_files("Recortados")
+            lambda: file_list_view.set_filter("Recortados")
         )
         self.view.content.files_area.file_list_widget.krakened_button.clicked.connect(
-            lambda: self.load_workspace_files("Taxonomizado")
+            lambda: file_list_view.set_filter("Taxonomizado")
         )
         self.view.content.files_area.file_list_widget.sorted_button.clicked.connect(
-            lambda: self.load_workspace_files("Ordenados")
+            lambda: file_list_view.set_filter("Ordenados")
         )
 
         #
@@ -120,7 +148,9 @@ class HomePanelController:
             print(__name__, "-", f"Path {file_path} is not a file.")
             return
 
-        if not file_path.suffix in {".fasta", ".fa", ".fastq", ".fq"}:
+        if not file_path.name.lower().endswith(
+            tuple(f".{ext}" for ext in SEQUENCE_FILE_EXTENSIONS)
+        ):
             print(__name__, "-", f"File {file_path} is not a supported RNA file type.")
             return
 
@@ -144,67 +174,86 @@ class HomePanelController:
 
     def _on_upload_file_finished(self, dialog: QProgressDialog):
         dialog.close()
+        mark_workspace_folders_dirty(get_current_workspace_source_folder_path())
         self.load_workspace_files()
 
     def load_workspace_files(self, fltr: Optional[str] = None):
-
+        """
+        Update the listed files with the workspace contents. Only the rows
+        that changed are inserted or removed. With `fltr` only that group
+        ("Recortados", "Ordenados" or "Taxonomizado") is shown.
+        """
         source_files = get_source_files_paths()
         trimmed_files = get_trimmed_files_paths()
         sorted_files = get_sorted_files_paths()
         krakened_files = get_krakened_files_paths()
 
+        file_list_view = self.view.content.files_area.file_list_widget.file_list_view
+
         if not source_files and not trimmed_files and not sorted_files:
             self.view.content.files_area.stacked.setCurrentIndex(0)
             print(__name__, "-", "No files found in the workspace.")
             self.current_files = []
+            file_list_view.set_files([])
             return
 
-        # delete existing file list items
+        groups: dict[Path, str] = {}
 
-        for i in range(
-            self.view.content.files_area.file_list_widget.list_widget.scroll_content_layout.count()
+        for group, files in (
+            ("", source_files),
+            ("Recortados", trimmed_files),
+            ("Ordenados", sorted_files),
+            ("Taxonomizado", krakened_files),
         ):
-            item = self.view.content.files_area.file_list_widget.list_widget.scroll_content_layout.itemAt(
-                i
-            )
+            # The listings come from the workspace index, already up to date
+            for file in files:
+                groups.setdefault(file, group)
 
-            if item.widget():
-                item.widget().deleteLater()
+        self._sequence_files = set(source_files + trimmed_files)
 
-        # add new file list items
+        file_list_view.set_files(list(groups), groups)
+        if fltr is not None:
+            file_list_view.set_filter(fltr)
 
-        files = []
+        self.view.content.files_area.stacked.setCurrentIndex(1)
 
-        if fltr == "Recortados":
-            files = trimmed_files
-        elif fltr == "Ordenados":
-            files = sorted_files
-        elif fltr == "Taxonomizado":
-            files = krakened_files
-        else:
-            files = source_files + trimmed_files + sorted_files + krakened_files
+    def _describe_file(self, file: Path) -> Optional[str]:
+        """
+        Summary shown under a listed file: None while a sequence file is
+        not indexed yet (the list then asks for `_index_file`).
+        """
+        if file not in self._sequence_files:
+            return ""
+        return describe_sequence_file(file)
 
-        for file in files:
-            if not file.exists():
-                continue
+    def _index_file(self, file: Path):
+        """
+        Build the index of a sequence file in the background (read count,
+        lengths and record offsets for previews), once per file.
+        """
+        if file in self._index_workers:
+            return
 
-            file_list_item = WorkspaceFileItemWidget(
-                file.name,
-                str(file),
-                parent=self.view.content.files_area.file_list_widget,
-            )
-            file_list_item.open_action.clicked.connect(
-                lambda _, f=file: os.startfile(f.parent.as_posix())
-            )
-            file_list_item.delete_action.clicked.connect(
-                lambda _, f=file: self.show_delete_source_file_dialog(f)
+        worker = GenericWorker(_build_sequence_index, file)
+        worker.signals.finished.connect(lambda _, f=file: self._on_file_indexed(f))
+        worker.signals.error.connect(
+            lambda error, f=file: (
+                self._index_workers.pop(f, None),
+                print(__name__, "-", f"Could not index {f}: {error}"),
             )
+        )
+        self._index_workers[file] = worker
+        QThreadPool.globalInstance().start(worker)
 
-            self.view.content.files_area.file_list_widget.list_widget.scroll_content_layout.addWidget(
-                file_list_item
-            )
+    def _on_file_indexed(self, file: Path):
+        self._index_workers.pop(file, None)
+
+        details = describe_sequence_file(file)
 
-            self.view.content.files_area.stacked.setCurrentIndex(1)
+        if details is not None:
+            self.view.content.files_area.file_list_widget.file_list_view.files_model.set_details(
+                file, details
+            )
 
     def show_delete_source_file_dialog(self, source_file: Path):
         """
@@ -238,6 +287,8 @@ class HomePanelController:
                 shutil.rmtree(fastqc_output_folder)
 
             file.unlink(True)
+            remove_sequence_index(file)
+            mark_workspace_folders_dirty(file.parent)
 
             self.load_workspace_files()
         except Exception as e:
@@ -1,4 +1,5 @@
 import shutil
+import time
 from pathlib import Path
 from PySide6.QtWidgets import QDialog, QFileDialog, QMessageBox
 from views import HomeWindow, CreateWorkspaceDialog
@@ -8,6 +9,8 @@ from utils import (
     get_workspaces,
     add_new_workspace,
     remove_workspace,
+    close_workspace_index,
+    report_startup_time,
 )
 from views.home_window.widgets import WorkspaceItem
 
@@ -176,6 +179,8 @@ class HomeWindowController:
             self.view.body.workspaces.workspaces_list_layout.addWidget(workspace_item)
 
     def open_workspace(self, workspace_path: Path):
+        started = time.perf_counter()
+
         set_current_workspace(workspace_path)
 
         self.view.close()
@@ -185,6 +190,9 @@ class HomeWindowController:
 
         main_window = MainWindow()
         MainWindowController(main_window)
+        main_window.content.first_painted.connect(
+            lambda: report_startup_time(started, "Workspace")
+        )
 
         main_window.show()
         center_window_on_screen(main_window)
@@ -201,6 +209,7 @@ class HomeWindowController:
             remove_workspace(workspace_item.path)
 
             workspace_path = workspace_item.path
+            close_workspace_index(workspace_path)
             if workspace_path.exists() and workspace_path.is_dir():
                 shutil.rmtree(workspace_item.path)
 
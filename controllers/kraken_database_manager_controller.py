@@ -16,7 +16,7 @@ from utils import (
     get_kraken2_database_folder_from_settings,
     get_kraken2_databases_folder_path,
 )
-from workers import DownloadWorker, UntarWorker
+from workers import DownloadExtractWorker
 
 
 class KrakenDatabaseManagerController:
@@ -201,17 +201,15 @@ class KrakenDatabaseManagerController:
         if not dest:
             dest = get_kraken2_databases_folder_path()
 
-        # file path
+        # Folder the archive is extracted into, as it downloads
 
-        input_file_path = dest / name
-        output_folder_path = input_file_path.parent / input_file_path.stem
+        output_folder_path = dest / split_name(name)
 
-        # workers
-        download_worker = DownloadWorker(link, dest, parent=self.view)
-
-        untar_worker = UntarWorker(
-            input_file_path,
-            output_folder_path,
+        # worker
+        download_worker = DownloadExtractWorker(
+            link,
+            dest,
+            extract_folder=output_folder_path,
             parent=self.view,
         )
 
@@ -222,33 +220,26 @@ class KrakenDatabaseManagerController:
         download_worker.finished_signal.connect(
             lambda _, th=download_worker: (
                 self._download_threads.remove(th),
-                untar_worker.start(),
-                self.progress.setLabelText("Database downloaded, extracting..."),
-            )
-        )
-        download_worker.start()
-        self._download_threads.append(download_worker)
-
-        untar_worker.progress_changed.connect(self.progress.setValue)
-        untar_worker.finished.connect(
-            lambda: (
                 self.progress.setValue(100),
                 self.progress.setLabelText(
                     "Database downloaded and extracted successfully."
                 ),
                 self._load_databases(),
                 self.progress.deleteLater(),
-                input_file_path.unlink(missing_ok=True),
             )
         )
-
-        self.progress.canceled.connect(
-            lambda: (
-                download_worker.terminate(),
-                untar_worker.terminate(),
+        download_worker.error.connect(
+            lambda error, th=download_worker: (
+                self._download_threads.remove(th),
                 self.progress.deleteLater(),
+                self._load_databases(),
+                print(Path(__file__).name, "error:", error),
             )
         )
+        download_worker.start()
+        self._download_threads.append(download_worker)
+
+        self.progress.canceled.connect(download_worker.cancel)
 
     def on_file_name(self, name: str):
         self.progress.setLabelText(f"Downloading database: {name}")
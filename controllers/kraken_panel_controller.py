@@ -1,14 +1,11 @@
 import os
-from typing import Callable, Optional, Tuple
+import time
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
 from pathlib import Path
-from PySide6.QtCore import QProcess, QThreadPool
+from PySide6.QtCore import QThreadPool, QCoreApplication
 from views.main_window.panels import KrakenPanel
-from views.main_window.panels.kraken_panel.widgets import (
-    PreviousReportItemWidget,
-)
 from views.widgets import SelectFilePushButton, SavedConfigItemWidget
 from utils import (
-    win_to_wsl,
     clear_layout,
     get_krakened_files_paths,
     get_kraken2_output_folder_path,
@@ -19,27 +16,94 @@ from utils import (
     remove_kraken2_saved_config,
     get_source_files_paths,
     get_trimmed_files_paths,
+    get_result_cache,
+)
+from jobs import (
+    ExitEvent,
+    ExitReason,
+    LogEvent,
+    ProgressEvent,
+    KrakenJobSpec,
+    KronaJobSpec,
+    KrakenDatabaseCache,
+    KrakenOutputCounter,
+    strip_compression_suffix,
 )
-from workers import GenericWorker
+from workers import GenericWorker, BatchJob, JobSupervisor
+from .batch_run_controller import BatchRunController
+
+if TYPE_CHECKING:
+    from utils import KrakenReport
+
+
+# The Kraken2 report helpers load Polars. They are imported when called, in
+# the worker threads, so neither startup nor the GUI thread waits for it
+
+
+def _update_workspace_abundance_matrix():
+    from utils import update_workspace_abundance_matrix
+
+    return update_workspace_abundance_matrix()
+
+
+def _read_kraken_report(report_file: Path):
+    from utils import read_kraken_report
+
+    return read_kraken_report(report_file)
+
+
+def _write_krona_html_for_reports(
+    report_files: list[Path], output_file: Optional[Path] = None
+):
+    from utils import write_krona_html_for_reports
+
+    return write_krona_html_for_reports(report_files, output_file)
+
+
+def _write_krona_html(report_files: dict[str, Path], output_file: Path):
+    from utils import read_kraken_report, write_krona_html
+
+    return write_krona_html(
+        {name: read_kraken_report(file) for name, file in report_files.items()},
+        output_file,
+    )
 
 
 class KrakenPanelController:
     selected_input_file_1: Optional[Path] = None
     selected_input_file_2: Optional[Path] = None
     selected_database: Optional[Path] = None
+    kraken_job_spec: Optional[KrakenJobSpec] = None
+    kraken_output_counter: Optional[KrakenOutputCounter] = None
+    _checking_spec: Optional[KrakenJobSpec] = None
 
     def __init__(self, view: KrakenPanel):
         self.view = view
 
-        self.kraken_procces = QProcess()
-        self.kraken_procces.readyReadStandardOutput.connect(self._on_kraken_stdout)
-        self.kraken_procces.readyReadStandardError.connect(self._on_kraken_stderr)
-        self.kraken_procces.finished.connect(self._on_kraken_finished)
+        # Databases are staged inside WSL, where Kraken2 runs
+        self.database_cache = KrakenDatabaseCache(wsl=True)
+        self._database_callbacks: list[Callable[[], None]] = []
+        self._preparing_database: Optional[Path] = None
+        if QCoreApplication.instance() is not None:
+            QCoreApplication.instance().aboutToQuit.connect(self.database_cache.release)
+
+        self.kraken_supervisor = JobSupervisor(self.view)
+        self.kraken_supervisor.output.connect(self._on_kraken_output)
+        self.kraken_supervisor.log.connect(self._on_kraken_log)
+        self.kraken_supervisor.progress.connect(self._on_kraken_progress)
+        self.kraken_supervisor.exited.connect(self._on_kraken_finished)
+
+        # previous reports
 
-        self.krona_procces = QProcess()
-        self.krona_procces.readyReadStandardOutput.connect(self._on_krona_stdout)
-        self.krona_procces.readyReadStandardError.connect(self._on_krona_stderr)
-        self.krona_procces.finished.connect(self._on_krona_finished)
+        self.view.body.files_page.previous_reports_list_widget.open_requested.connect(
+            lambda f: os.startfile(f.parent.as_posix())
+        )
+        self.view.body.files_page.previous_reports_list_widget.delete_requested.connect(
+            self._show_delete_source_file_dialog
+        )
+        self.view.body.files_page.previous_reports_list_widget.file_clicked.connect(
+            self._open_report
+        )
 
         self.view.head.database_download_manager_button.clicked.connect(
             self._open_database_manager
@@ -48,6 +112,23 @@ class KrakenPanelController:
         self.view.head.star_button.clicked.connect(self._open_save_config_dialog)
         self.view.head.user_manual_button.clicked.connect(self.open_user_manual)
 
+        # batch
+
+        self.batch_run_controller = BatchRunController(
+            self.view,
+            get_files=lambda: get_source_files_paths() + get_trimmed_files_paths(),
+            create_job=self._create_batch_job,
+            is_paired=lambda: (
+                self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
+                == "Paired End"
+            ),
+            # Kraken2 loads the whole database in memory, one sample at a time
+            max_concurrent_jobs=1,
+            on_finished=self._on_batch_finished,
+        )
+        self._batch_reports: dict[str, Path] = {}
+        self.view.head.batch_button.clicked.connect(self.batch_run_controller.open_menu)
+
         self.view.body.currentChanged.connect(self._change_page)
 
         # upload files page
@@ -85,6 +166,9 @@ class KrakenPanelController:
         self.view.body.options_page.taxonomize_button.clicked.connect(
             self._checking_existing_report
         )
+        self.view.body.options_page.preload_database.checkbox.toggled.connect(
+            lambda checked: self._prepare_database() if checked else None
+        )
 
         # generation page
 
@@ -127,36 +211,23 @@ class KrakenPanelController:
         self.view.body.files_page.previous_reports_list_widget.setVisible(True)
         self.view.body.files_page.loading_widget.setVisible(False)
 
-        for i in range(
-            self.view.body.files_page.previous_reports_list_widget.scroll_content_layout.count()
-        ):
-            item = self.view.body.files_page.previous_reports_list_widget.scroll_content_layout.itemAt(
-                i
-            )
+        self.view.body.files_page.previous_reports_list_widget.set_files(files)
 
-            if item.widget():
-                item.widget().deleteLater()
+        print(f"{Path(__file__).name}", "-", "Existing Krakened files loaded.")
 
-        for file in files:
-            file_list_item = PreviousReportItemWidget(
-                file.name,
-                str(file),
-                parent=self.view.body.files_page.previous_reports_list_widget,
+        # Keep the cohort abundance matrix in sync with the reports
+        self.abundance_worker = GenericWorker(_update_workspace_abundance_matrix)
+        self.abundance_worker.signals.finished.connect(
+            lambda count: print(
+                Path(__file__).name, "-", f"Abundance matrix updated ({count} reports)."
             )
-            file_list_item.open_action.clicked.connect(
-                lambda _, f=file: os.startfile(f.parent.as_posix())
-            )
-            file_list_item.delete_action.clicked.connect(
-                lambda _, f=file: self._show_delete_source_file_dialog(f)
-            )
-            file_list_item.clicked.connect(
-                lambda f=file: self._open_webview(f.as_posix())
-            )
-            self.view.body.files_page.previous_reports_list_widget.scroll_content_layout.addWidget(
-                file_list_item
+        )
+        self.abundance_worker.signals.error.connect(
+            lambda error: print(
+                Path(__file__).name, "-", "Error updating the abundance matrix:", error
             )
-
-        print(f"{Path(__file__).name}", "-", "Existing Krakened files loaded.")
+        )
+        self.pool.start(self.abundance_worker)
 
     def _on_load_existing_report_error(self, error: str):
         self.view.body.files_page.previous_reports_container_widget.setVisible(True)
@@ -165,42 +236,42 @@ class KrakenPanelController:
         print(f"{Path(__file__).name}", "-", "Error loading existing reports:", error)
 
     def _checking_existing_report(self):
-        mode = (
-            self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
-        )
+        """
+        Reuse the Kraken2 report of an identical previous run (same reads,
+        database and options) instead of running Kraken2 again.
+        """
+        spec = self.create_job_spec()
 
-        if mode == "Single End":
-            krona_html = (
-                get_kraken2_output_folder_path()
-                / f"{self.selected_input_file_1.stem}_report.krona.html"
-            )
-            kraken_txt = (
-                get_kraken2_output_folder_path()
-                / f"{self.selected_input_file_1.stem}_report.txt"
-            )
+        if spec is None:
+            return
 
-        if mode == "Paired End":
-            krona_html = (
-                get_kraken2_output_folder_path()
-                / f"{self.selected_input_file_1.stem}_{self.selected_input_file_2.stem}.krona.html"
-            )
-            kraken_txt = (
-                get_kraken2_output_folder_path()
-                / f"{self.selected_input_file_1.stem}_{self.selected_input_file_2.stem}_report.txt"
+        self._checking_spec = spec
+
+        # Restoring copies the cached report, so it runs in the thread pool
+        self.restore_worker = GenericWorker(get_result_cache().restore, spec)
+        self.restore_worker.signals.finished.connect(
+            lambda restored, s=spec: self._on_report_restored(s, bool(restored))
+        )
+        self.restore_worker.signals.error.connect(
+            lambda error, s=spec: (
+                print(Path(__file__).name, "-", "Error restoring the report:", error),
+                self._on_report_restored(s, False),
             )
+        )
+        QThreadPool.globalInstance().start(self.restore_worker)
 
-        print(f"{Path(__file__).name}", "-", "Krona HTML report path:", krona_html)
-        print(f"{Path(__file__).name}", "-", "Kraken TXT report path:", kraken_txt)
+    def _on_report_restored(self, spec: KrakenJobSpec, restored: bool):
+        # Another run was requested in the meantime
+        if spec is not self._checking_spec:
+            return
 
-        if krona_html.exists() and kraken_txt.exists():
+        self._checking_spec = None
 
-            print(
-                f"{Path(__file__).name}", "-", "Krona report and Kraken report found."
-            )
-            self._reset_upload_files_values()
-            self._reset_options_values()
-            self._go_back()
-            self._open_webview(krona_html.as_posix())
+        if restored:
+            print(f"{Path(__file__).name}", "-", "Kraken report found.")
+            self.kraken_job_spec = spec
+            self.view.body.setCurrentIndex(2)  # Navigate to the generation page
+            self._run_krona()
             return
 
         print(f"{Path(__file__).name}", "-", "No existing report found.")
@@ -240,190 +311,260 @@ class KrakenPanelController:
 
     # kraken
 
-    def _generate_kraken_command(self) -> Tuple[str, list[str]]:
+    def create_job_spec(
+        self,
+        input_file_1: Optional[Path] = None,
+        input_file_2: Optional[Path] = None,
+        threads: Optional[int] = None,
+        report_name: Optional[str] = None,
+    ) -> Optional[KrakenJobSpec]:
         """
-        Generate the command to run Kraken based on the selected options.
+        Build the Kraken2 job spec from the selected options.
+        When input files are given (batch mode) they replace the selected ones.
+        The report is named after the input files unless `report_name` is given.
         """
 
-        arguments = [
-            "kraken2",
-        ]
+        from PySide6.QtWidgets import QMessageBox
 
         # operation mode
 
-        mode = (
-            self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
-        )
+        # Batch jobs do not show live counters
+        batch = input_file_1 is not None
+
+        if input_file_1 is not None:
+            mode = "Single End" if input_file_2 is None else "Paired End"
+        else:
+            mode = (
+                self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
+            )
+            input_file_1 = self.selected_input_file_1
+            input_file_2 = self.selected_input_file_2
 
         # input files check
 
         if mode == "Single End":
-            required = [self.selected_input_file_1]
+            required = [input_file_1]
             msg = "Debe seleccionar un archivo de entrada."
         else:
-            required = [self.selected_input_file_1, self.selected_input_file_2]
+            required = [input_file_1, input_file_2]
             msg = "Debe seleccionar dos archivos de entrada."
 
         if any(file is None for file in required):
-            from PySide6.QtWidgets import QMessageBox
-
             QMessageBox.warning(
                 self.view,
                 "Error",
                 msg,
             )
-            return "", []
+            return None
+
+        if mode == "Single End":
+            input_file_2 = None
 
         # database
 
         if self.selected_database is None:
-            from PySide6.QtWidgets import QMessageBox
-
             QMessageBox.warning(
                 self.view,
                 "Error",
                 "Debe seleccionar una base de datos de Kraken2.",
             )
-
-            return "", []
-
-        arguments.extend(
-            [
-                "--db",
-                f"{win_to_wsl(self.selected_database).as_posix()}",
-            ]
-        )
-
-        # threads
-
-        threads = self.view.body.options_page.threads_selector_widget.slider.value()
-        if threads > 0:
-            arguments.extend(["--threads", f"{threads}"])
+            return None
 
         # report
 
         output_folder_path = get_kraken2_output_folder_path()
 
         if output_folder_path is None:
-            from PySide6.QtWidgets import QMessageBox
-
             QMessageBox.warning(
                 self.view,
                 "Error",
                 "La carpeta de salida de los reportes de Kraken2 no está configurada o no existe.",
             )
-            return "", []
+            return None
 
-        if mode == "Single End":
-            report_output_path = (
-                output_folder_path / f"{self.selected_input_file_1.stem}_report.txt"
+        report_output_path = output_folder_path / (
+            report_name or self._get_report_file_name(input_file_1, input_file_2)
+        )
+
+        # threads
+
+        if threads is None:
+            threads = self.view.body.options_page.threads_selector_widget.slider.value()
+
+        # options
+
+        options_page = self.view.body.options_page
+
+        confidence = None
+        if options_page.confidence.checkbox.isChecked():
+            confidence_value = (
+                options_page.confidence.decimal_selector_suboption_widget.decimal_selector._spin_box.value()
             )
-        else:
-            report_output_path = (
-                output_folder_path
-                / f"{self.selected_input_file_1.stem}_{self.selected_input_file_2.stem}_report.txt"
+            if confidence_value >= 0.0 and confidence_value <= 1.0:
+                confidence = confidence_value
+
+        minimum_hit_groups = None
+        if options_page.minimum_hit_groups.checkbox.isChecked():
+            minimum_hit_groups = (
+                options_page.minimum_hit_groups.number_selector_suboption_widget.number_selector._spin_box.value()
+                or None
             )
 
-        arguments.extend(
-            [
-                "--report",
-                f"{win_to_wsl(report_output_path).as_posix()}",
-            ]
+        minimum_base_quality = None
+        if options_page.minimum_base_quality.checkbox.isChecked():
+            minimum_base_quality = (
+                options_page.minimum_base_quality.number_selector_suboption_widget.number_selector._spin_box.value()
+                or None
+            )
+
+        # per-read output: compressed next to the report, or not written at all
+
+        output = "-"
+        if options_page.save_output.checkbox.isChecked():
+            output = report_output_path.with_name(
+                f"{report_output_path.stem.removesuffix('_report')}_output.kraken.gz"
+            ).as_posix()
+
+        spec = KrakenJobSpec(
+            database=self.selected_database,
+            input_file_1=input_file_1,
+            input_file_2=input_file_2,
+            report_file=report_output_path,
+            output=output,
+            counters=options_page.live_counters.checkbox.isChecked() and not batch,
+            threads=threads,
+            wsl=True,
+            quick=options_page.quick.checkbox.isChecked(),
+            memory_mapping=options_page.memory_mapping.checkbox.isChecked(),
+            confidence=confidence,
+            minimum_hit_groups=minimum_hit_groups,
+            minimum_base_quality=minimum_base_quality,
         )
 
-        # output
+        # Use the copy kept in memory, with --memory-mapping, once prepared
+        if options_page.preload_database.checkbox.isChecked():
+            spec = self.database_cache.apply(spec)
 
-        arguments.extend(
-            [
-                "--output",
-                "-",
-            ]
-        )  # Output to standard output (stdout)
+        return spec
 
-        # quick
-
-        is_quick_active = self.view.body.options_page.quick.checkbox.isChecked()
-        if is_quick_active:
-            arguments.append("--quick")
+    def _generate_kraken_command(
+        self,
+        input_file_1: Optional[Path] = None,
+        input_file_2: Optional[Path] = None,
+        threads: Optional[int] = None,
+        report_name: Optional[str] = None,
+    ) -> Tuple[str, list[str]]:
+        """
+        Generate the command to run Kraken based on the selected options.
+        """
+        spec = self.create_job_spec(input_file_1, input_file_2, threads, report_name)
 
-        # memory mapping
+        if spec is None:
+            return "", []
 
-        is_memory_mapping_active = (
-            self.view.body.options_page.memory_mapping.checkbox.isChecked()
-        )
-        if is_memory_mapping_active:
-            arguments.append("--memory-mapping")
+        return spec.to_command()
 
-        # confidence
+    def _get_report_file_name(
+        self, input_file_1: Path, input_file_2: Optional[Path] = None
+    ) -> str:
+        """
+        Get the name of the Kraken2 report for the given input files.
+        """
+        if input_file_2 is None:
+            return f"{input_file_1.stem}_report.txt"
+        return f"{input_file_1.stem}_{input_file_2.stem}_report.txt"
 
-        is_confidence_active = (
-            self.view.body.options_page.confidence.checkbox.isChecked()
-        )
+    def _create_kraken_job(
+        self,
+        name: str,
+        input_file_1: Path,
+        input_file_2: Optional[Path],
+        report_name: Optional[str] = None,
+    ) -> BatchJob:
+        """
+        Create a Kraken2 job. The report is exposed as the job output.
+        """
 
-        if is_confidence_active:
-            confidence_value = (
-                self.view.body.options_page.confidence.decimal_selector_suboption_widget.decimal_selector._spin_box.value()
+        def build(threads: int) -> Tuple[str, list[str]]:
+            spec = self.create_job_spec(
+                input_file_1, input_file_2, threads, report_name
             )
-            if confidence_value >= 0.0 and confidence_value <= 1.0:
-                arguments.extend(
-                    [
-                        "--confidence",
-                        f"{confidence_value}",
-                    ]
-                )
 
-        # minimum hit groups
+            if spec is None:
+                return "", []
 
-        is_minimum_hit_groups_active = (
-            self.view.body.options_page.minimum_hit_groups.checkbox.isChecked()
-        )
+            job.outputs = spec.outputs
+            job.spec = spec
 
-        if is_minimum_hit_groups_active:
-            minimum_hit_groups = (
-                self.view.body.options_page.minimum_hit_groups.number_selector_suboption_widget.number_selector._spin_box.value()
-            )
-            if minimum_hit_groups > 0:
-                arguments.extend(
-                    [
-                        "--minimum-hit-groups",
-                        f"{minimum_hit_groups}",
-                    ]
-                )
+            return spec.to_command()
 
-        # minimum base quality
+        job = BatchJob(name=name, build=build)
 
-        is_minimum_base_quality_active = (
-            self.view.body.options_page.minimum_base_quality.checkbox.isChecked()
+        return job
+
+    def _create_krona_job(self, name: str, report_file: Path) -> BatchJob:
+        """
+        Create a Krona job for an existing Kraken2 report, run in process.
+        """
+        spec = KronaJobSpec(report_file=report_file)
+
+        return BatchJob(
+            name=name,
+            task=lambda: _write_krona_html_for_reports([report_file], spec.html_file),
+            max_threads=1,
+            outputs=spec.outputs,
         )
-        if is_minimum_base_quality_active:
-            minimum_base_quality = (
-                self.view.body.options_page.minimum_base_quality.number_selector_suboption_widget.number_selector._spin_box.value()
-            )
-            if minimum_base_quality > 0:
-                arguments.extend(
-                    [
-                        "--minimum-base-quality",
-                        f"{minimum_base_quality}",
-                    ]
-                )
 
-        # input files
+    def _create_batch_job(
+        self, name: str, input_file_1: Path, input_file_2: Optional[Path]
+    ) -> BatchJob:
+        """
+        Create a batch job for Kraken2. Krona is queued once the report exists.
+        """
+        job = self._create_kraken_job(name, input_file_1, input_file_2)
+
+        def on_finished(exit_code: int):
+            if exit_code != 0 or not job.outputs:
+                return
 
-        if mode == "Single End":
-            arguments.append(f"{win_to_wsl(self.selected_input_file_1).as_posix()}")
-
-        if mode == "Paired End":
-            arguments.extend(
-                [
-                    "--paired",
-                    f"{win_to_wsl(self.selected_input_file_1).as_posix()}",
-                    f"{win_to_wsl(self.selected_input_file_2).as_posix()}",
-                ]
+            self._batch_reports[name] = job.outputs[0]
+            self.batch_run_controller.queue.add_job(
+                self._create_krona_job(f"{name} (krona)", job.outputs[0])
             )
 
-        # return command and arguments
+        job.on_finished = on_finished
+
+        return job
+
+    def _on_batch_finished(self):
+        """
+        Write a Krona chart with every sample of the batch, one dataset per
+        sample, next to the individual charts.
+        """
+        reports, self._batch_reports = self._batch_reports, {}
 
-        return "wsl", arguments
+        if len(reports) > 1:
+            output_file = (
+                get_kraken2_output_folder_path()
+                / f"lote_{time.strftime('%Y%m%d_%H%M%S')}.krona.html"
+            )
+            self.batch_krona_worker = GenericWorker(
+                _write_krona_html, reports, output_file
+            )
+            self.batch_krona_worker.signals.finished.connect(
+                lambda html_file: (
+                    self._load_existing_report(),
+                    self._open_webview(html_file.as_posix()),
+                )
+            )
+            self.batch_krona_worker.signals.error.connect(
+                lambda error: print(
+                    Path(__file__).name, "-", "Error writing the batch chart:", error
+                )
+            )
+            QThreadPool.globalInstance().start(self.batch_krona_worker)
+
+        self._load_existing_report()
 
     def _show_command(self):
         """
@@ -444,54 +585,148 @@ class KrakenPanelController:
         """ if not self._checking_existing_databases():
             return """
 
-        command, args = self._generate_kraken_command()
+        if self.create_job_spec() is None:
+            return
 
-        if not command or not args:
+        if (
+            self.view.body.options_page.preload_database.checkbox.isChecked()
+            and not self.database_cache.is_prepared(self.selected_database)
+        ):
+            self.view.body.setCurrentIndex(2)  # Navigate to the generation page
+            self.view.body.generation_page_widget.title_label.setText(
+                "Cargando la base de datos en memoria..."
+            )
+            self._prepare_database(
+                lambda: (
+                    self._start_kraken_process()
+                    if self.view.body.currentIndex() == 2
+                    else None
+                )
+            )
             return
 
+        self._start_kraken_process()
+
+    def _start_kraken_process(self):
+        self.kraken_job_spec = self.create_job_spec()
+
+        if self.kraken_job_spec is None:
+            return
+
+        command, args = self.kraken_job_spec.to_command()
+
+        self.kraken_output_counter = (
+            KrakenOutputCounter() if self.kraken_job_spec.counters else None
+        )
+        self._kraken_counters_updated_at = 0.0
+
         # Create the command string
         self.view.body.setCurrentIndex(2)  # Navigate to the generation page
-        self.kraken_procces.kill()  # Kill any previous process
-        self.kraken_procces.setProgram(command)
-        self.kraken_procces.setArguments(args)
-        self.kraken_procces.setProcessChannelMode(
-            QProcess.ProcessChannelMode.MergedChannels
+        # Replaces any previous process
+        self.kraken_supervisor.start(
+            command, args, self.kraken_job_spec.supervisor_policy()
         )
-        self.kraken_procces.start()
         print(Path(__file__).name, "-", "Running command:", command, args)
 
+    def _prepare_database(self, on_ready: Optional[Callable[[], None]] = None):
+        """
+        Stage the selected database in memory in the background.
+        `on_ready` is called once it is ready (or could not be staged).
+        """
+        database = self.selected_database
+
+        if database is None:
+            return
+
+        if self.database_cache.is_prepared(database):
+            if on_ready is not None:
+                on_ready()
+            return
+
+        if on_ready is not None:
+            self._database_callbacks.append(on_ready)
+
+        if self._preparing_database == database:
+            return
+
+        self._preparing_database = database
+
+        self.database_worker = GenericWorker(self.database_cache.prepare, database)
+        self.database_worker.signals.finished.connect(self._on_database_prepared)
+        self.database_worker.signals.error.connect(
+            lambda error: (
+                print(Path(__file__).name, "-", "Error preparing the database:", error),
+                self._on_database_prepared(),
+            )
+        )
+        QThreadPool.globalInstance().start(self.database_worker)
+
+    def _on_database_prepared(self, strategy: Optional[str] = None):
+        print(Path(__file__).name, "-", "Database prepared:", strategy)
+
+        self._preparing_database = None
+        callbacks, self._database_callbacks = self._database_callbacks, []
+
+        for callback in callbacks:
+            callback()
+
     def _cancel_kraken_command(self):
         """
         Cancel the currently running command in the Kraken panel.
         """
-        if self.kraken_procces.state() == QProcess.ProcessState.Running:
-            self.kraken_procces.kill()  # Kill the running process
+        if self.kraken_supervisor.is_running():
+            # Kill the running process and everything it started in WSL
+            self.kraken_supervisor.cancel()
         self.view.body.setCurrentIndex(0)  # Navigate back to the upload page
 
-    def _on_kraken_stdout(self):
-        data = (
-            self.kraken_procces.readAllStandardOutput().data().decode(errors="ignore")
-        )
-        print(
-            Path(__file__).name, "-", "kraken2-info", "-", data
-        )  # Print the standard output to the console
-        if data.strip() == "Loading database information...":
+    def _on_kraken_progress(self, event: ProgressEvent):
+        if "Loading database information" in event.message:
             self.view.body.generation_page_widget.title_label.setText(
                 "Cargando información de la base de datos..."
             )
+        elif self.kraken_output_counter is None:
+            self.view.body.generation_page_widget.set_text(event.message)
+
+    def _on_kraken_log(self, event: LogEvent):
+        print(
+            Path(__file__).name,
+            "-",
+            "kraken2-info" if event.stream == "stdout" else "error",
+            "-",
+            event.line,
+        )  # Print the tool output to the console
+
+    def _on_kraken_output(self, stream: str, data: bytes):
+        if (
+            self.kraken_output_counter is None
+            or stream != self.kraken_job_spec.counters_stream
+        ):
+            return
 
-    def _on_kraken_stderr(self):
-        data = self.kraken_procces.readAllStandardError().data().decode(errors="ignore")
-        print(Path(__file__).name, "-", "error", "-", data)
+        # The per-read output is only counted, never decoded or printed
+        self.kraken_output_counter.feed(data)
 
-    def _on_kraken_finished(self, exit_code: int, _: QProcess.ExitStatus):
+        now = time.monotonic()
+        if now - self._kraken_counters_updated_at >= 0.25:
+            self._kraken_counters_updated_at = now
+            counter = self.kraken_output_counter
+            self.view.body.generation_page_widget.title_label.setText(
+                f"{counter.processed:,} lecturas procesadas "
+                f"({counter.classified_percent:.2f}% clasificadas)"
+            )
+
+    def _on_kraken_finished(self, event: ExitEvent):
         """Handle the completion of the Kraken process."""
-        if exit_code != 0:
+        if event.reason == ExitReason.CANCELLED:
+            return  # The panel already went back to the upload page
+
+        if not event.ok:
             print(
                 f"{Path(__file__).name}",
                 "-",
                 "Kraken command failed with exit code:",
-                exit_code,
+                event.exit_code,
+                f"({event.reason.value}: {event.message})",
             )
             self._reset_options_values()
             self.view.body.setCurrentIndex(0)  # Navigate back to the upload page
@@ -505,16 +740,20 @@ class KrakenPanelController:
             return
 
         print(f"{Path(__file__).name}", "-", "Command finished.")
-        self._run_krona_command()
-        self.view.body.generation_page_widget.cancel_button.clicked.connect(
-            self._cancel_krona_command
+        self.store_worker = GenericWorker(
+            get_result_cache().store, self.kraken_job_spec
         )
+        QThreadPool.globalInstance().start(self.store_worker)
+        self._run_krona()
 
     def _reset_options_values(self):
         self.view.body.options_page.threads_selector_widget.slider.setValue(1)
 
         self.view.body.options_page.quick.checkbox.setChecked(False)
         self.view.body.options_page.memory_mapping.checkbox.setChecked(False)
+        self.view.body.options_page.preload_database.checkbox.setChecked(False)
+        self.view.body.options_page.save_output.checkbox.setChecked(False)
+        self.view.body.options_page.live_counters.checkbox.setChecked(False)
 
         self.view.body.options_page.minimum_hit_groups.checkbox.setChecked(False)
         self.view.body.options_page.minimum_hit_groups.set_value(0)
@@ -544,112 +783,83 @@ class KrakenPanelController:
 
     # krona
 
-    def _generate_krona_command(self) -> Tuple[str, list[str]]:
+    def _run_krona(self):
         """
-        Generate the command to run Krona based on the Kraken report.
+        Write the Krona chart of the Kraken report in the background.
+        The chart is generated in process, without KronaTools or WSL.
         """
+        if self.kraken_job_spec is None:
+            print(Path(__file__).name, "-", "No report to run Krona.")
+            return
 
-        arguments = [
-            "ktImportText",
-        ]
+        report_file = self.kraken_job_spec.report_file
 
-        mode = (
-            self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
+        self.view.body.generation_page_widget.title_label.setText(
+            "Generando gráfico de Krona..."
         )
 
-        if mode == "Single End":
-            input_file = win_to_wsl(
-                get_kraken2_output_folder_path()
-                / f"{self.selected_input_file_1.stem}_report.txt"
-            )
-            output_file = input_file.with_suffix(".krona.html")
-
-            arguments.extend(
-                [
-                    "-o",
-                    output_file.as_posix(),
-                    input_file.as_posix(),
-                ]
-            )
-
-        if mode == "Paired End":
-            input_file = win_to_wsl(
-                get_kraken2_output_folder_path()
-                / f"{self.selected_input_file_1.stem}_{self.selected_input_file_2.stem}_report.txt"
-            )
-            output_file = input_file.with_suffix(".krona.html")
-
-            arguments.extend(
-                [
-                    "-o",
-                    output_file.as_posix(),
-                    input_file.as_posix(),
-                ]
-            )
+        self.krona_worker = GenericWorker(_write_krona_html_for_reports, [report_file])
+        self.krona_worker.signals.finished.connect(self._on_krona_finished)
+        self.krona_worker.signals.error.connect(
+            lambda error: self._on_krona_error(report_file, error)
+        )
+        QThreadPool.globalInstance().start(self.krona_worker)
 
-        return "wsl", arguments
+        print(Path(__file__).name, "-", "Generating Krona chart:", report_file)
 
-    def _run_krona_command(self):
-        """
-        Run the Krona command to visualize the Kraken report.
-        """
-        command, args = self._generate_krona_command()
+    def _on_krona_finished(self, html_file: Path):
+        """Open the Krona chart once it is written."""
+        print(f"{Path(__file__).name}", "-", "Krona chart written:", html_file)
+        self._open_webview(html_file.as_posix())
+        self._finish_run()
 
-        if not command or not args:
-            print(Path(__file__).name, "-", "No command to run Krona.")
-            return
+    def _on_krona_error(self, report_file: Path, error: str):
+        # Sin gráfico de Krona el reporte se abre en el navegador propio
+        print(f"{Path(__file__).name}", "-", "Krona failed:", error)
+        self._open_report_browser(report_file)
+        self._finish_run()
 
-        self.krona_procces.kill()  # Kill any previous process
-        self.krona_procces.setProgram(command)
-        self.krona_procces.setArguments(args)
-        self.krona_procces.setProcessChannelMode(
-            QProcess.ProcessChannelMode.MergedChannels
-        )
-        self.krona_procces.start()
-        print(Path(__file__).name, "-", "Running Krona command:", command, args)
+    def _finish_run(self):
+        self._reset_upload_files_values()
+        self._reset_options_values()
+        self._load_existing_report()
+        self.view.body.setCurrentIndex(0)
 
-    def _cancel_krona_command(self):
+    def _open_report(self, file: Path):
         """
-        Cancel the currently running Krona command.
+        Open a previous result: Kraken2 reports (.txt) in the report browser,
+        Krona charts in the web view.
         """
-        if self.krona_procces.state() == QProcess.ProcessState.Running:
-            self.krona_procces.kill()  # Kill the running Krona process
-        self.view.body.setCurrentIndex(0)  # Navigate back to the upload page
-
-    def _on_krona_stdout(self):
-        data = self.krona_procces.readAllStandardOutput().data().decode(errors="ignore")
-        print(data)
-
-    def _on_krona_stderr(self):
-        data = self.krona_procces.readAllStandardError().data().decode(errors="ignore")
-        print(data)
-
-    def _on_krona_finished(self):
-        """Handle the completion of the Krona process."""
+        if file.suffix == ".txt":
+            self._open_report_browser(file)
+        else:
+            self._open_webview(file.as_posix())
 
-        mode = (
-            self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
+    def _open_report_browser(self, report_file: Path):
+        """
+        Parse the Kraken2 report in the background and browse it in a new
+        window. Needs neither Krona nor WSL.
+        """
+        self.report_worker = GenericWorker(_read_kraken_report, report_file)
+        self.report_worker.signals.finished.connect(
+            lambda report: self._show_report_browser(report_file, report)
         )
-
-        if mode == "Single End":
-            krona_html = (
-                get_kraken2_output_folder_path()
-                / f"{self.selected_input_file_1.stem}_report.krona.html"
-            )
-
-        if mode == "Paired End":
-            krona_html = (
-                get_kraken2_output_folder_path()
-                / f"{self.selected_input_file_1.stem}_{self.selected_input_file_2.stem}_report.krona.html"
+        self.report_worker.signals.error.connect(
+            lambda error: print(
+                Path(__file__).name, "-", "Error reading the report:", error
             )
+        )
+        QThreadPool.globalInstance().start(self.report_worker)
 
-        self._open_webview(krona_html.as_posix())
-        print(f"{Path(__file__).name}", "-", "Krona command finished.")
+    def _show_report_browser(self, report_file: Path, report: "KrakenReport"):
+        from PySide6.QtWidgets import QMainWindow
+        from views.main_window.panels.kraken_panel.widgets import ReportBrowserWidget
 
-        self._reset_upload_files_values()
-        self._reset_options_values()
-        self._load_existing_report()
-        self.view.body.setCurrentIndex(0)
+        self.report_window = QMainWindow()
+        self.report_window.setWindowTitle(f"Reporte de Kraken2 - {report_file.name}")
+        self.report_window.resize(900, 700)
+        self.report_window.setCentralWidget(ReportBrowserWidget(report))
+        self.report_window.show()
 
     def _open_webview(self, url: str):
         from PySide6.QtWidgets import QMainWindow
@@ -674,10 +884,12 @@ class KrakenPanelController:
         if index == 1:
             self.view.head.star_button.setVisible(True)
             self.view.head.cli_push_button.setVisible(True)
+            self.view.head.batch_button.setVisible(True)
             self._load_saved_config()
         else:
             self.view.head.star_button.setVisible(False)
             self.view.head.cli_push_button.setVisible(False)
+            self.view.head.batch_button.setVisible(False)
 
         mode = (
             self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
@@ -693,11 +905,14 @@ class KrakenPanelController:
                 f"{Path(__file__).name}",
                 "-",
                 "Selected input files:",
-                all(file.suffix == ".fastq" for file in required),
+                all(
+                    strip_compression_suffix(file).suffix == ".fastq"
+                    for file in required
+                ),
             )
 
             if all(file is not None for file in required) and all(
-                file.suffix == ".fastq" for file in required
+                strip_compression_suffix(file).suffix == ".fastq" for file in required
             ):
 
                 self.view.body.options_page.minimum_base_quality.setVisible(True)
@@ -816,6 +1031,8 @@ class KrakenPanelController:
                 "Selected database:",
                 self.selected_database,
             )
+            if self.view.body.options_page.preload_database.checkbox.isChecked():
+                self._prepare_database()
         else:
             self.selected_database = None
             self.view.body.files_page.select_database_button.clear_file()
@@ -880,6 +1097,9 @@ class KrakenPanelController:
             "threads": self.view.body.options_page.threads_selector_widget.slider.value(),
             "quick": self.view.body.options_page.quick.is_checked(),
             "memory_mapping": self.view.body.options_page.memory_mapping.is_checked(),
+            "preload_database": self.view.body.options_page.preload_database.is_checked(),
+            "save_output": self.view.body.options_page.save_output.is_checked(),
+            "live_counters": self.view.body.options_page.live_counters.is_checked(),
             "confidence": {
                 "active": self.view.body.options_page.confidence.is_checked(),
                 "value": self.view.body.options_page.confidence.value(),
@@ -933,6 +1153,18 @@ class KrakenPanelController:
         value: bool = config.get("memory_mapping", False)
         self.view.body.options_page.memory_mapping.set_checked(value)
 
+        # Preload database
+        value: bool = config.get("preload_database", False)
+        self.view.body.options_page.preload_database.set_checked(value)
+
+        # Save output
+        value: bool = config.get("save_output", False)
+        self.view.body.options_page.save_output.set_checked(value)
+
+        # Live counters
+        value: bool = config.get("live_counters", False)
+        self.view.body.options_page.live_counters.set_checked(value)
+
         # Confidence
         value_dict: dict = config.get("confidence", None)
         if value is not None and isinstance(value_dict, dict):
@@ -24,6 +24,24 @@ class MainWindowController:
         self.view.side_bar.kraken_button.toggled.connect(self._on_kraken)
         self.view.side_bar.settings_button.toggled.connect(self._on_settings)
 
+        # pipeline
+
+        from controllers import PipelineRunController
+
+        # The panels are built lazily, the pipeline asks for their
+        # controllers only when it creates its jobs
+        content = self.view.content
+        self.pipeline_run_controller = PipelineRunController(
+            self.view,
+            lambda: content.trimmomatic_panel_controller,
+            lambda: content.fastqc_panel_controller,
+            lambda: content.sort_me_rna_controller,
+            lambda: content.kraken2_controller,
+        )
+        self.view.content.home_panel.header.pipeline_button.clicked.connect(
+            self.pipeline_run_controller.open_menu
+        )
+
     def check_existing_workspace(self):
         # Check if the current workspace exists
         current_workspace = get_current_workspace()
@@ -83,3 +101,4 @@ class MainWindowController:
     def _on_settings(self, checked: bool):
         if checked:
             self.view.content.settings_panel_controller.check_installed()
+            self.view.content.settings_panel_controller.load_compression_policy()
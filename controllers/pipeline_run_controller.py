@@ -0,0 +1,160 @@
+from pathlib import Path
+from typing import Callable, Optional
+from PySide6.QtWidgets import QWidget
+from utils import get_result_cache, get_source_files_paths, pair_sample_files
+from workers import BatchJob, PipelineRunner, PipelineStage
+from .batch_run_controller import BatchRunController
+from .trimmomatic_panel_controller import TrimmomaticPanelController
+from .fastqc_panel_controller import FastQCPanelController
+from .sortmerna_panel_controller import SortMeRnaPanelController
+from .kraken_panel_controller import KrakenPanelController
+
+
+class PipelineRunController(BatchRunController):
+    """
+    Controller for running Trimmomatic → FastQC → SortMeRNA → Kraken2 → Krona
+    over many samples.
+
+    Every stage is built from the options currently set in its panel, so the
+    pipeline runs with the same arguments a manual run would use. The panel
+    controllers are given as getters, since panels are built on first use. Samples are
+    paired automatically (R1/R2) and advance independently through the stages.
+    """
+
+    def __init__(
+        self,
+        view: QWidget,
+        get_trimmomatic_controller: Callable[[], TrimmomaticPanelController],
+        get_fastqc_controller: Callable[[], FastQCPanelController],
+        get_sortmerna_controller: Callable[[], SortMeRnaPanelController],
+        get_kraken_controller: Callable[[], KrakenPanelController],
+    ):
+        super().__init__(
+            view,
+            get_files=get_source_files_paths,
+            create_job=lambda *_: None,
+            on_finished=self._load_existing_reports,
+        )
+
+        self._get_trimmomatic_controller = get_trimmomatic_controller
+        self._get_fastqc_controller = get_fastqc_controller
+        self._get_sortmerna_controller = get_sortmerna_controller
+        self._get_kraken_controller = get_kraken_controller
+
+        self.stages = [
+            PipelineStage(
+                "trimmomatic", self._create_trimmomatic_jobs, max_concurrent_jobs=2
+            ),
+            PipelineStage("fastqc", self._create_fastqc_jobs, depends_on="trimmomatic"),
+            PipelineStage(
+                "sortmerna",
+                self._create_sortmerna_jobs,
+                depends_on="trimmomatic",
+                max_concurrent_jobs=1,
+            ),
+            # Kraken2 loads the whole database in memory, one sample at a time
+            PipelineStage(
+                "kraken2",
+                self._create_kraken_jobs,
+                depends_on="sortmerna",
+                max_concurrent_jobs=1,
+            ),
+            PipelineStage("krona", self._create_krona_jobs, depends_on="kraken2"),
+        ]
+
+    @property
+    def trimmomatic_controller(self) -> TrimmomaticPanelController:
+        return self._get_trimmomatic_controller()
+
+    @property
+    def fastqc_controller(self) -> FastQCPanelController:
+        return self._get_fastqc_controller()
+
+    @property
+    def sortmerna_controller(self) -> SortMeRnaPanelController:
+        return self._get_sortmerna_controller()
+
+    @property
+    def kraken_controller(self) -> KrakenPanelController:
+        return self._get_kraken_controller()
+
+    # samples
+
+    def _samples_from_files(
+        self, files: list[Path]
+    ) -> list[tuple[str, Path, Optional[Path]]]:
+        return pair_sample_files(files)
+
+    def _samples_from_sheet(
+        self, samples: list[tuple[str, Path, Optional[Path]]]
+    ) -> list[tuple[str, Path, Optional[Path]]]:
+        return samples
+
+    # queue
+
+    def _create_queue(self) -> PipelineRunner:
+        queue = PipelineRunner(
+            self.stages, result_cache=get_result_cache(), parent=self.view
+        )
+        queue.stage_finished.connect(
+            lambda sample, stage, success: print(
+                Path(__file__).name,
+                "-",
+                f"{sample}: {stage} {'finished' if success else 'failed'}",
+            )
+        )
+        return queue
+
+    def _add_sample(self, name: str, file_1: Path, file_2: Optional[Path]):
+        self.queue.add_sample(name, [file for file in (file_1, file_2) if file])
+
+    def _load_existing_reports(self):
+        self.trimmomatic_controller._load_existing_report()
+        self.sortmerna_controller._load_existing_report()
+        self.kraken_controller._load_existing_report()
+
+    # stages
+
+    def _create_trimmomatic_jobs(
+        self, sample: str, inputs: list[Path]
+    ) -> list[BatchJob]:
+        input_file_2 = inputs[1] if len(inputs) > 1 else None
+        return [
+            self.trimmomatic_controller._create_batch_job(
+                f"{sample} (trimmomatic)", inputs[0], input_file_2
+            )
+        ]
+
+    def _create_fastqc_jobs(self, sample: str, inputs: list[Path]) -> list[BatchJob]:
+        return [
+            self.fastqc_controller._create_batch_job(
+                f"{sample} (fastqc {file.name})", file
+            )
+            for file in inputs
+        ]
+
+    def _create_sortmerna_jobs(self, sample: str, inputs: list[Path]) -> list[BatchJob]:
+        input_file_2 = inputs[1] if len(inputs) > 1 else None
+        return [
+            # Kraken2 needs the non-rRNA reads, written only with --other
+            self.sortmerna_controller._create_batch_job(
+                f"{sample} (sortmerna)", inputs[0], input_file_2, other=True
+            )
+        ]
+
+    def _create_kraken_jobs(self, sample: str, inputs: list[Path]) -> list[BatchJob]:
+        input_file_2 = inputs[1] if len(inputs) > 1 else None
+        return [
+            # SortMeRNA names its outputs 'other', so the report takes the sample name
+            self.kraken_controller._create_kraken_job(
+                f"{sample} (kraken2)",
+                inputs[0],
+                input_file_2,
+                report_name=f"{sample}_report.txt",
+            )
+        ]
+
+    def _create_krona_jobs(self, sample: str, inputs: list[Path]) -> list[BatchJob]:
+        return [
+            self.kraken_controller._create_krona_job(f"{sample} (krona)", inputs[0])
+        ]
@@ -1,6 +1,5 @@
 from pathlib import Path
 from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import QProcess
 from views.main_window import SettingsPanel
 from utils import (
     get_fastqc_file_path,
@@ -9,15 +8,19 @@ from utils import (
     get_trimmomatic_executable_path_from_settings,
     get_sortmerna_executable_path,
     get_sortmerna_executable_path_from_settings,
+    get_project_file_path,
+    get_workspace_compression_policy,
+    set_workspace_compression_policy,
+    get_tool_registry,
+    ToolInfo,
 )
+from jobs import CompressionPolicy
 
+# Programs probed by the tool probe service (the rest are found on disk)
+PROBED_TOOLS = ("java", "wsl", "kraken2", "krona")
 
-class SettingsPanelController:
 
-    wsl_process = QProcess()
-    java_process = QProcess()
-    kraken2_process = QProcess()
-    krona_process = QProcess()
+class SettingsPanelController:
 
     is_wsl_installed = False
     is_java_installed = False
@@ -34,6 +37,10 @@ class SettingsPanelController:
             self._open_user_manual
         )
 
+        self.view.content.rescan_programs.open_manual_push_button.clicked.connect(
+            self._rescan_programs
+        )
+
         self.view.content.wsl_installed.install_push_button.clicked.connect(
             self._open_user_manual_on_wsl
         )
@@ -44,74 +51,90 @@ class SettingsPanelController:
             self._open_user_manual_on_wsl
         )
 
+        compression = self.view.content.compression
+        compression.method_combo_box.currentIndexChanged.connect(
+            self._save_compression_policy
+        )
+        compression.level_spin_box.valueChanged.connect(self._save_compression_policy)
+        compression.threads_spin_box.valueChanged.connect(self._save_compression_policy)
+
         self.application = QApplication.instance()
 
-        self.application.state.wsl_check_worker.result.connect(self._on_wsl_finished)
-        self.application.state.java_check_worker.result.connect(
-            self._on_java_check_finished
-        )
-        self.application.state.kraken2_check_worker.result.connect(
-            self._on_kraken2_check_finished
-        )
-        self.application.state.krona_check_worker.result.connect(
-            self._on_krona_check_finished
-        )
+        self.application.state.tool_probe_service.probed.connect(self._on_tool_probed)
 
     def check_installed(self):
         """
         Check if the required programs are installed on the system.
-        This method is called when the settings panel
-        is opened to update the installed status of WSL and Java.
+        This method is called when the settings panel is opened. Cached
+        results are shown at once; only stale ones are probed again.
         """
-        self._check_installed_java()
-        self._check_installed_wsl()
+        self._check_installed_tools()
         self._check_installed_fastqc()
         self._check_installed_trimmomatic()
         self._check_installed_sortmerna()
 
-    # WSL
-
-    def _check_installed_wsl(self):
-        print(Path(__file__).name, "-", "Checking WSL installation...")
-        self.application.state.wsl_check_worker.start()
-
-    def _on_wsl_finished(self, installed: bool):
-        self.view.content.wsl_installed.set_installed(installed)
-        print(Path(__file__).name, "-", "WSL installation status:", installed)
+    def _rescan_programs(self):
+        """
+        Forget the cached tool discovery results and check everything again.
+        """
+        get_tool_registry().rescan()
 
-        if installed:
-            self._check_installed_kraken2()
-            self._check_installed_krona()
+        for item in self._tool_items().values():
+            item.set_checking()
 
-    # Java
+        self.check_installed()
 
-    def _check_installed_java(self):
-        print(Path(__file__).name, "-", "Checking Java installation...")
-        self.application.state.java_check_worker.start()
+    # compression
 
-    def _on_java_check_finished(self, installed: bool):
-        self.view.content.java_installed.set_installed(installed)
-        print(Path(__file__).name, "-", "Java installation status:", installed)
+    def load_compression_policy(self):
+        """
+        Show the compression policy of the current workspace (only editable
+        when there is a project file to store it in).
+        """
+        compression = self.view.content.compression
+        policy = get_workspace_compression_policy()
+        compression.set_policy(policy.method, policy.level, policy.threads)
+        compression.setEnabled(get_project_file_path() is not None)
+
+    def _save_compression_policy(self):
+        compression = self.view.content.compression
+        set_workspace_compression_policy(
+            CompressionPolicy(
+                method=compression.method(),
+                level=compression.level(),
+                threads=compression.threads(),
+            )
+        )
 
-    # kraken2
+    # Java, WSL, Kraken2 and Krona
 
-    def _check_installed_kraken2(self):
-        print(Path(__file__).name, "-", "Checking Kraken2 installation...")
-        self.application.state.kraken2_check_worker.start()
+    def _tool_items(self) -> dict:
+        content = self.view.content
+        return {
+            "java": content.java_installed,
+            "wsl": content.wsl_installed,
+            "kraken2": content.kraken2_installed,
+            "krona": content.krona_installed,
+        }
 
-    def _on_kraken2_check_finished(self, installed: bool):
-        self.view.content.kraken2_installed.set_installed(installed)
-        print(Path(__file__).name, "-", "Kraken2 installation status:", installed)
+    def _check_installed_tools(self):
+        print(Path(__file__).name, "-", "Checking Java, WSL, Kraken2 and Krona...")
+        self.application.state.tool_probe_service.probe(PROBED_TOOLS)
 
-    # krona
+    def _on_tool_probed(self, name: str, tool: ToolInfo):
+        item = self._tool_items().get(name)
 
-    def _check_installed_krona(self):
-        print(Path(__file__).name, "-", "Checking Krona installation...")
-        self.application.state.krona_check_worker.start()
+        if item is None:
+            return
 
-    def _on_krona_check_finished(self, installed: bool):
-        self.view.content.krona_installed.set_installed(installed)
-        print(Path(__file__).name, "-", "Krona installation status:", installed)
+        item.set_installed(tool.available, tool.version)
+        print(
+            Path(__file__).name,
+            "-",
+            f"{name} installation status:",
+            tool.available,
+            tool.version or "",
+        )
 
     # fastqc
 
@@ -2,10 +2,9 @@ from os import startfile
 from shutil import rmtree
 from typing import Callable, Optional, Tuple
 from pathlib import Path
-from PySide6.QtCore import QProcess, Qt
+from PySide6.QtCore import Qt, QThreadPool
 from PySide6.QtGui import QFontMetrics
 from views.main_window.panels.sortmerna_panel import SortMeRnaPanel
-from views.main_window.panels.sortmerna_panel.widgets import PreviousReportItemWidget
 from views.widgets import (
     FileSelectorDialog,
     SelectFilePushButton,
@@ -14,8 +13,11 @@ from views.widgets import (
 from utils import (
     OperationModes,
     clear_layout,
+    get_available_cpu_count,
     get_sortmerna_executable_path,
     get_sortmerna_output_folder_path,
+    get_sequence_file_base_name,
+    get_workspace_compression_policy,
     get_source_files_paths,
     get_sorted_folders_paths,
     get_trimmed_files_paths,
@@ -30,6 +32,16 @@ from utils import (
     set_sortmerna_saved_config,
     remove_sortmerna_saved_config
 )
+from jobs import (
+    ExitEvent,
+    ExitReason,
+    LogEvent,
+    ProgressEvent,
+    SortMeRnaIndexCache,
+    SortMeRnaJobSpec,
+)
+from workers import BatchJob, GenericWorker, JobSupervisor
+from .batch_run_controller import BatchRunController
 
 
 class SortMeRnaPanelController:
@@ -42,17 +54,27 @@ class SortMeRnaPanelController:
 
         self.view = view
 
+        # Reference indexes shared by every run, built in the background
+        self.index_cache = SortMeRnaIndexCache()
+        self._index_workers: dict[Path, GenericWorker] = {}
+
+        # previous reports
+
+        self.view.body.files_page.previous_reports_list_widget.open_requested.connect(
+            lambda f: startfile(f.as_posix())
+        )
+        self.view.body.files_page.previous_reports_list_widget.delete_requested.connect(
+            self._show_delete_source_file_dialog
+        )
+
         self._load_existing_report()
 
         # process
 
-        self.process = QProcess()
-        self.process.setProcessChannelMode(
-            QProcess.ProcessChannelMode.ForwardedOutputChannel
-        )
-        self.process.readyReadStandardOutput.connect(self._on_stdout)
-        self.process.readyReadStandardError.connect(self._on_stderr)
-        self.process.finished.connect(self._on_finished)
+        self.supervisor = JobSupervisor(self.view)
+        self.supervisor.log.connect(self._on_log)
+        self.supervisor.progress.connect(self._on_progress)
+        self.supervisor.exited.connect(self._on_finished)
         self.view.body.generation_page.cancel_button.clicked.connect(
             self._cancel_command
         )
@@ -65,6 +87,22 @@ class SortMeRnaPanelController:
         self.view.head.star_button.clicked.connect(self._open_save_config_dialog)
         self.view.head.user_manual_button.clicked.connect(self.open_user_manual)
 
+        # batch
+
+        self.batch_run_controller = BatchRunController(
+            self.view,
+            get_files=lambda: get_source_files_paths() + get_trimmed_files_paths(),
+            create_job=self._create_batch_job,
+            is_paired=lambda: (
+                self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
+                == OperationModes.PairedEnd.value[0]
+            ),
+            on_finished=self._load_existing_report,
+        )
+        self.view.head.batch_button.clicked.connect(
+            self.batch_run_controller.open_menu
+        )
+
         # select files
 
         self.view.body.files_page.select_file_1.clicked.connect(
@@ -100,8 +138,19 @@ class SortMeRnaPanelController:
     #
 
     def _load_existing_report(self):
-        folders = get_sorted_folders_paths()
+        # sorted/ is scanned in the background
+        self.report_worker = GenericWorker(get_sorted_folders_paths)
+        self.report_worker.signals.finished.connect(
+            self._on_load_existing_report_finished
+        )
+        self.report_worker.signals.error.connect(
+            lambda error: print(
+                f"{Path(__file__).name}", "-", "Error loading existing reports:", error
+            )
+        )
+        QThreadPool.globalInstance().start(self.report_worker)
 
+    def _on_load_existing_report_finished(self, folders: list[Path]):
         if not folders:
             self.view.body.files_page.previous_reports_container_widget.setVisible(
                 False
@@ -110,32 +159,7 @@ class SortMeRnaPanelController:
             return
 
         self.view.body.files_page.previous_reports_container_widget.setVisible(True)
-
-        for i in range(
-            self.view.body.files_page.previous_reports_list_widget.scroll_content_layout.count()
-        ):
-            item = self.view.body.files_page.previous_reports_list_widget.scroll_content_layout.itemAt(
-                i
-            )
-
-            if item.widget():
-                item.widget().deleteLater()
-
-        for file in folders:
-            file_list_item = PreviousReportItemWidget(
-                file.name,
-                str(file),
-                parent=self.view.body.files_page.previous_reports_list_widget,
-            )
-            file_list_item.open_action.clicked.connect(
-                lambda _, f=file: startfile(f.as_posix())
-            )
-            file_list_item.delete_action.clicked.connect(
-                lambda _, f=file: self._show_delete_source_file_dialog(f)
-            )
-            self.view.body.files_page.previous_reports_list_widget.scroll_content_layout.addWidget(
-                file_list_item
-            )
+        self.view.body.files_page.previous_reports_list_widget.set_files(folders)
 
     def _show_delete_source_file_dialog(self, source_file: Path):
         """
@@ -203,23 +227,84 @@ class SortMeRnaPanelController:
             db_folder if db_folder else get_sortmerna_databases_folder_path(),
             add_sortmerna_database,
             remove_sortmerna_database_by_link,
+            on_database_installed=self._index_installed_database,
         )
         database_manager_dialog.show()
 
-    # command
+    # reference index
 
-    def _generate_command(self) -> Optional[Tuple[Path, list[str]]]:
-        """Generate the command to run SortMeRna."""
+    def _index_installed_database(self, path: Path):
+        """
+        Index the references of a freshly installed database, so the first
+        run does not have to.
+        """
+        references = [path] if path.is_file() else sorted(path.rglob("*.fasta"))
 
-        arguments = []
+        for reference in references:
+            if reference.suffix == ".fasta":
+                self._build_reference_index(reference)
 
-        mode = (
-            self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
+    def _build_reference_index(self, reference: Path):
+        """
+        Build the shared index of a reference in the background, once.
+        Runs started before it is ready index into their own workdir.
+        """
+        executable = get_sortmerna_executable_path()
+
+        if executable is None or reference in self._index_workers:
+            return
+
+        if self.index_cache.is_ready([reference], executable.as_posix()):
+            return
+
+        worker = GenericWorker(
+            self.index_cache.build,
+            [reference],
+            executable.as_posix(),
+            get_available_cpu_count(),
+        )
+        worker.signals.finished.connect(
+            lambda _, r=reference: self._index_workers.pop(r, None)
+        )
+        worker.signals.error.connect(
+            lambda error, r=reference: (
+                self._index_workers.pop(r, None),
+                print(Path(__file__).name, "-", f"Could not index {r}: {error}"),
+            )
         )
+        self._index_workers[reference] = worker
+        QThreadPool.globalInstance().start(worker)
 
-        if self.selected_input_file_1 is None:
-            from PySide6.QtWidgets import QMessageBox
+    # command
 
+    def create_job_spec(
+        self,
+        input_file_1: Optional[Path] = None,
+        input_file_2: Optional[Path] = None,
+        threads: Optional[int] = None,
+    ) -> Optional[SortMeRnaJobSpec]:
+        """Build the SortMeRna job spec from the options page.
+
+        When input files are given (batch mode) they replace the selected ones
+        and the operation mode is inferred from the presence of the second file.
+        """
+
+        if input_file_1 is not None:
+            mode = (
+                OperationModes.SingleEnd.value[0]
+                if input_file_2 is None
+                else OperationModes.PairedEnd.value[0]
+            )
+        else:
+            mode = (
+                self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
+            )
+            input_file_1 = self.selected_input_file_1
+            input_file_2 = self.selected_input_file_2
+
+        from PySide6.QtWidgets import QMessageBox
+
+        if input_file_1 is None:
             QMessageBox.warning(
                 self.view,
                 "Input File Missing",
@@ -227,12 +312,7 @@ class SortMeRnaPanelController:
             )
             return None
 
-        if (
-            self.selected_input_file_2 is None
-            and mode != OperationModes.SingleEnd.value[0]
-        ):
-            from PySide6.QtWidgets import QMessageBox
-
+        if input_file_2 is None and mode != OperationModes.SingleEnd.value[0]:
             QMessageBox.warning(
                 self.view,
                 "Input File Missing",
@@ -242,8 +322,6 @@ class SortMeRnaPanelController:
 
         # references
         if self.selected_reference == []:
-            from PySide6.QtWidgets import QMessageBox
-
             QMessageBox.warning(
                 self.view,
                 "Reference File Missing",
@@ -251,92 +329,22 @@ class SortMeRnaPanelController:
             )
             return None
 
-        if self.selected_reference is not None:
-            arguments.extend(["--ref", f"{self.selected_reference.as_posix()}"])
-
-        # input files
-        files = (
-            ["--reads", f"{self.selected_input_file_1}"]
-            if mode == OperationModes.SingleEnd.value[0]
-            else [
-                "--reads",
-                f"{self.selected_input_file_1}",
-                "--reads",
-                f"{self.selected_input_file_2}",
-            ]
-        )
+        executable = get_sortmerna_executable_path()
 
-        if files != []:
-            arguments.extend(files)
-
-        # threads
-        threads = self.view.body.options_page.threads_selector_widget.slider.value()
-        arguments.extend(["--threads", f"{threads}"])
-
-        # use fastx
-        arguments.append("--fastx")
-
-        # unaligned
-        is_unaligned_active = self.view.body.options_page.output_no_aligned.is_checked()
-        if is_unaligned_active:
-            arguments.append("--other")
-
-        # output sam
-        is_output_sam_active = (
-            self.view.body.options_page.output_sam.checkbox.isChecked()
-        )
-        if is_output_sam_active:
-            arguments.append("--sam")
-
-        # include sq tags
-        is_include_sq_tags_active = (
-            self.view.body.options_page.include_sq_tags.checkbox.isChecked()
-        )
-        if is_include_sq_tags_active:
-            arguments.append("--SQ")
-
-        # blast format
-        is_blast_format_active = (
-            self.view.body.options_page.blast_format.checkbox.isChecked()
-        )
-        if is_blast_format_active:
-            blast_format = (
-                self.view.body.options_page.blast_format.combo_box.currentData()
+        if executable is None:
+            QMessageBox.warning(
+                self.view,
+                "SortMeRna Not Found",
+                "SortMeRna is not installed. Please install it from the settings.",
             )
-            arguments.extend(["--blast", f"{blast_format}"])
-
-        # num alignments
-        is_num_alignments_active = (
-            self.view.body.options_page.num_alignments.checkbox.isChecked()
-        )
-        if is_num_alignments_active:
-            num_alignments = self.view.body.options_page.num_alignments.value()
-            print(num_alignments)
-            arguments.extend(["--num_alignments", f"{num_alignments}"])
-
-        # min lis
-        is_min_lis_active = self.view.body.options_page.min_lis.checkbox.isChecked()
-        if is_min_lis_active:
-            min_lis = self.view.body.options_page.min_lis.value()
-            arguments.extend(["--min_lis", f"{min_lis}"])
-
-        # no best
-        is_no_best_active = self.view.body.options_page.no_best.checkbox.isChecked()
-        if is_no_best_active:
-            arguments.append("--no-best")
-
-        # paired
-        is_paired_active = self.view.body.options_page.paired.checkbox.isChecked()
-        if is_paired_active:
-            arguments.append("--paired")
+            return None
 
         # workdir
-
-        workdir = get_sortmerna_output_folder_path(self.selected_input_file_1.stem)
+        workdir = get_sortmerna_output_folder_path(
+            get_sequence_file_base_name(input_file_1)
+        )
 
         if workdir is None:
-            from PySide6.QtWidgets import QMessageBox
-
             QMessageBox.warning(
                 self.view,
                 "Output Directory Error",
@@ -344,14 +352,66 @@ class SortMeRnaPanelController:
             )
             return None
 
-        arguments.extend(
-            [
-                "--workdir",
-                workdir.as_posix(),
-            ]
+        # threads
+        if threads is None:
+            threads = self.view.body.options_page.threads_selector_widget.slider.value()
+
+        options_page = self.view.body.options_page
+
+        spec = SortMeRnaJobSpec(
+            executable=executable.as_posix(),
+            references=(
+                [self.selected_reference] if self.selected_reference is not None else []
+            ),
+            reads=(
+                [input_file_1]
+                if mode == OperationModes.SingleEnd.value[0]
+                else [input_file_1, input_file_2]
+            ),
+            workdir=workdir,
+            threads=threads,
+            other=options_page.output_no_aligned.is_checked(),
+            sam=options_page.output_sam.checkbox.isChecked(),
+            sq=options_page.include_sq_tags.checkbox.isChecked(),
+            blast=(
+                options_page.blast_format.combo_box.currentData()
+                if options_page.blast_format.checkbox.isChecked()
+                else None
+            ),
+            num_alignments=(
+                options_page.num_alignments.value()
+                if options_page.num_alignments.checkbox.isChecked()
+                else None
+            ),
+            min_lis=(
+                options_page.min_lis.value()
+                if options_page.min_lis.checkbox.isChecked()
+                else None
+            ),
+            no_best=options_page.no_best.checkbox.isChecked(),
+            paired=options_page.paired.checkbox.isChecked(),
+            compression=get_workspace_compression_policy(),
         )
 
-        return get_sortmerna_executable_path(), arguments
+        # Read the shared index with --idx-dir once it has been built
+        return self.index_cache.apply(spec)
+
+    def _generate_command(
+        self,
+        input_file_1: Optional[Path] = None,
+        input_file_2: Optional[Path] = None,
+        threads: Optional[int] = None,
+    ) -> Tuple[Optional[Path], list[str]]:
+        """Generate the command to run SortMeRna."""
+
+        spec = self.create_job_spec(input_file_1, input_file_2, threads)
+
+        if spec is None:
+            return None, []
+
+        executable, arguments = spec.to_command()
+
+        return Path(executable), arguments
 
     def _run_command(self):
         command, arguments = self._generate_command()
@@ -363,54 +423,80 @@ class SortMeRnaPanelController:
 
         self.view.body.setCurrentIndex(2)  # Navigate to the generation page
 
-        self.process.kill()  # Kill any previous process if running
-        self.process.setProgram(command.as_posix())
-        self.process.setArguments(arguments)
-        self.process.start()
+        # Replaces any previous process if running
+        self.supervisor.start(
+            command.as_posix(), arguments, SortMeRnaJobSpec.supervision
+        )
+
+    def _create_batch_job(
+        self,
+        name: str,
+        input_file_1: Path,
+        input_file_2: Optional[Path],
+        other: bool = False,
+    ) -> BatchJob:
+        """
+        Create a batch job for SortMeRna. Once finished, the non-rRNA reads
+        written by --other (if any) are exposed as the job outputs.
+        `other` forces --other regardless of the options page.
+        """
+
+        def build(threads: int) -> tuple[str, list[str]]:
+            spec = self.create_job_spec(input_file_1, input_file_2, threads)
+            if spec is None:
+                return "", []
+
+            if other:
+                spec.other = True
+
+            job.spec = spec
+
+            return spec.to_command()
+
+        def on_finished(exit_code: int):
+            if exit_code == 0 and job.spec is not None:
+                job.outputs = job.spec.outputs
+
+        job = BatchJob(name=name, build=build, on_finished=on_finished)
+
+        return job
 
     def _cancel_command(self):
-        if self.process.state() == QProcess.Running:
-            self.process.kill()
+        if self.supervisor.is_running():
+            self.supervisor.cancel()
             print("Process cancelled.")
         else:
             print("No process is running to cancel.")
 
         self.view.body.setCurrentIndex(0)  # Go back to the files page
 
-    def _on_stdout(self):
-        output = self.process.readAllStandardOutput().data().decode(errors="ignore")
-        """ print(f"STDOUT: {output}") """
-
+    def _on_progress(self, event: ProgressEvent):
         self.view.body.generation_page.title_label.setText(
             QFontMetrics(self.view.body.generation_page.title_label.font()).elidedText(
-                output.strip(),
+                event.message,
                 Qt.TextElideMode.ElideRight,
                 200,
             )
         )
 
-    def _on_stderr(self):
-        error_output = (
-            self.process.readAllStandardError().data().decode(errors="ignore")
-        )
-        print(f"STDERR: {error_output}")
+    def _on_log(self, event: LogEvent):
+        print(f"{event.stream.upper()}: {event.line}")
 
-        from PySide6.QtWidgets import QMessageBox
-
-        QMessageBox.warning(
-            self.view,
-            "Error",
-            f"An error occurred while running SortMeRna:\n{error_output}",
-        )
-        # Here you can update the UI with the error output if needed
-
-    def _on_finished(self):
-        exit_code = self.process.exitCode()
-
-        if exit_code == 0:
+    def _on_finished(self, event: ExitEvent):
+        if event.ok:
             print("Process finished successfully.")
         else:
-            print(f"Process finished with error code: {exit_code}")
+            print(f"Process finished with error code: {event.exit_code}")
+
+        # SortMeRna logs to stderr, so only a failed run is reported
+        if not event.ok and event.reason != ExitReason.CANCELLED:
+            from PySide6.QtWidgets import QMessageBox
+
+            QMessageBox.warning(
+                self.view,
+                "Error",
+                f"An error occurred while running SortMeRna:\n{event.message}",
+            )
 
         self.view.body.setCurrentIndex(0)  # Go back to the files page
 
@@ -436,10 +522,12 @@ class SortMeRnaPanelController:
         if index == 1:
             self.view.head.cli_push_button.setVisible(True)
             self.view.head.star_button.setVisible(True)
+            self.view.head.batch_button.setVisible(True)
             self._load_saved_config()
         elif index == 0:
             self.view.head.cli_push_button.setVisible(False)
             self.view.head.star_button.setVisible(False)
+            self.view.head.batch_button.setVisible(False)
             self._reset_options_values()
 
         mode = (
@@ -548,6 +636,7 @@ class SortMeRnaPanelController:
                 self.selected_reference.name,
                 self.selected_reference.as_posix(),
             )
+            self._build_reference_index(self.selected_reference)
             print(
                 f"{Path(__file__).name}",
                 "-",
@@ -2,7 +2,7 @@ import os
 import json
 from pathlib import Path
 from typing import Callable, Optional, cast
-from PySide6.QtCore import QProcess, QThreadPool
+from PySide6.QtCore import QThreadPool
 from utils import (
     get_current_workspace,
     get_source_files_paths,
@@ -14,15 +14,25 @@ from utils import (
     get_trimmomatic_output_2paired_file_path,
     get_trimmomatic_output_1unpaired_file_path,
     get_trimmomatic_output_2unpaired_file_path,
+    get_workspace_compression_policy,
     get_project_file_path,
+    get_sequence_file_base_name,
     to_unc_path,
     clear_layout,
     OperationModes,
 )
 from views.main_window.panels.trimmomatic_panel import TrimmomaticPanel
-from views.main_window.panels.trimmomatic_panel.widgets import PreviousReportItemWidget
 from views.widgets import SaveConfigDialog, SavedConfigItemWidget, SelectFilePushButton
-from workers import GenericWorker
+from jobs import (
+    TrimmomaticJobSpec,
+    IlluminaClip,
+    SlidingWindow,
+    ExitEvent,
+    LogEvent,
+    ProgressEvent,
+)
+from workers import GenericWorker, BatchJob, JobSupervisor
+from .batch_run_controller import BatchRunController
 
 
 class TrimmomaticPanelController:
@@ -34,10 +44,10 @@ class TrimmomaticPanelController:
 
         self.view = view
 
-        self.process = QProcess()
-        self.process.readyReadStandardOutput.connect(self.on_stdout)
-        self.process.readyReadStandardError.connect(self.on_stderr)
-        self.process.finished.connect(self.on_finished)
+        self.supervisor = JobSupervisor(self.view)
+        self.supervisor.log.connect(self.on_log)
+        self.supervisor.progress.connect(self.on_progress)
+        self.supervisor.exited.connect(self.on_finished)
 
         self._load_available_adapters()
 
@@ -45,6 +55,31 @@ class TrimmomaticPanelController:
         self.view.head.cli_push_button.clicked.connect(self._open_cli_dialog)
         self.view.head.star_button.clicked.connect(self.open_save_config_dialog)
 
+        # batch
+
+        self.batch_run_controller = BatchRunController(
+            self.view,
+            get_files=lambda: get_source_files_paths() + get_trimmed_files_paths(),
+            create_job=self._create_batch_job,
+            is_paired=lambda: (
+                self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
+                == OperationModes.PairedEnd.value[0]
+            ),
+            on_finished=self._load_existing_report,
+        )
+        self.view.head.batch_button.clicked.connect(
+            self.batch_run_controller.open_menu
+        )
+
+        # previous trimms
+
+        self.view.body.files_page.previous_reports_list_widget.open_requested.connect(
+            lambda f: os.startfile(f.parent.as_posix())
+        )
+        self.view.body.files_page.previous_reports_list_widget.delete_requested.connect(
+            self._show_delete_source_file_dialog
+        )
+
         # upload files page
 
         self.view.body.files_page.select_file_1.clicked.connect(
@@ -76,7 +111,7 @@ class TrimmomaticPanelController:
 
     def _load_existing_report(self):
         self.view.body.files_page.previous_reports_container_widget.setVisible(False)
-        self.view.body.files_page.list_widget.setVisible(False)
+        self.view.body.files_page.previous_reports_list_widget.setVisible(False)
 
         self.pool = QThreadPool.globalInstance()
 
@@ -87,26 +122,10 @@ class TrimmomaticPanelController:
 
     def _on_load_existing_report_finished(self, files: list[Path]):
         self.view.body.files_page.previous_reports_container_widget.setVisible(True)
-        self.view.body.files_page.list_widget.setVisible(True)
+        self.view.body.files_page.previous_reports_list_widget.setVisible(True)
         self.view.body.files_page.loading_widget.setVisible(False)
 
-        clear_layout(self.view.body.files_page.list_widget.scroll_content_layout)
-
-        for file in files:
-            file_list_item = PreviousReportItemWidget(
-                file.name,
-                str(file),
-                parent=self.view.body.files_page.list_widget,
-            )
-            file_list_item.open_action.clicked.connect(
-                lambda _, f=file: os.startfile(f.parent.as_posix())
-            )
-            file_list_item.delete_action.clicked.connect(
-                lambda _, f=file: self._show_delete_source_file_dialog(f)
-            )
-            self.view.body.files_page.list_widget.scroll_content_layout.addWidget(
-                file_list_item
-            )
+        self.view.body.files_page.previous_reports_list_widget.set_files(files)
 
         print(f"{Path(__file__).name}", "-", "Existing Trimmed files loaded.")
 
@@ -261,179 +280,131 @@ class TrimmomaticPanelController:
 
     # command
 
-    def generate_arguments(self) -> list[str]:
+    def create_job_spec(
+        self,
+        input_file_1: Optional[Path] = None,
+        input_file_2: Optional[Path] = None,
+        threads: Optional[int] = None,
+    ) -> Optional[TrimmomaticJobSpec]:
+        """
+        Build the Trimmomatic job spec from the options page.
+        When input files are given (batch mode) they replace the selected ones
+        and the operation mode is inferred from the presence of the second file.
+        """
         trimmomatic_jar_path = get_trimmomatic_jar_path()
 
         if not trimmomatic_jar_path:
             self.view.show_error_dialog(
                 "Trimmomatic not found. Please install Trimmomatic and try again."
             )
-            return []
+            return None
 
-        mode = (
-            self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
-        )
-        threads = self.view.body.options_page.threads_selector_widget.slider.value()
+        if input_file_1 is not None:
+            mode = (
+                OperationModes.SingleEnd.value[0]
+                if input_file_2 is None
+                else OperationModes.PairedEnd.value[0]
+            )
+        else:
+            mode = (
+                self.view.body.files_page.operation_mode_widget.button_group.checkedButton().text()
+            )
+            input_file_1 = self.selected_input_file_1
+            input_file_2 = self.selected_input_file_2
+
+        if threads is None:
+            threads = self.view.body.options_page.threads_selector_widget.slider.value()
         phred = (
             self.view.body.options_page.quality_scores_format_options_widget.button_group.checkedButton().text()
         )
 
-        arguments = [
-            "-jar",
-            f"{trimmomatic_jar_path}",
-            (
-                OperationModes.SingleEnd.value[1]
-                if mode == OperationModes.SingleEnd.value[0]
-                else OperationModes.PairedEnd.value[1]
-            ),
-            "-threads",
-            str(threads),
-            f"-phred{phred[-2:]}",
-        ]
-
         # files for SE or PE mode
 
-        if self.selected_input_file_1 is None and self.selected_input_file_2 is None:
+        if input_file_1 is None and input_file_2 is None:
             self.view.show_error_dialog("Please select an input file")
-            return []
+            return None
 
-        files = (
-            [
-                self.selected_input_file_1.as_posix(),
-                get_trimmomatic_output_file_path(
-                    self.selected_input_file_1.stem
-                ).as_posix(),
-            ]
-            if mode == OperationModes.SingleEnd.value[0]
-            else [
-                self.selected_input_file_1.as_posix(),
-                self.selected_input_file_2.as_posix(),
-                get_trimmomatic_output_1paired_file_path().as_posix(),
-                get_trimmomatic_output_2paired_file_path().as_posix(),
-                get_trimmomatic_output_1unpaired_file_path().as_posix(),
-                get_trimmomatic_output_2unpaired_file_path().as_posix(),
+        name = get_sequence_file_base_name(input_file_1)
+
+        if mode == OperationModes.SingleEnd.value[0]:
+            input_file_2 = None
+            output_files = [get_trimmomatic_output_file_path(name)]
+        else:
+            # Trimmomatic PE expects the outputs as 1P 1U 2P 2U
+            output_files = [
+                get_trimmomatic_output_1paired_file_path(name),
+                get_trimmomatic_output_1unpaired_file_path(name),
+                get_trimmomatic_output_2paired_file_path(name),
+                get_trimmomatic_output_2unpaired_file_path(name),
             ]
-        )
 
-        arguments.extend(files)
+        options_page = self.view.body.options_page
 
         # illumina clip option
-        is_illumina_clip_active = (
-            self.view.body.options_page.illumina_clip_option_widget.checkbox.isChecked()
-        )
-        if is_illumina_clip_active:
-
-            adapter = (
-                self.view.body.options_page.illumina_clip_option_widget.adaptar_suboption.combo_box.currentData()
-            )
-            seed_mismatches = (
-                self.view.body.options_page.illumina_clip_option_widget.seed_mismatches_suboption.number_selector._spin_box.value()
-            )
-            palindrome_clip_threshold = (
-                self.view.body.options_page.illumina_clip_option_widget.palindrome_clip_threshold_suboption.number_selector._spin_box.value()
-            )
-            simple_clip_threshold = (
-                self.view.body.options_page.illumina_clip_option_widget.simple_clip_threshold_suboption.number_selector._spin_box.value()
-            )
-
-            illumina_clip_arguments = f"ILLUMINACLIP:{to_unc_path(adapter)}:{seed_mismatches}:{palindrome_clip_threshold}:{simple_clip_threshold}"
-
-            is_min_adapter_length_active = (
-                self.view.body.options_page.illumina_clip_option_widget.min_adapter_length_suboption.check_box_widget.isChecked()
-            )
-            if is_min_adapter_length_active:
-                min_adapter_length = (
-                    self.view.body.options_page.illumina_clip_option_widget.min_adapter_length_suboption.number_selector._spin_box.value()
-                )
-                illumina_clip_arguments += f":{min_adapter_length}"
-            else:
-                illumina_clip_arguments += ":0"
-
-            keep_both_reads = (
-                self.view.body.options_page.illumina_clip_option_widget.keep_both_reads_suboption.checkbox.isChecked()
+        illumina_clip = None
+        if options_page.illumina_clip_option_widget.checkbox.isChecked():
+            illumina_clip_widget = options_page.illumina_clip_option_widget
+            illumina_clip = IlluminaClip(
+                adapter=to_unc_path(
+                    illumina_clip_widget.adaptar_suboption.combo_box.currentData()
+                ),
+                seed_mismatches=illumina_clip_widget.seed_mismatches_suboption.number_selector._spin_box.value(),
+                palindrome_clip_threshold=illumina_clip_widget.palindrome_clip_threshold_suboption.number_selector._spin_box.value(),
+                simple_clip_threshold=illumina_clip_widget.simple_clip_threshold_suboption.number_selector._spin_box.value(),
+                min_adapter_length=(
+                    illumina_clip_widget.min_adapter_length_suboption.number_selector._spin_box.value()
+                    if illumina_clip_widget.min_adapter_length_suboption.check_box_widget.isChecked()
+                    else 0
+                ),
+                keep_both_reads=illumina_clip_widget.keep_both_reads_suboption.checkbox.isChecked(),
             )
-            if keep_both_reads:
-                illumina_clip_arguments += ":True"
-
-            arguments.append(illumina_clip_arguments)
 
         # sliding window option
-        is_sliding_window_active = (
-            self.view.body.options_page.sliding_window_option_widget.checkbox.isChecked()
-        )
-        if is_sliding_window_active:
-            window_size = (
-                self.view.body.options_page.sliding_window_option_widget.window_size_suboption.number_selector._spin_box.value()
-            )
-            quality_threshold = (
-                self.view.body.options_page.sliding_window_option_widget.quality_threshold_suboption.number_selector._spin_box.value()
-            )
-            arguments.append(f"SLIDINGWINDOW:{window_size}:{quality_threshold}")
-
-        # leading option
-
-        is_leading_active = (
-            self.view.body.options_page.leading_option_widget.checkbox.isChecked()
-        )
-        if is_leading_active:
-            leading = (
-                self.view.body.options_page.leading_option_widget.number_selector_suboption_widget.number_selector._spin_box.value()
-            )
-            arguments.append(f"LEADING:{leading}")
-
-        # trailing option
-        is_trailing_active = (
-            self.view.body.options_page.trailing_option_widget.checkbox.isChecked()
-        )
-        if is_trailing_active:
-            trailing = (
-                self.view.body.options_page.trailing_option_widget.number_selector_suboption_widget.number_selector._spin_box.value()
+        sliding_window = None
+        if options_page.sliding_window_option_widget.checkbox.isChecked():
+            sliding_window = SlidingWindow(
+                window_size=options_page.sliding_window_option_widget.window_size_suboption.number_selector._spin_box.value(),
+                quality_threshold=options_page.sliding_window_option_widget.quality_threshold_suboption.number_selector._spin_box.value(),
             )
-            arguments.append(f"TRAILING:{trailing}")
 
-        # minlen option
-        is_minlen_active = (
-            self.view.body.options_page.minlen_option_widget.checkbox.isChecked()
-        )
-        if is_minlen_active:
-            minlen = (
-                self.view.body.options_page.minlen_option_widget.number_selector_suboption_widget.number_selector._spin_box.value()
+        # leading, trailing, minlen, crop and headcrop options
+        def single_value(option_widget) -> Optional[int]:
+            if not option_widget.checkbox.isChecked():
+                return None
+            return (
+                option_widget.number_selector_suboption_widget.number_selector._spin_box.value()
             )
-            arguments.append(f"MINLEN:{minlen}")
 
-        # crop option
-        is_crop_active = (
-            self.view.body.options_page.crop_option_widget.checkbox.isChecked()
-        )
-        if is_crop_active:
-            crop = (
-                self.view.body.options_page.crop_option_widget.number_selector_suboption_widget.number_selector._spin_box.value()
-            )
-            arguments.append(f"CROP:{crop}")
-
-        # headcrop option
-        is_headcrop_active = (
-            self.view.body.options_page.headcrop_option_widget.checkbox.isChecked()
-        )
-        if is_headcrop_active:
-            headcrop = (
-                self.view.body.options_page.headcrop_option_widget.number_selector_suboption_widget.number_selector._spin_box.value()
-            )
-            arguments.append(f"HEADCROP:{headcrop}")
-
-        # return the command arguments
-        if (
-            not is_illumina_clip_active
-            and not is_sliding_window_active
-            and not is_leading_active
-            and not is_trailing_active
-            and not is_minlen_active
-            and not is_crop_active
-            and not is_headcrop_active
-        ):
+        return TrimmomaticJobSpec(
+            jar=trimmomatic_jar_path,
+            input_file_1=input_file_1,
+            input_file_2=input_file_2,
+            output_files=output_files,
+            threads=threads,
+            phred=int(phred[-2:]),
+            illumina_clip=illumina_clip,
+            sliding_window=sliding_window,
+            leading=single_value(options_page.leading_option_widget),
+            trailing=single_value(options_page.trailing_option_widget),
+            minlen=single_value(options_page.minlen_option_widget),
+            crop=single_value(options_page.crop_option_widget),
+            headcrop=single_value(options_page.headcrop_option_widget),
+            compression=get_workspace_compression_policy(),
+        )
+
+    def generate_arguments(
+        self,
+        input_file_1: Optional[Path] = None,
+        input_file_2: Optional[Path] = None,
+        threads: Optional[int] = None,
+    ) -> list[str]:
+        spec = self.create_job_spec(input_file_1, input_file_2, threads)
+
+        # Trimmomatic needs at least one trimming step
+        if spec is None or not spec.has_steps:
             return []
 
-        return arguments
+        return spec.to_command()[1]
 
     def run_proccess(self):
         arguments = self.generate_arguments()
@@ -446,42 +417,65 @@ class TrimmomaticPanelController:
         self.view.head.play_button.setVisible(False)
         self.view.body.setEnabled(False) """
 
-        self.process.start(
+        self.supervisor.start(
             "java",
             arguments,
+            TrimmomaticJobSpec.supervision,
         )
 
         self.view.body.setCurrentIndex(2)
 
+    def _create_batch_job(
+        self, name: str, input_file_1: Path, input_file_2: Optional[Path]
+    ) -> BatchJob:
+        """
+        Create a batch job for Trimmomatic. The trimmed files (the paired ones
+        in PE mode) are exposed as the job outputs.
+        """
+
+        def build(threads: int) -> tuple[str, list[str]]:
+            spec = self.create_job_spec(input_file_1, input_file_2, threads)
+
+            if spec is None or not spec.has_steps:
+                return "", []
+
+            job.outputs = spec.outputs
+            job.spec = spec
+
+            return spec.to_command()
+
+        job = BatchJob(name=name, build=build)
+
+        return job
+
     def kill_process(self):
         self.view.body.setEnabled(True)
         self.view.head.indeterminate_progress_bar_background.setVisible(False)
         self.view.head.cancel_button.setVisible(False)
         self.view.head.play_button.setVisible(True)
-        if self.process.state() == QProcess.Running:
-            self.process.kill()
+        if self.supervisor.is_running():
+            self.supervisor.cancel()
 
             print("Process cancelled")
         else:
             print("No process running to cancel")
 
-    def on_stdout(self):
-        output = self.process.readAllStandardOutput().data().decode()
-        self.view.body.generation_page_widget.title_label.setText(output)
-        print("output", output)
+    def on_progress(self, event: ProgressEvent):
+        self.view.body.generation_page_widget.title_label.setText(event.message)
 
-    def on_stderr(self):
-        error = self.process.readAllStandardError().data().decode()
-        self.view.body.generation_page_widget.set_text(error)
-        print("error", self.process.readAllStandardError().data().decode())
+    def on_log(self, event: LogEvent):
+        # Trimmomatic writes its progress and errors to stderr
+        if event.stream == "stderr":
+            self.view.body.generation_page_widget.set_text(event.line)
+        print(event.stream, event.line)
 
-    def on_finished(self, exit_code, exit_status):
+    def on_finished(self, event: ExitEvent):
         """
         This method is called when the process finishes.
         It updates the UI and shows a message to the user.
         """
-        if exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0:
-            pass
+        if not event.ok:
+            print("Trimmomatic", event.reason.value, event.message)
 
         self._go_back()
         self._load_existing_report()
@@ -937,10 +931,12 @@ class TrimmomaticPanelController:
         if index == 1:
             self.view.head.star_button.setVisible(True)
             self.view.head.cli_push_button.setVisible(True)
+            self.view.head.batch_button.setVisible(True)
             self.load_saved_configs()
         else:
             self.view.head.star_button.setVisible(False)
             self.view.head.cli_push_button.setVisible(False)
+            self.view.head.batch_button.setVisible(False)
 
     def _to_options_page(self):
         """Navigate to the options page in the Kraken panel."""
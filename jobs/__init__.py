@@ -0,0 +1,73 @@
+from .supervision import (
+    ExitEvent,
+    ExitReason,
+    LogEvent,
+    OutputMonitor,
+    ProgressEvent,
+    SupervisorEvent,
+    SupervisorPolicy,
+    in_process_group,
+    kill_process_tree,
+    kill_supervised_processes,
+    popen_group_options,
+    run_supervised,
+)
+from .job_spec import JobSpec, to_wsl_path, headless_command
+from .compression import (
+    CompressionPolicy,
+    compress_file,
+    decompress_file,
+    read_seek_table,
+    strip_compression_suffix,
+    run_wrapped,
+)
+from .trimmomatic_job_spec import TrimmomaticJobSpec, IlluminaClip, SlidingWindow
+from .fastqc_job_spec import FastQCJobSpec
+from .sortmerna_job_spec import SortMeRnaJobSpec
+from .kraken_job_spec import KrakenJobSpec, KronaJobSpec
+from .serialization import AnyJobSpec, parse_job_spec, load_job_specs, dump_job_specs
+from .result_cache import ResultCache, fingerprint_file, job_cache_key
+from .kraken_output import KrakenOutputCounter
+from .kraken_database_cache import KrakenDatabaseCache
+from .sortmerna_index_cache import SortMeRnaIndexCache
+from .download import (
+    ChecksumMismatch,
+    DownloadCancelled,
+    RemoteFile,
+    download_file,
+    get_partial_paths,
+    get_session,
+    iter_download,
+    new_hasher,
+    probe_url,
+    verify_checksum,
+)
+from .runner import run_job_spec, run_job_specs
+from .sequence_index_metadata import read_sequence_index_metadata, remove_sequence_index
+import importlib
+
+# Modules that import NumPy are loaded the first time one of their names is
+# used, so importing jobs (and starting the application) stays cheap
+_LAZY_NAMES = {
+    "RecordBatch": ".sequence_reader",
+    "detect_format": ".sequence_reader",
+    "open_sequence_file": ".sequence_reader",
+    "read_chunks": ".sequence_reader",
+    "parse_chunk": ".sequence_reader",
+    "read_batches": ".sequence_reader",
+    "SequenceIndex": ".sequence_index",
+    "build_sequence_index": ".sequence_index",
+    "load_sequence_index": ".sequence_index",
+    "get_sequence_index": ".sequence_index",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_NAMES.get(name)
+
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
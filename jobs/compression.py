@@ -0,0 +1,712 @@
+"""
+Compression of the files written by the tools.
+
+A `CompressionPolicy` says how the sequence files a stage writes are
+stored: as they are, gzip or zstd, with a level and a number of threads.
+
+With gzip the tools compress their own output as they write it
+(Trimmomatic from the .gz output names, SortMeRNA with --zip-out), so the
+plain reads never touch the disk. Their gzip is single threaded and the
+policy's level and threads do not apply.
+
+None of the tools can write zstd, so with zstd the tool writes the plain
+file and `run_wrapped` (`main.py --headless wrap`) compresses it once the
+tool has finished, in parallel, as one zstd frame per block plus a seek
+table at the end (the "seekable format" of the zstd project). The price
+is disk space: until the run ends the plain output is on disk, and then
+briefly next to its compressed copy. `write_gzip` writes BGZF, small gzip
+members whose headers give their size, for the callers that compress
+files themselves. Both formats let a reader find the blocks and
+decompress them in parallel (`decompress_file`).
+
+Most tools cannot read zstd either: `run_wrapped` decompresses zstd inputs
+to a staging file before the tool runs and removes it afterwards, so a
+zstd input also costs its plain size on disk for the duration of the run.
+"""
+
+import os
+import queue
+import signal
+import struct
+import subprocess
+import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Literal, Optional, Union
+import zstandard
+from pydantic import BaseModel, ConfigDict
+
+CompressionMethod = Literal["none", "gzip", "zstd"]
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+# Uncompressed size of each gzip member / zstd frame
+BLOCK_SIZE = 4 * 1024**2
+
+# BGZF: gzip members of at most 64 KiB whose header holds their size
+BGZF_BLOCK_SIZE = 0xFF00
+BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+_BGZF_HEADER = struct.Struct("<4sIBBHccHH")
+_BGZF_HEADER_SIZE = _BGZF_HEADER.size
+
+SKIPPABLE_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+_SKIPPABLE_HEADER = struct.Struct("<II")
+_SEEK_TABLE_ENTRY = struct.Struct("<II")
+_SEEK_TABLE_FOOTER = struct.Struct("<IBI")
+
+# Files compressed by `compress_folder`
+SEQUENCE_SUFFIXES = (".fastq", ".fq", ".fasta", ".fa", ".fna", ".fas")
+
+
+class CompressionPolicy(BaseModel):
+    """
+    How the outputs of a stage are stored. `level` None is the default
+    level of the method and `threads` 0 uses every core.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    method: CompressionMethod = "none"
+    level: Optional[int] = None
+    threads: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.method != "none"
+
+    @property
+    def suffix(self) -> str:
+        return SUFFIXES[self.method]
+
+    @property
+    def after_run(self) -> bool:
+        """
+        Whether the outputs are compressed by `run_wrapped` once the tool has
+        finished. The tools write gzip themselves, but not zstd.
+        """
+        return self.method == "zstd"
+
+    def apply(self, path: Path) -> Path:
+        """
+        Name of `path` once stored with this policy.
+        """
+        plain = strip_compression_suffix(path)
+        return plain.with_name(plain.name + self.suffix)
+
+    def to_arguments(self) -> list[str]:
+        """
+        Options of `main.py --headless wrap` for this policy.
+        """
+        arguments = [f"--method={self.method}", f"--threads={self.threads}"]
+        if self.level is not None:
+            arguments.append(f"--level={self.level}")
+        return arguments
+
+
+def strip_compression_suffix(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    for suffix in (".gz", ".zst"):
+        if path.name.endswith(suffix):
+            return path.with_name(path.name.removesuffix(suffix))
+    return path
+
+
+def _threads(threads: int) -> int:
+    return threads if threads > 0 else os.cpu_count() or 1
+
+
+def _blocks(source: BinaryIO, block_size: int) -> Iterator[bytes]:
+    while block := source.read(block_size):
+        yield block
+
+
+def _parallel_map(function: Callable, items: Iterable, threads: int) -> Iterator[bytes]:
+    """
+    `map` over threads (zlib and zstd release the GIL), in order and with at
+    most two items per thread in flight.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = []
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= threads * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+# writing
+
+
+def _bgzf_block(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    header = _BGZF_HEADER.pack(
+        b"\x1f\x8b\x08\x04",
+        0,
+        0,
+        0xFF,
+        6,
+        b"B",
+        b"C",
+        2,
+        _BGZF_HEADER_SIZE + len(deflated) + 8 - 1,
+    )
+    return header + deflated + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+def write_gzip(
+    source: BinaryIO,
+    destination: BinaryIO,
+    level: Optional[int] = None,
+    threads: int = 0,
+    block_size: int = BLOCK_SIZE,
+):
+    """
+    Compress `source` as BGZF, the blocked gzip of htslib: any gzip reader
+    reads it, and `decompress_file` decompresses its blocks in parallel.
+    Each thread compresses `block_size` bytes at a time.
+    """
+    level = DEFAULT_LEVELS["gzip"] if level is None else level
+
+    def compress(data: bytes) -> bytes:
+        return b"".join(
+            _bgzf_block(data[start : start + BGZF_BLOCK_SIZE], level)
+            for start in range(0, len(data), BGZF_BLOCK_SIZE)
+        )
+
+    for blocks in _parallel_map(
+        compress, _blocks(source, block_size), _threads(threads)
+    ):
+        destination.write(blocks)
+
+    destination.write(BGZF_EOF)
+
+
+def write_seekable_zstd(
+    source: BinaryIO,
+    destination: BinaryIO,
+    level: Optional[int] = None,
+    threads: int = 0,
+    block_size: int = BLOCK_SIZE,
+):
+    """
+    Compress `source` as independent zstd frames of `block_size` bytes,
+    followed by the seek table (a skippable frame, which ordinary zstd
+    readers ignore).
+    """
+    level = DEFAULT_LEVELS["zstd"] if level is None else level
+
+    def compress(block: bytes) -> tuple[bytes, int]:
+        compressor = zstandard.ZstdCompressor(level=level, write_checksum=True)
+        return compressor.compress(block), len(block)
+
+    entries = []
+    for frame, size in _parallel_map(
+        compress, _blocks(source, block_size), _threads(threads)
+    ):
+        destination.write(frame)
+        entries.append(_SEEK_TABLE_ENTRY.pack(len(frame), size))
+
+    table = b"".join(entries) + _SEEK_TABLE_FOOTER.pack(len(entries), 0, SEEKABLE_MAGIC)
+    destination.write(_SKIPPABLE_HEADER.pack(SKIPPABLE_MAGIC, len(table)) + table)
+
+
+def compress_file(
+    path: Union[str, Path],
+    policy: CompressionPolicy,
+    output: Optional[Union[str, Path]] = None,
+) -> Path:
+    """
+    Compress a file with the policy and remove the original. The result
+    (`policy.apply(path)` unless `output` is given) only appears once it
+    is complete.
+    """
+    path = Path(path)
+    output = Path(output) if output is not None else policy.apply(path)
+
+    if not policy.enabled:
+        return path
+
+    temporary = output.with_name(f".{output.name}.tmp")
+    write = write_seekable_zstd if policy.method == "zstd" else write_gzip
+
+    try:
+        with open(path, "rb") as source, open(temporary, "wb") as destination:
+            write(source, destination, policy.level, policy.threads)
+        os.replace(temporary, output)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+    path.unlink()
+
+    return output
+
+
+def compress_folder(folder: Union[str, Path], policy: CompressionPolicy) -> list[Path]:
+    """
+    Compress every plain sequence file of a folder.
+    """
+    return [
+        compress_file(file, policy)
+        for file in sorted(Path(folder).iterdir())
+        if file.is_file() and file.name.lower().endswith(SEQUENCE_SUFFIXES)
+    ]
+
+
+# reading
+
+
+def read_seek_table(path: Union[str, Path]) -> Optional[list[tuple[int, int]]]:
+    """
+    (compressed size, decompressed size) of every frame of a seekable zstd
+    file, or None if the file has no seek table.
+    """
+    with open(path, "rb") as file:
+        size = file.seek(0, os.SEEK_END)
+        if size < _SEEK_TABLE_FOOTER.size:
+            return None
+
+        file.seek(size - _SEEK_TABLE_FOOTER.size)
+        frames, descriptor, magic = _SEEK_TABLE_FOOTER.unpack(
+            file.read(_SEEK_TABLE_FOOTER.size)
+        )
+        if magic != SEEKABLE_MAGIC:
+            return None
+
+        # Bit 7 of the descriptor: a checksum after each entry
+        entry_size = _SEEK_TABLE_ENTRY.size + (4 if descriptor & 0x80 else 0)
+        table_size = frames * entry_size
+
+        file.seek(size - _SEEK_TABLE_FOOTER.size - table_size)
+        table = file.read(table_size)
+
+    return [
+        _SEEK_TABLE_ENTRY.unpack_from(table, index * entry_size)
+        for index in range(frames)
+    ]
+
+
+def decompress_file(
+    path: Union[str, Path],
+    output: Union[str, Path],
+    threads: int = 0,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> Path:
+    """
+    Decompress a gzip or zstd file (a plain file is copied).
+
+    Files made of many independent blocks, BGZF gzip and zstd with several
+    frames, are decompressed on `threads` threads and written in order.
+    Anything else, such as the single gzip stream most tools write, goes
+    through `_decompress_pipelined` so reading, decompressing and writing
+    overlap. `on_progress` receives the fraction of the file read.
+
+    Like `compress_file`, the output only appears once it is complete: an
+    error or a cancel midway never leaves a truncated file behind.
+    """
+    path, output = Path(path), Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    temporary = output.with_name(f".{output.name}.tmp")
+
+    try:
+        with open(path, "rb") as source, open(temporary, "wb") as destination:
+            _decompress(path, source, destination, _threads(threads), on_progress)
+        os.replace(temporary, output)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+    return output
+
+
+def _decompress(
+    path: Path,
+    source: BinaryIO,
+    destination: BinaryIO,
+    threads: int,
+    on_progress: Optional[Callable[[float], None]],
+):
+    size = max(path.stat().st_size, 1)
+
+    magic = source.read(4)
+    source.seek(0)
+
+    if magic.startswith(GZIP_MAGIC) and _is_bgzf(source):
+        groups = _bgzf_groups(source)
+        decompress = _inflate_bgzf
+    elif magic == ZSTD_MAGIC and (frames := _zstd_frames(path)) is not None:
+        groups = _read_groups(source, frames)
+        decompress = _decompress_frames
+    else:
+        _decompress_pipelined(
+            source, destination, _stream_decompressor(magic), size, on_progress
+        )
+        return
+
+    def task(group: tuple[bytes, int]) -> tuple[bytes, int]:
+        data, end = group
+        return decompress(data), end
+
+    for block, end in _parallel_map(task, groups, threads):
+        destination.write(block)
+        if on_progress is not None:
+            on_progress(end / size)
+
+
+# reading: blocks decompressed in parallel
+
+# Compressed size of the groups of blocks given to each thread
+GROUP_SIZE = 4 * 1024**2
+# Larger frames are not worth holding in memory to decompress in parallel
+MAX_FRAME_SIZE = 32 * 1024**2
+
+
+def _is_bgzf(source: BinaryIO) -> bool:
+    header = source.read(_BGZF_HEADER_SIZE)
+    source.seek(0)
+    return _bgzf_block_size(header) is not None
+
+
+def _bgzf_block_size(header: bytes) -> Optional[int]:
+    """
+    Size of the BGZF block starting with `header`, from its BC extra
+    subfield, or None if it is not a BGZF block.
+    """
+    header = bytes(header)
+    if len(header) < 12 or not header.startswith(GZIP_MAGIC) or not header[3] & 4:
+        return None
+
+    extra_length = int.from_bytes(header[10:12], "little")
+    extra = header[12 : 12 + extra_length]
+
+    position = 0
+    while position + 4 <= len(extra):
+        subfield_length = int.from_bytes(extra[position + 2 : position + 4], "little")
+        if extra[position : position + 2] == b"BC" and subfield_length == 2:
+            return int.from_bytes(extra[position + 4 : position + 6], "little") + 1
+        position += 4 + subfield_length
+
+    return None
+
+
+def _bgzf_groups(source: BinaryIO) -> Iterator[tuple[bytes, int]]:
+    """
+    Groups of whole BGZF blocks of about `GROUP_SIZE` bytes, with the file
+    position where each ends.
+    """
+    buffer = b""
+    position = 0
+
+    while True:
+        data = source.read(GROUP_SIZE)
+        buffer += data
+
+        cut = 0
+        while True:
+            block_size = _bgzf_block_size(buffer[cut : cut + _BGZF_HEADER_SIZE])
+            if block_size is None or cut + block_size > len(buffer):
+                break
+            cut += block_size
+
+        if not data:
+            if len(buffer) > cut:
+                raise ValueError("truncated BGZF file, or a member that is not BGZF")
+            if cut:
+                yield buffer, position + cut
+            return
+
+        if cut:
+            position += cut
+            yield buffer[:cut], position
+            buffer = buffer[cut:]
+
+
+def _inflate_bgzf(data: bytes) -> bytes:
+    view = memoryview(data)
+    parts = []
+    position = 0
+    while position < len(view):
+        block_size = _bgzf_block_size(view[position : position + _BGZF_HEADER_SIZE])
+        parts.append(zlib.decompress(view[position : position + block_size], 31))
+        position += block_size
+    return b"".join(parts)
+
+
+def _zstd_frames(path: Path) -> Optional[list[int]]:
+    """
+    Compressed size of every frame of a zstd file (skippable frames
+    included), from its seek table or else by walking the frame and block
+    headers. None when there is a single frame or a frame too large to
+    decompress in memory, which are better decompressed as a stream.
+    """
+    seek_table = read_seek_table(path)
+
+    if seek_table is not None:
+        frames = [compressed_size for compressed_size, _ in seek_table]
+    else:
+        frames = []
+        with open(path, "rb") as file:
+            size = file.seek(0, os.SEEK_END)
+            position = 0
+            while position < size:
+                frame_size = _zstd_frame_size(file, position)
+                if frame_size is None or frame_size > MAX_FRAME_SIZE:
+                    return None
+                frames.append(frame_size)
+                position += frame_size
+
+    if len(frames) < 2 or max(frames) > MAX_FRAME_SIZE:
+        return None
+
+    return frames
+
+
+def _zstd_frame_size(file: BinaryIO, position: int) -> Optional[int]:
+    file.seek(position)
+    header = file.read(18)
+
+    magic = int.from_bytes(header[:4], "little")
+    if magic & 0xFFFFFFF0 == SKIPPABLE_MAGIC & 0xFFFFFFF0:
+        return 8 + int.from_bytes(header[4:8], "little")
+
+    if not header.startswith(ZSTD_MAGIC):
+        return None
+
+    parameters = zstandard.get_frame_parameters(header)
+    end = position + zstandard.frame_header_size(header)
+
+    # Blocks: 3-byte header (last block flag, type, size); RLE blocks hold
+    # a single byte whatever their size
+    while True:
+        file.seek(end)
+        block_header = int.from_bytes(file.read(3), "little")
+        last, block_type, block_size = (
+            block_header & 1,
+            (block_header >> 1) & 3,
+            block_header >> 3,
+        )
+        end += 3 + (1 if block_type == 1 else block_size)
+        if last:
+            break
+
+    if parameters.has_checksum:
+        end += 4
+
+    return end - position
+
+
+def _read_groups(source: BinaryIO, frames: list[int]) -> Iterator[tuple[bytes, int]]:
+    """
+    Consecutive frames grouped up to about `GROUP_SIZE` bytes, with the file
+    position where each group ends.
+    """
+    group = []
+    group_size = 0
+    position = 0
+
+    for frame_size in frames:
+        group.append(frame_size)
+        group_size += frame_size
+        if group_size >= GROUP_SIZE:
+            position += group_size
+            yield source.read(group_size), position
+            group, group_size = [], 0
+
+    if group:
+        yield source.read(group_size), position + group_size
+
+
+def _decompress_frames(data: bytes) -> bytes:
+    decompressor = zstandard.ZstdDecompressor().decompressobj(read_across_frames=True)
+    return decompressor.decompress(data)
+
+
+# reading: one stream
+
+
+class _MemberStream:
+    """
+    Incremental decompressor of consecutive gzip members or zstd frames,
+    which knows whether the last one was complete.
+    """
+
+    def __init__(self, new_decompressor: Callable):
+        self.new_decompressor = new_decompressor
+        self.decompressor = new_decompressor()
+        self.complete = True
+
+    def decompress(self, data: bytes) -> bytes:
+        parts = []
+        while data:
+            self.complete = False
+            parts.append(self.decompressor.decompress(data))
+            if not self.decompressor.eof:
+                break
+            self.complete = True
+            data = self.decompressor.unused_data
+            self.decompressor = self.new_decompressor()
+        return b"".join(parts)
+
+    def finish(self):
+        if not self.complete:
+            raise EOFError("compressed file ended before the end of its last block")
+
+
+class _PlainStream:
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+    def finish(self):
+        pass
+
+
+def _stream_decompressor(magic: bytes):
+    if magic.startswith(GZIP_MAGIC):
+        return _MemberStream(lambda: zlib.decompressobj(31))
+    if magic == ZSTD_MAGIC:
+        return _MemberStream(zstandard.ZstdDecompressor().decompressobj)
+    return _PlainStream()
+
+
+def _decompress_pipelined(
+    source: BinaryIO,
+    destination: BinaryIO,
+    decompressor,
+    size: int,
+    on_progress: Optional[Callable[[float], None]] = None,
+):
+    """
+    Decompress a stream with a reader thread, this thread decompressing and
+    a writer thread, connected by short queues, so the disk is read and
+    written while the CPU decompresses.
+    """
+    compressed = queue.Queue(maxsize=4)
+    decompressed = queue.Queue(maxsize=4)
+    errors = []
+
+    def read():
+        try:
+            while data := source.read(BLOCK_SIZE):
+                compressed.put(data)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            compressed.put(None)
+
+    def write():
+        # Keeps taking blocks after an error so the decompressor never waits
+        while (block := decompressed.get()) is not None:
+            if errors:
+                continue
+            try:
+                destination.write(block)
+            except Exception as e:
+                errors.append(e)
+
+    reader = threading.Thread(target=read, daemon=True)
+    writer = threading.Thread(target=write, daemon=True)
+    reader.start()
+    writer.start()
+
+    def decompress(data: Optional[bytes]):
+        """
+        Decompress one block (None: the end of the file).
+        """
+        if data is None:
+            decompressor.finish()
+            return
+        decompressed.put(decompressor.decompress(data))
+        if on_progress is not None:
+            on_progress(source.tell() / size)
+
+    try:
+        # After an error the reader is still drained so it can finish
+        while True:
+            data = compressed.get()
+            if not errors:
+                try:
+                    decompress(data)
+                except Exception as e:
+                    errors.append(e)
+            if data is None:
+                break
+    finally:
+        decompressed.put(None)
+        reader.join()
+        writer.join()
+
+    if errors:
+        raise errors[0]
+
+
+# wrapper
+
+
+def run_wrapped(
+    command: list[str],
+    policy: CompressionPolicy,
+    outputs: Iterable[Path] = (),
+    output_folders: Iterable[Path] = (),
+    staged: Iterable[tuple[Path, Path]] = (),
+) -> int:
+    """
+    Run a tool between its decompression and compression steps:
+
+        1. decompress each staged input (source, staging path)
+        2. run the command, with its output going straight to ours
+        3. remove the staging files
+        4. if the tool succeeded and the policy compresses after the run
+           (zstd), compress `outputs` and the sequence files of
+           `output_folders` with the policy
+
+    Returns the exit code of the tool.
+    """
+    staged = list(staged)
+
+    # Stopping the wrapper also stops the tool
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(143))
+
+    process = None
+    try:
+        for source, staging_path in staged:
+            decompress_file(source, staging_path, policy.threads)
+
+        try:
+            process = subprocess.Popen(command)
+        except OSError as e:
+            print(Path(__file__).name, "-", f"Could not start {command[0]}: {e}")
+            return 127
+        exit_code = process.wait()
+    finally:
+        if process is not None and process.poll() is None:
+            process.terminate()
+            process.wait()
+
+        for _, staging_path in staged:
+            staging_path.unlink(missing_ok=True)
+            try:
+                staging_path.parent.rmdir()
+                staging_path.parent.parent.rmdir()
+            except OSError:
+                pass
+
+    if exit_code != 0 or not policy.after_run:
+        return exit_code
+
+    for output in outputs:
+        if output.is_file():
+            compress_file(output, policy)
+
+    for folder in output_folders:
+        if folder.is_dir():
+            compress_folder(folder, policy)
+
+    return exit_code
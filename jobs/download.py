@@ -0,0 +1,519 @@
+"""
+HTTP downloads of reference databases.
+
+Every request goes through one shared `requests.Session`, so the HEAD
+that finds a file's name and size, the download itself and every range
+of a segmented download reuse the same pool of keep-alive connections.
+
+    path = download_file(url, folder, checksum="sha256:9f86d0...", segments=4)
+
+The file is written to `.<name>.part` and only renamed when it is
+complete and verified, so an interrupted download never looks finished.
+`.<name>.part.json` records the size and validator (ETag or
+Last-Modified) of the remote file and, for segmented downloads, how far
+every byte range got: the next call resumes with HTTP Range requests if
+the remote file did not change. A dropped connection is retried from the
+last byte received.
+
+Cancellation is cooperative: `should_stop` is polled between chunks and
+DownloadCancelled is raised, keeping the partial file for a resume.
+
+The checksum is computed while the bytes arrive. Segmented downloads
+hash the contiguous prefix as it grows, reading back bytes that were
+just written and are still in the page cache, so verifying never costs
+a separate pass over the file.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Union
+from urllib.parse import unquote, urlparse
+
+# requests is imported on first use, it is not needed to start the app
+if TYPE_CHECKING:
+    import requests
+
+CHUNK_SIZE = 1024**2
+
+# Connection timeout and maximum silence while reading, in seconds
+TIMEOUT = (10, 60)
+
+# Reconnections in a row without receiving anything before giving up
+RETRIES = 5
+RETRY_DELAY = 1.0
+
+# Ranges of a segmented download are never smaller than this
+MIN_SEGMENT_SIZE = 64 * 1024**2
+
+POOL_SIZE = 16
+
+# Algorithm of a checksum given without prefix, by hex digest length
+_DIGEST_ALGORITHMS = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+
+_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+class ChecksumMismatch(ValueError):
+    pass
+
+
+def get_session() -> "requests.Session":
+    """
+    Session shared by every download of the process.
+    """
+    global _session
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            # Byte counts and ranges refer to the file, not to a
+            # compressed transfer of it
+            session.headers["Accept-Encoding"] = "identity"
+            _session = session
+
+        return _session
+
+
+# remote files
+
+
+@dataclass
+class RemoteFile:
+    name: str
+    # None if the server does not say
+    size: Optional[int]
+    accepts_ranges: bool
+    # ETag or Last-Modified, tells whether a partial file is still valid
+    validator: Optional[str]
+
+
+def response_file_name(headers, url: str) -> str:
+    """
+    File name from Content-Disposition or, failing that, from the URL.
+    """
+    disposition = headers.get("content-disposition", "")
+
+    match = re.search(r"filename\*\s*=\s*[^']*'[^']*'([^;]+)", disposition)
+    if match is None:
+        match = re.search(r'filename\s*=\s*"?([^";]+)"?', disposition)
+
+    if match is not None:
+        name = Path(unquote(match.group(1).strip())).name
+        if name:
+            return name
+
+    return Path(unquote(urlparse(url).path)).name or "downloaded.file"
+
+
+def probe_url(url: str, session: Optional["requests.Session"] = None) -> RemoteFile:
+    """
+    Name, size and range support of a remote file, without downloading it.
+    """
+    session = session or get_session()
+
+    response = session.head(url, allow_redirects=True, timeout=TIMEOUT)
+
+    if response.status_code in (403, 405, 501):
+        # HEAD not allowed: ask for the first byte instead
+        response = session.get(
+            url, headers={"Range": "bytes=0-0"}, stream=True, timeout=TIMEOUT
+        )
+        response.close()
+
+    response.raise_for_status()
+    headers = response.headers
+
+    size = None
+    content_range = re.match(r"bytes \d+-\d+/(\d+)", headers.get("content-range", ""))
+    if content_range is not None:
+        size = int(content_range.group(1))
+    elif "content-length" in headers and response.status_code == 200:
+        size = int(headers["content-length"])
+
+    return RemoteFile(
+        name=response_file_name(headers, url),
+        size=size,
+        accepts_ranges=(
+            response.status_code == 206
+            or headers.get("accept-ranges", "").lower() == "bytes"
+        ),
+        validator=headers.get("etag") or headers.get("last-modified"),
+    )
+
+
+def iter_download(
+    url: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    session: Optional["requests.Session"] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Iterator[bytes]:
+    """
+    Chunks of bytes [start, end) of a remote file (to its end without
+    `end`). When the connection drops it reconnects asking for the rest
+    with a Range request; a server without range support is read again
+    from the start, skipping what was already received.
+    """
+    import requests
+
+    retry_errors = (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    )
+
+    session = session or get_session()
+    position = start
+    failures = 0
+
+    while end is None or position < end:
+        headers = {}
+        if position or end is not None:
+            last = "" if end is None else str(end - 1)
+            headers["Range"] = f"bytes={position}-{last}"
+
+        try:
+            with session.get(
+                url, headers=headers, stream=True, timeout=TIMEOUT
+            ) as response:
+                response.raise_for_status()
+
+                # 200 instead of 206: the response starts at byte 0
+                skip = position if response.status_code == 200 else 0
+
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if should_stop is not None and should_stop():
+                        raise DownloadCancelled("Download cancelled")
+
+                    if skip:
+                        dropped = min(skip, len(chunk))
+                        chunk = chunk[dropped:]
+                        skip -= dropped
+                    if end is not None:
+                        chunk = chunk[: end - position]
+                    if not chunk:
+                        continue
+
+                    position += len(chunk)
+                    failures = 0
+                    yield chunk
+
+                    if end is not None and position >= end:
+                        return
+
+            if end is None:
+                return
+
+            # The range ended early: ask again for the rest
+            raise requests.exceptions.ChunkedEncodingError("Incomplete range")
+
+        except retry_errors:
+            failures += 1
+            if failures > RETRIES:
+                raise
+            time.sleep(RETRY_DELAY * failures)
+
+
+# checksums
+
+
+def new_hasher(checksum: str):
+    """
+    Hash object for a checksum written "algorithm:hexdigest" or just the
+    hex digest (md5, sha1, sha256 or sha512, told apart by length).
+    """
+    algorithm, _ = _parse_checksum(checksum)
+    return hashlib.new(algorithm)
+
+
+def verify_checksum(hasher, checksum: str):
+    _, expected = _parse_checksum(checksum)
+    if hasher.hexdigest() != expected:
+        raise ChecksumMismatch(
+            f"Checksum mismatch: expected {expected}, got {hasher.hexdigest()}"
+        )
+
+
+def _parse_checksum(checksum: str) -> tuple[str, str]:
+    algorithm, _, digest = checksum.strip().rpartition(":")
+    digest = digest.lower()
+    algorithm = algorithm.lower() or _DIGEST_ALGORITHMS.get(len(digest), "")
+
+    if algorithm not in hashlib.algorithms_available:
+        raise ValueError(f"Unknown checksum algorithm: {checksum}")
+
+    return algorithm, digest
+
+
+def _hash_file(hasher, path: Path, start: int, end: int):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while start < end:
+            data = file.read(min(CHUNK_SIZE, end - start))
+            if not data:
+                raise EOFError(f"{path} is shorter than expected")
+            hasher.update(data)
+            start += len(data)
+
+
+# files
+
+
+def get_partial_paths(path: Union[str, Path]) -> tuple[Path, Path]:
+    """
+    Partial file and state file of a download to `path`.
+    """
+    path = Path(path)
+    return (
+        path.with_name(f".{path.name}.part"),
+        path.with_name(f".{path.name}.part.json"),
+    )
+
+
+def download_file(
+    url: str,
+    folder: Union[str, Path],
+    name: Optional[str] = None,
+    checksum: Optional[str] = None,
+    segments: int = 1,
+    on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    remote: Optional[RemoteFile] = None,
+    session: Optional["requests.Session"] = None,
+) -> Path:
+    """
+    Download `url` into `folder` and return the path of the file.
+
+    `segments` > 1 downloads that many byte ranges in parallel when the
+    server supports ranges and the file is large enough. `on_progress`
+    receives the bytes downloaded and the total (None if unknown).
+    `remote` skips the HEAD request when the caller already probed the URL.
+    """
+    session = session or get_session()
+    remote = remote or probe_url(url, session)
+
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    path = folder / (name or remote.name)
+    part, state_path = get_partial_paths(path)
+
+    state = _load_state(state_path, part, remote)
+    hasher = new_hasher(checksum) if checksum else None
+
+    segments = min(segments, (remote.size or 0) // MIN_SEGMENT_SIZE)
+
+    if remote.accepts_ranges and segments > 1:
+        _download_segments(
+            url,
+            part,
+            state_path,
+            state,
+            remote,
+            segments,
+            hasher,
+            on_progress,
+            should_stop,
+            session,
+        )
+    else:
+        _download_stream(
+            url,
+            part,
+            state_path,
+            state,
+            remote,
+            hasher,
+            on_progress,
+            should_stop,
+            session,
+        )
+
+    if hasher is not None:
+        try:
+            verify_checksum(hasher, checksum)
+        except ChecksumMismatch:
+            # Corrupt: the next try starts over
+            part.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            raise
+
+    os.replace(part, path)
+    state_path.unlink(missing_ok=True)
+
+    return path
+
+
+def _load_state(state_path: Path, part: Path, remote: RemoteFile) -> Optional[dict]:
+    """
+    State of a previous attempt, or None if it cannot be resumed.
+    """
+    if not remote.accepts_ranges or not part.exists():
+        return None
+
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    if state.get("size") != remote.size or state.get("validator") != remote.validator:
+        return None
+
+    return state
+
+
+def _save_state(state_path: Path, state: dict):
+    temporary = state_path.with_name(f"{state_path.name}.tmp")
+    temporary.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(temporary, state_path)
+
+
+def _download_stream(
+    url: str,
+    part: Path,
+    state_path: Path,
+    state: Optional[dict],
+    remote: RemoteFile,
+    hasher,
+    on_progress: Optional[Callable[[int, Optional[int]], None]],
+    should_stop: Optional[Callable[[], bool]],
+    session: "requests.Session",
+):
+    offset = 0
+    if state is not None and "segments" not in state:
+        offset = part.stat().st_size
+        if remote.size is not None:
+            offset = min(offset, remote.size)
+
+    _save_state(state_path, {"size": remote.size, "validator": remote.validator})
+
+    if offset and hasher is not None:
+        # The hash of what was downloaded before cannot be saved: read it
+        _hash_file(hasher, part, 0, offset)
+
+    with open(part, "r+b" if offset else "wb") as file:
+        file.truncate(offset)
+        file.seek(offset)
+
+        done = offset
+        for chunk in iter_download(url, offset, None, session, should_stop):
+            file.write(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+
+            done += len(chunk)
+            if on_progress is not None:
+                on_progress(done, remote.size)
+
+    if remote.size is not None and done != remote.size:
+        raise EOFError(f"Downloaded {done} of {remote.size} bytes")
+
+
+def _download_segments(
+    url: str,
+    part: Path,
+    state_path: Path,
+    state: Optional[dict],
+    remote: RemoteFile,
+    segments: int,
+    hasher,
+    on_progress: Optional[Callable[[int, Optional[int]], None]],
+    should_stop: Optional[Callable[[], bool]],
+    session: "requests.Session",
+):
+    size = remote.size
+
+    if state is None or "segments" not in state:
+        bounds = [size * index // segments for index in range(segments + 1)]
+        # [start, end, bytes done]
+        state = {
+            "size": size,
+            "validator": remote.validator,
+            "segments": [[start, end, 0] for start, end in zip(bounds, bounds[1:])],
+        }
+        with open(part, "wb") as file:
+            file.truncate(size)
+
+    ranges: list[list[int]] = state["segments"]
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def stopped() -> bool:
+        return stop.is_set() or (should_stop is not None and should_stop())
+
+    def fetch(segment: list[int]):
+        start, end, done = segment
+        # Unbuffered: what `done` counts is already in the file
+        with open(part, "r+b", buffering=0) as file:
+            file.seek(start + done)
+            for chunk in iter_download(url, start + done, end, session, stopped):
+                file.write(chunk)
+                with lock:
+                    segment[2] += len(chunk)
+
+    hashed = 0
+
+    def contiguous() -> int:
+        with lock:
+            for start, end, done in ranges:
+                if start + done < end:
+                    return start + done
+        return size
+
+    def advance_hash():
+        nonlocal hashed
+        if hasher is None:
+            return
+        end = contiguous()
+        if end > hashed:
+            _hash_file(hasher, part, hashed, end)
+            hashed = end
+
+    pending = [segment for segment in ranges if segment[0] + segment[2] < segment[1]]
+
+    with ThreadPoolExecutor(max_workers=max(len(pending), 1)) as executor:
+        futures = [executor.submit(fetch, segment) for segment in pending]
+
+        try:
+            while True:
+                finished, running = wait(
+                    futures, timeout=0.5, return_when=FIRST_EXCEPTION
+                )
+
+                with lock:
+                    done = sum(segment[2] for segment in ranges)
+                _save_state(state_path, state)
+                advance_hash()
+
+                if on_progress is not None:
+                    on_progress(done, size)
+
+                for future in finished:
+                    future.result()
+
+                if not running:
+                    break
+        finally:
+            stop.set()
+            wait(futures)
+            _save_state(state_path, state)
+
+    advance_hash()
@@ -0,0 +1,727 @@
+"""
+Built-in FASTQ quality control, an alternative to FastQC without Java.
+
+The file (plain, gzip or zstd) is read in large chunks by
+`jobs.sequence_reader` and every statistic is computed with NumPy over the
+whole chunk: bases, qualities and positions are flat arrays and the
+histograms come from `np.bincount`, so no Python code runs per read. Chunk
+statistics are plain histograms that add up, which lets large files be
+split across several processes.
+
+The result is written as a FastQC-compatible `<name>_fastqc.zip` with a
+fastqc_data.txt holding the modules shown by the FastQC panel.
+"""
+
+import math
+import os
+import sys
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional, Union
+import numpy as np
+from .sequence_reader import parse_fastq, read_batches, read_chunks
+
+# Files smaller than this (on disk) are analysed in a single process
+PARALLEL_THRESHOLD = 64 * 1024**2
+
+MAX_QUALITY = 94
+
+# As FastQC: the first 100,000 distinct sequences are tracked, and
+# sequences longer than 75 bases are truncated to 50
+DUPLICATION_LIMIT = 100_000
+DUPLICATION_LENGTH = 50
+
+ADAPTERS = {
+    "Illumina Universal Adapter": "AGATCGGAAGAG",
+    "Illumina Small RNA 3' Adapter": "TGGAATTCTCGG",
+    "Illumina Small RNA 5' Adapter": "GATCGTCGGACT",
+    "Nextera Transposase Sequence": "CTGTCTCTTATA",
+    "PolyA": "AAAAAAAAAAAA",
+    "PolyG": "GGGGGGGGGGGG",
+}
+ADAPTER_LENGTH = 12
+
+# A, C, G, T -> 0..3, anything else (N) -> 4
+BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _bases in enumerate(("Aa", "Cc", "Gg", "Tt")):
+    for _base in _bases:
+        BASE_CODES[ord(_base)] = _code
+
+DUPLICATION_LEVELS = [
+    ("1", 1, 1),
+    ("2", 2, 2),
+    ("3", 3, 3),
+    ("4", 4, 4),
+    ("5", 5, 5),
+    ("6", 6, 6),
+    ("7", 7, 7),
+    ("8", 8, 8),
+    ("9", 9, 9),
+    (">10", 10, 49),
+    (">50", 50, 99),
+    (">100", 100, 499),
+    (">500", 500, 999),
+    (">1k", 1000, 4999),
+    (">5k", 5000, 9999),
+    (">10k+", 10000, None),
+]
+
+_HASH_WEIGHTS = (np.random.default_rng(0x7A11).integers(1, 2**63, 75) | 1).astype(
+    np.uint64
+)
+
+
+def _pad(array: np.ndarray, length: int) -> np.ndarray:
+    if array.shape[0] >= length:
+        return array
+    padding = [(0, length - array.shape[0])] + [(0, 0)] * (array.ndim - 1)
+    return np.pad(array, padding)
+
+
+def _add(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    length = max(a.shape[0], b.shape[0])
+    return _pad(a, length) + _pad(b, length)
+
+
+@dataclass
+class BlockStats:
+    """
+    Histograms of one block of reads. Two blocks are combined by adding
+    their histograms; the sequence hashes are merged by `DuplicationTracker`.
+    """
+
+    reads: int = 0
+    bases: int = 0
+    min_length: int = 0
+    max_length: int = 0
+    quality: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, MAX_QUALITY), dtype=np.int64)
+    )
+    base_content: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, 5), dtype=np.int64)
+    )
+    sequence_quality: np.ndarray = field(
+        default_factory=lambda: np.zeros(MAX_QUALITY, dtype=np.int64)
+    )
+    gc: np.ndarray = field(default_factory=lambda: np.zeros(101, dtype=np.int64))
+    lengths: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    adapters: np.ndarray = field(
+        default_factory=lambda: np.zeros((0, len(ADAPTERS)), dtype=np.int64)
+    )
+    # Distinct sequence hashes of the block, their counts and first read
+    hashes: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.uint64))
+    hash_counts: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+
+    def merge(self, other: "BlockStats"):
+        if other.reads == 0:
+            return
+        self.min_length = (
+            min(self.min_length, other.min_length) if self.reads else other.min_length
+        )
+        self.max_length = max(self.max_length, other.max_length)
+        self.reads += other.reads
+        self.bases += other.bases
+        self.quality = _add(self.quality, other.quality)
+        self.base_content = _add(self.base_content, other.base_content)
+        self.sequence_quality += other.sequence_quality
+        self.gc += other.gc
+        self.lengths = _add(self.lengths, other.lengths)
+        self.adapters = _add(self.adapters, other.adapters)
+
+
+class DuplicationTracker:
+    """
+    Counts of the first `DUPLICATION_LIMIT` distinct sequences, in the order
+    they appear; later new sequences are ignored, as in FastQC.
+    """
+
+    def __init__(self, limit: int = DUPLICATION_LIMIT):
+        self.limit = limit
+        self.hashes = np.zeros(0, dtype=np.uint64)  # sorted
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def add(self, hashes: np.ndarray, counts: np.ndarray):
+        """
+        `hashes` (distinct) must be in order of first appearance.
+        """
+        if len(hashes) == 0:
+            return
+
+        index = np.searchsorted(self.hashes, hashes)
+        index[index == len(self.hashes)] = 0
+        known = (
+            self.hashes[index] == hashes
+            if len(self.hashes)
+            else np.zeros(len(hashes), bool)
+        )
+
+        np.add.at(self.counts, index[known], counts[known])
+
+        room = self.limit - len(self.hashes)
+        if room > 0:
+            new_hashes = hashes[~known][:room]
+            new_counts = counts[~known][:room]
+            hashes = np.concatenate([self.hashes, new_hashes])
+            order = np.argsort(hashes, kind="stable")
+            self.hashes = hashes[order]
+            self.counts = np.concatenate([self.counts, new_counts])[order]
+
+
+def block_stats(block: bytes, quality_offset: int = 33) -> BlockStats:
+    """
+    Statistics of a block of complete FASTQ records.
+    """
+    stats = BlockStats()
+
+    batch = parse_fastq(block)
+    lengths = batch.lengths
+
+    reads = len(lengths)
+    if reads == 0:
+        return stats
+
+    total = int(lengths.sum())
+    max_length = int(lengths.max())
+
+    stats.reads = reads
+    stats.bases = total
+    stats.min_length = int(lengths.min())
+    stats.max_length = max_length
+    stats.lengths = np.bincount(lengths, minlength=max_length + 1)
+
+    # Flat arrays over every base of the block
+    read_ids = np.repeat(np.arange(reads), lengths)
+    read_offsets = np.cumsum(lengths) - lengths
+    positions = np.arange(total) - read_offsets[read_ids]
+
+    bases = BASE_CODES[batch.sequences]
+    qualities = np.clip(
+        batch.qualities.astype(np.int16) - quality_offset,
+        0,
+        MAX_QUALITY - 1,
+    )
+
+    stats.quality = np.bincount(
+        positions * MAX_QUALITY + qualities, minlength=max_length * MAX_QUALITY
+    ).reshape(max_length, MAX_QUALITY)
+    stats.base_content = np.bincount(
+        positions * 5 + bases, minlength=max_length * 5
+    ).reshape(max_length, 5)
+
+    # Per sequence
+    safe_lengths = np.maximum(lengths, 1)
+    mean_quality = np.bincount(read_ids, weights=qualities, minlength=reads)
+    stats.sequence_quality = np.bincount(
+        (mean_quality // safe_lengths).astype(np.int64), minlength=MAX_QUALITY
+    )[:MAX_QUALITY]
+
+    is_gc = (bases == 1) | (bases == 2)
+    gc = np.bincount(read_ids, weights=is_gc, minlength=reads)
+    called = np.bincount(read_ids, weights=bases < 4, minlength=reads)
+    has_called = called > 0
+    stats.gc = np.bincount(
+        np.rint(100 * gc[has_called] / called[has_called]).astype(np.int64),
+        minlength=101,
+    )
+
+    stats.adapters = _adapter_positions(bases, positions, read_ids, lengths, max_length)
+    stats.hashes, stats.hash_counts = _sequence_hashes(
+        bases, positions, read_ids, lengths
+    )
+
+    return stats
+
+
+def _adapter_positions(
+    bases: np.ndarray,
+    positions: np.ndarray,
+    read_ids: np.ndarray,
+    lengths: np.ndarray,
+    max_length: int,
+) -> np.ndarray:
+    """
+    Histogram (position x adapter) of where each adapter first appears in
+    each read.
+    """
+    result = np.zeros((max_length, len(ADAPTERS)), dtype=np.int64)
+    windows = len(bases) - ADAPTER_LENGTH + 1
+
+    if windows <= 0:
+        return result
+
+    for column, adapter in enumerate(ADAPTERS.values()):
+        codes = BASE_CODES[np.frombuffer(adapter.encode(), dtype=np.uint8)]
+
+        # Windows matching the first bases (a few in a thousand), narrowed
+        # down base by base, instead of comparing every 12-mer of the block
+        candidates = bases[:windows] == codes[0]
+        for offset in range(1, 4):
+            candidates &= bases[offset : offset + windows] == codes[offset]
+
+        hits = np.flatnonzero(candidates)
+        for offset in range(4, ADAPTER_LENGTH):
+            hits = hits[bases[hits + offset] == codes[offset]]
+
+        # Windows crossing into the next read do not count
+        hits = hits[positions[hits] <= lengths[read_ids[hits]] - ADAPTER_LENGTH]
+        if len(hits) == 0:
+            continue
+
+        # Hits are sorted, so the first of each read is its first occurrence
+        _, first = np.unique(read_ids[hits], return_index=True)
+        result[:, column] = np.bincount(positions[hits[first]], minlength=max_length)[
+            :max_length
+        ]
+
+    return result
+
+
+def _sequence_hashes(
+    bases: np.ndarray,
+    positions: np.ndarray,
+    read_ids: np.ndarray,
+    lengths: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    64 bit hash of each (possibly truncated) read, reduced to the distinct
+    hashes in order of first appearance and their counts.
+    """
+    kept_lengths = np.where(lengths > 75, DUPLICATION_LENGTH, lengths)
+    kept = positions < kept_lengths[read_ids]
+
+    # The kept bases of each read are contiguous, so every hash is a sum
+    # over one segment
+    with np.errstate(over="ignore"):
+        values = (bases[kept].astype(np.uint64) + 1) * _HASH_WEIGHTS[positions[kept]]
+        offsets = np.cumsum(kept_lengths) - kept_lengths
+        hashes = np.add.reduceat(values, np.minimum(offsets, max(len(values) - 1, 0)))
+        hashes[kept_lengths == 0] = 0
+        hashes ^= kept_lengths.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+
+    distinct, first, counts = np.unique(hashes, return_index=True, return_counts=True)
+    order = np.argsort(first, kind="stable")
+
+    return distinct[order], counts[order]
+
+
+# reading
+
+
+def _detect_quality_offset(path: Path) -> int:
+    """
+    Phred+64 if no quality below '@' appears in the first block.
+    """
+    for batch in read_batches(path, "fastq", chunk_size=1024**2):
+        if len(batch) == 0:
+            break
+        lowest = int(batch.qualities.min(initial=255))
+        return 64 if lowest >= 64 else 33
+    return 33
+
+
+def analyse_fastq(
+    path: Union[str, Path],
+    processes: Optional[int] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> tuple[BlockStats, DuplicationTracker, int]:
+    """
+    Statistics of a whole FASTQ file. Files larger than
+    `PARALLEL_THRESHOLD` are analysed by `processes` worker processes
+    (by default one per CPU).
+    """
+    path = Path(path)
+    quality_offset = _detect_quality_offset(path)
+    analyse = partial(block_stats, quality_offset=quality_offset)
+
+    stats = BlockStats()
+    duplication = DuplicationTracker()
+
+    def collect(block: BlockStats):
+        stats.merge(block)
+        duplication.add(block.hashes, block.hash_counts)
+
+    blocks = read_chunks(path, "fastq", on_progress=on_progress)
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes <= 1 or path.stat().st_size < PARALLEL_THRESHOLD:
+        for block in blocks:
+            collect(analyse(block))
+        return stats, duplication, quality_offset
+
+    # Blocks are submitted a few at a time (not all at once, which would
+    # load the whole file) and collected in order
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+
+        for block in blocks:
+            pending.append(executor.submit(analyse, block))
+            if len(pending) >= 2 * processes:
+                collect(pending.popleft().result())
+
+        while pending:
+            collect(pending.popleft().result())
+
+    return stats, duplication, quality_offset
+
+
+# FastQC report
+
+
+def _status(value: float, warn: float, fail: float, higher_is_worse=True) -> str:
+    if not higher_is_worse:
+        value, warn, fail = -value, -warn, -fail
+    if value > fail:
+        return "fail"
+    if value > warn:
+        return "warn"
+    return "pass"
+
+
+def _base_groups(length: int) -> list[tuple[int, int]]:
+    """
+    Positions reported (1-based, inclusive): one by one for short reads,
+    then in groups of equal width for long ones, as FastQC does.
+    """
+    if length <= 75:
+        return [(i, i) for i in range(1, length + 1)]
+
+    groups = [(i, i) for i in range(1, 10)]
+    width = max(1, math.ceil((length - 9) / 66))
+    for start in range(10, length + 1, width):
+        groups.append((start, min(start + width - 1, length)))
+    return groups
+
+
+def _group_rows(array: np.ndarray, groups: list[tuple[int, int]]) -> np.ndarray:
+    return np.stack([array[start - 1 : end].sum(axis=0) for start, end in groups])
+
+
+def _group_label(start: int, end: int) -> str:
+    return str(start) if start == end else f"{start}-{end}"
+
+
+def _percentiles(histogram: np.ndarray, fractions: list[float]) -> np.ndarray:
+    """
+    Percentiles of each row of a histogram (rows x values).
+    """
+    cumulative = histogram.cumsum(axis=1)
+    totals = np.maximum(cumulative[:, -1:], 1)
+    return np.stack(
+        [(cumulative >= fraction * totals).argmax(axis=1) for fraction in fractions],
+        axis=1,
+    )
+
+
+def _format(value) -> str:
+    if isinstance(value, (float, np.floating)):
+        text = f"{float(value):.6f}".rstrip("0")
+        return text + "0" if text.endswith(".") else text
+    return str(value)
+
+
+def _module(name: str, status: str, columns: list[str], rows, properties=()) -> str:
+    lines = [f">>{name}\t{status}"]
+    lines.extend(f"#{key}\t{_format(value)}" for key, value in properties)
+    lines.append("#" + "\t".join(columns))
+    lines.extend("\t".join(_format(value) for value in row) for row in rows)
+    lines.append(">>END_MODULE")
+    return "\n".join(lines)
+
+
+def fastqc_modules(
+    file_name: str,
+    stats: BlockStats,
+    duplication: DuplicationTracker,
+    quality_offset: int = 33,
+) -> list[tuple[str, str, str]]:
+    """
+    (name, status, text) of each module, in fastqc_data.txt format.
+    """
+    modules = []
+    reads = max(stats.reads, 1)
+    groups = _base_groups(stats.max_length)
+
+    # Basic Statistics
+
+    called = stats.base_content[:, :4].sum()
+    gc_percent = round(100 * stats.base_content[:, 1:3].sum() / called) if called else 0
+    length = (
+        str(stats.max_length)
+        if stats.min_length == stats.max_length
+        else f"{stats.min_length}-{stats.max_length}"
+    )
+    rows = [
+        ("Filename", file_name),
+        ("File type", "Conventional base calls"),
+        (
+            "Encoding",
+            "Sanger / Illumina 1.9" if quality_offset == 33 else "Illumina 1.5",
+        ),
+        ("Total Sequences", stats.reads),
+        ("Total Bases", stats.bases),
+        ("Sequences flagged as poor quality", 0),
+        ("Sequence length", length),
+        ("%GC", gc_percent),
+    ]
+    modules.append(("Basic Statistics", "pass", ["Measure", "Value"], rows, ()))
+
+    # Per base sequence quality
+
+    quality = _group_rows(stats.quality, groups) if groups else stats.quality
+    totals = np.maximum(quality.sum(axis=1), 1)
+    means = (quality * np.arange(MAX_QUALITY)).sum(axis=1) / totals
+    percentiles = _percentiles(quality, [0.5, 0.25, 0.75, 0.1, 0.9])
+    rows = [
+        (_group_label(*group), round(float(mean), 2), *map(float, values))
+        for group, mean, values in zip(groups, means, percentiles)
+    ]
+    lower_quartile = percentiles[:, 1].min(initial=MAX_QUALITY)
+    median = percentiles[:, 0].min(initial=MAX_QUALITY)
+    status = "pass"
+    if lower_quartile < 10 or median < 25:
+        status = "warn"
+    if lower_quartile < 5 or median < 20:
+        status = "fail"
+    modules.append(
+        (
+            "Per base sequence quality",
+            status,
+            [
+                "Base",
+                "Mean",
+                "Median",
+                "Lower Quartile",
+                "Upper Quartile",
+                "10th Percentile",
+                "90th Percentile",
+            ],
+            rows,
+            (),
+        )
+    )
+
+    # Per sequence quality scores
+
+    present = np.flatnonzero(stats.sequence_quality)
+    rows = [(int(q), int(stats.sequence_quality[q])) for q in present]
+    mode = int(stats.sequence_quality.argmax())
+    modules.append(
+        (
+            "Per sequence quality scores",
+            _status(mode, 27, 20, higher_is_worse=False),
+            ["Quality", "Count"],
+            rows,
+            (),
+        )
+    )
+
+    # Per base sequence content (G, A, T, C as FastQC)
+
+    content = _group_rows(stats.base_content, groups) if groups else stats.base_content
+    percents = 100 * content[:, :4] / np.maximum(content[:, :4].sum(axis=1), 1)[:, None]
+    rows = [
+        (_group_label(*group), *(round(float(p), 2) for p in row[[2, 0, 3, 1]]))
+        for group, row in zip(groups, percents)
+    ]
+    difference = max(
+        np.abs(percents[:, 0] - percents[:, 3]).max(initial=0),
+        np.abs(percents[:, 1] - percents[:, 2]).max(initial=0),
+    )
+    modules.append(
+        (
+            "Per base sequence content",
+            _status(difference, 10, 20),
+            ["Base", "G", "A", "T", "C"],
+            rows,
+            (),
+        )
+    )
+
+    # Per sequence GC content, compared with a normal distribution
+
+    gc = stats.gc.astype(float)
+    total_gc = max(gc.sum(), 1)
+    mode_gc = int(gc.argmax())
+    spread = math.sqrt(max((gc * (np.arange(101) - mode_gc) ** 2).sum() / total_gc, 1))
+    normal = np.exp(-((np.arange(101) - mode_gc) ** 2) / (2 * spread**2))
+    normal *= total_gc / normal.sum()
+    deviation = 100 * np.abs(gc - normal).sum() / total_gc
+    modules.append(
+        (
+            "Per sequence GC content",
+            _status(deviation, 15, 30),
+            ["GC Content", "Count"],
+            [(i, float(count)) for i, count in enumerate(gc)],
+            (),
+        )
+    )
+
+    # Per base N content
+
+    n_percent = 100 * content[:, 4] / np.maximum(content.sum(axis=1), 1)
+    modules.append(
+        (
+            "Per base N content",
+            _status(n_percent.max(initial=0), 5, 20),
+            ["Base", "N-Count"],
+            [
+                (_group_label(*group), round(float(p), 4))
+                for group, p in zip(groups, n_percent)
+            ],
+            (),
+        )
+    )
+
+    # Sequence Length Distribution
+
+    present = np.flatnonzero(stats.lengths)
+    status = "pass"
+    if len(present) > 1:
+        status = "warn"
+    if stats.lengths[:1].sum() > 0:
+        status = "fail"
+    modules.append(
+        (
+            "Sequence Length Distribution",
+            status,
+            ["Length", "Count"],
+            [(int(length), float(stats.lengths[length])) for length in present],
+            (),
+        )
+    )
+
+    # Sequence Duplication Levels (over the tracked sequences)
+
+    counts = duplication.counts
+    tracked_reads = max(int(counts.sum()), 1)
+    distinct = max(len(counts), 1)
+    rows = []
+    for label, low, high in DUPLICATION_LEVELS:
+        in_level = (
+            (counts >= low) if high is None else (counts >= low) & (counts <= high)
+        )
+        rows.append(
+            (
+                label,
+                round(100 * in_level.sum() / distinct, 4),
+                round(100 * counts[in_level].sum() / tracked_reads, 4),
+            )
+        )
+    deduplicated = 100 * len(counts) / tracked_reads
+    modules.append(
+        (
+            "Sequence Duplication Levels",
+            _status(deduplicated, 80, 50, higher_is_worse=False),
+            ["Duplication Level", "Percentage of deduplicated", "Percentage of total"],
+            rows,
+            [("Total Deduplicated Percentage", round(deduplicated, 4))],
+        )
+    )
+
+    # Adapter Content: reads with the adapter at or before each position
+
+    cumulative = 100 * np.cumsum(_pad(stats.adapters, stats.max_length), axis=0) / reads
+    adapter_rows = [
+        (_group_label(start, end), *(round(float(p), 4) for p in cumulative[end - 1]))
+        for start, end in groups
+    ]
+    modules.append(
+        (
+            "Adapter Content",
+            _status(cumulative.max(initial=0), 5, 10),
+            ["Position", *ADAPTERS],
+            adapter_rows,
+            (),
+        )
+    )
+
+    return [
+        (name, status, _module(name, status, columns, rows, properties))
+        for name, status, columns, rows, properties in modules
+    ]
+
+
+def report_name(input_file: Path) -> str:
+    """
+    Same name FastQC gives to its report.
+    """
+    name = Path(input_file).name
+    for extension in (".gz", ".zst", ".bz2", ".txt", ".fastq", ".fq"):
+        name = name.removesuffix(extension)
+    return f"{name}_fastqc"
+
+
+def write_fastqc_zip(
+    input_file: Path,
+    output_dir: Path,
+    processes: Optional[int] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> Path:
+    """
+    Analyse a FASTQ file and write `<name>_fastqc.zip` in `output_dir`
+    with fastqc_data.txt and summary.txt.
+    """
+    input_file = Path(input_file)
+    output_dir = Path(output_dir)
+    name = report_name(input_file)
+
+    stats, duplication, quality_offset = analyse_fastq(
+        input_file, processes, on_progress
+    )
+    modules = fastqc_modules(input_file.name, stats, duplication, quality_offset)
+
+    data = "##FastQC\tTranscriptoHub\n" + "\n".join(text for _, _, text in modules)
+    summary = "".join(
+        f"{status.upper()}\t{module}\t{input_file.name}\n"
+        for module, status, _ in modules
+    )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / f"{name}.zip"
+    temporary_file = output_dir / f".{name}.zip.tmp"
+
+    with zipfile.ZipFile(temporary_file, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f"{name}/fastqc_data.txt", data + "\n")
+        archive.writestr(f"{name}/summary.txt", summary)
+
+    os.replace(temporary_file, output_file)
+
+    return output_file
+
+
+def main(files: list[Path], output_dir: Path, processes: Optional[int] = None) -> int:
+    """
+    Entry point of the command line: reports progress on stderr like
+    FastQC ("Approx 40% complete") so the same progress parsing works.
+    """
+    failed = 0
+
+    for file in files:
+        last = [-1]
+
+        def on_progress(fraction: float):
+            percent = min(int(fraction * 100) // 5 * 5, 100)
+            if percent != last[0]:
+                last[0] = percent
+                print(
+                    f"Approx {percent}% complete for {file.name}",
+                    file=sys.stderr,
+                    flush=True,
+                )
+
+        try:
+            output_file = write_fastqc_zip(file, output_dir, processes, on_progress)
+        except (OSError, ValueError, EOFError) as e:
+            print(f"Failed to process {file}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+
+        print(f"Analysis complete for {file.name}: {output_file}", flush=True)
+
+    return 1 if failed else 0
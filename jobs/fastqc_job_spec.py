@@ -0,0 +1,108 @@
+from pathlib import Path
+from typing import ClassVar, Literal, Optional
+from .job_spec import JobSpec, headless_command
+from .supervision import SupervisorPolicy
+
+
+class FastQCJobSpec(JobSpec):
+    """
+    FastQC analysis of a single file.
+
+    With `engine="builtin"` the file is analysed by `jobs.fastq_qc` instead
+    of FastQC (no Java needed), run as `main.py --headless qc` so it goes
+    through the same process handling, queue and cache, and writes a report
+    zip that reads like FastQC's. FastQC itself cannot read zstd: a zstd
+    input is decompressed next to the report first (see `wrap_command`).
+    """
+
+    cache_exclude: ClassVar[set[str]] = JobSpec.cache_exclude | {
+        "input_file",
+        "output_dir",
+    }
+
+    # FastQC reports every 5% of the file: half an hour without a line
+    # means it is stuck
+    supervision: ClassVar[SupervisorPolicy] = SupervisorPolicy(
+        idle_timeout=30 * 60,
+        fatal_patterns=(
+            r"^Exception in thread",
+            r"java\.lang\.OutOfMemoryError",
+            r"^Failed to process",
+            r"which didn't exist, or couldn't be read",
+        ),
+        progress_patterns=(
+            r"Approx (?P<percent>\d+)% complete",
+            r"^Started analysis of",
+            r"^Analysis complete for",
+        ),
+    )
+
+    tool: Literal["fastqc"] = "fastqc"
+
+    executable: str = "fastqc"
+    engine: Literal["fastqc", "builtin"] = "fastqc"
+    input_file: Path
+    output_dir: Path
+    threads: Optional[int] = None
+
+    @property
+    def report_name(self) -> str:
+        """
+        Name FastQC gives to the report: the file name without its
+        compression and sequence extensions, followed by _fastqc.
+        """
+        name = self.input_file.name
+        for extension in (
+            ".gz",
+            ".zst",
+            ".bz2",
+            ".txt",
+            ".fastq",
+            ".fq",
+            ".csfastq",
+            ".sam",
+            ".bam",
+        ):
+            name = name.removesuffix(extension)
+        return f"{name}_fastqc"
+
+    @property
+    def outputs(self) -> list[Path]:
+        return [self.output_dir / f"{self.report_name}.zip"]
+
+    @property
+    def inputs(self) -> list[Path]:
+        return [self.input_file]
+
+    def restore_targets(self, names: list[str]) -> list[Path]:
+        return [self.output_dir / name for name in names]
+
+    def to_command(self) -> tuple[str, list[str]]:
+        if self.engine == "builtin":
+            return self._builtin_command()
+
+        input_file = self.staged_input(self.input_file, self.output_dir)
+
+        arguments = [
+            f"{input_file}",
+            f"--outdir={self.output_dir}",
+        ]
+
+        if self.threads is not None:
+            arguments.append(f"--threads={self.threads}")
+
+        return self.wrap_command(
+            self.executable, arguments, staged=[(self.input_file, input_file)]
+        )
+
+    def _builtin_command(self) -> tuple[str, list[str]]:
+        arguments = [
+            "qc",
+            f"{self.input_file}",
+            f"--out-dir={self.output_dir}",
+        ]
+
+        if self.threads is not None:
+            arguments.append(f"--processes={self.threads}")
+
+        return headless_command(arguments)
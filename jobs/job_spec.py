@@ -0,0 +1,150 @@
+import hashlib
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path, PureWindowsPath
+from typing import ClassVar, Iterable, Optional
+from pydantic import BaseModel, ConfigDict
+from .compression import CompressionPolicy, strip_compression_suffix
+from .supervision import SupervisorPolicy
+
+
+def to_wsl_path(path: Path) -> str:
+    """
+    Convert a Windows path (C:\\Users\\...) to its WSL equivalent (/mnt/c/...).
+    Paths without a drive are returned unchanged.
+
+    Kept here instead of using `utils.win_to_wsl` so that job specs can be
+    imported without loading Qt.
+    """
+    windows_path = PureWindowsPath(path)
+
+    if not windows_path.drive:
+        return Path(path).as_posix()
+
+    drive = windows_path.drive.rstrip(":").lower()
+    return (
+        Path("/mnt") / drive / windows_path.relative_to(windows_path.anchor).as_posix()
+    ).as_posix()
+
+
+def headless_command(arguments: list[str]) -> tuple[str, list[str]]:
+    """
+    Command that runs `main.py --headless <arguments>` with the current
+    Python. A frozen build is itself the entry point.
+    """
+    if getattr(sys, "frozen", False):
+        return sys.executable, ["--headless", *arguments]
+
+    main = Path(__file__).resolve().parents[1] / "main.py"
+    return sys.executable, [str(main), "--headless", *arguments]
+
+
+class JobSpec(BaseModel, ABC):
+    """
+    Serializable description of a single tool run.
+
+    A spec holds every value needed to build the command line, so it can be
+    created from the GUI widgets, from the command line or from a JSON file
+    and produce exactly the same command.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    # Fields that do not change the result of the job (locations, threads),
+    # left out of the result cache key
+    cache_exclude: ClassVar[set[str]] = {"threads", "working_directory"}
+
+    # Timeouts and output patterns applied while the tool runs
+    # (jobs.supervision)
+    supervision: ClassVar[SupervisorPolicy] = SupervisorPolicy()
+
+    tool: str
+    working_directory: Optional[Path] = None
+
+    @property
+    def outputs(self) -> list[Path]:
+        """
+        Files produced by the job that later stages consume.
+        """
+        return []
+
+    @property
+    def inputs(self) -> list[Path]:
+        """
+        Files whose content determines the result of the job.
+        """
+        return []
+
+    def result_files(self) -> list[Path]:
+        """
+        Every file written by the job, stored in the result cache.
+        """
+        return self.outputs
+
+    def restore_targets(self, names: list[str]) -> list[Path]:
+        """
+        Where the cached files (given by their original names) are restored.
+        """
+        return self.result_files()
+
+    def cache_parameters(self) -> dict:
+        """
+        Parameters that determine the result, hashed into the result cache
+        key: every field but `cache_exclude`.
+        """
+        return self.model_dump(mode="json", exclude=self.cache_exclude)
+
+    @abstractmethod
+    def to_command(self) -> tuple[str, list[str]]:
+        """
+        Build the program and arguments to run.
+        """
+
+    def supervisor_policy(self) -> SupervisorPolicy:
+        """
+        Policy the command is supervised with.
+        """
+        return self.supervision
+
+    def staged_input(self, path: Path, folder: Path) -> Path:
+        """
+        Path the tool reads an input from. Tools cannot read zstd, so a zstd
+        input is decompressed into a staging folder inside `folder` for the
+        duration of the run (see `wrap_command`); other inputs are read in
+        place.
+        """
+        if not path.name.endswith(".zst"):
+            return path
+
+        digest = hashlib.sha1(self.model_dump_json().encode()).hexdigest()[:12]
+        return folder / ".staging" / digest / strip_compression_suffix(path).name
+
+    def wrap_command(
+        self,
+        program: str,
+        arguments: list[str],
+        compression: Optional[CompressionPolicy] = None,
+        outputs: Iterable[Path] = (),
+        output_folders: Iterable[Path] = (),
+        staged: Iterable[tuple[Path, Path]] = (),
+    ) -> tuple[str, list[str]]:
+        """
+        Run the command through `main.py --headless wrap`, which decompresses
+        the staged inputs (source, staging path) before it and, for policies
+        the tool cannot write itself (zstd), compresses the outputs after it.
+        Without anything to do the command is returned as is.
+        """
+        staged = [(source, path) for source, path in staged if source != path]
+        compression = compression or CompressionPolicy()
+
+        if not staged and not compression.after_run:
+            return program, arguments
+
+        wrap_arguments = ["wrap", *compression.to_arguments()]
+        if compression.after_run:
+            wrap_arguments += [f"--output={output}" for output in outputs]
+            wrap_arguments += [f"--output-dir={folder}" for folder in output_folders]
+        for source, path in staged:
+            wrap_arguments += ["--stage", f"{source}", f"{path}"]
+
+        return headless_command([*wrap_arguments, "--", program, *arguments])
@@ -0,0 +1,177 @@
+import shlex
+import subprocess
+from pathlib import Path
+from typing import Literal, Optional
+from .job_spec import to_wsl_path
+from .kraken_job_spec import KrakenJobSpec
+from .result_cache import fingerprint_file
+
+DATABASE_FILES = ("hash.k2d", "opts.k2d", "taxo.k2d")
+
+# Where staged databases are copied, inside Linux (or WSL)
+SHM_ROOT = "/dev/shm/transcriptohub/kraken2"
+
+# Fraction of the available RAM a database may take before it is left on disk
+MEMORY_FRACTION = 0.8
+
+Strategy = Literal["shm", "page_cache", "disk"]
+
+
+class KrakenDatabaseCache:
+    """
+    Keeps a Kraken2 database resident in memory between runs.
+
+    Every kraken2 invocation loads the whole database before classifying,
+    which dominates the runtime of small samples with large databases. The
+    database is prepared once, depending on the memory available:
+
+    - "shm": copied to /dev/shm (tmpfs) and used with --memory-mapping,
+      so every run maps the same resident copy.
+    - "page_cache": read once so it stays in the page cache, and used in
+      place with --memory-mapping.
+    - "disk": too large for memory, runs are left unchanged.
+
+    With `wsl` every command runs inside WSL, where Kraken2 runs on Windows.
+    Only one database is staged at a time.
+    """
+
+    def __init__(self, wsl: bool = False):
+        self.wsl = wsl
+        self._prepared: dict[Path, tuple[Strategy, Optional[str]]] = {}
+
+    def _run(self, script: str, **kwargs) -> subprocess.CompletedProcess:
+        command = ["sh", "-c", script]
+        if self.wsl:
+            command = ["wsl", "-e", *command]
+        try:
+            return subprocess.run(command, capture_output=True, text=True, **kwargs)
+        except OSError as e:
+            return subprocess.CompletedProcess(command, 127, "", str(e))
+
+    def _path(self, path: Path) -> str:
+        return to_wsl_path(path) if self.wsl else Path(path).as_posix()
+
+    # memory
+
+    @staticmethod
+    def database_size(database: Path) -> int:
+        return sum(
+            (database / name).stat().st_size
+            for name in DATABASE_FILES
+            if (database / name).exists()
+        )
+
+    def available_memory(self) -> int:
+        """
+        MemAvailable from /proc/meminfo, in bytes (0 if unknown).
+        """
+        result = self._run("cat /proc/meminfo")
+        for line in result.stdout.splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+        return 0
+
+    def shm_available(self) -> int:
+        """
+        Free space in /dev/shm, in bytes (0 if unknown).
+        """
+        result = self._run("df -Pk /dev/shm")
+        lines = result.stdout.splitlines()
+        try:
+            return int(lines[1].split()[3]) * 1024
+        except (IndexError, ValueError):
+            return 0
+
+    def choose_strategy(self, database: Path) -> Strategy:
+        size = self.database_size(database)
+        memory = self.available_memory() * MEMORY_FRACTION
+
+        if size == 0 or size > memory:
+            return "disk"
+        if size <= self.shm_available():
+            return "shm"
+        return "page_cache"
+
+    # staging
+
+    def staged_path(self, database: Path) -> str:
+        fingerprint = fingerprint_file(database / "hash.k2d")[:12]
+        return f"{SHM_ROOT}/{database.name}-{fingerprint}"
+
+    def is_staged(self, database: Path) -> bool:
+        staged = shlex.quote(self.staged_path(database))
+        return self._run(f"test -f {staged}/.complete").returncode == 0
+
+    def prepare(self, database: Path) -> Strategy:
+        """
+        Stage or warm the database. Blocking: run it off the GUI thread.
+        """
+        database = Path(database)
+        strategy = self.choose_strategy(database)
+        source = shlex.quote(self._path(database))
+        files = " ".join(f"{source}/{name}" for name in DATABASE_FILES)
+
+        staged = None
+
+        if strategy == "shm":
+            staged = self.staged_path(database)
+
+            if not self.is_staged(database):
+                self.release()
+                target = shlex.quote(staged)
+                # Copied to a temporary folder and renamed, so a half copied
+                # database is never used
+                result = self._run(
+                    f"mkdir -p {SHM_ROOT} && rm -rf {target}.tmp && "
+                    f"mkdir {target}.tmp && cp {files} {target}.tmp/ && "
+                    f"touch {target}.tmp/.complete && mv {target}.tmp {target}"
+                )
+                if result.returncode != 0:
+                    print(
+                        Path(__file__).name,
+                        "-",
+                        f"Could not stage {database.name}: {result.stderr}",
+                    )
+                    self._run(f"rm -rf {target}.tmp")
+                    strategy = "page_cache"
+                    staged = None
+
+        if strategy == "page_cache":
+            # vmtouch is used when installed, cat works everywhere
+            self._run(
+                f"if command -v vmtouch >/dev/null; then vmtouch -tq {files}; "
+                f"else cat {files} > /dev/null; fi"
+            )
+
+        print(Path(__file__).name, "-", f"Database {database.name}: {strategy}")
+
+        self._prepared[database] = (strategy, staged)
+        return strategy
+
+    def is_prepared(self, database: Path) -> bool:
+        return Path(database) in self._prepared
+
+    def apply(self, spec: KrakenJobSpec) -> KrakenJobSpec:
+        """
+        Return the spec pointed at the prepared copy of its database.
+        """
+        strategy, staged = self._prepared.get(spec.database, ("disk", None))
+
+        if strategy == "shm":
+            return spec.model_copy(
+                update={"staged_database": staged, "memory_mapping": True}
+            )
+        if strategy == "page_cache":
+            return spec.model_copy(update={"memory_mapping": True})
+        return spec
+
+    def release(self):
+        """
+        Free the memory used by staged databases.
+        """
+        self._run(f"rm -rf {SHM_ROOT}")
+        self._prepared = {
+            database: prepared
+            for database, prepared in self._prepared.items()
+            if prepared[0] != "shm"
+        }
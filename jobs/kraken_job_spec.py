@@ -0,0 +1,247 @@
+import shlex
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, ClassVar, Literal, Optional
+from pydantic import model_validator
+from .job_spec import JobSpec, headless_command, to_wsl_path
+from .supervision import STREAMS, SupervisorPolicy
+
+
+class KrakenJobSpec(JobSpec):
+    """
+    Kraken2 classification of one (single end) or two (paired end) read files.
+
+    With `wsl` the command is run through WSL and every path is translated,
+    which is how the desktop application runs Kraken2 on Windows.
+
+    `staged_database` is a copy of the database already resident in memory
+    (see `KrakenDatabaseCache`), used instead of `database` when set.
+
+    `output` is the per-read classification: "-" discards it (Kraken2 does
+    not write it at all), a path ending in .gz or .zst is compressed on the
+    fly by a shell pipeline, any other path is written as is. With
+    `counters` the per-read output is also written to stdout, so the caller
+    can count reads as they are classified (see `KrakenOutputCounter`).
+
+    Kraken2 reads gzip but not zstd: zstd inputs are decompressed next to
+    the report first (see `wrap_command`).
+    """
+
+    cache_exclude: ClassVar[set[str]] = JobSpec.cache_exclude | {
+        "input_file_1",
+        "input_file_2",
+        "report_file",
+        "output",
+        "wsl",
+        "memory_mapping",
+        "staged_database",
+        "counters",
+    }
+
+    supervision: ClassVar[SupervisorPolicy] = SupervisorPolicy(
+        fatal_patterns=(
+            r"^(kraken2|classify): ",
+            r"does not contain necessary file",
+            r"std::bad_alloc",
+            # A missing program (kraken2, pigz, zstd) as reported by bash or sh
+            r"^(ba|da)?sh: (line )?\d+: [^:]+: (command )?not found$",
+            r"^[^\s:]+: command not found$",
+        ),
+        progress_patterns=(
+            r"Loading database information",
+            r"sequences \(.*\) processed",
+        ),
+    )
+
+    tool: Literal["kraken2"] = "kraken2"
+
+    database: Path
+    input_file_1: Path
+    input_file_2: Optional[Path] = None
+    report_file: Path
+    output: str = "-"
+    counters: bool = False
+    threads: int = 1
+    wsl: bool = False
+    staged_database: Optional[str] = None
+
+    quick: bool = False
+    memory_mapping: bool = False
+    confidence: Optional[float] = None
+    minimum_hit_groups: Optional[int] = None
+    minimum_base_quality: Optional[int] = None
+
+    @property
+    def outputs(self) -> list[Path]:
+        return [self.report_file]
+
+    @property
+    def inputs(self) -> list[Path]:
+        inputs = [self.input_file_1]
+        if self.input_file_2 is not None:
+            inputs.append(self.input_file_2)
+        # The database is identified by its index files
+        inputs.extend(
+            self.database / name for name in ("hash.k2d", "opts.k2d", "taxo.k2d")
+        )
+        return inputs
+
+    def result_files(self) -> list[Path]:
+        if not self.saves_output:
+            return [self.report_file]
+        return [self.report_file, Path(self.output)]
+
+    def cache_parameters(self) -> dict:
+        parameters = super().cache_parameters()
+
+        # Where the per-read output goes does not change the result, but
+        # whether it is written at all, and compressed how, does: a report
+        # only run cannot stand in for one that asked for it
+        if self.saves_output:
+            parameters["output"] = next(
+                (suffix for suffix in (".gz", ".zst") if self.output.endswith(suffix)),
+                "plain",
+            )
+
+        return parameters
+
+    def _path(self, path: Path) -> str:
+        return to_wsl_path(path) if self.wsl else path.as_posix()
+
+    @property
+    def saves_output(self) -> bool:
+        return self.output not in ("-", "/dev/null")
+
+    @property
+    def _pipes_output(self) -> bool:
+        return self._compressor() is not None or (self.saves_output and self.counters)
+
+    @property
+    def counters_stream(self) -> Optional[str]:
+        """
+        Stream carrying the per-read output for the counters: always stdout,
+        so stderr keeps only the messages of Kraken2. None without `counters`.
+        """
+        return "stdout" if self.counters else None
+
+    def supervisor_policy(self) -> SupervisorPolicy:
+        # The per-read output is counted as it arrives, never split in lines
+        stream = self.counters_stream
+        if stream is None:
+            return self.supervision
+        return replace(
+            self.supervision,
+            log_streams=tuple(name for name in STREAMS if name != stream),
+        )
+
+    def _compressor(self) -> Optional[str]:
+        if self.output.endswith(".gz"):
+            # pigz compresses with every core, gzip is always there
+            return "if command -v pigz >/dev/null; then pigz -c; else gzip -c; fi"
+        if self.output.endswith(".zst"):
+            return "zstd -q -T0 -c"
+        return None
+
+    def to_command(self) -> tuple[str, list[str]]:
+        output = self._path(Path(self.output)) if self.saves_output else "-"
+        compressor = self._compressor() if self.saves_output else None
+        pipeline = self._pipes_output
+
+        kraken_output = "/dev/stdout" if pipeline or self.counters else output
+
+        folder = self.report_file.parent
+        staged = [(self.input_file_1, self.staged_input(self.input_file_1, folder))]
+        if self.input_file_2 is not None:
+            staged.append(
+                (self.input_file_2, self.staged_input(self.input_file_2, folder))
+            )
+
+        arguments = [
+            "kraken2",
+            "--db",
+            self.staged_database or self._path(self.database),
+        ]
+
+        if self.threads > 0:
+            arguments.extend(["--threads", f"{self.threads}"])
+
+        arguments.extend(["--report", self._path(self.report_file)])
+        arguments.extend(["--output", kraken_output])
+
+        if self.quick:
+            arguments.append("--quick")
+        if self.memory_mapping:
+            arguments.append("--memory-mapping")
+        if self.confidence is not None:
+            arguments.extend(["--confidence", f"{self.confidence}"])
+        if self.minimum_hit_groups is not None:
+            arguments.extend(["--minimum-hit-groups", f"{self.minimum_hit_groups}"])
+        if self.minimum_base_quality is not None:
+            arguments.extend(["--minimum-base-quality", f"{self.minimum_base_quality}"])
+
+        if self.input_file_2 is not None:
+            arguments.append("--paired")
+        arguments.extend(self._path(path) for _, path in staged)
+
+        if pipeline:
+            # The per-read output goes straight from Kraken2 to the compressor,
+            # never through the caller. For the counters tee copies it to fd 3,
+            # a duplicate of stdout (stdout itself feeds the compressor), so
+            # stderr is left to Kraken2. pipefail keeps the exit code of Kraken2.
+            script = shlex.join(arguments)
+            if self.counters:
+                script += " | tee /dev/fd/3"
+            script += f" | {compressor or 'cat'} > {shlex.quote(output)}"
+            if self.counters:
+                script = f"{{ {script}; }} 3>&1"
+            arguments = ["bash", "-c", f"set -o pipefail; {script}"]
+
+        if self.wsl:
+            program, arguments = "wsl", ["-e", *arguments] if pipeline else arguments
+        else:
+            program, arguments = arguments[0], arguments[1:]
+
+        return self.wrap_command(program, arguments, staged=staged)
+
+
+class KronaJobSpec(JobSpec):
+    """
+    Krona chart of a Kraken2 report, written by `utils.krona_html` as
+    `main.py --headless krona` so it goes through the same process handling,
+    queue and cache as the tools, without KronaTools (ktImportText) or WSL.
+    """
+
+    cache_exclude: ClassVar[set[str]] = JobSpec.cache_exclude | {
+        "report_file",
+        "output_file",
+    }
+
+    tool: Literal["krona"] = "krona"
+
+    report_file: Path
+    output_file: Optional[Path] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _drop_wsl(cls, data: Any) -> Any:
+        # Specs saved when the chart was made by ktImportText through WSL
+        if isinstance(data, dict) and "wsl" in data:
+            data = {key: value for key, value in data.items() if key != "wsl"}
+        return data
+
+    @property
+    def html_file(self) -> Path:
+        return self.output_file or self.report_file.with_suffix(".krona.html")
+
+    @property
+    def outputs(self) -> list[Path]:
+        return [self.html_file]
+
+    @property
+    def inputs(self) -> list[Path]:
+        return [self.report_file]
+
+    def to_command(self) -> tuple[str, list[str]]:
+        return headless_command(
+            ["krona", f"{self.report_file}", f"--output={self.html_file}"]
+        )
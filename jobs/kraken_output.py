@@ -0,0 +1,45 @@
+class KrakenOutputCounter:
+    """
+    Live counters over the Kraken2 per-read output (one line per read,
+    starting with C or U), fed in chunks of any size as they arrive.
+
+    Only the records are counted: the stream is never decoded or kept, so
+    it can be hundreds of MB without growing the memory of the process.
+    Other lines (Kraken2 messages) are ignored.
+    """
+
+    def __init__(self):
+        self.classified = 0
+        self.unclassified = 0
+        # Last bytes of the previous chunk, to find records split between
+        # chunks. The stream starts at the beginning of a line.
+        self._tail = b"\n"
+
+    @property
+    def processed(self) -> int:
+        return self.classified + self.unclassified
+
+    @property
+    def classified_percent(self) -> float:
+        if self.processed == 0:
+            return 0.0
+        return 100.0 * self.classified / self.processed
+
+    def feed(self, data: bytes):
+        if not data:
+            return
+
+        window = self._tail + data
+
+        self.classified += window.count(b"\nC\t")
+        self.unclassified += window.count(b"\nU\t")
+
+        # A record prefix is 3 bytes long, so 2 bytes are enough to join it
+        # with the next chunk and never count the same record twice
+        self._tail = window[-2:]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.processed} reads processed, "
+            f"{self.classified_percent:.2f}% classified"
+        )
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from .job_spec import JobSpec
+
+# Bytes hashed from each sampled region of an input file
+_SAMPLE_SIZE = 64 * 1024
+# Number of regions sampled across the file (always including head and tail)
+_SAMPLE_COUNT = 8
+
+# Fingerprints of the most recently used files, by (path, size, mtime_ns):
+# a file that changes gets a new key, and the oldest keys are dropped
+_FINGERPRINT_MEMO_SIZE = 4096
+_fingerprints: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+_fingerprints_lock = threading.Lock()
+
+
+def fingerprint_file(path: Path) -> str:
+    """
+    Fast fingerprint of a file: size, modification time and a hash of a few
+    regions spread over the file. Reading a handful of 64 KiB blocks keeps it
+    cheap even for multi-gigabyte FASTQ files or Kraken2 databases.
+    """
+    path = Path(path)
+
+    try:
+        stat = path.stat()
+    except OSError:
+        return "missing"
+
+    memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with _fingerprints_lock:
+        if memo_key in _fingerprints:
+            _fingerprints.move_to_end(memo_key)
+            return _fingerprints[memo_key]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    try:
+        with path.open("rb") as f:
+            if stat.st_size <= _SAMPLE_SIZE * _SAMPLE_COUNT:
+                digest.update(f.read())
+            else:
+                step = (stat.st_size - _SAMPLE_SIZE) // (_SAMPLE_COUNT - 1)
+                for index in range(_SAMPLE_COUNT):
+                    f.seek(index * step)
+                    digest.update(f.read(_SAMPLE_SIZE))
+    except OSError:
+        return "unreadable"
+
+    fingerprint = digest.hexdigest()
+
+    with _fingerprints_lock:
+        _fingerprints[memo_key] = fingerprint
+        if len(_fingerprints) > _FINGERPRINT_MEMO_SIZE:
+            _fingerprints.popitem(last=False)
+
+    return fingerprint
+
+
+def job_cache_key(spec: JobSpec) -> str:
+    """
+    Key of a job: its normalized parameters plus the fingerprints of its
+    inputs. Output locations and thread counts do not change the result,
+    so they are left out (see `JobSpec.cache_parameters`).
+    """
+    data = spec.cache_parameters()
+    data["inputs"] = [fingerprint_file(file) for file in spec.inputs]
+
+    return hashlib.blake2b(
+        json.dumps(data, sort_keys=True).encode(), digest_size=20
+    ).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed cache of tool results.
+
+    Each entry is a folder named after the job key with the result files and
+    a manifest. Entries are written to a temporary folder and renamed into
+    place, so a killed run never leaves a partial entry, and files are
+    restored through a temporary name and `os.replace` for the same reason.
+
+    Files are always copied, never hard-linked: the tools rewrite their
+    outputs in place (open and truncate), so a workspace file sharing its
+    inode with an entry would silently change the cached result of another
+    run. Copying large outputs is slow, so callers in the GUI run `store`
+    and `restore` in a worker thread; they are safe to call concurrently.
+
+    The total size is bounded: least recently used entries are evicted.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root: Path, max_bytes: int = 20 * 1024**3):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._evict_lock = threading.Lock()
+
+    def _entry(self, spec: JobSpec) -> Path:
+        return self.root / job_cache_key(spec)
+
+    def restore(self, spec: JobSpec) -> bool:
+        """
+        Restore the results of an identical previous run, if any.
+        Returns True on a cache hit.
+        """
+        entry = self._entry(spec)
+        manifest_path = entry / self.MANIFEST
+
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+
+        files = manifest["files"]
+        targets = spec.restore_targets([file["name"] for file in files])
+
+        if len(targets) != len(files):
+            return False
+
+        try:
+            for file, target in zip(files, targets):
+                target.parent.mkdir(parents=True, exist_ok=True)
+                temporary = target.with_name(f".{target.name}.tmp")
+                temporary.unlink(missing_ok=True)
+                shutil.copy2(entry / file["stored"], temporary)
+                os.replace(temporary, target)
+        except OSError as e:
+            print(Path(__file__).name, "-", f"Could not restore {entry.name}: {e}")
+            return False
+
+        # LRU: the manifest modification time is the last access
+        os.utime(manifest_path)
+
+        print(Path(__file__).name, "-", f"Cache hit for {spec.tool}: {entry.name}")
+        return True
+
+    def store(self, spec: JobSpec) -> bool:
+        """
+        Store the results of a successful run.
+        """
+        files = [file for file in spec.result_files() if file.is_file()]
+
+        if not files:
+            return False
+
+        entry = self._entry(spec)
+
+        if (entry / self.MANIFEST).exists():
+            os.utime(entry / self.MANIFEST)
+            return True
+
+        temporary = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.root))
+
+        try:
+            manifest = {"tool": spec.tool, "created": time.time(), "files": []}
+            size = 0
+
+            for index, file in enumerate(files):
+                stored = f"{index}_{file.name}"
+                shutil.copy2(file, temporary / stored)
+                size += file.stat().st_size
+                manifest["files"].append({"stored": stored, "name": file.name})
+
+            manifest["size"] = size
+            (temporary / self.MANIFEST).write_text(
+                json.dumps(manifest), encoding="utf-8"
+            )
+
+            os.replace(temporary, entry)
+        except OSError as e:
+            shutil.rmtree(temporary, ignore_errors=True)
+
+            # Another thread stored the same result first
+            if (entry / self.MANIFEST).exists():
+                return True
+
+            print(Path(__file__).name, "-", f"Could not cache {spec.tool}: {e}")
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        Leftover temporary folders from interrupted stores are removed too.
+        """
+        with self._evict_lock:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+
+        for entry in self.root.iterdir():
+            if entry.name.startswith(".tmp-"):
+                try:
+                    stale = time.time() - entry.stat().st_mtime > 24 * 60 * 60
+                except OSError:
+                    continue
+                if stale:
+                    shutil.rmtree(entry, ignore_errors=True)
+                continue
+
+            manifest_path = entry / self.MANIFEST
+            try:
+                size = json.loads(manifest_path.read_text(encoding="utf-8"))["size"]
+                last_access = manifest_path.stat().st_mtime
+            except (OSError, ValueError, KeyError):
+                continue
+
+            entries.append((last_access, size, entry))
+            total += size
+
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
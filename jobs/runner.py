@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Optional
+from .job_spec import JobSpec
+from .result_cache import ResultCache
+from .supervision import kill_supervised_processes, run_supervised
+
+
+def run_job_spec(
+    spec: JobSpec,
+    cache: Optional[ResultCache] = None,
+    timeout: Optional[float] = None,
+    idle_timeout: Optional[float] = None,
+) -> int:
+    """
+    Run a job spec to completion and return its exit code.
+
+    With a result cache, the outputs of an identical previous run are
+    restored instead of running the tool again. `timeout` and
+    `idle_timeout` (seconds) override those of the spec's policy.
+    """
+    if cache is not None and cache.restore(spec):
+        return 0
+
+    program, arguments = spec.to_command()
+
+    policy = spec.supervisor_policy()
+    if timeout is not None or idle_timeout is not None:
+        policy = replace(
+            policy,
+            timeout=timeout if timeout is not None else policy.timeout,
+            idle_timeout=(
+                idle_timeout if idle_timeout is not None else policy.idle_timeout
+            ),
+        )
+
+    print(Path(__file__).name, "-", "Running:", program, " ".join(arguments))
+
+    # The output is already forwarded as is: only the end is reported
+    event = run_supervised(
+        program,
+        arguments,
+        policy,
+        working_directory=spec.working_directory,
+    )
+
+    if not event.ok:
+        print(
+            Path(__file__).name,
+            "-",
+            f"{spec.tool} {event.reason.value}: {event.message}",
+        )
+
+    if event.ok and cache is not None:
+        cache.store(spec)
+
+    return event.exit_code
+
+
+def run_job_specs(
+    specs: list[JobSpec],
+    jobs: int = 1,
+    cache: Optional[ResultCache] = None,
+    timeout: Optional[float] = None,
+    idle_timeout: Optional[float] = None,
+) -> list[int]:
+    """
+    Run several job specs, up to `jobs` at a time, and return their exit
+    codes in the same order.
+    """
+
+    def run(spec: JobSpec) -> int:
+        return run_job_spec(spec, cache, timeout, idle_timeout)
+
+    if jobs <= 1:
+        return [run(spec) for spec in specs]
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        try:
+            return list(executor.map(run, specs))
+        except KeyboardInterrupt:
+            # The tools run in their own process groups and do not see
+            # the Ctrl+C
+            kill_supervised_processes()
+            raise
@@ -0,0 +1,284 @@
+"""
+Random-access index of FASTQ and FASTA files.
+
+One pass over a file writes two small sidecar files next to it:
+
+    sample_R1.fastq.idx.npy   byte offset of every record (plus the end),
+                              a NumPy array opened with mmap
+    sample_R1.fastq.idx.json  read count, length range, phred encoding and
+                              the size and mtime of the file it describes
+
+With them the read count is a JSON lookup and record N of an uncompressed
+file is one slice of the memory-mapped file, so previews and random
+subsamples never scan the file. Offsets of compressed files refer to the
+decompressed stream: counts and lengths are still instant, but reaching a
+record means decompressing up to it.
+"""
+
+import json
+import mmap
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Union
+import numpy as np
+from .sequence_reader import (
+    RecordBatch,
+    SequenceFormat,
+    detect_format,
+    is_compressed,
+    line_bounds,
+    open_sequence_file,
+    parse_chunk,
+    read_batches,
+    read_chunks,
+)
+from .sequence_index_metadata import (
+    INDEX_VERSION,
+    get_sequence_index_paths,
+    read_sequence_index_metadata,
+)
+
+
+@dataclass
+class SequenceIndex:
+    path: Path
+    format: SequenceFormat
+    reads: int
+    min_length: int
+    max_length: int
+    bases: int
+    # 33 or 64 for FASTQ, None for FASTA
+    phred: Optional[int]
+    compressed: bool
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return self.reads
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        """
+        Bytes [start, end) of the (decompressed) file.
+        """
+        if not self.compressed:
+            with open(self.path, "rb") as file:
+                if end - start < mmap.ALLOCATIONGRANULARITY:
+                    file.seek(start)
+                    return file.read(end - start)
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return data[start:end]
+
+        with open_sequence_file(self.path) as stream:
+            remaining = start
+            while remaining > 0:
+                skipped = len(stream.read(min(remaining, 16 * 1024**2)))
+                if skipped == 0:
+                    break
+                remaining -= skipped
+            return stream.read(end - start)
+
+    def records(self, start: int, stop: Optional[int] = None) -> RecordBatch:
+        """
+        Records [start, stop) (only record `start` without `stop`).
+        """
+        if stop is None:
+            stop = start + 1
+
+        start = max(0, min(start, self.reads))
+        stop = max(start, min(stop, self.reads))
+
+        chunk = self._read_range(int(self.offsets[start]), int(self.offsets[stop]))
+        return parse_chunk(chunk, self.format)
+
+    def take(self, indices: np.ndarray) -> RecordBatch:
+        """
+        Records at the given positions, in ascending order.
+        """
+        indices = np.unique(np.asarray(indices, dtype=np.int64))
+        indices = indices[(indices >= 0) & (indices < self.reads)]
+
+        if self.compressed:
+            return self._take_streaming(indices)
+
+        with open(self.path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                chunk = b"".join(
+                    data[self.offsets[index] : self.offsets[index + 1]]
+                    for index in indices.tolist()
+                )
+
+        return parse_chunk(chunk, self.format)
+
+    def _take_streaming(self, indices: np.ndarray) -> RecordBatch:
+        """
+        `take` for compressed files: one pass over the stream up to the last
+        record wanted, keeping only the wanted records.
+        """
+        parts = []
+        first = 0
+
+        if len(indices):
+            for batch in read_batches(self.path, self.format):
+                last = first + len(batch)
+                wanted = indices[(indices >= first) & (indices < last)] - first
+                parts.extend(self._record_bytes(batch, index) for index in wanted)
+                first = last
+
+                if first > indices[-1]:
+                    break
+
+        return parse_chunk(b"".join(parts), self.format)
+
+    def _record_bytes(self, batch: RecordBatch, index: int) -> bytes:
+        name = batch.names[
+            batch.name_offsets[index] : batch.name_offsets[index + 1]
+        ].tobytes()
+        sequence = batch.sequence(index)
+
+        if self.format == "fasta":
+            return b">" + name + b"\n" + sequence + b"\n"
+
+        return b"@" + name + b"\n" + sequence + b"\n+\n" + batch.quality(index) + b"\n"
+
+    def sample(self, count: int, seed: Optional[int] = None) -> RecordBatch:
+        """
+        `count` records chosen at random, without replacement.
+        """
+        rng = np.random.default_rng(seed)
+        count = min(count, self.reads)
+        return self.take(rng.choice(self.reads, size=count, replace=False))
+
+
+def _record_starts(chunk: bytes, format: SequenceFormat) -> np.ndarray:
+    buffer = np.frombuffer(chunk, dtype=np.uint8)
+    starts, ends = line_bounds(buffer)
+
+    if format == "fastq":
+        return starts[0::4]
+
+    starts = starts[ends > starts]
+    return starts[buffer[starts] == ord(">")]
+
+
+def build_sequence_index(
+    path: Union[str, Path],
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> SequenceIndex:
+    """
+    Read the file once and write its sidecar index files.
+    """
+    path = Path(path)
+    format = detect_format(path)
+    stat = path.stat()
+
+    compressed = is_compressed(path)
+
+    offsets = [np.zeros(0, dtype=np.int64)]
+    position = 0
+    reads = 0
+    bases = 0
+    min_length: Optional[int] = None
+    max_length = 0
+    lowest_quality = 255
+
+    for chunk in read_chunks(path, format, on_progress=on_progress):
+        batch = parse_chunk(chunk, format)
+        offsets.append(_record_starts(chunk, format) + position)
+        position += len(chunk)
+
+        if len(batch) == 0:
+            continue
+
+        lengths = batch.lengths
+        reads += len(batch)
+        bases += int(lengths.sum())
+        max_length = max(max_length, int(lengths.max()))
+        min_length = (
+            int(lengths.min())
+            if min_length is None
+            else min(min_length, int(lengths.min()))
+        )
+
+        if batch.qualities is not None and len(batch.qualities):
+            lowest_quality = min(lowest_quality, int(batch.qualities.min()))
+
+    offsets.append(np.array([position], dtype=np.int64))
+    offsets = np.concatenate(offsets)
+
+    phred = None
+    if format == "fastq":
+        phred = 64 if reads and lowest_quality >= 64 else 33
+
+    metadata = {
+        "version": INDEX_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "format": format,
+        "reads": reads,
+        "bases": bases,
+        "min_length": min_length or 0,
+        "max_length": max_length,
+        "phred": phred,
+        "compressed": compressed,
+    }
+
+    offsets_path, metadata_path = get_sequence_index_paths(path)
+
+    # Offsets first: the metadata is what marks the index as valid
+    temporary_offsets = offsets_path.with_name(f".{offsets_path.name}.tmp.npy")
+    np.save(temporary_offsets, offsets)
+    os.replace(temporary_offsets, offsets_path)
+
+    temporary_metadata = metadata_path.with_name(f".{metadata_path.name}.tmp")
+    temporary_metadata.write_text(json.dumps(metadata), encoding="utf-8")
+    os.replace(temporary_metadata, metadata_path)
+
+    return _from_metadata(path, metadata, offsets)
+
+
+def _from_metadata(path: Path, metadata: dict, offsets: np.ndarray) -> SequenceIndex:
+    return SequenceIndex(
+        path=path,
+        format=metadata["format"],
+        reads=metadata["reads"],
+        min_length=metadata["min_length"],
+        max_length=metadata["max_length"],
+        bases=metadata["bases"],
+        phred=metadata["phred"],
+        compressed=metadata["compressed"],
+        offsets=offsets,
+    )
+
+
+def load_sequence_index(path: Union[str, Path]) -> Optional[SequenceIndex]:
+    """
+    Index of a file with its offsets memory-mapped, or None if it has to be
+    (re)built.
+    """
+    path = Path(path)
+    metadata = read_sequence_index_metadata(path)
+
+    if metadata is None:
+        return None
+
+    offsets_path, _ = get_sequence_index_paths(path)
+
+    try:
+        offsets = np.load(offsets_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    if len(offsets) != metadata["reads"] + 1:
+        return None
+
+    return _from_metadata(path, metadata, offsets)
+
+
+def get_sequence_index(
+    path: Union[str, Path],
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> SequenceIndex:
+    """
+    Index of a file, built first if it is missing or out of date.
+    """
+    return load_sequence_index(path) or build_sequence_index(path, on_progress)
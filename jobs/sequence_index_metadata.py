@@ -0,0 +1,53 @@
+"""
+Sidecar files of the sequence index (see `jobs.sequence_index`).
+
+Reading the metadata is a JSON lookup, so it lives apart from the index
+itself and can be used without importing NumPy (the home panel shows the
+read count of every workspace file at startup).
+"""
+
+import json
+from pathlib import Path
+from typing import Optional, Union
+
+INDEX_VERSION = 1
+
+OFFSETS_SUFFIX = ".idx.npy"
+METADATA_SUFFIX = ".idx.json"
+
+
+def get_sequence_index_paths(path: Union[str, Path]) -> tuple[Path, Path]:
+    path = Path(path)
+    return (
+        path.with_name(path.name + OFFSETS_SUFFIX),
+        path.with_name(path.name + METADATA_SUFFIX),
+    )
+
+
+def read_sequence_index_metadata(path: Union[str, Path]) -> Optional[dict]:
+    """
+    Metadata of the index of a file, or None if there is no index or the
+    file changed since it was built.
+    """
+    path = Path(path)
+    _, metadata_path = get_sequence_index_paths(path)
+
+    try:
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+        stat = path.stat()
+    except (OSError, ValueError):
+        return None
+
+    if (
+        metadata.get("version") != INDEX_VERSION
+        or metadata.get("size") != stat.st_size
+        or metadata.get("mtime_ns") != stat.st_mtime_ns
+    ):
+        return None
+
+    return metadata
+
+
+def remove_sequence_index(path: Union[str, Path]):
+    for sidecar in get_sequence_index_paths(path):
+        sidecar.unlink(missing_ok=True)
@@ -0,0 +1,315 @@
+"""
+Streaming reader of FASTQ and FASTA files, plain or compressed with gzip
+or zstd.
+
+Files are read in chunks of about `CHUNK_SIZE` bytes cut at record
+boundaries, so memory stays bounded whatever the file size, and each
+chunk is parsed with NumPy into a `RecordBatch`: every sequence (and
+quality string) of the chunk back to back in one array plus an array of
+offsets, instead of one Python object per read.
+
+    for batch in read_batches("a_R1.fastq.gz"):
+        reads += len(batch)
+        n_bases += np.count_nonzero(batch.sequences == ord("N"))
+
+Chunks are plain bytes, so they can also be sent to worker processes and
+parsed there (`read_chunks` + `parse_chunk`).
+"""
+
+import gzip
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Literal, Optional, Union
+import numpy as np
+import zstandard
+from .compression import GZIP_MAGIC, ZSTD_MAGIC
+
+CHUNK_SIZE = 16 * 1024**2
+
+SequenceFormat = Literal["fastq", "fasta"]
+
+FASTQ_SUFFIXES = (".fastq", ".fq")
+FASTA_SUFFIXES = (".fasta", ".fa", ".fna", ".fas")
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+
+_NEWLINE = 10
+_CARRIAGE_RETURN = 13
+
+
+@dataclass
+class RecordBatch:
+    """
+    Records of one chunk. The sequence of record `i` is
+    `sequences[offsets[i]:offsets[i + 1]]`, and the same slice of
+    `qualities` is its quality string (None for FASTA). Names are stored
+    the same way in `names` / `name_offsets`, without the leading @ or >.
+    """
+
+    format: SequenceFormat
+    sequences: np.ndarray
+    offsets: np.ndarray
+    qualities: Optional[np.ndarray]
+    names: np.ndarray
+    name_offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def sequence(self, index: int) -> bytes:
+        return self.sequences[self.offsets[index] : self.offsets[index + 1]].tobytes()
+
+    def quality(self, index: int) -> Optional[bytes]:
+        if self.qualities is None:
+            return None
+        return self.qualities[self.offsets[index] : self.offsets[index + 1]].tobytes()
+
+    def name(self, index: int) -> str:
+        return (
+            self.names[self.name_offsets[index] : self.name_offsets[index + 1]]
+            .tobytes()
+            .decode(errors="replace")
+        )
+
+
+# files
+
+
+def detect_format(path: Union[str, Path]) -> SequenceFormat:
+    """
+    Format of a sequence file from its extension or, failing that, from its
+    first character.
+    """
+    name = Path(path).name.lower()
+    for suffix in COMPRESSION_SUFFIXES:
+        name = name.removesuffix(suffix)
+
+    if name.endswith(FASTQ_SUFFIXES):
+        return "fastq"
+    if name.endswith(FASTA_SUFFIXES):
+        return "fasta"
+
+    with open_sequence_file(path) as stream:
+        first = stream.read(1)
+
+    if first == b">":
+        return "fasta"
+    if first == b"@":
+        return "fastq"
+
+    raise ValueError(f"{path} is not a FASTQ or FASTA file")
+
+
+def open_sequence_file(path: Union[str, Path]) -> io.BufferedIOBase:
+    """
+    Open a file for binary reading, decompressing it on the fly if it is
+    gzip or zstd (detected by content, not by extension).
+    """
+    stream, _ = _open(Path(path))
+    return stream
+
+
+def is_compressed(path: Union[str, Path]) -> bool:
+    with open(path, "rb") as file:
+        magic = file.read(4)
+    return magic.startswith(GZIP_MAGIC) or magic == ZSTD_MAGIC
+
+
+def _open(path: Path) -> tuple[io.BufferedIOBase, io.BufferedIOBase]:
+    """
+    Return the (decompressed) stream and the raw file, whose position
+    tells how much of the file has been read.
+    """
+    raw = open(path, "rb")
+    magic = raw.read(4)
+    raw.seek(0)
+
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=raw), raw
+
+    if magic == ZSTD_MAGIC:
+        # Our zstd files are many frames (see jobs.compression)
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            raw, read_across_frames=True, closefd=True
+        )
+        return io.BufferedReader(reader, buffer_size=1024**2), raw
+
+    return raw, raw
+
+
+def read_chunks(
+    path: Union[str, Path],
+    format: Optional[SequenceFormat] = None,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> Iterator[bytes]:
+    """
+    Chunks of about `chunk_size` bytes of decompressed data, each ending at
+    a record boundary. `on_progress` receives the fraction of the file
+    (compressed size) read so far.
+    """
+    path = Path(path)
+    if format is None:
+        format = detect_format(path)
+
+    size = max(path.stat().st_size, 1)
+    stream, raw = _open(path)
+
+    with raw, stream:
+        tail = b""
+
+        while True:
+            data = stream.read(chunk_size)
+
+            if not data:
+                if tail.strip():
+                    yield tail if tail.endswith(b"\n") else tail + b"\n"
+                return
+
+            chunk = tail + data
+            cut = _last_record_end(chunk, format)
+
+            if cut == 0:
+                # A single record larger than the chunk: keep reading
+                tail = chunk
+                continue
+
+            tail = chunk[cut:]
+            yield chunk[:cut]
+
+            if on_progress is not None:
+                on_progress(raw.tell() / size)
+
+
+def _last_record_end(chunk: bytes, format: SequenceFormat) -> int:
+    """
+    Position right after the last complete record of the chunk (0 if
+    there is none).
+    """
+    if format == "fasta":
+        # A record ends where the next header starts
+        return chunk.rfind(b"\n>") + 1
+
+    records = chunk.count(b"\n") // 4
+    if records == 0:
+        return 0
+
+    newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == _NEWLINE)
+    return int(newlines[records * 4 - 1]) + 1
+
+
+# parsing
+
+
+def line_bounds(buffer: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Start and end (without the line break) of every line.
+    """
+    newlines = np.flatnonzero(buffer == _NEWLINE)
+    if len(buffer) and buffer[-1] != _NEWLINE:
+        newlines = np.append(newlines, len(buffer))
+
+    starts = np.concatenate([[0], newlines[:-1] + 1])[: len(newlines)].astype(np.int64)
+    ends = newlines.astype(np.int64)
+
+    # Windows line endings
+    crlf = (ends > starts) & (buffer[np.maximum(ends - 1, 0)] == _CARRIAGE_RETURN)
+    ends[crlf] -= 1
+
+    return starts, ends
+
+
+def _gather(
+    buffer: np.ndarray, starts: np.ndarray, lengths: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Concatenate the slices `buffer[start:start + length]` into one array.
+    """
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    index = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+
+    return buffer[index], offsets
+
+
+def parse_fastq(chunk: bytes) -> RecordBatch:
+    buffer = np.frombuffer(chunk, dtype=np.uint8)
+    starts, ends = line_bounds(buffer)
+
+    if len(starts) % 4:
+        raise ValueError("truncated FASTQ record")
+
+    if len(starts) and not np.all(buffer[starts[0::4]] == ord("@")):
+        raise ValueError("not a FASTQ file (records must be 4 lines long)")
+
+    lengths = ends[1::4] - starts[1::4]
+    if not np.array_equal(ends[3::4] - starts[3::4], lengths):
+        raise ValueError("sequence and quality lengths differ")
+
+    sequences, offsets = _gather(buffer, starts[1::4], lengths)
+    qualities, _ = _gather(buffer, starts[3::4], lengths)
+    names, name_offsets = _gather(
+        buffer, starts[0::4] + 1, ends[0::4] - starts[0::4] - 1
+    )
+
+    return RecordBatch("fastq", sequences, offsets, qualities, names, name_offsets)
+
+
+def parse_fasta(chunk: bytes) -> RecordBatch:
+    buffer = np.frombuffer(chunk, dtype=np.uint8)
+    starts, ends = line_bounds(buffer)
+
+    # Blank lines are ignored
+    not_blank = ends > starts
+    starts, ends = starts[not_blank], ends[not_blank]
+
+    is_header = buffer[starts] == ord(">")
+
+    if len(starts) and not is_header[0]:
+        raise ValueError("not a FASTA file (expected a > header)")
+
+    # Sequences may span several lines: each sequence line belongs to the
+    # last header before it
+    records = np.cumsum(is_header) - 1
+    sequence_lines = ~is_header
+    line_lengths = ends[sequence_lines] - starts[sequence_lines]
+
+    sequences, _ = _gather(buffer, starts[sequence_lines], line_lengths)
+
+    record_lengths = np.bincount(
+        records[sequence_lines], weights=line_lengths, minlength=int(is_header.sum())
+    ).astype(np.int64)
+    offsets = np.zeros(len(record_lengths) + 1, dtype=np.int64)
+    np.cumsum(record_lengths, out=offsets[1:])
+
+    header_starts = starts[is_header]
+    names, name_offsets = _gather(
+        buffer, header_starts + 1, ends[is_header] - header_starts - 1
+    )
+
+    return RecordBatch("fasta", sequences, offsets, None, names, name_offsets)
+
+
+def parse_chunk(chunk: bytes, format: SequenceFormat) -> RecordBatch:
+    return parse_fasta(chunk) if format == "fasta" else parse_fastq(chunk)
+
+
+def read_batches(
+    path: Union[str, Path],
+    format: Optional[SequenceFormat] = None,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> Iterator[RecordBatch]:
+    """
+    Record batches of a FASTQ or FASTA file, one per chunk.
+    """
+    if format is None:
+        format = detect_format(path)
+
+    for chunk in read_chunks(path, format, chunk_size, on_progress):
+        yield parse_chunk(chunk, format)
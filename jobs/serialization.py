@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+from typing import Annotated, Union
+from pydantic import Field, TypeAdapter
+from .fastqc_job_spec import FastQCJobSpec
+from .kraken_job_spec import KrakenJobSpec, KronaJobSpec
+from .sortmerna_job_spec import SortMeRnaJobSpec
+from .trimmomatic_job_spec import TrimmomaticJobSpec
+
+AnyJobSpec = Annotated[
+    Union[
+        TrimmomaticJobSpec,
+        FastQCJobSpec,
+        SortMeRnaJobSpec,
+        KrakenJobSpec,
+        KronaJobSpec,
+    ],
+    Field(discriminator="tool"),
+]
+
+_job_spec_adapter = TypeAdapter(AnyJobSpec)
+
+
+def parse_job_spec(data: dict) -> AnyJobSpec:
+    """
+    Build the job spec matching the 'tool' field of `data`.
+    """
+    return _job_spec_adapter.validate_python(data)
+
+
+def load_job_specs(path: Path) -> list[AnyJobSpec]:
+    """
+    Load job specs from a JSON file (one object or a list of objects)
+    or from a JSON Lines file (one object per line).
+    """
+    content = Path(path).read_text(encoding="utf-8").strip()
+
+    if not content:
+        return []
+
+    if content[0] == "[":
+        return [parse_job_spec(data) for data in json.loads(content)]
+
+    try:
+        return [parse_job_spec(json.loads(content))]
+    except json.JSONDecodeError:
+        return [
+            parse_job_spec(json.loads(line))
+            for line in content.splitlines()
+            if line.strip()
+        ]
+
+
+def dump_job_specs(specs: list[AnyJobSpec], path: Path):
+    """
+    Write job specs as JSON Lines.
+    """
+    with Path(path).open("w", encoding="utf-8") as f:
+        for spec in specs:
+            f.write(spec.model_dump_json(exclude_none=True) + "\n")
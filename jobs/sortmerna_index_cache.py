@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from .result_cache import fingerprint_file
+from .sortmerna_job_spec import SortMeRnaJobSpec
+
+# Bumped whenever the layout of the cache (or of its manifest) changes
+INDEX_VERSION = 1
+
+# Folder created next to the references, holding one index per key
+INDEX_FOLDER_NAME = ".idx"
+MANIFEST_NAME = "manifest.json"
+
+# SortMeRNA indexing options. They are passed explicitly when building so
+# the index always matches the key, and they are SortMeRNA's defaults so
+# runs (which do not pass them) accept it
+INDEX_PARAMETERS = {"-L": 18, "--interval": 1, "--max_pos": 1000}
+
+
+class SortMeRnaIndexCache:
+    """
+    Reference indexes shared by every SortMeRNA run.
+
+    SortMeRNA indexes its references into workdir/idx before aligning,
+    which takes minutes for the rRNA databases and was repeated for every
+    sample, since each run gets its own workdir. The index is built once
+    into <references folder>/.idx/<key>, where the key covers the
+    fingerprint of the references and of the SortMeRNA executable, the
+    indexing parameters and INDEX_VERSION, and runs read it with --idx-dir.
+    Only kvdb/ and out/ are left in the workdir.
+
+    An index is published by renaming a finished build into place, so a
+    half built index is never used.
+    """
+
+    def key(self, references: list[Path], executable: str) -> str:
+        data = {
+            "version": INDEX_VERSION,
+            "references": [fingerprint_file(reference) for reference in references],
+            "executable": self._executable_fingerprint(executable),
+            "parameters": INDEX_PARAMETERS,
+        }
+        encoded = json.dumps(data, sort_keys=True).encode()
+        return hashlib.blake2b(encoded, digest_size=12).hexdigest()
+
+    @staticmethod
+    def _executable_fingerprint(executable: str) -> str:
+        path = shutil.which(executable) or executable
+        return fingerprint_file(Path(path))
+
+    def index_folder(self, references: list[Path], executable: str) -> Path:
+        root = Path(references[0]).parent / INDEX_FOLDER_NAME
+        return root / self.key(references, executable)
+
+    def is_ready(self, references: list[Path], executable: str) -> bool:
+        if not references:
+            return False
+        folder = self.index_folder(references, executable)
+        return (folder / MANIFEST_NAME).is_file()
+
+    def build(self, references: list[Path], executable: str, threads: int = 1) -> Path:
+        """
+        Index the references unless they already are. Blocking: run it off
+        the GUI thread.
+        """
+        references = [Path(reference) for reference in references]
+        folder = self.index_folder(references, executable)
+
+        if (folder / MANIFEST_NAME).is_file():
+            return folder
+
+        folder.parent.mkdir(parents=True, exist_ok=True)
+        building = Path(tempfile.mkdtemp(prefix=f"{folder.name}-", dir=folder.parent))
+
+        try:
+            arguments = [executable]
+            for reference in references:
+                arguments.extend(["--ref", reference.as_posix()])
+            for option, value in INDEX_PARAMETERS.items():
+                arguments.extend([option, str(value)])
+
+            # --index 1 only builds the index; some versions still require
+            # --reads, so an empty read file is given
+            reads = building / "reads.fasta"
+            reads.touch()
+            arguments.extend(
+                [
+                    "--reads",
+                    reads.as_posix(),
+                    "--index",
+                    "1",
+                    "--threads",
+                    str(threads),
+                    "--idx-dir",
+                    (building / "idx").as_posix(),
+                    "--workdir",
+                    (building / "work").as_posix(),
+                ]
+            )
+
+            started = time.perf_counter()
+            result = subprocess.run(arguments, capture_output=True, text=True)
+
+            if result.returncode != 0:
+                raise RuntimeError(
+                    f"SortMeRNA could not index {', '.join(r.name for r in references)}: "
+                    f"{result.stderr.strip() or result.stdout.strip()}"
+                )
+
+            index = building / "idx"
+            manifest = {
+                "version": INDEX_VERSION,
+                "references": [reference.name for reference in references],
+                "parameters": INDEX_PARAMETERS,
+                "seconds": round(time.perf_counter() - started, 1),
+            }
+            (index / MANIFEST_NAME).write_text(json.dumps(manifest, indent=4))
+
+            try:
+                os.replace(index, folder)
+            except OSError:
+                # Another build published the same index first
+                if not (folder / MANIFEST_NAME).is_file():
+                    raise
+
+            print(
+                Path(__file__).name,
+                "-",
+                f"Indexed {', '.join(r.name for r in references)} "
+                f"in {manifest['seconds']} s",
+            )
+        finally:
+            shutil.rmtree(building, ignore_errors=True)
+
+        return folder
+
+    def apply(self, spec: SortMeRnaJobSpec) -> SortMeRnaJobSpec:
+        """
+        Return the spec pointed at the shared index of its references, if it
+        has been built, and reading it without indexing (--index 0).
+        Otherwise SortMeRNA indexes into the workdir as usual.
+        """
+        if spec.idx_dir is not None or not self.is_ready(
+            spec.references, spec.executable
+        ):
+            return spec
+
+        folder = self.index_folder(spec.references, spec.executable)
+        return spec.model_copy(update={"idx_dir": folder, "shared_index": True})
@@ -0,0 +1,129 @@
+from pathlib import Path
+from typing import ClassVar, Literal, Optional
+from pydantic import Field
+from .compression import CompressionPolicy
+from .job_spec import JobSpec
+from .supervision import SupervisorPolicy
+
+
+class SortMeRnaJobSpec(JobSpec):
+    """
+    SortMeRNA run over one (single end) or two (paired end) read files.
+
+    With a gzip policy SortMeRNA compresses the reads it writes to
+    workdir/out itself (--zip-out); with zstd they are written plain and
+    compressed once it finishes (see `jobs.compression`). With
+    `idx_dir` the reference index is read from (or written to) that folder
+    instead of workdir/idx. With `shared_index` the folder holds an index
+    prepared by `jobs.sortmerna_index_cache` and is only read (--index 0):
+    runs never rebuild a shared index, even if it turns out to be unusable.
+    """
+
+    cache_exclude: ClassVar[set[str]] = JobSpec.cache_exclude | {
+        "references",
+        "reads",
+        "workdir",
+        "idx_dir",
+        "shared_index",
+    }
+
+    supervision: ClassVar[SupervisorPolicy] = SupervisorPolicy(
+        fatal_patterns=(r"\bERROR:", r"std::bad_alloc", r"^terminate called"),
+        # Status lines of SortMeRNA start with [function:line]
+        progress_patterns=(r"^\[\w+:\d+\]",),
+    )
+
+    tool: Literal["sortmerna"] = "sortmerna"
+
+    executable: str = "sortmerna"
+    references: list[Path]
+    reads: list[Path]
+    workdir: Path
+    idx_dir: Optional[Path] = None
+    shared_index: bool = False
+    threads: int = 1
+
+    other: bool = False
+    sam: bool = False
+    sq: bool = False
+    blast: Optional[str] = None
+    num_alignments: Optional[int] = None
+    min_lis: Optional[int] = None
+    no_best: bool = False
+    paired: bool = False
+
+    compression: CompressionPolicy = Field(default_factory=CompressionPolicy)
+
+    @property
+    def outputs(self) -> list[Path]:
+        """
+        Non-rRNA reads written by --other, once the run has finished.
+        """
+        if not self.other:
+            return []
+        return sorted((self.workdir / "out").glob("other*"))
+
+    @property
+    def inputs(self) -> list[Path]:
+        return [*self.reads, *self.references]
+
+    def result_files(self) -> list[Path]:
+        return sorted(
+            file for file in (self.workdir / "out").glob("*") if file.is_file()
+        )
+
+    def restore_targets(self, names: list[str]) -> list[Path]:
+        return [self.workdir / "out" / name for name in names]
+
+    def to_command(self) -> tuple[str, list[str]]:
+        arguments = []
+
+        for reference in self.references:
+            arguments.extend(["--ref", f"{reference.as_posix()}"])
+
+        staged = [
+            (reads, self.staged_input(reads, self.workdir)) for reads in self.reads
+        ]
+
+        for _, reads in staged:
+            arguments.extend(["--reads", f"{reads}"])
+
+        arguments.extend(["--threads", f"{self.threads}"])
+        arguments.append("--fastx")
+
+        if self.other:
+            arguments.append("--other")
+        if self.sam:
+            arguments.append("--sam")
+        if self.sq:
+            arguments.append("--SQ")
+        if self.blast is not None:
+            arguments.extend(["--blast", f"{self.blast}"])
+        if self.num_alignments is not None:
+            arguments.extend(["--num_alignments", f"{self.num_alignments}"])
+        if self.min_lis is not None:
+            arguments.extend(["--min_lis", f"{self.min_lis}"])
+        if self.no_best:
+            arguments.append("--no-best")
+        if self.paired:
+            arguments.append("--paired")
+
+        if self.compression.enabled:
+            # Without it the output follows the format of the reads
+            zip_out = "1" if self.compression.method == "gzip" else "0"
+            arguments.extend(["--zip-out", zip_out])
+
+        arguments.extend(["--workdir", self.workdir.as_posix()])
+        if self.idx_dir is not None:
+            arguments.extend(["--idx-dir", self.idx_dir.as_posix()])
+            if self.shared_index:
+                # Only the cache's --index 1 build writes to a shared index
+                arguments.extend(["--index", "0"])
+
+        return self.wrap_command(
+            self.executable,
+            arguments,
+            self.compression,
+            output_folders=[self.workdir / "out"],
+            staged=staged,
+        )
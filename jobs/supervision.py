@@ -0,0 +1,506 @@
+"""
+Supervision of the external tools: process trees, timeouts and events.
+
+Every tool run (from the panels, the batch queue or the command line) goes
+through the same rules:
+
+- The tool runs in its own process group (its own session on POSIX), so
+  cancelling it kills the whole tree and not only the direct child. Tools
+  run inside WSL are started under `setsid`, which reports the Linux
+  process group on stderr (`PROCESS_GROUP_MARKER`); killing `wsl.exe` alone
+  leaves the Linux side (e.g. kraken2 holding its database) running.
+- A `SupervisorPolicy` stops the run after a wall-clock timeout, after a
+  period without output, or as soon as a line matches a fatal pattern.
+- The output is turned into typed events (`LogEvent`, `ProgressEvent`,
+  `ExitEvent`) instead of raw text chunks.
+
+`OutputMonitor` holds the rules shared by `run_supervised` (used by the
+command line) and `workers.JobSupervisor` (used by the application).
+"""
+
+import os
+import queue
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+# First line written to stderr by the WSL wrapper, followed by the id of
+# the Linux process group
+PROCESS_GROUP_MARKER = "@@transcriptohub-process-group"
+
+_PROCESS_GROUP_SCRIPT = f'echo "{PROCESS_GROUP_MARKER} $$" >&2; exec "$@"'
+
+# Seconds between the polite termination request and the forced kill
+KILL_GRACE = 5.0
+
+STREAMS = ("stdout", "stderr")
+
+
+class ExitReason(str, Enum):
+    FINISHED = "finished"
+    FAILED = "failed"
+    FAILED_TO_START = "failed_to_start"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+    IDLE_TIMED_OUT = "idle_timed_out"
+    FATAL_ERROR = "fatal_error"
+
+
+@dataclass(frozen=True)
+class LogEvent:
+    """
+    A line written by the tool.
+    """
+
+    stream: str
+    line: str
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """
+    A line matching one of the progress patterns of the policy. `percent`
+    is set when the pattern has a `percent` group.
+    """
+
+    message: str
+    percent: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ExitEvent:
+    """
+    End of a run. `exit_code` is never 0 unless the tool finished
+    successfully; `message` explains the other reasons.
+    """
+
+    exit_code: int
+    reason: ExitReason
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.reason == ExitReason.FINISHED
+
+
+SupervisorEvent = Union[LogEvent, ProgressEvent, ExitEvent]
+
+
+@dataclass
+class SupervisorPolicy:
+    """
+    Limits and patterns applied while a tool runs.
+
+    Timeouts are in seconds (None disables them). Patterns are regular
+    expressions searched in each output line of `log_streams`; streams
+    left out (e.g. the per-read output of Kraken2) are forwarded untouched,
+    without being decoded, but still count as output for `idle_timeout`.
+    """
+
+    timeout: Optional[float] = None
+    idle_timeout: Optional[float] = None
+    fatal_patterns: tuple[str, ...] = ()
+    progress_patterns: tuple[str, ...] = ()
+    log_streams: tuple[str, ...] = STREAMS
+    kill_grace: float = KILL_GRACE
+
+    _fatal: list[re.Pattern] = field(init=False, repr=False, compare=False)
+    _progress: list[re.Pattern] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._fatal = [re.compile(pattern) for pattern in self.fatal_patterns]
+        self._progress = [re.compile(pattern) for pattern in self.progress_patterns]
+
+    def is_fatal(self, line: str) -> bool:
+        return any(pattern.search(line) for pattern in self._fatal)
+
+    def progress(self, line: str) -> Optional[ProgressEvent]:
+        for pattern in self._progress:
+            match = pattern.search(line)
+
+            if match is None:
+                continue
+
+            percent = match.groupdict().get("percent")
+            return ProgressEvent(
+                line.strip(), float(percent) if percent is not None else None
+            )
+
+        return None
+
+
+# process groups
+
+
+def _is_wsl(program: str) -> bool:
+    return Path(program).name.lower() in ("wsl", "wsl.exe")
+
+
+def in_process_group(program: str, arguments: list[str]) -> tuple[str, list[str]]:
+    """
+    Run the WSL part of a command under `setsid`, which reports its process
+    group before running the tool. The WSL command is either the command
+    itself or the one after `--` (as in `main.py --headless wrap ... --`).
+    Other commands are returned unchanged.
+    """
+    command = [program, *arguments]
+
+    for i, part in enumerate(command):
+        if not _is_wsl(part) or (i > 0 and command[i - 1] != "--"):
+            continue
+
+        tool = command[i + 1 :]
+        if tool[:1] in (["-e"], ["--exec"]):
+            tool = tool[1:]
+
+        if tool[:1] == ["setsid"]:
+            break
+
+        command[i + 1 :] = [
+            "-e",
+            "setsid",
+            "-w",
+            "sh",
+            "-c",
+            _PROCESS_GROUP_SCRIPT,
+            "sh",
+            *tool,
+        ]
+        break
+
+    return command[0], command[1:]
+
+
+def parse_process_group(line: str) -> Optional[int]:
+    """
+    Linux process group reported by the WSL wrapper, if `line` is its
+    marker.
+    """
+    if not line.startswith(PROCESS_GROUP_MARKER):
+        return None
+
+    try:
+        return int(line[len(PROCESS_GROUP_MARKER) :].strip())
+    except ValueError:
+        return None
+
+
+def popen_group_options() -> dict:
+    """
+    `subprocess.Popen` options that start the child in its own process
+    group.
+    """
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def kill_process_tree(pid: int, wsl_group: Optional[int] = None, force: bool = False):
+    """
+    Stop a supervised process and everything it started: the Linux process
+    group inside WSL (if any) and then the process tree on this side.
+    Without `force` the processes are asked to terminate (SIGTERM); Windows
+    console programs cannot be asked, so they are always killed.
+    """
+    # 0 and negative pids address whole process groups (our own included)
+    if pid <= 0:
+        raise ValueError(f"Invalid process id: {pid}")
+
+    if wsl_group is not None and shutil.which("wsl"):
+        try:
+            subprocess.run(
+                [
+                    "wsl",
+                    "-e",
+                    "kill",
+                    "-KILL" if force else "-TERM",
+                    "--",
+                    f"-{wsl_group}",
+                ],
+                capture_output=True,
+                timeout=30,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+    if os.name == "nt":
+        try:
+            subprocess.run(
+                ["taskkill", "/PID", f"{pid}", "/T", "/F"],
+                capture_output=True,
+                timeout=30,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        return
+
+    sig = signal.SIGKILL if force else signal.SIGTERM
+
+    try:
+        # The child leads its own session, so its group id is its pid
+        if os.getpgid(pid) == pid:
+            os.killpg(pid, sig)
+        else:
+            os.kill(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+# output
+
+
+class OutputMonitor:
+    """
+    Turns the output of a supervised process into events and decides when
+    the policy stops it.
+
+    `feed` returns the bytes to forward (the WSL process group marker is
+    removed) and the events found in the complete lines. `check` returns
+    the reason to stop the process, if any.
+    """
+
+    def __init__(self, policy: SupervisorPolicy, wsl: bool = False):
+        self.policy = policy
+        self.wsl_group: Optional[int] = None
+        self.fatal_line: Optional[str] = None
+
+        self.started_at = time.monotonic()
+        self.last_output_at = self.started_at
+
+        self._pending = {stream: b"" for stream in STREAMS}
+        # The marker is the first line on stderr
+        self._awaiting_group = wsl
+
+    def feed(self, stream: str, data: bytes) -> tuple[bytes, list[SupervisorEvent]]:
+        if not data:
+            return data, []
+
+        self.last_output_at = time.monotonic()
+
+        if stream == "stderr" and self._awaiting_group:
+            data = self._take_marker(data)
+
+        if stream not in self.policy.log_streams:
+            return data, []
+
+        *lines, self._pending[stream] = (self._pending[stream] + data).split(b"\n")
+        return data, self._events(stream, lines)
+
+    def flush(self) -> list[SupervisorEvent]:
+        events = []
+        for stream in STREAMS:
+            pending, self._pending[stream] = self._pending[stream], b""
+            if pending and stream in self.policy.log_streams:
+                events.extend(self._events(stream, [pending]))
+        return events
+
+    def check(self, now: Optional[float] = None) -> Optional[tuple[ExitReason, str]]:
+        now = time.monotonic() if now is None else now
+
+        if self.fatal_line is not None:
+            return ExitReason.FATAL_ERROR, self.fatal_line
+
+        timeout = self.policy.timeout
+        if timeout is not None and now - self.started_at > timeout:
+            return ExitReason.TIMED_OUT, f"Not finished after {timeout:g} s"
+
+        idle_timeout = self.policy.idle_timeout
+        if idle_timeout is not None and now - self.last_output_at > idle_timeout:
+            return ExitReason.IDLE_TIMED_OUT, f"No output for {idle_timeout:g} s"
+
+        return None
+
+    def _take_marker(self, data: bytes) -> bytes:
+        buffered = self._pending["stderr"] + data
+        line, newline, rest = buffered.partition(b"\n")
+
+        if not newline:
+            # Wait for the whole line, unless it is clearly not the marker
+            if len(buffered) < 256:
+                self._pending["stderr"] = buffered
+                return b""
+            self._awaiting_group = False
+            self._pending["stderr"] = b""
+            return buffered
+
+        self._awaiting_group = False
+        self._pending["stderr"] = b""
+
+        group = parse_process_group(line.decode(errors="ignore").strip())
+        if group is None:
+            return buffered
+
+        self.wsl_group = group
+        return rest
+
+    def _events(self, stream: str, lines: Iterable[bytes]) -> list[SupervisorEvent]:
+        events: list[SupervisorEvent] = []
+
+        for raw in lines:
+            line = raw.decode(errors="ignore").rstrip("\r")
+
+            if not line.strip():
+                continue
+
+            events.append(LogEvent(stream, line))
+
+            progress = self.policy.progress(line)
+            if progress is not None:
+                events.append(progress)
+
+            if self.fatal_line is None and self.policy.is_fatal(line):
+                self.fatal_line = line.strip()
+
+        return events
+
+
+# synchronous runs
+
+# Processes started by run_supervised that are still running: pid, monitor
+_live_processes: dict[int, OutputMonitor] = {}
+_live_lock = threading.Lock()
+
+
+def kill_supervised_processes():
+    """
+    Kill every process tree started by `run_supervised` that is still
+    running (they do not receive the Ctrl+C of the terminal, as they run in
+    their own process group).
+    """
+    with _live_lock:
+        live = list(_live_processes.items())
+
+    for pid, monitor in live:
+        kill_process_tree(pid, monitor.wsl_group, force=True)
+
+
+def _read_stream(stream, name: str, chunks: queue.Queue):
+    try:
+        while data := stream.read1(65536):
+            chunks.put((name, data))
+    finally:
+        chunks.put((name, None))
+
+
+def _forward(stream: str, data: bytes):
+    target = sys.stdout if stream == "stdout" else sys.stderr
+    buffer = getattr(target, "buffer", None)
+
+    if buffer is not None:
+        buffer.write(data)
+        buffer.flush()
+    else:
+        target.write(data.decode(errors="ignore"))
+        target.flush()
+
+
+def run_supervised(
+    program: str,
+    arguments: list[str],
+    policy: Optional[SupervisorPolicy] = None,
+    working_directory: Optional[Path] = None,
+    on_event: Optional[Callable[[SupervisorEvent], None]] = None,
+) -> ExitEvent:
+    """
+    Run a command to completion under a policy. The output is forwarded
+    to ours as it arrives and the events are passed to `on_event`.
+    """
+    policy = policy or SupervisorPolicy()
+    command = in_process_group(program, arguments)
+    wsl = command != (program, arguments)
+    program, arguments = command
+
+    try:
+        process = subprocess.Popen(
+            [program, *arguments],
+            cwd=working_directory,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **popen_group_options(),
+        )
+    except OSError as e:
+        event = ExitEvent(127, ExitReason.FAILED_TO_START, f"{program}: {e}")
+        if on_event is not None:
+            on_event(event)
+        return event
+
+    monitor = OutputMonitor(policy, wsl=wsl)
+    with _live_lock:
+        _live_processes[process.pid] = monitor
+
+    chunks: queue.Queue = queue.Queue()
+    readers = [
+        threading.Thread(
+            target=_read_stream,
+            args=(getattr(process, name), name, chunks),
+            daemon=True,
+        )
+        for name in STREAMS
+    ]
+    for reader in readers:
+        reader.start()
+
+    def emit(events: list[SupervisorEvent]):
+        if on_event is not None:
+            for event in events:
+                on_event(event)
+
+    stop: Optional[tuple[ExitReason, str]] = None
+    killed_at: Optional[float] = None
+    open_streams = len(readers)
+
+    try:
+        while open_streams:
+            try:
+                stream, data = chunks.get(timeout=0.5)
+            except queue.Empty:
+                stream, data = None, b""
+
+            if stream is not None and data is None:
+                open_streams -= 1
+            elif data:
+                forwarded, events = monitor.feed(stream, data)
+                if forwarded:
+                    _forward(stream, forwarded)
+                emit(events)
+
+            if stop is None:
+                stop = monitor.check()
+                if stop is not None:
+                    killed_at = time.monotonic()
+                    kill_process_tree(process.pid, monitor.wsl_group)
+            elif (
+                killed_at is not None
+                and time.monotonic() - killed_at > policy.kill_grace
+            ):
+                killed_at = None
+                kill_process_tree(process.pid, monitor.wsl_group, force=True)
+
+        exit_code = process.wait()
+    except KeyboardInterrupt:
+        kill_process_tree(process.pid, monitor.wsl_group, force=True)
+        process.wait()
+        raise
+    finally:
+        with _live_lock:
+            _live_processes.pop(process.pid, None)
+
+    emit(monitor.flush())
+
+    if stop is not None:
+        event = ExitEvent(exit_code or 1, *stop)
+    elif exit_code == 0:
+        event = ExitEvent(0, ExitReason.FINISHED)
+    else:
+        event = ExitEvent(exit_code, ExitReason.FAILED, f"Exit code {exit_code}")
+
+    emit([event])
+    return event
@@ -0,0 +1,186 @@
+from pathlib import Path
+from typing import ClassVar, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+from .compression import CompressionPolicy, strip_compression_suffix
+from .job_spec import JobSpec
+from .supervision import SupervisorPolicy
+
+
+class IlluminaClip(BaseModel):
+    adapter: Path
+    seed_mismatches: int = 2
+    palindrome_clip_threshold: int = 30
+    simple_clip_threshold: int = 10
+    min_adapter_length: int = 0
+    keep_both_reads: bool = False
+
+    def to_argument(self) -> str:
+        argument = (
+            f"ILLUMINACLIP:{self.adapter}:{self.seed_mismatches}"
+            f":{self.palindrome_clip_threshold}:{self.simple_clip_threshold}"
+            f":{self.min_adapter_length}"
+        )
+        if self.keep_both_reads:
+            argument += ":True"
+        return argument
+
+
+class SlidingWindow(BaseModel):
+    window_size: int
+    quality_threshold: int
+
+
+class TrimmomaticJobSpec(JobSpec):
+    """
+    Trimmomatic run in single end (one input, one output) or paired end mode
+    (two inputs, outputs in the order 1P 1U 2P 2U).
+
+    `output_files` are the final names: with a compression policy they
+    take its extension. Trimmomatic writes .gz names compressed itself;
+    with zstd it writes them uncompressed and they are compressed once it
+    finishes (see `jobs.compression`).
+    """
+
+    cache_exclude: ClassVar[set[str]] = JobSpec.cache_exclude | {
+        "input_file_1",
+        "input_file_2",
+        "output_files",
+    }
+
+    supervision: ClassVar[SupervisorPolicy] = SupervisorPolicy(
+        fatal_patterns=(
+            r"^Exception in thread",
+            r"java\.lang\.OutOfMemoryError",
+            r"^Error: (Unable to access jarfile|Could not find or load main class)",
+        ),
+        progress_patterns=(
+            r"^Trimmomatic[PS]E: Started",
+            r"^Input Reads?( Pairs)?:",
+            r"Completed successfully",
+        ),
+    )
+
+    tool: Literal["trimmomatic"] = "trimmomatic"
+
+    jar: Path
+    java: str = "java"
+    input_file_1: Path
+    input_file_2: Optional[Path] = None
+    output_files: list[Path]
+    threads: int = 1
+    phred: Literal[33, 64] = 33
+
+    illumina_clip: Optional[IlluminaClip] = None
+    sliding_window: Optional[SlidingWindow] = None
+    leading: Optional[int] = None
+    trailing: Optional[int] = None
+    minlen: Optional[int] = None
+    crop: Optional[int] = None
+    headcrop: Optional[int] = None
+
+    compression: CompressionPolicy = Field(default_factory=CompressionPolicy)
+
+    @model_validator(mode="after")
+    def _apply_compression(self) -> "TrimmomaticJobSpec":
+        if self.compression.enabled:
+            self.output_files = [
+                self.compression.apply(file) for file in self.output_files
+            ]
+        return self
+
+    @property
+    def paired(self) -> bool:
+        return self.input_file_2 is not None
+
+    @property
+    def has_steps(self) -> bool:
+        """
+        Trimmomatic refuses to run without at least one trimming step.
+        """
+        return any(
+            step is not None
+            for step in (
+                self.illumina_clip,
+                self.sliding_window,
+                self.leading,
+                self.trailing,
+                self.minlen,
+                self.crop,
+                self.headcrop,
+            )
+        )
+
+    @property
+    def outputs(self) -> list[Path]:
+        if self.paired:
+            return [self.output_files[0], self.output_files[2]]
+        return self.output_files[:1]
+
+    @property
+    def inputs(self) -> list[Path]:
+        inputs = [self.input_file_1]
+        if self.paired:
+            inputs.append(self.input_file_2)
+        if self.illumina_clip is not None:
+            inputs.append(self.illumina_clip.adapter)
+        return inputs
+
+    def result_files(self) -> list[Path]:
+        return list(self.output_files)
+
+    @property
+    def written_files(self) -> list[Path]:
+        """
+        Files Trimmomatic itself writes, before any compression after the run.
+        """
+        if not self.compression.after_run:
+            return list(self.output_files)
+        return [strip_compression_suffix(file) for file in self.output_files]
+
+    def to_command(self) -> tuple[str, list[str]]:
+        folder = self.output_files[0].parent
+        staged = [(self.input_file_1, self.staged_input(self.input_file_1, folder))]
+        if self.paired:
+            staged.append(
+                (self.input_file_2, self.staged_input(self.input_file_2, folder))
+            )
+
+        arguments = [
+            "-jar",
+            f"{self.jar}",
+            "PE" if self.paired else "SE",
+            "-threads",
+            str(self.threads),
+            f"-phred{self.phred}",
+        ]
+
+        arguments.extend(path.as_posix() for _, path in staged)
+
+        arguments.extend(file.as_posix() for file in self.written_files)
+
+        if self.illumina_clip is not None:
+            arguments.append(self.illumina_clip.to_argument())
+
+        if self.sliding_window is not None:
+            arguments.append(
+                f"SLIDINGWINDOW:{self.sliding_window.window_size}"
+                f":{self.sliding_window.quality_threshold}"
+            )
+
+        for step, value in (
+            ("LEADING", self.leading),
+            ("TRAILING", self.trailing),
+            ("MINLEN", self.minlen),
+            ("CROP", self.crop),
+            ("HEADCROP", self.headcrop),
+        ):
+            if value is not None:
+                arguments.append(f"{step}:{value}")
+
+        return self.wrap_command(
+            self.java,
+            arguments,
+            self.compression,
+            outputs=self.written_files,
+            staged=staged,
+        )
@@ -1,16 +1,46 @@
 import sys
-import assets.assets_rc
-import styles.styles_rc
-import views.support_window.content.manual_rc
+import time
+from multiprocessing import freeze_support
+
+# Start of the startup-time measurement (time to first paint)
+started = time.perf_counter()
+
+if __name__ == "__main__":
+    # Worker processes of the built-in quality control in frozen builds
+    freeze_support()
+
+if __name__ == "__main__" and "--headless" in sys.argv:
+    # Command line mode: no Qt, no resources, no windows
+    from cli import main
+
+    sys.exit(main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
+if __name__ == "__main__" and "--profile-imports" in sys.argv:
+    # Import-time profile of the startup modules, compared with the last one
+    from utils import get_app_data_path, record_import_profile
+
+    regressions = record_import_profile(get_app_data_path() / "import_profile.json")
+    sys.exit(1 if regressions else 0)
+
 from pathlib import Path
 from PySide6.QtWidgets import QApplication
-from utils import set_default_settings, center_window_on_screen, get_current_workspace
+from utils import (
+    set_default_settings,
+    center_window_on_screen,
+    get_current_workspace,
+    report_startup_time,
+    register_resource_bundle,
+)
 from app_state import AppState
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.state = AppState
 
+    # The user manual bundle is registered when the support window opens
+    register_resource_bundle("assets")
+    register_resource_bundle("styles")
+
     set_default_settings()
 
     current_workspace = get_current_workspace()
@@ -34,8 +64,13 @@ if __name__ == "__main__":
 
         main_window = MainWindow()
         main_window_controller = MainWindowController(main_window)
+        main_window.content.first_painted.connect(lambda: report_startup_time(started))
 
         main_window.show()
         center_window_on_screen(main_window)
 
+    # Refresh stale tool checks in the background so the settings panel
+    # shows them at once
+    app.state.tool_probe_service.probe()
+
     sys.exit(app.exec())
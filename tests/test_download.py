@@ -0,0 +1,287 @@
+"""
+jobs.download against a local HTTP server that supports Range requests.
+
+    python -m unittest discover -s tests -t .
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+import requests
+from jobs import download
+from jobs.download import (
+    ChecksumMismatch,
+    DownloadCancelled,
+    download_file,
+    get_partial_paths,
+)
+
+DATA = os.urandom(256 * 1024)
+ETAG = '"v1"'
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serves `DATA` as /data.bin, honouring single byte ranges, and records
+    the Range header of every GET.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self._send_headers(200, 0, len(DATA))
+
+    def do_GET(self):
+        requested = self.headers.get("Range")
+        self.server.ranges.append(requested)
+
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", requested or "")
+        if match is None:
+            start, end, status = 0, len(DATA), 200
+        else:
+            start = int(match.group(1))
+            end = int(match.group(2)) + 1 if match.group(2) else len(DATA)
+            status = 206
+
+        self._send_headers(status, start, end)
+        self.wfile.write(DATA[start:end])
+
+    def _send_headers(self, status: int, start: int, end: int):
+        if self.path != "/data.bin":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", ETAG)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(DATA)}")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # A cancelled download closes its connection mid-response
+        pass
+
+
+class DownloadTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = _Server(("127.0.0.1", 0), _RangeHandler)
+        cls.server.ranges = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/data.bin"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.ranges.clear()
+        self.session = requests.Session()
+
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = Path(folder.name)
+
+        # Small chunks and segments so the test data spans several of them
+        for name, value in (
+            ("CHUNK_SIZE", 16 * 1024),
+            ("MIN_SEGMENT_SIZE", 32 * 1024),
+            ("RETRY_DELAY", 0),
+        ):
+            patcher = mock.patch.object(download, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_download(self):
+        path = download_file(self.url, self.folder, session=self.session)
+
+        self.assertEqual(path, self.folder / "data.bin")
+        self.assertEqual(path.read_bytes(), DATA)
+        self.assertEqual(self.server.ranges, [None])
+
+    def test_resume_from_partial_file(self):
+        path = self.folder / "data.bin"
+        part, state_path = get_partial_paths(path)
+        half = len(DATA) // 2
+        part.write_bytes(DATA[:half])
+        state_path.write_text(json.dumps({"size": len(DATA), "validator": ETAG}))
+
+        download_file(
+            self.url,
+            self.folder,
+            checksum="sha256:" + hashlib.sha256(DATA).hexdigest(),
+            session=self.session,
+        )
+
+        self.assertEqual(self.server.ranges, [f"bytes={half}-"])
+        self.assertEqual(path.read_bytes(), DATA)
+        self.assertFalse(part.exists())
+        self.assertFalse(state_path.exists())
+
+    def test_partial_file_of_a_changed_remote_starts_over(self):
+        path = self.folder / "data.bin"
+        part, state_path = get_partial_paths(path)
+        part.write_bytes(b"stale")
+        state_path.write_text(json.dumps({"size": len(DATA), "validator": '"v0"'}))
+
+        download_file(self.url, self.folder, session=self.session)
+
+        self.assertEqual(self.server.ranges, [None])
+        self.assertEqual(path.read_bytes(), DATA)
+
+    def test_segmented_download(self):
+        segments = 4
+        size = len(DATA) // segments
+
+        path = download_file(
+            self.url,
+            self.folder,
+            checksum=hashlib.md5(DATA).hexdigest(),
+            segments=segments,
+            session=self.session,
+        )
+
+        self.assertEqual(path.read_bytes(), DATA)
+        self.assertCountEqual(
+            self.server.ranges,
+            [
+                f"bytes={index * size}-{(index + 1) * size - 1}"
+                for index in range(segments)
+            ],
+        )
+
+    def test_segmented_download_resumes_every_segment(self):
+        path = self.folder / "data.bin"
+        part, state_path = get_partial_paths(path)
+        size = len(DATA) // 4
+        done = 1000
+
+        # Each segment got its first `done` bytes before the interruption
+        contents = bytearray(len(DATA))
+        for start in range(0, len(DATA), size):
+            contents[start : start + done] = DATA[start : start + done]
+        part.write_bytes(contents)
+        state_path.write_text(
+            json.dumps(
+                {
+                    "size": len(DATA),
+                    "validator": ETAG,
+                    "segments": [
+                        [start, start + size, done]
+                        for start in range(0, len(DATA), size)
+                    ],
+                }
+            )
+        )
+
+        download_file(
+            self.url,
+            self.folder,
+            checksum=hashlib.sha256(DATA).hexdigest(),
+            segments=4,
+            session=self.session,
+        )
+
+        self.assertEqual(path.read_bytes(), DATA)
+        self.assertCountEqual(
+            self.server.ranges,
+            [
+                f"bytes={start + done}-{start + size - 1}"
+                for start in range(0, len(DATA), size)
+            ],
+        )
+
+    def test_checksum_mismatch(self):
+        path = self.folder / "data.bin"
+        part, state_path = get_partial_paths(path)
+
+        with self.assertRaises(ChecksumMismatch):
+            download_file(
+                self.url,
+                self.folder,
+                checksum="sha256:" + hashlib.sha256(b"other").hexdigest(),
+                session=self.session,
+            )
+
+        # Nothing that looks finished, and nothing to resume from
+        self.assertFalse(path.exists())
+        self.assertFalse(part.exists())
+        self.assertFalse(state_path.exists())
+
+    def test_cancel(self):
+        path = self.folder / "data.bin"
+        part, state_path = get_partial_paths(path)
+        polls = 0
+
+        def should_stop() -> bool:
+            nonlocal polls
+            polls += 1
+            return polls > 3
+
+        with self.assertRaises(DownloadCancelled):
+            download_file(
+                self.url, self.folder, should_stop=should_stop, session=self.session
+            )
+
+        self.assertFalse(path.exists())
+        self.assertEqual(part.read_bytes(), DATA[: part.stat().st_size])
+        self.assertLess(part.stat().st_size, len(DATA))
+
+        # The partial file is kept and the next call resumes it
+        self.server.ranges.clear()
+        download_file(self.url, self.folder, session=self.session)
+
+        self.assertEqual(path.read_bytes(), DATA)
+        self.assertEqual(len(self.server.ranges), 1)
+        self.assertRegex(self.server.ranges[0], r"^bytes=[1-9]\d*-$")
+
+    def test_cancel_segmented_download(self):
+        path = self.folder / "data.bin"
+        _, state_path = get_partial_paths(path)
+        lock = threading.Lock()
+        polls = 0
+
+        def should_stop() -> bool:
+            nonlocal polls
+            with lock:
+                polls += 1
+                return polls > 4
+
+        with self.assertRaises(DownloadCancelled):
+            download_file(
+                self.url,
+                self.folder,
+                segments=4,
+                should_stop=should_stop,
+                session=self.session,
+            )
+
+        self.assertFalse(path.exists())
+        self.assertEqual(len(json.loads(state_path.read_text())["segments"]), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,8 @@ from .settings import (
     remove_workspace,
     get_fastqc_executable_path_from_settings,
     set_fastqc_executable_path_in_settings,
+    get_fastqc_builtin_engine_from_settings,
+    set_fastqc_builtin_engine_in_settings,
     get_trimmomatic_executable_path_from_settings,
     set_trimmomatic_executable_path_in_settings,
     get_sortmerna_executable_path_from_settings,
@@ -22,6 +24,7 @@ from .settings import (
     get_kraken2_databases,
     add_kraken2_database,
     remove_kraken2_database_by_link,
+    get_result_cache_max_size_from_settings,
 )
 from .utils import (
     to_unc_path,
@@ -34,6 +37,7 @@ from .utils import (
 )
 from .paths import (
     get_app_data_path,
+    get_result_cache_folder_path,
     get_current_workspace_folder_path,
     get_fastqc_file_path,
     get_fastqc_folder_path,
@@ -46,6 +50,9 @@ from .paths import (
     get_trimmomatic_output_1unpaired_file_path,
     get_trimmomatic_output_2unpaired_file_path,
     get_files_in_workspace_folder,
+    get_workspace_compression_policy,
+    set_workspace_compression_policy,
+    SEQUENCE_FILE_EXTENSIONS,
     get_project_file_path,
     get_source_files_paths,
     get_current_workspace_source_folder_path,
@@ -61,6 +68,7 @@ from .paths import (
     remove_sortmerna_saved_config,
     get_kraken2_databases_folder_path,
     get_kraken2_output_folder_path,
+    get_kraken2_cohort_folder_path,
     get_kraken2_database_folders,
     get_kraken2_saved_configs,
     get_kraken2_saved_config,
@@ -71,5 +79,67 @@ from .paths import (
     get_sorted_folders_paths,
     get_krakened_files_paths,
 )
-from .extract_fastqc_data import extract_fastqc_data
+from .fastqc_data import (
+    CHART_FILES,
+    FastQCModule,
+    read_fastqc_data,
+    extract_fastqc_chart,
+)
+from .fastqc_charts import render_fastqc_chart
 from .operation_modes import OperationModes
+from .cpu import get_available_cpu_count, split_threads
+from .samples import (
+    get_sample_name,
+    get_sequence_file_base_name,
+    pair_sample_files,
+    read_sample_sheet,
+    describe_sequence_file,
+)
+from .result_cache import get_result_cache
+from .workspace_index import (
+    WorkspaceIndex,
+    WorkspaceWatcher,
+    close_workspace_index,
+    get_workspace_index,
+    mark_workspace_folders_dirty,
+)
+from .tool_registry import TOOLS, ToolInfo, ToolRegistry, get_tool_registry
+from .startup import (
+    STARTUP_BUDGET_MS,
+    get_startup_budget_ms,
+    report_startup_time,
+    profile_imports,
+    record_import_profile,
+)
+from .resources import (
+    RESOURCE_BUNDLES,
+    compile_resource_bundle,
+    register_resource_bundle,
+)
+import importlib
+
+# Los módulos que importan Polars o NumPy se cargan la primera vez que se
+# usa uno de sus nombres, para no alargar el arranque de la aplicación
+_LAZY_NAMES = {
+    "KrakenReport": ".kraken_report",
+    "read_kraken_report": ".kraken_report",
+    "build_children": ".kraken_report",
+    "write_krona_html": ".krona_html",
+    "write_krona_html_for_reports": ".krona_html",
+    "build_krona_xml": ".krona_html",
+    "merge_reports": ".krona_html",
+    "AbundanceMatrix": ".abundance_matrix",
+    "get_workspace_abundance_matrix": ".abundance_matrix",
+    "update_workspace_abundance_matrix": ".abundance_matrix",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_NAMES.get(name)
+
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,300 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+import polars as pl
+from .kraken_report import read_kraken_report
+from .krona_html import get_report_sample_name
+from .paths import get_krakened_files_paths, get_kraken2_cohort_folder_path
+
+
+class AbundanceMatrix:
+    """
+    Matriz de abundancias (taxón x muestra) de todos los reportes de Kraken2
+    de un directorio de trabajo, guardada en Parquet.
+
+    La matriz es dispersa: sólo se guardan las parejas (muestra, taxón) con
+    lecturas, en formato largo. Hay tres archivos en `folder`:
+
+    - counts.parquet: sample, taxid, clade_reads, direct_reads
+    - taxa.parquet: taxid, name, rank, parent_taxid
+    - samples.parquet: sample, report, size, mtime_ns
+
+    `update` sólo vuelve a leer los reportes nuevos o modificados (según su
+    tamaño y fecha), así que mantener la matriz al día es casi gratis y las
+    consultas sobre cientos de muestras no leen ningún reporte de texto.
+    """
+
+    COUNTS_FILE = "counts.parquet"
+    TAXA_FILE = "taxa.parquet"
+    SAMPLES_FILE = "samples.parquet"
+
+    COUNTS_SCHEMA = {
+        "sample": pl.String,
+        "taxid": pl.Int64,
+        "clade_reads": pl.Int64,
+        "direct_reads": pl.Int64,
+    }
+    TAXA_SCHEMA = {
+        "taxid": pl.Int64,
+        "name": pl.String,
+        "rank": pl.String,
+        "parent_taxid": pl.Int64,
+    }
+    SAMPLES_SCHEMA = {
+        "sample": pl.String,
+        "report": pl.String,
+        "size": pl.Int64,
+        "mtime_ns": pl.Int64,
+    }
+
+    def __init__(self, folder: Union[str, Path]):
+        self.folder = Path(folder)
+
+    # storage
+
+    def _read(self, name: str, schema: dict) -> pl.DataFrame:
+        path = self.folder / name
+        if not path.exists():
+            return pl.DataFrame(schema=schema)
+        return pl.read_parquet(path)
+
+    def _write(self, name: str, frame: pl.DataFrame):
+        # Se escribe aparte y se renombra para no dejar un archivo a medias
+        path = self.folder / name
+        temporary_path = path.with_name(f".{name}.tmp")
+        frame.write_parquet(temporary_path, compression="zstd")
+        os.replace(temporary_path, path)
+
+    def _scan(self, name: str, schema: dict) -> pl.LazyFrame:
+        path = self.folder / name
+        if not path.exists():
+            return pl.LazyFrame(schema=schema)
+        return pl.scan_parquet(path)
+
+    def samples(self) -> pl.DataFrame:
+        return self._read(self.SAMPLES_FILE, self.SAMPLES_SCHEMA)
+
+    def taxa(self) -> pl.DataFrame:
+        return self._read(self.TAXA_FILE, self.TAXA_SCHEMA)
+
+    # update
+
+    @staticmethod
+    def _report_counts(sample: str, report_file: Path) -> tuple[pl.DataFrame, ...]:
+        report = read_kraken_report(report_file)
+
+        parent_taxids = report.taxids[report.parents]
+        parent_taxids[report.parents < 0] = -1
+
+        counts = pl.DataFrame(
+            {
+                "sample": pl.repeat(sample, len(report), eager=True),
+                "taxid": report.taxids,
+                "clade_reads": report.clade_reads,
+                "direct_reads": report.direct_reads,
+            },
+            schema=AbundanceMatrix.COUNTS_SCHEMA,
+        ).filter(pl.col("clade_reads") > 0)
+
+        taxa = pl.DataFrame(
+            {
+                "taxid": report.taxids,
+                "name": report.names.tolist(),
+                "rank": [report.rank_codes[rank] for rank in report.ranks.tolist()],
+                "parent_taxid": parent_taxids,
+            },
+            schema=AbundanceMatrix.TAXA_SCHEMA,
+        )
+
+        return counts, taxa
+
+    def update(self, report_files: list[Path]) -> int:
+        """
+        Sincroniza la matriz con los reportes dados: añade los nuevos, vuelve a
+        leer los modificados y quita los que ya no existen. Devuelve el número
+        de reportes leídos.
+        """
+        samples = self.samples()
+        known = {
+            report: (sample, size, mtime_ns)
+            for sample, report, size, mtime_ns in samples.iter_rows()
+        }
+
+        current: dict[str, tuple[int, int]] = {}
+        for report_file in report_files:
+            try:
+                stat = Path(report_file).stat()
+            except OSError:
+                continue
+            current[Path(report_file).as_posix()] = (stat.st_size, stat.st_mtime_ns)
+
+        unchanged = {
+            report: known[report][0]
+            for report, stat in current.items()
+            if report in known and known[report][1:] == stat
+        }
+        changed = [report for report in current if report not in unchanged]
+        removed = [report for report in known if report not in current]
+
+        if not changed and not removed:
+            return 0
+
+        used_names = set(unchanged.values())
+        names: dict[str, str] = {}
+
+        for report in sorted(changed):
+            sample = known[report][0] if report in known else None
+
+            if sample is None:
+                base_name = get_report_sample_name(Path(report))
+                sample = base_name
+                suffix = 2
+                while sample in used_names:
+                    sample = f"{base_name}_{suffix}"
+                    suffix += 1
+
+            used_names.add(sample)
+            names[report] = sample
+
+        def read(report: str):
+            try:
+                return self._report_counts(names[report], Path(report))
+            except (OSError, ValueError, IndexError, pl.exceptions.PolarsError) as e:
+                print(Path(__file__).name, "-", f"Could not read {report}: {e}")
+                return None
+
+        new_rows = []
+        new_counts = []
+        new_taxa = []
+
+        # La lectura de los reportes (polars) libera el GIL
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for report, result in zip(names, executor.map(read, names)):
+                if result is None:
+                    continue
+
+                counts, taxa = result
+                new_rows.append((names[report], report, *current[report]))
+                new_counts.append(counts)
+                new_taxa.append(taxa)
+
+        kept_samples = list(unchanged.values())
+
+        samples = pl.concat(
+            [
+                samples.filter(pl.col("sample").is_in(kept_samples)),
+                pl.DataFrame(new_rows, schema=self.SAMPLES_SCHEMA, orient="row"),
+            ]
+        ).sort("sample")
+
+        counts = pl.concat(
+            [
+                self._read(self.COUNTS_FILE, self.COUNTS_SCHEMA).filter(
+                    pl.col("sample").is_in(kept_samples)
+                ),
+                *new_counts,
+            ]
+        ).sort("sample", "taxid")
+
+        # Un TaxID tiene el mismo nombre y rango en todos los reportes de una
+        # misma base de datos; se conserva el primero
+        taxa = (
+            pl.concat([self.taxa(), *new_taxa])
+            .unique(subset="taxid", keep="first", maintain_order=True)
+            .filter(pl.col("taxid").is_in(counts["taxid"].unique().implode()))
+            .sort("taxid")
+        )
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._write(self.COUNTS_FILE, counts)
+        self._write(self.TAXA_FILE, taxa)
+        self._write(self.SAMPLES_FILE, samples)
+
+        return len(new_rows)
+
+    # queries
+
+    def counts(
+        self,
+        rank: Optional[str] = None,
+        samples: Optional[list[str]] = None,
+        direct: bool = False,
+    ) -> pl.LazyFrame:
+        """
+        Matriz en formato largo (sample, taxid, name, rank, reads), sólo con
+        los pares con lecturas. `rank` es un código de Kraken2 (S, G, F...):
+        S no incluye S1. Con `direct` se usan las lecturas asignadas al propio
+        taxón en lugar de las de todo el clado.
+        """
+        reads = "direct_reads" if direct else "clade_reads"
+
+        counts = self._scan(self.COUNTS_FILE, self.COUNTS_SCHEMA)
+        taxa = self._scan(self.TAXA_FILE, self.TAXA_SCHEMA)
+
+        if samples is not None:
+            counts = counts.filter(pl.col("sample").is_in(samples))
+
+        counts = counts.join(taxa.select("taxid", "name", "rank"), on="taxid")
+
+        if rank is not None:
+            counts = counts.filter(pl.col("rank") == rank)
+
+        return counts.select(
+            "sample", "taxid", "name", "rank", pl.col(reads).alias("reads")
+        ).filter(pl.col("reads") > 0)
+
+    def matrix(
+        self,
+        rank: str = "S",
+        samples: Optional[list[str]] = None,
+        min_reads: int = 0,
+        direct: bool = False,
+    ) -> pl.DataFrame:
+        """
+        Matriz densa taxón x muestra de un rango, con una columna por muestra
+        y ceros donde un taxón no aparece. Se descartan los taxones con menos
+        de `min_reads` lecturas en todas las muestras.
+        """
+        counts = self.counts(rank, samples, direct).collect()
+
+        if samples is None:
+            samples = self.samples()["sample"].to_list()
+
+        matrix = counts.pivot(
+            on="sample", index=["taxid", "name"], values="reads", sort_columns=True
+        )
+
+        missing = [sample for sample in samples if sample not in matrix.columns]
+        matrix = matrix.with_columns(
+            *(pl.lit(0, dtype=pl.Int64).alias(sample) for sample in missing)
+        )
+        matrix = matrix.select("taxid", "name", *samples).fill_null(0)
+
+        if min_reads > 0:
+            matrix = matrix.filter(pl.max_horizontal(*samples) >= min_reads)
+
+        return matrix.sort("taxid")
+
+
+def get_workspace_abundance_matrix() -> Optional[AbundanceMatrix]:
+    """
+    Matriz de abundancias del directorio de trabajo actual, o None si no hay
+    ningún directorio de trabajo.
+    """
+    folder = get_kraken2_cohort_folder_path()
+    return AbundanceMatrix(folder) if folder is not None else None
+
+
+def update_workspace_abundance_matrix() -> int:
+    """
+    Pone al día la matriz del directorio de trabajo actual con sus reportes
+    de Kraken2. Devuelve el número de reportes leídos.
+    """
+    matrix = get_workspace_abundance_matrix()
+
+    if matrix is None:
+        return 0
+
+    reports = [file for file in get_krakened_files_paths() if file.suffix == ".txt"]
+    return matrix.update(reports)
@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+
+def _get_cgroup_cpu_limit() -> Optional[int]:
+    """
+    Obtiene el límite de CPUs impuesto por cgroups (v2 o v1), si existe.
+    Devuelve None si no hay cuota o si no se puede leer.
+    """
+    # cgroup v2: "<quota> <period>" o "max <period>"
+    cpu_max = Path("/sys/fs/cgroup/cpu.max")
+    try:
+        if cpu_max.is_file():
+            quota, period = cpu_max.read_text().split()[:2]
+            if quota != "max" and int(period) > 0:
+                return max(1, int(int(quota) // int(period)))
+            return None
+    except (OSError, ValueError):
+        pass
+
+    # cgroup v1
+    quota_file = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period_file = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    try:
+        if quota_file.is_file() and period_file.is_file():
+            quota = int(quota_file.read_text().strip())
+            period = int(period_file.read_text().strip())
+            if quota > 0 and period > 0:
+                return max(1, quota // period)
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def get_available_cpu_count() -> int:
+    """
+    Get the number of CPUs this process may actually use.
+
+    Takes the CPU affinity mask (``os.sched_getaffinity``) and the cgroup
+    quota into account, falling back to ``os.cpu_count()`` on platforms
+    where neither is available (e.g. Windows).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            count = len(os.sched_getaffinity(0))
+        except OSError:
+            count = os.cpu_count() or 1
+    else:
+        count = os.cpu_count() or 1
+
+    cgroup_limit = _get_cgroup_cpu_limit()
+    if cgroup_limit is not None:
+        count = min(count, cgroup_limit)
+
+    return max(1, count)
+
+
+def split_threads(
+    budget: int, jobs: int, min_threads: int = 1, max_threads: Optional[int] = None
+) -> int:
+    """
+    Reparte un presupuesto de hilos entre un número de trabajos concurrentes.
+    Devuelve los hilos que le corresponden a cada trabajo, acotados entre
+    min_threads y max_threads.
+    """
+    if jobs <= 0:
+        return max(min_threads, budget)
+
+    slots = max(1, min(jobs, budget // max(1, min_threads)))
+    threads = max(min_threads, budget // slots)
+
+    if max_threads is not None:
+        threads = min(threads, max_threads)
+
+    return threads
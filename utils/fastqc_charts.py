@@ -0,0 +1,165 @@
+from pathlib import Path
+from typing import Optional, Union
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QColor, QImage, QPainter, QPen, QPolygonF
+from .fastqc_data import CHART_FILES, FastQCModule
+
+WIDTH = 800
+HEIGHT = 600
+MARGIN_LEFT = 70
+MARGIN_RIGHT = 30
+MARGIN_TOP = 50
+MARGIN_BOTTOM = 80
+
+COLORS = [
+    "#d62728",
+    "#1f77b4",
+    "#2ca02c",
+    "#000000",
+    "#9467bd",
+    "#ff7f0e",
+    "#8c564b",
+]
+
+# Columnas que se dibujan de cada módulo (las demás se omiten)
+CHART_COLUMNS = {
+    "Per base sequence quality": [
+        "Mean",
+        "Median",
+        "Lower Quartile",
+        "Upper Quartile",
+    ],
+    "Sequence Duplication Levels": [
+        "Percentage of deduplicated",
+        "Percentage of total",
+    ],
+}
+
+# Escala fija del eje Y de los módulos en porcentaje o en calidad Phred
+Y_RANGES = {
+    "Per base sequence quality": (0, 40),
+    "Per base sequence content": (0, 100),
+    "Per base N content": (0, 100),
+    "Sequence Duplication Levels": (0, 100),
+    "Adapter Content": (0, 100),
+}
+
+
+def render_fastqc_chart(
+    module: FastQCModule, output_path: Union[str, Path]
+) -> Optional[Path]:
+    """
+    Dibuja la gráfica de un módulo a partir de su tabla, como líneas (una
+    por columna) sobre la primera columna. Sirve para los reportes que no
+    traen imágenes, como los del análisis integrado. Devuelve None si el
+    módulo no tiene gráfica.
+    """
+    if module.name not in CHART_FILES or not module.rows or len(module.columns) < 2:
+        return None
+
+    columns = CHART_COLUMNS.get(module.name, module.columns[1:])
+    series = {
+        name: [float(value) for value in module.column(name)]
+        for name in columns
+        if name in module.columns
+    }
+    labels = [str(value) for value in module.column(module.columns[0])]
+
+    values = [value for points in series.values() for value in points]
+    y_min, y_max = Y_RANGES.get(module.name, (0, max(values, default=0) * 1.05 or 1))
+
+    image = QImage(WIDTH, HEIGHT, QImage.Format.Format_ARGB32)
+    image.fill(Qt.GlobalColor.white)
+
+    plot = QRectF(
+        MARGIN_LEFT,
+        MARGIN_TOP,
+        WIDTH - MARGIN_LEFT - MARGIN_RIGHT,
+        HEIGHT - MARGIN_TOP - MARGIN_BOTTOM,
+    )
+    count = len(labels)
+
+    def x_of(index: int) -> float:
+        return plot.left() + plot.width() * (index + 0.5) / count
+
+    def y_of(value: float) -> float:
+        value = min(max(value, y_min), y_max)
+        return plot.bottom() - plot.height() * (value - y_min) / (y_max - y_min)
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+    painter.drawText(
+        QRectF(0, 0, WIDTH, MARGIN_TOP), Qt.AlignmentFlag.AlignCenter, module.name
+    )
+
+    # ejes y rejilla
+
+    painter.setPen(QPen(QColor("#dddddd")))
+    for step in range(6):
+        value = y_min + (y_max - y_min) * step / 5
+        y = y_of(value)
+        painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+
+    painter.setPen(QPen(Qt.GlobalColor.black))
+    painter.drawRect(plot)
+
+    for step in range(6):
+        value = y_min + (y_max - y_min) * step / 5
+        painter.drawText(
+            QRectF(0, y_of(value) - 10, MARGIN_LEFT - 8, 20),
+            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+            f"{value:g}",
+        )
+
+    label_step = max(1, count // 15)
+    for index in range(0, count, label_step):
+        painter.drawText(
+            QRectF(x_of(index) - 30, plot.bottom() + 4, 60, 20),
+            Qt.AlignmentFlag.AlignCenter,
+            labels[index],
+        )
+
+    painter.drawText(
+        QRectF(plot.left(), plot.bottom() + 24, plot.width(), 20),
+        Qt.AlignmentFlag.AlignCenter,
+        module.columns[0],
+    )
+
+    # series y leyenda
+
+    for number, (name, points) in enumerate(series.items()):
+        color = QColor(COLORS[number % len(COLORS)])
+        painter.setPen(QPen(color, 2))
+        painter.drawPolyline(
+            QPolygonF(
+                [
+                    QPointF(x_of(index), y_of(value))
+                    for index, value in enumerate(points)
+                ]
+            )
+        )
+
+        legend_y = plot.bottom() + 48
+        legend_x = plot.left() + number * (plot.width() / max(len(series), 1))
+        painter.drawLine(
+            QPointF(legend_x, legend_y + 10), QPointF(legend_x + 20, legend_y + 10)
+        )
+        painter.setPen(QPen(Qt.GlobalColor.black))
+        painter.drawText(
+            QRectF(
+                legend_x + 24, legend_y, plot.width() / max(len(series), 1) - 24, 20
+            ),
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            name,
+        )
+
+    painter.end()
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if not image.save(str(output_path), "PNG"):
+        return None
+
+    return output_path
@@ -0,0 +1,163 @@
+import io
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# Gráfica de cada módulo dentro de la carpeta Images del zip de FastQC
+CHART_FILES = {
+    "Per base sequence quality": "per_base_quality.png",
+    "Per tile sequence quality": "per_tile_quality.png",
+    "Per sequence quality scores": "per_sequence_quality.png",
+    "Per base sequence content": "per_base_sequence_content.png",
+    "Per sequence GC content": "per_sequence_gc_content.png",
+    "Per base N content": "per_base_n_content.png",
+    "Sequence Length Distribution": "sequence_length_distribution.png",
+    "Sequence Duplication Levels": "duplication_levels.png",
+    "Adapter Content": "adapter_content.png",
+}
+
+
+@dataclass
+class FastQCModule:
+    """
+    Un módulo de fastqc_data.txt: su estado (pass, warn o fail) y su tabla.
+
+    Cada columna se convierte a int o float cuando todos sus valores lo
+    permiten (las posiciones agrupadas como "10-14" quedan como texto).
+    Las líneas de cabecera extra ("#Total Deduplicated Percentage 85.3")
+    quedan en `properties`.
+    """
+
+    name: str
+    status: str
+    columns: list[str] = field(default_factory=list)
+    rows: list[tuple] = field(default_factory=list)
+    properties: dict[str, Any] = field(default_factory=dict)
+
+    def column(self, name: str) -> list:
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Tabla de dos columnas (p. ej. Basic Statistics) como diccionario.
+        """
+        return {row[0]: row[1] for row in self.rows if len(row) >= 2}
+
+
+def _to_number(value: str) -> Union[int, float]:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _typed_rows(rows: list[list[str]]) -> list[tuple]:
+    if not rows:
+        return []
+
+    columns = list(zip(*rows))
+    typed_columns = []
+
+    for values in columns:
+        try:
+            typed_columns.append([_to_number(value) for value in values])
+        except ValueError:
+            typed_columns.append(list(values))
+
+    return list(zip(*typed_columns))
+
+
+def _data_file_name(archive: zipfile.ZipFile) -> str:
+    for name in archive.namelist():
+        if name.endswith("/fastqc_data.txt") or name == "fastqc_data.txt":
+            return name
+    raise FileNotFoundError(f"fastqc_data.txt not found in {archive.filename}")
+
+
+def read_fastqc_data(zip_path: Union[str, Path]) -> dict[str, FastQCModule]:
+    """
+    Lee los módulos de fastqc_data.txt directamente del zip de FastQC, línea
+    a línea y sin extraer nada a disco. Devuelve los módulos por nombre.
+    """
+    modules: dict[str, FastQCModule] = {}
+    module: Optional[FastQCModule] = None
+    raw_rows: list[list[str]] = []
+
+    with zipfile.ZipFile(zip_path) as archive:
+        with archive.open(_data_file_name(archive)) as raw:
+            for line in io.TextIOWrapper(raw, encoding="utf-8", errors="replace"):
+                line = line.rstrip("\r\n")
+
+                if not line or line.startswith("##"):
+                    continue
+
+                if line == ">>END_MODULE":
+                    if module is not None:
+                        module.rows = _typed_rows(raw_rows)
+                        modules[module.name] = module
+                    module = None
+                    continue
+
+                if line.startswith(">>"):
+                    name, _, status = line[2:].partition("\t")
+                    module = FastQCModule(name=name, status=status)
+                    raw_rows = []
+                    continue
+
+                if module is None:
+                    continue
+
+                fields = line.split("\t")
+
+                if line.startswith("#"):
+                    fields[0] = fields[0][1:]
+                    if len(fields) == 2 and not raw_rows and not module.columns:
+                        # "#Nombre<tab>número" antes de la cabecera es una
+                        # propiedad del módulo, no la cabecera
+                        try:
+                            module.properties[fields[0]] = _to_number(fields[1])
+                            continue
+                        except ValueError:
+                            pass
+                    module.columns = fields
+                    continue
+
+                raw_rows.append(fields)
+
+    return modules
+
+
+def extract_fastqc_chart(
+    zip_path: Union[str, Path], module_name: str, output_dir: Path
+) -> Optional[Path]:
+    """
+    Extrae del zip de FastQC la gráfica de un módulo, sólo cuando se pide y
+    una única vez. Devuelve su ruta, o None si el módulo no tiene gráfica.
+    """
+    chart_file = CHART_FILES.get(module_name)
+
+    if chart_file is None:
+        return None
+
+    zip_path = Path(zip_path)
+    output_path = Path(output_dir) / chart_file
+
+    if (
+        output_path.exists()
+        and output_path.stat().st_mtime_ns >= zip_path.stat().st_mtime_ns
+    ):
+        return output_path
+
+    with zipfile.ZipFile(zip_path) as archive:
+        prefix = _data_file_name(archive).removesuffix("fastqc_data.txt")
+        try:
+            data = archive.read(f"{prefix}Images/{chart_file}")
+        except KeyError:
+            return None
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(data)
+
+    return output_path
@@ -6,13 +6,23 @@ Genera un .qrc a partir de una carpeta:
   - --folder: carpeta base que quieres incluir
   - --prefix: prefijo para <qresource>
   - --output: (opcional) ruta de salida; si no se especifica, imprime por stdout
+  - --rcc: (opcional) compila además el paquete binario .rcc junto al .qrc
+
+Los archivos generados (.qrc, .rcc, módulos _rc.py y __pycache__) no se
+incluyen.
 """
 
 import os
 import argparse
+import shutil
+import subprocess
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 
+# Archivos generados que no deben acabar dentro del propio recurso
+SKIPPED_SUFFIXES = (".qrc", ".rcc", "_rc.py", ".pyc")
+SKIPPED_FOLDERS = {"__pycache__"}
+
 
 def build_qrc(folder: str, prefix: str) -> ET.ElementTree:
     # Raíz RCC
@@ -21,8 +31,11 @@ def build_qrc(folder: str, prefix: str) -> ET.ElementTree:
     qres = ET.SubElement(rcc, "qresource", prefix=prefix)
 
     # Recorre todos los ficheros en folder
-    for root, _, files in os.walk(folder):
+    for root, folders, files in os.walk(folder):
+        folders[:] = sorted(f for f in folders if f not in SKIPPED_FOLDERS)
         for fname in sorted(files):
+            if fname.endswith(SKIPPED_SUFFIXES):
+                continue
             full_path = os.path.join(root, fname)
             # ruta relativa dentro de folder, usando forward slashes
             rel_path = os.path.relpath(full_path, folder).replace(os.sep, "/")
@@ -67,11 +80,19 @@ def main():
     parser.add_argument(
         "--output", "-o", help="Ruta de salida del .qrc (default: stdout)"
     )
+    parser.add_argument(
+        "--rcc",
+        action="store_true",
+        help="Compila también el .rcc junto al .qrc (requiere --output)",
+    )
     args = parser.parse_args()
 
     if not os.path.isdir(args.folder):
         parser.error(f"'{args.folder}' no es una carpeta válida.")
 
+    if args.rcc and not args.output:
+        parser.error("--rcc requiere --output.")
+
     tree = build_qrc(args.folder, args.prefix)
     xml_str = prettify(tree)
 
@@ -79,6 +100,16 @@ def main():
         with open(args.output, "w", encoding="utf-8") as f:
             f.write(xml_str)
         print(f"Generado {args.output}")
+
+        if args.rcc:
+            rcc_path = os.path.splitext(args.output)[0] + ".rcc"
+            executable = shutil.which("pyside6-rcc")
+            if executable is None:
+                parser.error("pyside6-rcc no está instalado.")
+            subprocess.run(
+                [executable, "--binary", "-o", rcc_path, args.output], check=True
+            )
+            print(f"Generado {rcc_path}")
     else:
         print(xml_str)
 
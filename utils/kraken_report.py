@@ -0,0 +1,172 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Union
+import numpy as np
+import polars as pl
+
+
+@dataclass
+class KrakenReport:
+    """
+    Árbol taxonómico de un reporte de Kraken2 (`--report`) guardado en arreglos.
+
+    Cada taxón es un índice: `parents[i]` es el índice de su padre (-1 para
+    las raíces), `ranks[i]` un código que indexa `rank_codes` y los conteos
+    están en arreglos de NumPy, de modo que un reporte con decenas de miles
+    de taxones ocupa unos pocos arreglos contiguos.
+
+    Los hijos de cada nodo están en formato CSR: los hijos de `i` son
+    `child_indices[child_offsets[i]:child_offsets[i + 1]]`, en el orden del
+    reporte. Las raíces están en `roots`.
+    """
+
+    names: np.ndarray  # str
+    taxids: np.ndarray  # int64
+    ranks: np.ndarray  # uint8, índice en rank_codes
+    rank_codes: list[str]
+    depths: np.ndarray  # int16
+    parents: np.ndarray  # int32
+    clade_reads: np.ndarray  # int64
+    direct_reads: np.ndarray  # int64
+    percents: np.ndarray  # float32
+    child_offsets: np.ndarray  # int64, len = n + 1
+    child_indices: np.ndarray  # int32
+    roots: np.ndarray  # int32
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def total_reads(self) -> int:
+        """
+        Lecturas totales: clasificadas (root) más no clasificadas.
+        """
+        return int(self.clade_reads[self.roots].sum())
+
+    def children(self, node: int) -> np.ndarray:
+        if node < 0:
+            return self.roots
+        return self.child_indices[
+            self.child_offsets[node] : self.child_offsets[node + 1]
+        ]
+
+    def rank(self, node: int) -> str:
+        return self.rank_codes[self.ranks[node]]
+
+    def lineage(self, node: int) -> list[int]:
+        """
+        Índices desde la raíz hasta `node`, ambos incluidos.
+        """
+        lineage = []
+        while node >= 0:
+            lineage.append(node)
+            node = int(self.parents[node])
+        return lineage[::-1]
+
+
+def build_children(parents: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Construye los hijos en formato CSR (offsets, índices) y las raíces a
+    partir del arreglo de padres. El orden relativo de los hermanos se
+    conserva.
+    """
+    count = len(parents)
+    has_parent = parents >= 0
+
+    children = np.flatnonzero(has_parent).astype(np.int32)
+    children = children[np.argsort(parents[children], kind="stable")]
+
+    child_counts = np.bincount(parents[has_parent], minlength=count)
+    child_offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(child_counts, out=child_offsets[1:])
+
+    roots = np.flatnonzero(~has_parent).astype(np.int32)
+
+    return child_offsets, children, roots
+
+
+def find_parents(depths: np.ndarray) -> np.ndarray:
+    """
+    Padre de cada taxón de un árbol en preorden a partir de su profundidad:
+    el último taxón anterior con menor profundidad (-1 para las raíces).
+    Un salto de más de un nivel se trata como hijo del último taxón.
+    """
+    count = len(depths)
+    positions = np.arange(count)
+    parents = np.full(count, -1, dtype=np.int32)
+
+    for depth in np.unique(depths):
+        if depth == 0:
+            continue
+
+        # Último índice, hasta cada posición, de un taxón menos profundo
+        shallower = np.where(depths < depth, positions, -1)
+        last_shallower = np.maximum.accumulate(shallower)
+
+        at_depth = depths == depth
+        parents[at_depth] = last_shallower[at_depth]
+
+    return parents
+
+
+def read_kraken_report(path: Union[str, Path]) -> KrakenReport:
+    """
+    Lee un reporte de Kraken2 en formato estándar:
+
+        porcentaje  lecturas_clado  lecturas_directas  rango  taxid  nombre
+
+    con dos columnas extra de minimizadores si se generó con
+    --report-minimizer-data. La profundidad de cada taxón viene de la
+    sangría del nombre (dos espacios por nivel).
+
+    El archivo se lee con polars y el árbol se reconstruye con NumPy, sin
+    recorrer las líneas en Python.
+    """
+    try:
+        table = pl.read_csv(
+            path,
+            separator="\t",
+            has_header=False,
+            quote_char=None,
+            infer_schema=False,
+            truncate_ragged_lines=True,
+            encoding="utf8-lossy",
+        )
+    except pl.exceptions.NoDataError:
+        table = pl.DataFrame()
+
+    if table.width >= 8:
+        # percent, clade, direct, minimizers, distinct, rank, taxid, name
+        table = table.select(table.columns[:3] + table.columns[5:8])
+
+    if table.width < 6:
+        table = pl.DataFrame(schema={f"column_{i}": pl.String for i in range(1, 7)})
+
+    table = table.select(table.columns[:6])
+    table.columns = ["percent", "clade", "direct", "rank", "taxid", "name"]
+    table = table.drop_nulls()
+
+    indented_names = table["name"]
+    names = indented_names.str.strip_chars_start(" ")
+    depths = ((indented_names.str.len_chars() - names.str.len_chars()) // 2).to_numpy()
+
+    rank_codes = table["rank"].unique(maintain_order=True).to_list()
+    ranks = table["rank"].cast(pl.Enum(rank_codes)).to_physical().to_numpy()
+
+    parents = find_parents(depths)
+    child_offsets, child_indices, roots = build_children(parents)
+
+    return KrakenReport(
+        names=names.to_numpy().astype(str),
+        taxids=table["taxid"].cast(pl.Int64).to_numpy(),
+        ranks=ranks.astype(np.uint8),
+        rank_codes=rank_codes,
+        depths=depths.astype(np.int16),
+        parents=parents,
+        clade_reads=table["clade"].cast(pl.Int64).to_numpy(),
+        direct_reads=table["direct"].cast(pl.Int64).to_numpy(),
+        percents=table["percent"].str.strip_chars().cast(pl.Float32).to_numpy(),
+        child_offsets=child_offsets,
+        child_indices=child_indices,
+        roots=roots,
+    )
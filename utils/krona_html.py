@@ -0,0 +1,223 @@
+import os
+from pathlib import Path
+from typing import Optional, Union
+from xml.sax.saxutils import escape, quoteattr
+import numpy as np
+from .kraken_report import KrakenReport, read_kraken_report, build_children
+
+# Recursos de Krona (script e imágenes) que carga el HTML generado
+KRONA_URL = "https://marbl.github.io/Krona"
+KRONA_VERSION = "2.8.1"
+
+# Los taxones por debajo de esta fracción de las lecturas en todas las
+# muestras se descartan: Krona no llega a dibujarlos y con taxonomías
+# completas son la mayor parte del archivo
+MIN_FRACTION = 1e-5
+
+TAXONOMY_URL = "https://www.ncbi.nlm.nih.gov/Taxonomy/Browser/wwwtax.cgi?mode=Info&id="
+
+RANK_NAMES = {
+    "D": "domain",
+    "K": "kingdom",
+    "P": "phylum",
+    "C": "class",
+    "O": "order",
+    "F": "family",
+    "G": "genus",
+    "S": "species",
+}
+
+HEADER = """\
+<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" \
+"http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
+ <head>
+  <meta charset="utf-8"/>
+  <link rel="shortcut icon" href="{url}/img/favicon.ico"/>
+  <script id="notfound">window.onload=function(){{document.body.innerHTML=\
+"No se pudieron cargar los recursos de Krona desde {url}."}}</script>
+  <script src="{url}/src/krona-{version}.js"></script>
+ </head>
+ <body>
+  <img id="hiddenImage" src="{url}/img/hidden.png" style="display:none"/>
+  <img id="loadingImage" src="{url}/img/loading.gif" style="display:none"/>
+  <img id="logo" src="{url}/img/logo-small.png" style="display:none"/>
+  <noscript>Javascript must be enabled to view this page.</noscript>
+  <div style="display:none">
+  <krona collapse="true" key="true">
+   <attributes magnitude="magnitude">
+    <attribute display="Lecturas">magnitude</attribute>
+    <attribute display="TaxID" mono="true" hrefBase={href}>taxid</attribute>
+    <attribute display="Rango" mono="true">rank</attribute>
+   </attributes>
+"""
+
+FOOTER = """\
+  </krona>
+  </div>
+ </body>
+</html>
+"""
+
+
+def _rank_name(code: str) -> str:
+    # R, U y los niveles intermedios (G1, S2...) no tienen rango
+    return RANK_NAMES.get(code, "no rank")
+
+
+def merge_reports(
+    reports: list[KrakenReport],
+) -> tuple[list[str], list[int], list[str], np.ndarray, np.ndarray]:
+    """
+    Une los árboles de varios reportes en uno solo. Un taxón es el mismo en
+    dos muestras si tiene el mismo TaxID bajo el mismo padre.
+
+    Devuelve nombres, TaxIDs, rangos, padres y una matriz de lecturas del
+    clado (taxones x muestras).
+    """
+    names: list[str] = []
+    taxids: list[int] = []
+    ranks: list[str] = []
+    parents: list[int] = []
+    lookup: dict[tuple[int, int], int] = {}
+    columns: list[tuple[np.ndarray, np.ndarray]] = []
+
+    for report in reports:
+        merged = np.empty(len(report), dtype=np.int64)
+
+        # El reporte está en preorden: el padre siempre se ha visto antes
+        for node, (parent, taxid) in enumerate(
+            zip(report.parents.tolist(), report.taxids.tolist())
+        ):
+            merged_parent = int(merged[parent]) if parent >= 0 else -1
+            key = (merged_parent, taxid)
+            index = lookup.get(key)
+
+            if index is None:
+                index = len(names)
+                lookup[key] = index
+                names.append(str(report.names[node]))
+                taxids.append(taxid)
+                ranks.append(_rank_name(report.rank(node)))
+                parents.append(merged_parent)
+
+            merged[node] = index
+
+        columns.append((merged, report.clade_reads))
+
+    magnitudes = np.zeros((len(names), len(reports)), dtype=np.int64)
+    for sample, (merged, clade_reads) in enumerate(columns):
+        magnitudes[merged, sample] = clade_reads
+
+    return names, taxids, ranks, np.array(parents, dtype=np.int32), magnitudes
+
+
+def build_krona_xml(
+    reports: dict[str, KrakenReport], min_fraction: float = MIN_FRACTION
+) -> str:
+    """
+    Genera el bloque <datasets> y el árbol de nodos de Krona para una o
+    varias muestras (un dataset por muestra).
+    """
+    samples = list(reports)
+    names, taxids, ranks, parents, magnitudes = merge_reports(list(reports.values()))
+
+    totals = np.array([report.total_reads for report in reports.values()])
+
+    # Un hijo nunca tiene más lecturas que su padre, así que los ancestros de
+    # un taxón conservado también se conservan
+    fractions = magnitudes / np.maximum(totals, 1)
+    keep = fractions.max(axis=1, initial=0) >= min_fraction
+    child_offsets, child_indices, roots = build_children(np.where(keep, parents, -1))
+    roots = roots[keep[roots]]
+
+    def values(row) -> str:
+        return "".join(f"<val>{value}</val>" for value in row)
+
+    parts = [" <datasets>"]
+    parts.extend(f"<dataset>{escape(sample)}</dataset>" for sample in samples)
+    parts.append("</datasets>\n")
+
+    # Nodo raíz con todas las lecturas, clasificadas y no clasificadas
+    parts.append(
+        f'<node name="Todas las lecturas"><magnitude>{values(totals.tolist())}'
+        "</magnitude>\n"
+    )
+
+    magnitude_rows = magnitudes.tolist()
+    stack: list[int] = [-1] + [int(root) for root in roots[::-1]]
+
+    while stack:
+        node = stack.pop()
+
+        if node < 0:
+            parts.append("</node>\n")
+            continue
+
+        parts.append(
+            f"<node name={quoteattr(names[node])}>"
+            f"<magnitude>{values(magnitude_rows[node])}</magnitude>"
+            f"<taxid><val>{taxids[node]}</val></taxid>"
+            f"<rank><val>{ranks[node]}</val></rank>\n"
+        )
+
+        # Marca de cierre y después los hijos, para que se cierre tras ellos
+        stack.append(-1)
+        children = child_indices[child_offsets[node] : child_offsets[node + 1]]
+        stack.extend(int(child) for child in children[::-1])
+
+    return "".join(parts)
+
+
+def write_krona_html(
+    reports: dict[str, KrakenReport],
+    output_file: Union[str, Path],
+    min_fraction: float = MIN_FRACTION,
+    resources_url: str = KRONA_URL,
+) -> Path:
+    """
+    Escribe un gráfico de Krona con una muestra por dataset, sin necesidad
+    de KronaTools (ktImportText) ni de WSL.
+    """
+    output_file = Path(output_file)
+
+    html = (
+        HEADER.format(
+            url=resources_url,
+            version=KRONA_VERSION,
+            href=quoteattr(TAXONOMY_URL),
+        )
+        + build_krona_xml(reports, min_fraction)
+        + FOOTER
+    )
+
+    # Se escribe aparte y se renombra para no dejar nunca un HTML a medias
+    temporary_file = output_file.with_name(f".{output_file.name}.tmp")
+    temporary_file.write_text(html, encoding="utf-8")
+    os.replace(temporary_file, output_file)
+
+    return output_file
+
+
+def get_report_sample_name(report_file: Path) -> str:
+    return Path(report_file).stem.removesuffix("_report")
+
+
+def write_krona_html_for_reports(
+    report_files: list[Path],
+    output_file: Optional[Path] = None,
+    min_fraction: float = MIN_FRACTION,
+) -> Path:
+    """
+    Lee los reportes de Kraken2 y escribe su gráfico de Krona. Con un solo
+    reporte, por defecto junto a él (`<reporte>.krona.html`).
+    """
+    if output_file is None:
+        output_file = Path(report_files[0]).with_suffix(".krona.html")
+
+    reports = {
+        get_report_sample_name(report_file): read_kraken_report(report_file)
+        for report_file in report_files
+    }
+
+    return write_krona_html(reports, output_file, min_fraction)
@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from PySide6.QtCore import QStandardPaths, QCoreApplication
 from typing import Optional
+from jobs import CompressionPolicy
 
 
 QCoreApplication.setOrganizationName("Universidad Cooperativa de Colombia")
@@ -10,6 +11,24 @@ QCoreApplication.setApplicationName("TranscriptoHub")
 QCoreApplication.setApplicationVersion("1.0.0")
 
 
+# Extensiones de los archivos de secuencias, sin comprimir, con gzip o con zstd
+SEQUENCE_FILE_EXTENSIONS = [
+    f"{ext}{compression}"
+    for ext in ("fastq", "fasta", "fa", "fq")
+    for compression in ("", ".gz", ".zst")
+]
+
+
+def _count_output_files(folder: Path, pattern: str) -> int:
+    """
+    Cuenta los archivos de salida que coinciden con el patrón, comprimidos o no.
+    """
+    return sum(
+        len(list(folder.glob(pattern + compression)))
+        for compression in ("", ".gz", ".zst")
+    )
+
+
 def get_app_data_path() -> Path:
     """Get the path to the application data directory."""
     app_data_path = Path(
@@ -21,6 +40,14 @@ def get_app_data_path() -> Path:
     return app_data_path
 
 
+def get_result_cache_folder_path() -> Path:
+    """Get the path to the folder of the tool result cache."""
+    cache_path = get_app_data_path() / "cache" / "results"
+    if not cache_path.exists():
+        cache_path.mkdir(parents=True, exist_ok=True)
+    return cache_path
+
+
 """
 Funciones relacionadas con la ruta de los programas.
 """
@@ -42,48 +69,22 @@ Funciones relacionadas con FastQC.
 
 def get_fastqc_folder_path() -> Optional[Path]:
     """
-    Busca dentro de path_programs() una carpeta que en su nombre
-    contenga 'fastqc' (case-insensitive) y devuelve su ruta completa.
-    Si no la encuentra, devuelve None.
+    Carpeta de path_programs() que en su nombre contiene 'fastqc'
+    (case-insensitive), o None si no existe. Se toma del registro de
+    programas, que sólo la vuelve a buscar si la carpeta cambia.
     """
-    base_dir = path_programs()
+    from .tool_registry import get_tool_registry
 
-    if not os.path.isdir(base_dir):
-        return None
-
-    for entry in base_dir.iterdir():
-        if not entry.is_dir():
-            continue
-
-        if "fastqc" in entry.name.lower():
-            return entry
-
-    return None
+    return get_tool_registry().get("fastqc").folder
 
 
 def get_fastqc_file_path() -> Optional[Path]:
     """
-    Busca dentro de path_programs() una carpeta que en su nombre
-    contenga 'fastqc' (case-insensitive) y devuelve su ruta completa.
-    Si no la encuentra, devuelve None.
+    Script .bat de FastQC dentro de su carpeta, o None si no existe.
     """
-    base_dir = get_fastqc_folder_path()
+    from .tool_registry import get_tool_registry
 
-    if base_dir is None:
-        return None
-
-    if not base_dir.is_dir():
-        return None
-
-    for entry in base_dir.glob("**/*"):
-        if (
-            entry.is_file()
-            and "fastqc" in entry.name.lower()
-            and entry.suffix == ".bat"
-        ):
-            return entry
-
-    return None
+    return get_tool_registry().get("fastqc").path
 
 
 def get_fastqc_output_folder_path_by_file(file_path: Path) -> Optional[Path]:
@@ -114,39 +115,22 @@ Funciones relacionadas con Trimmomatic.
 
 def get_trimmomatic_folder_path() -> Optional[Path]:
     """
-    Busca dentro de path_programs() una carpeta que en su nombre
-    contenga 'trimmomatic' (case-insensitive) y devuelve su ruta completa.
-    Si no la encuentra, devuelve None.
+    Carpeta de path_programs() que en su nombre contiene 'trimmomatic'
+    (case-insensitive), o None si no existe.
     """
-    base_dir = path_programs()
-
-    if not base_dir.is_dir():
-        return None
-
-    for entry in base_dir.iterdir():
-        if entry.is_dir() and "trimmomatic" in entry.as_posix().lower():
-            return entry
+    from .tool_registry import get_tool_registry
 
-    return None
+    return get_tool_registry().get("trimmomatic").folder
 
 
 def get_trimmomatic_jar_path() -> Optional[Path]:
     """
-    Busca en el directorio <path_programs()>/trimmomatic
-    cualquier archivo .jar que contenga 'trimmomatic' en su nombre
-    y devuelve su ruta completa. Si no lo encuentra, devuelve None.
+    Archivo .jar de la carpeta de Trimmomatic que contiene 'trimmomatic'
+    en su nombre, o None si no existe.
     """
-    base_dir = get_trimmomatic_folder_path()
-    if base_dir is None or not base_dir.is_dir():
-        return None
-
-    # Patrón para cualquier .jar que contenga 'trimmomatic' (case-insensitive)
-    matches = list(base_dir.glob("*trimmomatic*.jar"))
+    from .tool_registry import get_tool_registry
 
-    if not matches:
-        return None
-
-    return matches[0]
+    return get_tool_registry().get("trimmomatic").path
 
 
 def get_trimmomatic_adapters_path() -> Optional[Path]:
@@ -175,7 +159,8 @@ def get_trimmomatic_output_folder_path() -> Optional[Path]:
 def get_trimmomatic_output_file_path(name: str) -> Optional[Path]:
     """
     Obtiene la ruta del archivo de salida de Trimmomatic.
-    El archivo se nombra como 'trimmed_<número>.fastq' y se guarda en la carpeta 'trimmed'.
+    El archivo se nombra como 'trimmed_<número>.fastq' (con la extensión de la
+    política de compresión del workspace) y se guarda en la carpeta 'trimmed'.
     Si no se puede determinar la ruta, devuelve None.
     """
     output_folder = get_trimmomatic_output_folder_path()
@@ -183,17 +168,23 @@ def get_trimmomatic_output_file_path(name: str) -> Optional[Path]:
     if output_folder is None:
         return None
 
-    output_file_count = len(list(output_folder.glob(f"{name}_trimmed_[0-9]*.fastq")))
+    output_file_count = _count_output_files(
+        output_folder, f"{name}_trimmed_[0-9]*.fastq"
+    )
 
     output_file_path = output_folder / f"{name}_trimmed_{output_file_count}.fastq"
 
-    return output_file_path
+    return get_workspace_compression_policy().apply(output_file_path)
 
 
-def get_trimmomatic_output_1paired_file_path() -> Optional[Path]:
+def get_trimmomatic_output_1paired_file_path(
+    name: Optional[str] = None,
+) -> Optional[Path]:
     """
     Obtiene la ruta del archivo de salida emparejado de Trimmomatic.
-    El archivo se nombra como 'trimmed_<número>_paired.fastq' y se guarda en la carpeta 'trimmed'.
+    El archivo se nombra como '<nombre>_trimmed_<número>_1paired.fastq' (con la extensión de la
+    política de compresión del workspace) y se guarda en la carpeta 'trimmed'.
+    Si no se indica un nombre se usa 'trimmed_<número>_1paired.fastq'.
     Si no se puede determinar la ruta, devuelve None.
     """
     output_folder = get_trimmomatic_output_folder_path()
@@ -201,17 +192,25 @@ def get_trimmomatic_output_1paired_file_path() -> Optional[Path]:
     if output_folder is None:
         return None
 
-    output_file_count = len(list(output_folder.glob("trimmed_*_1paired.fastq")))
+    prefix = f"{name}_trimmed" if name else "trimmed"
 
-    output_file_path = output_folder / f"trimmed_{output_file_count}_paired.fastq"
+    output_file_count = _count_output_files(
+        output_folder, f"{prefix}_[0-9]*_1paired.fastq"
+    )
+
+    output_file_path = output_folder / f"{prefix}_{output_file_count}_1paired.fastq"
 
-    return output_file_path
+    return get_workspace_compression_policy().apply(output_file_path)
 
 
-def get_trimmomatic_output_2paired_file_path() -> Optional[Path]:
+def get_trimmomatic_output_2paired_file_path(
+    name: Optional[str] = None,
+) -> Optional[Path]:
     """
     Obtiene la ruta del segundo archivo de salida emparejado de Trimmomatic.
-    El archivo se nombra como 'trimmed_<número>_2paired.fastq' y se guarda en la carpeta 'trimmed'.
+    El archivo se nombra como '<nombre>_trimmed_<número>_2paired.fastq' (con la extensión de la
+    política de compresión del workspace) y se guarda en la carpeta 'trimmed'.
+    Si no se indica un nombre se usa 'trimmed_<número>_2paired.fastq'.
     Si no se puede determinar la ruta, devuelve None.
     """
     output_folder = get_trimmomatic_output_folder_path()
@@ -219,17 +218,25 @@ def get_trimmomatic_output_2paired_file_path() -> Optional[Path]:
     if output_folder is None:
         return None
 
-    output_file_count = len(list(output_folder.glob("trimmed_*_2paired.fastq")))
+    prefix = f"{name}_trimmed" if name else "trimmed"
 
-    output_file_path = output_folder / f"trimmed_{output_file_count}_2paired.fastq"
+    output_file_count = _count_output_files(
+        output_folder, f"{prefix}_[0-9]*_2paired.fastq"
+    )
 
-    return output_file_path
+    output_file_path = output_folder / f"{prefix}_{output_file_count}_2paired.fastq"
 
+    return get_workspace_compression_policy().apply(output_file_path)
 
-def get_trimmomatic_output_1unpaired_file_path() -> Optional[Path]:
+
+def get_trimmomatic_output_1unpaired_file_path(
+    name: Optional[str] = None,
+) -> Optional[Path]:
     """
     Obtiene la ruta del archivo de salida no emparejado de Trimmomatic.
-    El archivo se nombra como 'trimmed_<número>_unpaired.fastq' y se guarda en la carpeta 'trimmed'.
+    El archivo se nombra como '<nombre>_trimmed_<número>_1unpaired.fastq' (con la extensión de la
+    política de compresión del workspace) y se guarda en la carpeta 'trimmed'.
+    Si no se indica un nombre se usa 'trimmed_<número>_1unpaired.fastq'.
     Si no se puede determinar la ruta, devuelve None.
     """
     output_folder = get_trimmomatic_output_folder_path()
@@ -237,17 +244,25 @@ def get_trimmomatic_output_1unpaired_file_path() -> Optional[Path]:
     if output_folder is None:
         return None
 
-    output_file_count = len(list(output_folder.glob("trimmed_*_1unpaired.fastq")))
+    prefix = f"{name}_trimmed" if name else "trimmed"
 
-    output_file_path = output_folder / f"trimmed_{output_file_count}_unpaired.fastq"
+    output_file_count = _count_output_files(
+        output_folder, f"{prefix}_[0-9]*_1unpaired.fastq"
+    )
 
-    return output_file_path
+    output_file_path = output_folder / f"{prefix}_{output_file_count}_1unpaired.fastq"
 
+    return get_workspace_compression_policy().apply(output_file_path)
 
-def get_trimmomatic_output_2unpaired_file_path() -> Optional[Path]:
+
+def get_trimmomatic_output_2unpaired_file_path(
+    name: Optional[str] = None,
+) -> Optional[Path]:
     """
     Obtiene la ruta del segundo archivo de salida no emparejado de Trimmomatic.
-    El archivo se nombra como 'trimmed_<número>_2unpaired.fastq' y se guarda en la carpeta 'trimmed'.
+    El archivo se nombra como '<nombre>_trimmed_<número>_2unpaired.fastq' (con la extensión de la
+    política de compresión del workspace) y se guarda en la carpeta 'trimmed'.
+    Si no se indica un nombre se usa 'trimmed_<número>_2unpaired.fastq'.
     Si no se puede determinar la ruta, devuelve None.
     """
     output_folder = get_trimmomatic_output_folder_path()
@@ -255,11 +270,15 @@ def get_trimmomatic_output_2unpaired_file_path() -> Optional[Path]:
     if output_folder is None:
         return None
 
-    output_file_count = len(list(output_folder.glob("trimmed_*_2unpaired.fastq")))
+    prefix = f"{name}_trimmed" if name else "trimmed"
+
+    output_file_count = _count_output_files(
+        output_folder, f"{prefix}_[0-9]*_2unpaired.fastq"
+    )
 
-    output_file_path = output_folder / f"trimmed_{output_file_count}_2unpaired.fastq"
+    output_file_path = output_folder / f"{prefix}_{output_file_count}_2unpaired.fastq"
 
-    return output_file_path
+    return get_workspace_compression_policy().apply(output_file_path)
 
 
 """
@@ -269,38 +288,21 @@ Funciones relacionadas con SortMeRNA.
 
 def get_sortmerna_folder_path() -> Optional[Path]:
     """
-    Busca dentro de path_programs() una carpeta que en su nombre
-    contenga 'sortmerna' (case-insensitive) y devuelve su ruta completa.
-    Si no la encuentra, devuelve None.
+    Carpeta de path_programs() que en su nombre contiene 'sortmerna'
+    (case-insensitive), o None si no existe.
     """
-    base_dir = path_programs()
-
-    if not base_dir.is_dir():
-        return None
-
-    for entry in base_dir.iterdir():
-        if entry.is_dir() and "sortmerna" in entry.as_posix().lower():
-            return entry
+    from .tool_registry import get_tool_registry
 
-    return None
+    return get_tool_registry().get("sortmerna").folder
 
 
 def get_sortmerna_executable_path() -> Optional[Path]:
     """
-    Busca dentro de path_programs() un archivo que en su nombre
-    contenga 'sortmerna' (case-insensitive) y devuelve su ruta completa.
-    Si no lo encuentra, devuelve None.
+    Ejecutable de SortMeRNA dentro de su carpeta, o None si no existe.
     """
-    base_dir = get_sortmerna_folder_path()
-
-    if not base_dir or not base_dir.is_dir():
-        return None
+    from .tool_registry import get_tool_registry
 
-    for entry in base_dir.glob("**/*"):
-        if entry.is_file() and "sortmerna" in entry.name.lower():
-            return entry
-
-    return None
+    return get_tool_registry().get("sortmerna").path
 
 
 def get_sortmerna_output_folder_path_from_workspace() -> Optional[Path]:
@@ -535,6 +537,24 @@ def get_kraken2_output_folder_path() -> Optional[Path]:
     return output_folder_path
 
 
+def get_kraken2_cohort_folder_path() -> Optional[Path]:
+    """
+    Obtiene la ruta de la carpeta 'cohort' dentro del directorio de trabajo
+    actual, donde se guarda la matriz de abundancias de todos los reportes.
+    Si no se ha establecido un directorio de trabajo, devuelve None.
+    """
+    workspace_path = get_current_workspace_folder_path()
+
+    if not workspace_path:
+        return None
+
+    cohort_folder_path = Path(workspace_path) / "cohort"
+    if not cohort_folder_path.exists():
+        cohort_folder_path.mkdir(parents=True, exist_ok=True)
+
+    return cohort_folder_path
+
+
 def get_kraken2_saved_configs() -> Optional[list[str]]:
     """
     Obtiene una lista de configuraciones guardadas de Kraken2.
@@ -669,41 +689,20 @@ def get_current_workspace_source_folder_path() -> Path:
 def get_files_in_workspace_folder() -> list[Path]:
     """
     Obtiene una lista de rutas a archivos de secuencias que estén
-    dentro de las carpetas 'trimmed' y 'sorted' del workspace actual.
-    Las extensiones válidas son:
-      - .fastq
-      - .fastq.gz
-      - .fasta
-      - .fasta.gz
+    dentro de las carpetas 'source', 'trimmed' y 'sorted' del workspace actual.
+    Las extensiones válidas son .fastq, .fasta, .fa y .fq, sin comprimir o
+    con .gz / .zst (SEQUENCE_FILE_EXTENSIONS).
 
     Si no se ha establecido un directorio de trabajo, devuelve una lista vacía.
     """
-    workspace_path = get_current_workspace_folder_path()
-    if not workspace_path:
-        return []
+    from .workspace_index import get_workspace_index
 
-    # Extensiones que queremos capturar
-    exts = ["fastq", "fastq.gz", "fasta", "fasta.gz", "fa", "fq"]
+    index = get_workspace_index()
+    if index is None:
+        return []
 
-    collected: list[Path] = []
-    for ext in exts:
-        # Carpeta 'source'
-        source_path = Path(workspace_path) / "source"
-        if source_path.is_dir():
-            collected.extend(source_path.glob("**/*." + ext))
-
-        # Carpeta 'trimmed'
-        trimmed_path = Path(workspace_path) / "trimmed"
-        if trimmed_path.is_dir():
-            collected.extend(trimmed_path.glob("**/*." + ext))
-
-        # Carpeta 'sorted'
-        sorted_path = Path(workspace_path) / "sorted"
-        if sorted_path.is_dir():
-            collected.extend(sorted_path.glob("**/*." + ext))
-
-    # Devolver la lista ordenada para consistencia
-    return sorted(collected)
+    # Consulta al índice del workspace, ya ordenada
+    return index.files("source", "trimmed", "sorted")
 
 
 def get_project_file_path() -> Optional[str]:
@@ -724,107 +723,105 @@ def get_project_file_path() -> Optional[str]:
         return None
 
 
-def get_source_files_paths() -> list[Path]:
+def get_workspace_compression_policy() -> CompressionPolicy:
     """
-    Obtiene una lista de rutas a los archivos de secuencias fuente
-    que estén dentro del directorio de trabajo actual.
-    Las extensiones válidas son:
-      - .fastq
-      - .fastq.gz
-      - .fasta
-      - .fasta.gz
-
-    Si no se ha establecido un directorio de trabajo, devuelve una lista vacía.
+    Obtiene la política de compresión del workspace actual, con la que las
+    etapas guardan sus archivos de secuencias. Sin proyecto o sin política
+    guardada, los archivos no se comprimen.
     """
-    workspace_path = get_current_workspace_folder_path()
-    if not workspace_path:
-        return []
+    project_file_path = get_project_file_path()
 
-    # Extensiones que queremos capturar
-    exts = ["fastq", "fastq.gz", "fasta", "fasta.gz", "fa", "fq"]
+    if not project_file_path:
+        return CompressionPolicy()
 
-    collected: list[Path] = []
+    import json
 
-    for ext in exts:
-        path = Path(workspace_path) / "source"
+    try:
+        with open(project_file_path, "r") as f:
+            data = json.load(f)
+        return CompressionPolicy.model_validate(data.get("compression", {}))
+    except (FileNotFoundError, json.JSONDecodeError, ValueError):
+        return CompressionPolicy()
 
-        if not path.is_dir():
-            continue
 
-        if not path.exists():
-            path.mkdir(parents=True, exist_ok=True)
-            continue
+def set_workspace_compression_policy(policy: CompressionPolicy) -> None:
+    """
+    Guarda la política de compresión en el archivo de proyecto.
+    """
+    project_file_path = get_project_file_path()
 
-        collected.extend(path.glob("**/*." + ext))
+    if not project_file_path:
+        return
 
-    # Devolver la lista ordenada para consistencia
-    return sorted(collected)
+    import json
 
+    try:
+        with open(project_file_path, "r") as f:
+            project_file_data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        project_file_data = {}
 
-def get_trimmed_files_paths() -> list[Path]:
+    project_file_data["compression"] = policy.model_dump()
+
+    with open(project_file_path, "w") as f:
+        json.dump(project_file_data, f, indent=4)
+
+
+def get_source_files_paths() -> list[Path]:
     """
-    Obtiene una lista de rutas a los archivos de secuencias recortadas
+    Obtiene una lista de rutas a los archivos de secuencias fuente
     que estén dentro del directorio de trabajo actual.
-    Las extensiones válidas son:
-      - .fastq
-      - .fastq.gz
-      - .fasta
-      - .fasta.gz
+    Las extensiones válidas son .fastq, .fasta, .fa y .fq, sin comprimir o
+    con .gz / .zst (SEQUENCE_FILE_EXTENSIONS).
 
     Si no se ha establecido un directorio de trabajo, devuelve una lista vacía.
     """
-    workspace_path = get_current_workspace_folder_path()
-    if not workspace_path:
+    from .workspace_index import get_workspace_index
+
+    index = get_workspace_index()
+    if index is None:
         return []
 
-    # Extensiones que queremos capturar
-    exts = ["fastq", "fastq.gz", "fasta", "fasta.gz"]
+    # Consulta al índice del workspace, ya ordenada
+    return index.files("source")
 
-    collected: list[Path] = []
-    path = Path(workspace_path) / "trimmed"
 
-    if not path.is_dir():
-        return collected
+def get_trimmed_files_paths() -> list[Path]:
+    """
+    Obtiene una lista de rutas a los archivos de secuencias recortadas
+    que estén dentro del directorio de trabajo actual.
+    Las extensiones válidas son .fastq, .fasta, .fa y .fq, sin comprimir o
+    con .gz / .zst (SEQUENCE_FILE_EXTENSIONS).
 
-    for ext in exts:
-        collected.extend(path.glob("**/*." + ext))
+    Si no se ha establecido un directorio de trabajo, devuelve una lista vacía.
+    """
+    from .workspace_index import get_workspace_index
 
-    # Devolver la lista ordenada para consistencia
-    return sorted(collected)
+    index = get_workspace_index()
+    if index is None:
+        return []
+
+    # Consulta al índice del workspace, ya ordenada
+    return index.files("trimmed")
 
 
 def get_sorted_files_paths() -> list[Path]:
     """
     Obtiene una lista de rutas a los archivos de secuencias ordenadas
     que estén dentro del directorio de trabajo actual.
-    Las extensiones válidas son:
-      - .fastq
-      - .fastq.gz
-      - .fasta
-      - .fasta.gz
-      - .fq
-      - .fa
+    Las extensiones válidas son .fastq, .fasta, .fa y .fq, sin comprimir o
+    con .gz / .zst (SEQUENCE_FILE_EXTENSIONS).
 
     Si no se ha establecido un directorio de trabajo, devuelve una lista vacía.
     """
-    workspace_path = get_current_workspace_folder_path()
-    if not workspace_path:
-        return []
-
-    # Extensiones que queremos capturar
-    exts = ["fastq", "fastq.gz", "fasta", "fasta.gz", "fa", "fq"]
-
-    collected: list[Path] = []
-    path = Path(workspace_path) / "sorted"
+    from .workspace_index import get_workspace_index
 
-    if not path.is_dir():
-        return collected
-
-    for ext in exts:
-        collected.extend(path.glob("**/*." + ext))
+    index = get_workspace_index()
+    if index is None:
+        return []
 
-    # Devolver la lista ordenada para consistencia
-    return sorted(collected)
+    # Consulta al índice del workspace, ya ordenada
+    return index.files("sorted")
 
 
 def get_sorted_folders_paths() -> list[Path]:
@@ -865,21 +862,11 @@ def get_krakened_files_paths() -> list[Path]:
 
     Si no se ha establecido un directorio de trabajo, devuelve una lista vacía.
     """
-    workspace_path = get_current_workspace_folder_path()
-    if not workspace_path:
-        return []
-
-    # Extensiones que queremos capturar
-    exts = ["html", "txt"]
-
-    collected: list[Path] = []
-    path = get_kraken2_output_folder_path()
-
-    if not path or not path.is_dir():
-        return collected
+    from .workspace_index import get_workspace_index
 
-    for ext in exts:
-        collected.extend(path.glob("**/*." + ext))
+    index = get_workspace_index()
+    if index is None:
+        return []
 
-    # Devolver la lista ordenada para consistencia
-    return sorted(collected)
+    # Consulta al índice del workspace, ya ordenada
+    return index.files("krakened")
\ No newline at end of file
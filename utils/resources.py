@@ -0,0 +1,96 @@
+"""
+Recursos de Qt (iconos, hojas de estilo y manual) en paquetes binarios.
+
+Cada paquete es un .rcc compilado a partir de su .qrc. Se registra con
+`QResource.registerResource`, que proyecta el archivo en memoria en lugar
+de importar un módulo _rc.py de varios megas, y sus archivos quedan
+disponibles con el prefijo del .qrc (`:/assets/...`, `:/styles/...`).
+
+En desarrollo el .rcc se compila (con pyside6-rcc) si falta o si es más
+antiguo que el .qrc o que alguno de sus archivos. El ejecutable de
+PyInstaller lleva los .rcc ya compilados (ver README).
+"""
+
+import shutil
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from PySide6.QtCore import QResource
+
+# Nombre del paquete: ruta del .qrc (y del .rcc) sin extensión, relativa a
+# la raíz de la aplicación
+RESOURCE_BUNDLES = {
+    "assets": Path("assets") / "assets",
+    "styles": Path("styles") / "styles",
+    "manual": Path("views") / "support_window" / "content" / "manual",
+}
+
+_registered: set[str] = set()
+
+
+def get_resources_root() -> Path:
+    """
+    Carpeta desde la que se buscan los paquetes: la de PyInstaller en el
+    ejecutable y la raíz del proyecto en desarrollo.
+    """
+    if getattr(sys, "frozen", False):
+        return Path(sys._MEIPASS)
+    return Path(__file__).resolve().parent.parent
+
+
+def _qrc_files(qrc: Path) -> list[Path]:
+    tree = ET.parse(qrc)
+    return [qrc.parent / file.text for file in tree.iter("file")]
+
+
+def _is_outdated(rcc: Path, qrc: Path) -> bool:
+    if not rcc.exists():
+        return True
+
+    compiled = rcc.stat().st_mtime_ns
+
+    return any(
+        not path.exists() or path.stat().st_mtime_ns > compiled
+        for path in [qrc, *_qrc_files(qrc)]
+    )
+
+
+def compile_resource_bundle(qrc: Path, rcc: Path):
+    """
+    Compila `qrc` en el paquete binario `rcc`.
+    """
+    executable = shutil.which("pyside6-rcc")
+
+    if executable is None:
+        raise FileNotFoundError("pyside6-rcc no está instalado")
+
+    subprocess.run(
+        [executable, "--binary", "-o", str(rcc), str(qrc)],
+        check=True,
+        capture_output=True,
+    )
+
+
+def register_resource_bundle(name: str) -> bool:
+    """
+    Registra el paquete de recursos `name` (compilándolo antes si hace
+    falta). Registrarlo más de una vez no hace nada.
+    """
+    if name in _registered:
+        return True
+
+    base = get_resources_root() / RESOURCE_BUNDLES[name]
+    qrc = base.with_suffix(".qrc")
+    rcc = base.with_suffix(".rcc")
+
+    if not getattr(sys, "frozen", False) and _is_outdated(rcc, qrc):
+        print(Path(__file__).name, "-", f"Compiling {rcc.name}...")
+        compile_resource_bundle(qrc, rcc)
+
+    if not QResource.registerResource(str(rcc)):
+        print(Path(__file__).name, "-", f"Could not register {rcc}")
+        return False
+
+    _registered.add(name)
+    return True
@@ -0,0 +1,20 @@
+from typing import Optional
+from jobs import ResultCache
+from .paths import get_result_cache_folder_path
+from .settings import get_result_cache_max_size_from_settings
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Cache de resultados compartido por todos los paneles.
+    """
+    global _result_cache
+
+    if _result_cache is None:
+        _result_cache = ResultCache(
+            get_result_cache_folder_path(), get_result_cache_max_size_from_settings()
+        )
+
+    return _result_cache
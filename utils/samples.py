@@ -0,0 +1,163 @@
+import csv
+import re
+from pathlib import Path
+from typing import Optional
+from jobs import read_sequence_index_metadata
+
+# Sufijos habituales de lectura 1/2 en nombres de archivos Illumina:
+#   muestra_R1_001.fastq.gz, muestra_1.fq, muestra.R2.fastq, ...
+_READ_PATTERN = re.compile(r"(?P<sep>[._-])(?P<tag>R?)(?P<read>[12])(?=([._-]\d{3})?$)")
+
+_SEQUENCE_SUFFIXES = (
+    ".fastq.gz",
+    ".fq.gz",
+    ".fasta.gz",
+    ".fa.gz",
+    ".fastq.zst",
+    ".fq.zst",
+    ".fastq",
+    ".fq",
+    ".fasta",
+    ".fa",
+)
+
+
+def get_sequence_file_base_name(file: Path) -> str:
+    """
+    Devuelve el nombre del archivo sin sus extensiones de secuencia
+    (por ejemplo 'muestra_R1.fastq.gz' -> 'muestra_R1').
+    """
+    name = file.name
+    for suffix in _SEQUENCE_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return file.stem
+
+
+def _split_read_tag(base: str) -> tuple[str, Optional[str]]:
+    """
+    Separa el nombre base en (muestra, lectura), donde lectura es '1', '2'
+    o None si el nombre no lleva marca de lectura.
+    """
+    match = None
+    for match in _READ_PATTERN.finditer(base):
+        pass
+
+    if match is None:
+        return base, None
+
+    return base[: match.start()], match.group("read")
+
+
+def get_sample_name(file: Path) -> str:
+    """
+    Devuelve el nombre de la muestra quitando la marca de lectura R1/R2.
+    """
+    return _split_read_tag(get_sequence_file_base_name(file))[0]
+
+
+def pair_sample_files(files: list[Path]) -> list[tuple[str, Path, Optional[Path]]]:
+    """
+    Agrupa una lista de archivos en muestras, emparejando R1 con R2.
+
+    Devuelve una lista ordenada de tuplas (muestra, lectura_1, lectura_2).
+    Los archivos sin pareja se devuelven como muestras single-end
+    con lectura_2 = None.
+    """
+    mates: dict[str, dict[str, Path]] = {}
+    singles: list[tuple[str, Path, Optional[Path]]] = []
+
+    for file in files:
+        base = get_sequence_file_base_name(file)
+        name, read = _split_read_tag(base)
+
+        if read is None:
+            singles.append((base, file, None))
+            continue
+
+        mates.setdefault(name, {})[read] = file
+
+    samples: list[tuple[str, Path, Optional[Path]]] = list(singles)
+
+    for name, reads in mates.items():
+        if "1" in reads and "2" in reads:
+            samples.append((name, reads["1"], reads["2"]))
+        else:
+            for read in reads.values():
+                samples.append((get_sequence_file_base_name(read), read, None))
+
+    return sorted(samples, key=lambda sample: sample[0])
+
+
+def read_sample_sheet(path: Path) -> list[tuple[str, Path, Optional[Path]]]:
+    """
+    Lee una hoja de muestras en CSV o TSV con las columnas
+    'sample', 'r1' y 'r2' (opcional). Las rutas relativas se resuelven
+    respecto a la carpeta de la hoja de muestras. Una hoja vacía no tiene
+    muestras.
+    """
+    path = Path(path)
+
+    # utf-8-sig: Excel guarda los CSV con BOM
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        lines = f.read().splitlines()
+
+    if not lines or not lines[0].strip():
+        return []
+
+    try:
+        dialect = csv.Sniffer().sniff(lines[0], delimiters=",;\t")
+    except csv.Error:
+        # Una sola columna (o una cabecera rara): sin separador que detectar
+        dialect = csv.excel
+    reader = csv.DictReader(lines, dialect=dialect)
+
+    samples: list[tuple[str, Path, Optional[Path]]] = []
+
+    for row in reader:
+        # Las columnas de más (sin cabecera) quedan bajo la clave None
+        row = {
+            key.strip().lower(): (value or "").strip()
+            for key, value in row.items()
+            if key is not None
+        }
+
+        r1 = row.get("r1") or row.get("fastq_1") or row.get("read1")
+        if not r1:
+            continue
+
+        r2 = row.get("r2") or row.get("fastq_2") or row.get("read2")
+
+        file_1 = Path(r1) if Path(r1).is_absolute() else path.parent / r1
+        file_2 = None
+        if r2:
+            file_2 = Path(r2) if Path(r2).is_absolute() else path.parent / r2
+
+        name = row.get("sample") or get_sample_name(file_1)
+        samples.append((name, file_1, file_2))
+
+    return samples
+
+
+def describe_sequence_file(file: Path) -> Optional[str]:
+    """
+    Resumen de un archivo de secuencias a partir de su índice
+    ("1,204,332 lecturas · 35-151 pb · Phred+33"), o None si todavía no
+    está indexado. No lee el archivo, sólo los metadatos del índice.
+    """
+    metadata = read_sequence_index_metadata(file)
+
+    if metadata is None:
+        return None
+
+    lengths = (
+        str(metadata["max_length"])
+        if metadata["min_length"] == metadata["max_length"]
+        else f"{metadata['min_length']}-{metadata['max_length']}"
+    )
+    parts = [f"{metadata['reads']:,} lecturas", f"{lengths} pb"]
+
+    if metadata["phred"] is not None:
+        parts.append(f"Phred+{metadata['phred']}")
+
+    return " · ".join(parts)
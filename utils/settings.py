@@ -37,6 +37,12 @@ def set_default_settings():
     if not settings.contains("kraken2_database_folder"):
         settings.setValue("kraken2_database_folder", "")
 
+    if not settings.contains("fastqc_builtin_engine"):
+        settings.setValue("fastqc_builtin_engine", False)
+
+    if not settings.contains("result_cache_max_size"):
+        settings.setValue("result_cache_max_size", 20)
+
     if not settings.contains("kraken2_databases"):
         settings.setValue(
             "kraken2_databases",
@@ -201,6 +207,23 @@ def set_fastqc_executable_path_in_settings(path: Path):
     settings.setValue("fastqc_executable", path.as_posix())
 
 
+# get fastqc engine
+def get_fastqc_builtin_engine_from_settings() -> bool:
+    """
+    Whether the FastQC panel uses the built-in quality control instead of
+    FastQC.
+    """
+    return settings.value("fastqc_builtin_engine", False, bool)
+
+
+# set fastqc engine
+def set_fastqc_builtin_engine_in_settings(enabled: bool):
+    """
+    Set whether the FastQC panel uses the built-in quality control.
+    """
+    settings.setValue("fastqc_builtin_engine", bool(enabled))
+
+
 # get trimmomatic executable path
 def get_trimmomatic_executable_path_from_settings() -> Optional[Path]:
     """
@@ -333,6 +356,19 @@ def remove_sortmerna_database_by_link(link: str):
     )
 
 
+# result cache
+
+
+def get_result_cache_max_size_from_settings() -> int:
+    """
+    Get the maximum size of the result cache, in bytes, from the settings.
+    The value is stored in GB.
+    """
+    max_size = settings.value("result_cache_max_size", 20, float)
+
+    return int(max_size * 1024**3)
+
+
 # kraken 2
 
 
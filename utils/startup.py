@@ -0,0 +1,169 @@
+"""
+Medición del tiempo de arranque de la ventana principal y del tiempo que
+tardan en importarse sus módulos.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Tiempo hasta que la ventana principal se pinta por primera vez que se
+# considera aceptable, en milisegundos. Se puede cambiar con la variable de
+# entorno TRANSCRIPTOHUB_STARTUP_BUDGET_MS
+STARTUP_BUDGET_MS = 800
+
+
+def get_startup_budget_ms() -> int:
+    try:
+        return int(os.environ["TRANSCRIPTOHUB_STARTUP_BUDGET_MS"])
+    except (KeyError, ValueError):
+        return STARTUP_BUDGET_MS
+
+
+def report_startup_time(started: float, label: str = "MainWindow") -> float:
+    """
+    Muestra el tiempo transcurrido desde `started` (time.perf_counter())
+    hasta ahora frente al presupuesto de arranque. Devuelve los
+    milisegundos.
+    """
+    elapsed = (time.perf_counter() - started) * 1000
+    budget = get_startup_budget_ms()
+
+    print(
+        Path(__file__).name,
+        "-",
+        f"{label} time to first paint: {elapsed:.0f} ms "
+        f"({'within' if elapsed <= budget else 'OVER'} the {budget} ms budget)",
+    )
+
+    return elapsed
+
+
+# Módulos que importa main.py antes de mostrar una ventana
+STARTUP_MODULES = ("utils", "app_state", "views", "controllers")
+
+# Se considera que el arranque empeora si uno de STARTUP_MODULES tarda en
+# importarse más que esto (en milisegundos y en proporción) respecto a la
+# medición anterior, o si aparece un módulo nuevo que tarda más de
+# IMPORT_REGRESSION_MS (una librería pesada importada sin querer)
+IMPORT_REGRESSION_MS = 20
+IMPORT_REGRESSION_RATIO = 0.3
+
+# Mediciones de las que se toma el mínimo, para reducir el ruido
+IMPORT_PROFILE_RUNS = 3
+
+
+def profile_imports(
+    modules=STARTUP_MODULES, runs: int = IMPORT_PROFILE_RUNS
+) -> dict[str, float]:
+    """
+    Tiempo de importación acumulado (ms) de cada módulo que se carga al
+    importar `modules` en un intérprete nuevo (python -X importtime), el
+    menor de `runs` mediciones. Sólo funciona desde el código fuente, no en
+    el ejecutable.
+    """
+    times = {}
+
+    for _ in range(runs):
+        for name, elapsed in _profile_imports_once(modules).items():
+            times[name] = min(elapsed, times.get(name, elapsed))
+
+    return times
+
+
+def _profile_imports_once(modules) -> dict[str, float]:
+    root = Path(__file__).resolve().parent.parent
+
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "; ".join(f"import {module}" for module in modules),
+        ],
+        cwd=root,
+        capture_output=True,
+        text=True,
+    )
+
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    # import time: self [us] | cumulative | imported package
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1000
+
+    return times
+
+
+def record_import_profile(
+    profile_path: Path, modules=STARTUP_MODULES, top: int = 15
+) -> list[str]:
+    """
+    Mide las importaciones del arranque, las compara con la medición
+    anterior guardada en `profile_path` y guarda la nueva. Muestra los
+    módulos más lentos y devuelve los que empeoraron.
+    """
+    times = profile_imports(modules)
+
+    try:
+        previous = json.loads(Path(profile_path).read_text(encoding="utf-8"))
+        previous_times = previous["modules"]
+    except (OSError, ValueError, KeyError):
+        previous_times = {}
+
+    regressions = []
+    if previous_times:
+        new_modules = times.keys() - previous_times.keys()
+
+        for name, elapsed in times.items():
+            if name in modules:
+                before = previous_times.get(name, 0.0)
+                if elapsed - before > IMPORT_REGRESSION_MS and elapsed > before * (
+                    1 + IMPORT_REGRESSION_RATIO
+                ):
+                    regressions.append(name)
+            # De una librería nueva sólo se muestra el paquete, no sus módulos
+            elif (
+                name in new_modules
+                and name.rpartition(".")[0] not in new_modules
+                and elapsed > IMPORT_REGRESSION_MS
+            ):
+                regressions.append(name)
+
+    total = sum(times.get(module, 0.0) for module in modules)
+
+    print(Path(__file__).name, "-", f"Startup imports: {total:.0f} ms")
+    for name in sorted(times, key=times.get, reverse=True)[:top]:
+        print(f"  {times[name]:8.1f} ms  {name}")
+    for name in regressions:
+        print(
+            Path(__file__).name,
+            "-",
+            f"Import regression: {name} {previous_times.get(name, 0.0):.0f} ms "
+            f"-> {times[name]:.0f} ms",
+        )
+
+    Path(profile_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(profile_path).write_text(
+        json.dumps(
+            {
+                "python": sys.version.split()[0],
+                "total_ms": round(total, 1),
+                "modules": {name: round(value, 1) for name, value in times.items()},
+            },
+            indent=4,
+        ),
+        encoding="utf-8",
+    )
+
+    return regressions
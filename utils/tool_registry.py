@@ -0,0 +1,394 @@
+"""
+Registro de los programas externos: dónde están y qué versión tienen.
+
+Cada programa se busca una sola vez y el resultado se guarda en memoria y
+en `tools.json` dentro de la carpeta de datos de la aplicación, junto con
+la fecha de modificación de las carpetas y archivos de los que depende.
+Mientras no cambien (basta un stat para comprobarlo) y no hayan pasado
+PROBE_TTL segundos, el resultado se reutiliza, de modo que construir un
+comando nunca recorre la carpeta de programas. `rescan` descarta lo
+guardado y obliga a buscar de nuevo.
+
+Programas:
+
+- FastQC, Trimmomatic y SortMeRNA: en la carpeta de programas
+  (`path_programs()`); dependen de su fecha y de la de la carpeta del
+  programa.
+- Java y WSL: se ejecutan para conocer su versión; dependen del ejecutable
+  encontrado en el PATH.
+- Kraken2 y Krona: dentro de WSL; dependen del ejecutable de WSL, pero
+  como se instalan dentro de la máquina virtual sólo se vuelven a buscar
+  al caducar o con `rescan`.
+
+Las búsquedas que ejecutan programas pueden tardar (WSL arranca su máquina
+virtual), así que `get` debe llamarse fuera del hilo de la interfaz;
+`cached` devuelve lo guardado sin buscar y `probe_all` busca varios
+programas a la vez.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from .paths import get_app_data_path, path_programs
+
+REGISTRY_VERSION = 2
+
+# Segundos que se espera a un programa antes de darlo por no disponible
+PROBE_TIMEOUT = 30
+
+# Segundos que se reutiliza un resultado aunque no cambie ninguna de las
+# rutas de las que depende
+PROBE_TTL = 24 * 60 * 60
+
+_VERSION_PATTERN = re.compile(r"\d+(?:\.\d+)+")
+
+
+@dataclass
+class ToolInfo:
+    name: str
+    available: bool = False
+    # Ejecutable, .jar o script encontrado
+    path: Optional[Path] = None
+    # Carpeta del programa (directorio de trabajo de FastQC, adaptadores de
+    # Trimmomatic...)
+    folder: Optional[Path] = None
+    version: Optional[str] = None
+    # Fecha de modificación (ns) de las rutas de las que depende el resultado
+    stamps: dict[str, Optional[int]] = field(default_factory=dict)
+    # Momento de la búsqueda (time.time())
+    checked: float = field(default_factory=time.time)
+
+    def to_json(self) -> dict:
+        data = asdict(self)
+        data["path"] = self.path.as_posix() if self.path else None
+        data["folder"] = self.folder.as_posix() if self.folder else None
+        return data
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ToolInfo":
+        return cls(
+            name=data["name"],
+            available=data["available"],
+            path=Path(data["path"]) if data["path"] else None,
+            folder=Path(data["folder"]) if data["folder"] else None,
+            version=data["version"],
+            stamps=data["stamps"],
+            checked=data["checked"],
+        )
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _stamps(*paths: Optional[Path]) -> dict[str, Optional[int]]:
+    return {path.as_posix(): _mtime_ns(path) for path in paths if path is not None}
+
+
+def _version_from_name(*names: str) -> Optional[str]:
+    for name in names:
+        match = _VERSION_PATTERN.search(name)
+        if match is not None:
+            return match.group(0)
+    return None
+
+
+def _run(arguments: list[str]) -> Optional[str]:
+    """
+    Salida (stdout y stderr) de un comando, o None si no se pudo ejecutar,
+    falló o tardó demasiado.
+    """
+    try:
+        completed = subprocess.run(
+            arguments, capture_output=True, timeout=PROBE_TIMEOUT, check=True
+        )
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return None
+
+    output = completed.stdout + completed.stderr
+
+    # wsl.exe escribe en UTF-16
+    if b"\x00" in output:
+        return output.decode("utf-16-le", errors="ignore")
+    return output.decode(errors="ignore")
+
+
+# discovery
+
+
+def _find_program_folder(keyword: str) -> Optional[Path]:
+    """
+    Carpeta de path_programs() cuyo nombre contiene `keyword`.
+    """
+    base_dir = path_programs()
+
+    if not base_dir.is_dir():
+        return None
+
+    for entry in base_dir.iterdir():
+        if entry.is_dir() and keyword in entry.name.lower():
+            return entry
+
+    return None
+
+
+def _program_tool(name: str, folder: Optional[Path], path: Optional[Path]) -> ToolInfo:
+    return ToolInfo(
+        name=name,
+        available=path is not None,
+        path=path,
+        folder=folder,
+        version=_version_from_name(
+            path.name if path else "", folder.name if folder else ""
+        ),
+        stamps=_stamps(path_programs(), folder, path),
+    )
+
+
+def _discover_fastqc() -> ToolInfo:
+    folder = _find_program_folder("fastqc")
+    path = None
+
+    if folder is not None:
+        path = next(
+            (
+                entry
+                for entry in folder.glob("**/*")
+                if entry.is_file()
+                and "fastqc" in entry.name.lower()
+                and entry.suffix == ".bat"
+            ),
+            None,
+        )
+
+    return _program_tool("fastqc", folder, path)
+
+
+def _discover_trimmomatic() -> ToolInfo:
+    folder = _find_program_folder("trimmomatic")
+    path = None
+
+    if folder is not None:
+        # Cualquier .jar que contenga 'trimmomatic' en su nombre
+        path = next(iter(folder.glob("*trimmomatic*.jar")), None)
+
+    return _program_tool("trimmomatic", folder, path)
+
+
+def _discover_sortmerna() -> ToolInfo:
+    folder = _find_program_folder("sortmerna")
+    path = None
+
+    if folder is not None:
+        path = next(
+            (
+                entry
+                for entry in folder.glob("**/*")
+                if entry.is_file() and "sortmerna" in entry.name.lower()
+            ),
+            None,
+        )
+
+    return _program_tool("sortmerna", folder, path)
+
+
+def _discover_command(name: str, arguments: list[str]) -> ToolInfo:
+    executable = shutil.which(arguments[0])
+
+    if executable is None:
+        return ToolInfo(name=name)
+
+    output = _run([executable, *arguments[1:]])
+
+    if output is None:
+        return ToolInfo(name=name, stamps=_stamps(Path(executable)))
+
+    return ToolInfo(
+        name=name,
+        available=True,
+        path=Path(executable),
+        version=_version_from_name(output),
+        stamps=_stamps(Path(executable)),
+    )
+
+
+def _discover_java() -> ToolInfo:
+    # -version (no --version) también funciona con Java 8
+    return _discover_command("java", ["java", "-version"])
+
+
+def _discover_wsl() -> ToolInfo:
+    return _discover_command("wsl", ["wsl", "--version"])
+
+
+def _discover_wsl_command(name: str, command: str, version: bool) -> ToolInfo:
+    executable = shutil.which("wsl")
+
+    # Sin WSL no hace falta arrancar nada
+    if executable is None:
+        return ToolInfo(name=name)
+
+    script = f"command -v {command}"
+    if version:
+        script += f" && {command} --version"
+
+    output = _run([executable, "sh", "-c", script])
+
+    if not output:
+        return ToolInfo(name=name, stamps=_stamps(Path(executable)))
+
+    lines = output.strip().splitlines()
+
+    return ToolInfo(
+        name=name,
+        available=True,
+        # Ruta dentro de WSL
+        path=Path(lines[0].strip()),
+        version=_version_from_name(*lines[1:2]),
+        stamps=_stamps(Path(executable)),
+    )
+
+
+def _discover_kraken2() -> ToolInfo:
+    return _discover_wsl_command("kraken2", "kraken2", version=True)
+
+
+def _discover_krona() -> ToolInfo:
+    return _discover_wsl_command("krona", "ktImportText", version=False)
+
+
+TOOLS: dict[str, Callable[[], ToolInfo]] = {
+    "fastqc": _discover_fastqc,
+    "trimmomatic": _discover_trimmomatic,
+    "sortmerna": _discover_sortmerna,
+    "java": _discover_java,
+    "wsl": _discover_wsl,
+    "kraken2": _discover_kraken2,
+    "krona": _discover_krona,
+}
+
+# Se buscan ejecutando programas: si no se encuentran no se guarda en
+# disco, para volver a intentarlo en el siguiente arranque
+_PROBED_TOOLS = {"java", "wsl", "kraken2", "krona"}
+
+
+class ToolRegistry:
+    """
+    Resultados de la búsqueda de cada programa, guardados en `cache_path`
+    y válidos durante `ttl` segundos. Se puede usar desde varios hilos.
+    """
+
+    def __init__(self, cache_path: Path, ttl: float = PROBE_TTL):
+        self.cache_path = Path(cache_path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._tools: dict[str, ToolInfo] = self._load()
+
+    def _load(self) -> dict[str, ToolInfo]:
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if data.get("version") != REGISTRY_VERSION:
+                return {}
+            return {
+                name: ToolInfo.from_json(tool)
+                for name, tool in data["tools"].items()
+                if name in TOOLS
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _save(self):
+        data = {
+            "version": REGISTRY_VERSION,
+            "tools": {
+                name: tool.to_json()
+                for name, tool in self._tools.items()
+                if tool.available or name not in _PROBED_TOOLS
+            },
+        }
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.cache_path.with_name(f".{self.cache_path.name}.tmp")
+        temporary.write_text(json.dumps(data, indent=4), encoding="utf-8")
+        os.replace(temporary, self.cache_path)
+
+    def cached(self, name: str) -> Optional[ToolInfo]:
+        """
+        Resultado guardado del programa si sigue siendo válido, sin buscarlo.
+        """
+        with self._lock:
+            tool = self._tools.get(name)
+
+        if tool is None or not self._is_valid(tool):
+            return None
+
+        return tool
+
+    def get(self, name: str) -> ToolInfo:
+        """
+        Resultado del programa, buscándolo sólo si no hay uno válido.
+        """
+        tool = self.cached(name)
+
+        if tool is None:
+            tool = TOOLS[name]()
+
+            with self._lock:
+                self._tools[name] = tool
+                self._save()
+
+        return tool
+
+    def probe_all(self, names: Optional[Iterable[str]] = None) -> dict[str, ToolInfo]:
+        """
+        Resultado de varios programas (todos por defecto), buscando a la vez
+        los que no tienen uno válido. Bloquea hasta que terminan todos.
+        """
+        names = list(TOOLS if names is None else names)
+
+        with ThreadPoolExecutor(max_workers=max(len(names), 1)) as executor:
+            return dict(zip(names, executor.map(self.get, names)))
+
+    def rescan(self, name: Optional[str] = None):
+        """
+        Descarta lo guardado de un programa (o de todos) para volver a buscarlo.
+        """
+        with self._lock:
+            if name is None:
+                self._tools.clear()
+            else:
+                self._tools.pop(name, None)
+            self._save()
+
+    def _is_valid(self, tool: ToolInfo) -> bool:
+        if not 0 <= time.time() - tool.checked < self.ttl:
+            return False
+
+        return all(
+            _mtime_ns(Path(path)) == mtime_ns for path, mtime_ns in tool.stamps.items()
+        )
+
+
+_registry: Optional[ToolRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tool_registry() -> ToolRegistry:
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = ToolRegistry(get_app_data_path() / "tools.json")
+
+    return _registry
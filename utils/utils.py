@@ -58,7 +58,13 @@ def win_to_wsl(p: Path) -> Path:
 
 
 def split_name(name: str):
-    return name.removesuffix(".tar")
+    """
+    Nombre de la carpeta en la que se extrae un archivo .tar (comprimido o no).
+    """
+    for suffix in (".tar.gz", ".tgz", ".tar.zst", ".tar.bz2", ".tar.xz", ".tar"):
+        if name.endswith(suffix):
+            return name.removesuffix(suffix)
+    return name
 
 
 def strip_any_suffix(text: str, sep: str = ".") -> str:
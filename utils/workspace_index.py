@@ -0,0 +1,532 @@
+"""
+Índice persistente de los archivos del workspace.
+
+Un archivo SQLite en la carpeta del workspace guarda, por cada archivo de
+las carpetas de las etapas (source, trimmed, sorted, krakened), su etapa,
+tamaño y fecha de modificación, y de qué archivos se generó (linaje). Así
+listar los archivos de una etapa es una consulta y no un recorrido de
+todas las carpetas por cada extensión.
+
+El índice se mantiene al día así:
+
+- Al abrirlo se reconcilia con el disco: sólo se vuelven a listar las
+  carpetas cuya fecha de modificación cambió (crear, borrar o renombrar un
+  archivo la cambia); del resto basta con un stat de la carpeta y de sus
+  archivos, que pueden haberse reescrito sin que la carpeta cambie.
+- `WorkspaceWatcher` vigila las carpetas con QFileSystemWatcher y vuelve a
+  listar las que cambian.
+- La cola de trabajos y el panel de inicio avisan de las carpetas que
+  cambiaron (`record_outputs`, `mark_workspace_folders_dirty`), que se
+  vuelven a listar en el momento.
+
+Las consultas sólo leen el índice, sin tocar el disco: su coste no depende
+del número de archivos del workspace. `reconcile` lo pone al día a petición.
+"""
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+from .paths import SEQUENCE_FILE_EXTENSIONS, get_current_workspace_folder_path
+
+INDEX_FILE_NAME = ".workspace_index.sqlite3"
+# 2: las extensiones se comparan sin distinguir mayúsculas
+INDEX_VERSION = 2
+
+# Carpeta de cada etapa dentro del workspace y extensiones que se indexan
+STAGE_EXTENSIONS = {
+    "source": tuple("." + ext for ext in SEQUENCE_FILE_EXTENSIONS),
+    "trimmed": tuple("." + ext for ext in SEQUENCE_FILE_EXTENSIONS),
+    "sorted": tuple("." + ext for ext in SEQUENCE_FILE_EXTENSIONS),
+    "krakened": (".html", ".txt"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    stage TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_stage ON files (stage);
+CREATE INDEX IF NOT EXISTS files_folder ON files (folder);
+CREATE TABLE IF NOT EXISTS folders (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS folders_parent ON folders (parent);
+CREATE TABLE IF NOT EXISTS lineage (
+    path TEXT NOT NULL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (path, source)
+);
+"""
+
+
+@dataclass
+class IndexedFile:
+    path: Path
+    stage: str
+    size: int
+    mtime_ns: int
+
+
+class WorkspaceIndex:
+    """
+    Índice SQLite de los archivos de un workspace. Las rutas se guardan
+    relativas al workspace, de modo que sigue siendo válido si se mueve.
+    Se puede usar desde varios hilos.
+    """
+
+    def __init__(self, workspace: Path):
+        self.workspace = Path(workspace)
+        self.path = self.workspace / INDEX_FILE_NAME
+
+        self._lock = threading.RLock()
+        self._dirty: set[Path] = set()
+        self._connection = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            connection = self._open()
+        except sqlite3.DatabaseError:
+            # Archivo dañado: el índice se reconstruye desde el disco
+            self.path.unlink(missing_ok=True)
+            connection = self._open()
+
+        return connection
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+
+        if connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            connection.executescript(
+                "DROP TABLE IF EXISTS files;"
+                "DROP TABLE IF EXISTS folders;"
+                "DROP TABLE IF EXISTS lineage;"
+            )
+            connection.execute(f"PRAGMA user_version={INDEX_VERSION}")
+
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    # paths
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return Path(path).relative_to(self.workspace).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
+
+    def _absolute(self, path: str) -> Path:
+        return self.workspace / path
+
+    # queries
+
+    def files(self, *stages: str) -> list[Path]:
+        """
+        Archivos de las etapas indicadas (todas si no se indica ninguna),
+        ordenados.
+        """
+        with self._lock:
+            query = "SELECT path FROM files"
+            if stages:
+                query += f" WHERE stage IN ({_placeholders(stages)})"
+
+            # Ordenadas por SQLite: ordenar miles de Path en Python cuesta más
+            # que la consulta
+            rows = self._connection.execute(query + " ORDER BY path", stages)
+
+            return [self._absolute(path) for path, in rows]
+
+    def file(self, path: Path) -> Optional[IndexedFile]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT stage, size, mtime_ns FROM files WHERE path = ?",
+                (self._relative(path),),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return IndexedFile(Path(path), *row)
+
+    def folders(self) -> list[Path]:
+        """
+        Carpetas indexadas, las que vigila `WorkspaceWatcher`.
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT path FROM folders").fetchall()
+
+        return [self._absolute(path) for path, in rows]
+
+    def sources(self, path: Path) -> list[Path]:
+        """
+        Archivos a partir de los que se generó `path`.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT source FROM lineage WHERE path = ?", (self._relative(path),)
+            ).fetchall()
+
+        return sorted(self._absolute(source) for source, in rows)
+
+    def derived(self, path: Path) -> list[Path]:
+        """
+        Archivos generados a partir de `path`.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path FROM lineage WHERE source = ?", (self._relative(path),)
+            ).fetchall()
+
+        return sorted(self._absolute(output) for output, in rows)
+
+    # updates
+
+    def mark_dirty(self, folder: Path):
+        """
+        Marca una carpeta para volver a listarla en el siguiente `refresh_dirty`.
+        """
+        with self._lock:
+            self._dirty.add(Path(folder))
+
+    def record_outputs(self, outputs: Iterable[Path], sources: Iterable[Path]):
+        """
+        Anota los archivos que generó un trabajo y de qué archivos salieron.
+        """
+        outputs = [Path(output) for output in outputs]
+        sources = [self._relative(source) for source in sources]
+
+        with self._lock:
+            for output in outputs:
+                self._dirty.add(output if output.is_dir() else output.parent)
+
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO lineage (path, source) VALUES (?, ?)",
+                    [
+                        (self._relative(output), source)
+                        for output in outputs
+                        for source in sources
+                    ],
+                )
+
+            self.refresh_dirty()
+
+    def reconcile(self, restat_files: bool = True):
+        """
+        Pone el índice al día con el disco. Las carpetas que no cambiaron
+        desde la última vez sólo cuestan un stat y, con `restat_files`, uno
+        por archivo para ver los que se reescribieron en su sitio.
+        """
+        with self._lock, self._connection:
+            known = {
+                path: (parent, mtime_ns)
+                for path, parent, mtime_ns in self._connection.execute(
+                    "SELECT path, parent, mtime_ns FROM folders"
+                )
+            }
+            children: dict[str, list[str]] = {}
+            for path, (parent, _) in known.items():
+                children.setdefault(parent, []).append(path)
+
+            stack = []
+            for stage in STAGE_EXTENSIONS:
+                if (self.workspace / stage).is_dir():
+                    stack.append(stage)
+                elif stage in known:
+                    self._forget_folder(stage)
+
+            while stack:
+                folder = stack.pop()
+
+                try:
+                    mtime_ns = os.stat(self._absolute(folder)).st_mtime_ns
+                except OSError:
+                    self._forget_folder(folder)
+                    continue
+
+                if folder in known and known[folder][1] == mtime_ns:
+                    if restat_files:
+                        self._restat_files(folder)
+                    stack.extend(children.get(folder, []))
+                else:
+                    stack.extend(self._scan_folder(folder))
+
+            self._dirty.clear()
+
+    def refresh_dirty(self):
+        """
+        Vuelve a listar las carpetas marcadas como pendientes.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+
+            dirty, self._dirty = self._dirty, set()
+
+            if self.workspace in dirty:
+                # Se creó o borró la carpeta de una etapa
+                self.reconcile(restat_files=False)
+                return
+
+            with self._connection:
+                for folder in dirty:
+                    relative = self._relative(folder)
+
+                    if not folder.is_dir():
+                        self._forget_folder(relative)
+                        continue
+
+                    stack = [relative]
+                    while stack:
+                        stack.extend(self._scan_folder(stack.pop()))
+
+    def _scan_folder(self, folder: str) -> list[str]:
+        """
+        Vuelve a listar una carpeta y devuelve sus subcarpetas.
+        """
+        stage = folder.split("/", 1)[0]
+        extensions = STAGE_EXTENSIONS.get(stage)
+
+        if extensions is None:
+            return []
+
+        path = self._absolute(folder)
+        files = []
+        subfolders = []
+
+        try:
+            entries = list(os.scandir(path))
+        except FileNotFoundError:
+            self._forget_folder(folder)
+            return []
+
+        for entry in entries:
+            # Carpetas ocultas como .staging
+            if entry.name.startswith("."):
+                continue
+
+            relative = f"{folder}/{entry.name}"
+
+            if entry.is_dir(follow_symlinks=False):
+                subfolders.append(relative)
+            elif entry.name.lower().endswith(extensions) and entry.is_file():
+                stat = entry.stat()
+                files.append((relative, stage, folder, stat.st_size, stat.st_mtime_ns))
+
+        current = {relative for relative, *_ in files}
+        removed = [
+            relative
+            for relative, in self._connection.execute(
+                "SELECT path FROM files WHERE folder = ?", (folder,)
+            )
+            if relative not in current
+        ]
+
+        self._connection.executemany(
+            "DELETE FROM lineage WHERE path = ?", [(path,) for path in removed]
+        )
+        self._connection.execute("DELETE FROM files WHERE folder = ?", (folder,))
+        self._connection.executemany(
+            "INSERT INTO files (path, stage, folder, size, mtime_ns)"
+            " VALUES (?, ?, ?, ?, ?)",
+            files,
+        )
+
+        for (relative,) in self._connection.execute(
+            "SELECT path FROM folders WHERE parent = ?", (folder,)
+        ).fetchall():
+            if relative not in subfolders:
+                self._forget_folder(relative)
+
+        self._connection.execute(
+            "INSERT OR REPLACE INTO folders (path, parent, mtime_ns) VALUES (?, ?, ?)",
+            (folder, folder.rpartition("/")[0] or None, os.stat(path).st_mtime_ns),
+        )
+
+        return subfolders
+
+    def _restat_files(self, folder: str):
+        """
+        Actualiza el tamaño y la fecha de los archivos de `folder` que se
+        reescribieron en su sitio.
+        """
+        changed = []
+        removed = []
+
+        for relative, size, mtime_ns in self._connection.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE folder = ?", (folder,)
+        ).fetchall():
+            try:
+                stat = os.stat(self._absolute(relative))
+            except OSError:
+                removed.append((relative,))
+                continue
+
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                changed.append((stat.st_size, stat.st_mtime_ns, relative))
+
+        self._connection.executemany(
+            "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", changed
+        )
+        self._connection.executemany("DELETE FROM files WHERE path = ?", removed)
+        self._connection.executemany("DELETE FROM lineage WHERE path = ?", removed)
+
+    def _forget_folder(self, folder: str):
+        """
+        Quita del índice una carpeta que ya no existe y todo su contenido.
+        """
+        below = folder.replace("%", r"\%").replace("_", r"\_") + "/%"
+
+        self._connection.execute(
+            "DELETE FROM lineage WHERE path IN (SELECT path FROM files"
+            " WHERE folder = ? OR folder LIKE ? ESCAPE '\\')",
+            (folder, below),
+        )
+        self._connection.execute(
+            "DELETE FROM files WHERE folder = ? OR folder LIKE ? ESCAPE '\\'",
+            (folder, below),
+        )
+        self._connection.execute(
+            "DELETE FROM folders WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+            (folder, below),
+        )
+
+
+def _placeholders(values: Iterable) -> str:
+    return ", ".join("?" for _ in values)
+
+
+_indexes: dict[Path, WorkspaceIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_workspace_index() -> Optional[WorkspaceIndex]:
+    """
+    Índice del workspace actual, abierto (y reconciliado) la primera vez que
+    se pide. Devuelve None si no hay workspace.
+    """
+    workspace = get_current_workspace_folder_path()
+
+    if not workspace or not workspace.is_dir():
+        return None
+
+    with _indexes_lock:
+        index = _indexes.get(workspace)
+
+        if index is None:
+            index = WorkspaceIndex(workspace)
+            index.reconcile()
+            _indexes[workspace] = index
+
+    return index
+
+
+def close_workspace_index(workspace: Path):
+    """
+    Cierra el índice de un workspace (por ejemplo antes de borrarlo).
+    """
+    with _indexes_lock:
+        index = _indexes.pop(Path(workspace), None)
+
+    if index is not None:
+        index.close()
+
+
+def mark_workspace_folders_dirty(*folders: Path):
+    """
+    Avisa al índice del workspace actual de que cambiaron estas carpetas y
+    las vuelve a listar, sin esperar a QFileSystemWatcher.
+    """
+    index = get_workspace_index()
+
+    if index is not None:
+        for folder in folders:
+            index.mark_dirty(folder)
+        index.refresh_dirty()
+
+
+class WorkspaceWatcher(QObject):
+    """
+    Mantiene al día el índice del workspace actual: vigila sus carpetas con
+    QFileSystemWatcher y emite `changed` cuando cambian los archivos.
+    """
+
+    changed = Signal()
+
+    # Los cambios seguidos (una herramienta escribiendo varios archivos)
+    # se agrupan en una sola actualización
+    DELAY_MS = 300
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index: Optional[WorkspaceIndex] = None
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DELAY_MS)
+        self._timer.timeout.connect(self._on_timeout)
+
+        self.watch_current_workspace()
+
+    def watch_current_workspace(self):
+        index = get_workspace_index()
+
+        if index is self.index:
+            return
+
+        self.stop()
+
+        self.index = index
+        if index is not None:
+            self._watch_folders()
+
+    def stop(self):
+        self.index = None
+
+        watched = self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+
+    def _watch_folders(self):
+        folders = {self.index.workspace.as_posix()}
+        folders.update(folder.as_posix() for folder in self.index.folders())
+
+        watched = set(self._watcher.directories())
+
+        if watched - folders:
+            self._watcher.removePaths(list(watched - folders))
+        if folders - watched:
+            self._watcher.addPaths(list(folders - watched))
+
+    def _on_directory_changed(self, path: str):
+        if self.index is None:
+            return
+
+        # Se vuelve a listar al vencer el temporizador, con el resto de cambios
+        self.index.mark_dirty(Path(path))
+        self._timer.start()
+
+    def _on_timeout(self):
+        if self.index is None:
+            return
+
+        self.index.refresh_dirty()
+        self._watch_folders()
+        self.changed.emit()
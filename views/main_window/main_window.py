@@ -46,6 +46,8 @@ class MainWindow(QMainWindow):
         self.main_layout.addWidget(self.content, 1)
 
     def changePanel(self, index):
+        # Los paneles se construyen la primera vez que se abren
+        self.content.ensure_panel(index)
         if index != self.content.main_layout.currentIndex():
             self.content.main_layout.setCurrentIndex(index)
 
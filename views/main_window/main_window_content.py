@@ -1,3 +1,6 @@
+import time
+from pathlib import Path
+from typing import Any, Callable
 from PySide6.QtWidgets import (
     QWidget,
     QSizePolicy,
@@ -6,6 +9,7 @@ from PySide6.QtWidgets import (
     QStackedLayout,
 )
 from PySide6.QtGui import QPainter
+from PySide6.QtCore import Signal
 from .panels import HomePanel
 from .panels import TrimmomaticPanel
 from .panels import FastqcPanel
@@ -13,8 +17,44 @@ from .panels import SortMeRnaPanel
 from .panels import KrakenPanel
 from .panels import SettingsPanel
 
+# Índices de los paneles, los mismos que los botones de la barra lateral
+HOME, FASTQC, TRIMMOMATIC, SORTMERNA, KRAKEN, SETTINGS = range(6)
+
+
+def _lazy_panel(index: int) -> property:
+    return property(lambda self: self.ensure_panel(index)[0])
+
+
+def _lazy_controller(index: int) -> property:
+    return property(lambda self: self.ensure_panel(index)[1])
+
 
 class MainWindowContent(QWidget):
+    """
+    Paneles de la ventana principal.
+
+    Al arrancar sólo se construye el panel de inicio; el resto (y sus
+    controladores) se construye la primera vez que se navega a él o se usa
+    uno de sus atributos, así abrir un workspace no espera a las páginas de
+    opciones, hojas de estilo y lecturas de disco de paneles que quizá no se
+    abran. Hasta entonces su índice lo ocupa un widget vacío.
+    """
+
+    # Primera vez que se pinta (el tiempo de arranque se mide hasta aquí)
+    first_painted = Signal()
+
+    home_panel = _lazy_panel(HOME)
+    home_panel_controller = _lazy_controller(HOME)
+    fastqc_panel = _lazy_panel(FASTQC)
+    fastqc_panel_controller = _lazy_controller(FASTQC)
+    trimmomatic_panel = _lazy_panel(TRIMMOMATIC)
+    trimmomatic_panel_controller = _lazy_controller(TRIMMOMATIC)
+    sort_me_rna = _lazy_panel(SORTMERNA)
+    sort_me_rna_controller = _lazy_controller(SORTMERNA)
+    kraken2 = _lazy_panel(KRAKEN)
+    kraken2_controller = _lazy_controller(KRAKEN)
+    settings_panel = _lazy_panel(SETTINGS)
+    settings_panel_controller = _lazy_controller(SETTINGS)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -22,6 +62,8 @@ class MainWindowContent(QWidget):
         self.setObjectName("Content")
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
 
+        self._painted = False
+
         self.setupUi()
 
     def setupUi(self):
@@ -29,61 +71,109 @@ class MainWindowContent(QWidget):
         self.main_layout = QStackedLayout(self)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.setSpacing(0)
-        self.main_layout.setCurrentIndex(1)
 
         ## panels
-        # home panel
 
+        self._factories: dict[int, Callable[[], tuple[QWidget, Any]]] = {
+            HOME: self._create_home_panel,
+            FASTQC: self._create_fastqc_panel,
+            TRIMMOMATIC: self._create_trimmomatic_panel,
+            SORTMERNA: self._create_sortmerna_panel,
+            KRAKEN: self._create_kraken_panel,
+            SETTINGS: self._create_settings_panel,
+        }
+        self._panels: dict[int, tuple[QWidget, Any]] = {}
+
+        for _ in self._factories:
+            self.main_layout.addWidget(QWidget(self))
+
+        self.ensure_panel(HOME)
+        self.main_layout.setCurrentIndex(HOME)
+
+    def ensure_panel(self, index: int) -> tuple[QWidget, Any]:
+        """
+        Panel y controlador del índice, construyéndolos si aún no existen.
+        """
+        if index in self._panels:
+            return self._panels[index]
+
+        started = time.perf_counter()
+
+        panel, controller = self._factories[index]()
+        self._panels[index] = (panel, controller)
+
+        placeholder = self.main_layout.widget(index)
+        current = self.main_layout.currentWidget()
+
+        self.main_layout.insertWidget(index, panel)
+        self.main_layout.removeWidget(placeholder)
+        placeholder.deleteLater()
+
+        self.main_layout.setCurrentWidget(panel if current is placeholder else current)
+
+        print(
+            Path(__file__).name,
+            "-",
+            f"{type(panel).__name__} created in "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms",
+        )
+
+        return panel, controller
+
+    # home panel
+
+    def _create_home_panel(self):
         from controllers import HomePanelController
 
-        self.home_panel = HomePanel(self)
-        self.home_panel_controller = HomePanelController(self.home_panel)
-        self.main_layout.addWidget(self.home_panel)
+        panel = HomePanel(self)
+        return panel, HomePanelController(panel)
 
-        # fastqc panel
+    # fastqc panel
 
+    def _create_fastqc_panel(self):
         from controllers import FastQCPanelController
 
-        self.fastqc_panel = FastqcPanel(self)
-        self.fastqc_panel_controller = FastQCPanelController(self.fastqc_panel)
-        self.main_layout.addWidget(self.fastqc_panel)
+        panel = FastqcPanel(self)
+        return panel, FastQCPanelController(panel)
 
-        # trimmomatic panel
+    # trimmomatic panel
 
+    def _create_trimmomatic_panel(self):
         from controllers import TrimmomaticPanelController
 
-        self.trimmomatic_panel = TrimmomaticPanel(self)
-        self.trimmomatic_panel_controller = TrimmomaticPanelController(
-            self.trimmomatic_panel
-        )
-        self.main_layout.addWidget(self.trimmomatic_panel)
+        panel = TrimmomaticPanel(self)
+        return panel, TrimmomaticPanelController(panel)
 
-        # sort me rna panel
+    # sort me rna panel
 
+    def _create_sortmerna_panel(self):
         from controllers import SortMeRnaPanelController
 
-        self.sort_me_rna = SortMeRnaPanel(self)
-        self.sort_me_rna_controller = SortMeRnaPanelController(self.sort_me_rna)
-        self.main_layout.addWidget(self.sort_me_rna)
+        panel = SortMeRnaPanel(self)
+        return panel, SortMeRnaPanelController(panel)
 
-        # kraken2 panel
+    # kraken2 panel
 
+    def _create_kraken_panel(self):
         from controllers import KrakenPanelController
 
-        self.kraken2 = KrakenPanel(self)
-        self.kraken2_controller = KrakenPanelController(self.kraken2)
-        self.main_layout.addWidget(self.kraken2)
+        panel = KrakenPanel(self)
+        return panel, KrakenPanelController(panel)
 
-        # settings panel
+    # settings panel
 
+    def _create_settings_panel(self):
         from controllers import SettingsPanelController
 
-        self.settings_panel = SettingsPanel(self)
-        self.settings_panel_controller = SettingsPanelController(self.settings_panel)
-        self.main_layout.addWidget(self.settings_panel)
+        panel = SettingsPanel(self)
+        return panel, SettingsPanelController(panel)
 
     def paintEvent(self, _):
         opt = QStyleOption()
         opt.initFrom(self)
         p = QPainter(self)
         self.style().drawPrimitive(QStyle.PE_Widget, opt, p, self)
+
+        if not self._painted:
+            self._painted = True
+            self.first_painted.emit()
@@ -1,4 +1,5 @@
 from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon
 from views.widgets import PanelHeadBase, ActionButtonWidget
 
 
@@ -20,6 +21,18 @@ class FastqcPanelHead(PanelHeadBase):
         self.user_manual_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.main_layout.addWidget(self.user_manual_button)
 
+        # built-in engine button
+
+        self.builtin_engine_button = ActionButtonWidget(
+            icon_path=":/assets/fast_outlined.svg",
+            tooltip="Usar el análisis integrado (sin FastQC ni Java)",
+            parent=self,
+        )
+        self.builtin_engine_button.setCheckable(True)
+        self.builtin_engine_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.builtin_engine_button.toggled.connect(self._on_builtin_engine_toggled)
+        self.main_layout.addWidget(self.builtin_engine_button)
+
         # cli push button
 
         self.cli_push_button = ActionButtonWidget(
@@ -29,3 +42,18 @@ class FastqcPanelHead(PanelHeadBase):
         )
         self.cli_push_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.main_layout.addWidget(self.cli_push_button)
+
+        # batch button
+
+        self.batch_button = ActionButtonWidget(
+            icon_path=":/assets/add_file_filled.svg",
+            tooltip="Procesar varias muestras en lote",
+            parent=self,
+        )
+        self.batch_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.main_layout.addWidget(self.batch_button)
+
+    def _on_builtin_engine_toggled(self, checked: bool):
+        self.builtin_engine_button.setIcon(
+            QIcon(":/assets/fast.svg" if checked else ":/assets/fast_outlined.svg")
+        )
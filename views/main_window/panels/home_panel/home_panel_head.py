@@ -11,6 +11,15 @@ class HomePanelHead(PanelHeadBase):
     def setup_ui(self):
         super().setup_ui()
 
+        # pipeline button
+        self.pipeline_button = ActionButtonWidget(
+            icon_path=":/assets/play.svg",
+            tooltip="Ejecutar el pipeline completo por muestra",
+            parent=self,
+        )
+        self.pipeline_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.main_layout.addWidget(self.pipeline_button)
+
         # user manual button
         self.user_manual_button = ActionButtonWidget(
             icon_path=":/assets/user_manual.svg",
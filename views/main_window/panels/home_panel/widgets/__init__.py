@@ -2,4 +2,3 @@ from .current_workspace import CurrentWorkspace
 from .workspace_files_widget import WorkspaceFilesWidget
 from .upload_files_push_button import UploadFilesPushButton
 from .workspace_files_page import WorkspaceFilesPage
-from .workspace_file_item_widget import WorkspaceFileItemWidget
@@ -12,7 +12,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QGuiApplication, QPainter, QIcon
 from PySide6.QtCore import Qt, QFile, QTextStream
-from views.widgets import ListWidget
+from views.widgets import FileListView
 
 
 class WorkspaceFilesPage(QWidget):
@@ -100,10 +100,16 @@ class WorkspaceFilesPage(QWidget):
         self.filter_button_group.addButton(self.analyzed_button)
         filter_layout.addWidget(self.analyzed_button) """
 
-        # scroll area
+        # file list
 
-        self.list_widget = ListWidget(self)
-        self.main_layout.addWidget(self.list_widget)
+        self.file_list_view = FileListView(
+            self,
+            actions=True,
+            details=True,
+            open_tooltip="Abrir carpeta de archivo",
+            delete_tooltip="Eliminar archivo",
+        )
+        self.main_layout.addWidget(self.file_list_view)
 
     def load_stylesheet(self, scheme: Qt.ColorScheme):
         qss_file = QFile(
@@ -47,6 +47,17 @@ class KrakenPanelHead(PanelHeadBase):
         self.star_button.setVisible(False)  # Initially hidden
         self.main_layout.addWidget(self.star_button)
 
+        # batch button
+
+        self.batch_button = ActionButtonWidget(
+            icon_path=":/assets/add_file_filled.svg",
+            tooltip="Procesar varias muestras en lote",
+            parent=self,
+        )
+        self.batch_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.batch_button.setVisible(False)  # Initially hidden
+        self.main_layout.addWidget(self.batch_button)
+
         # database button
 
         self.database_download_manager_button = ActionButtonWidget(
@@ -14,7 +14,7 @@ from PySide6.QtCore import Qt, QFile, QTextStream
 from views.widgets import (
     OperationModeWidget,
     SelectFilePushButton,
-    ListWidget,
+    FileListView,
     LoadingWidget,
 )
 
@@ -158,7 +158,12 @@ class FilesPage(QWidget):
         )
         self.previous_reports_container_layout.addWidget(self.previous_reports_label)
 
-        self.previous_reports_list_widget = ListWidget(self)
+        self.previous_reports_list_widget = FileListView(
+            self,
+            actions=True,
+            open_tooltip="Abrir carpeta de reporte",
+            delete_tooltip="Eliminar reporte",
+        )
         self.previous_reports_list_widget.setVisible(False)
         self.previous_reports_container_layout.addWidget(
             self.previous_reports_list_widget
@@ -82,6 +82,33 @@ class OptionsPage(QWidget):
         )
         self.container_layout.addWidget(self.memory_mapping, 3, 0, 1, 1)
 
+        self.preload_database = OptionWidget(
+            self,
+            "Preload Database",
+        )
+        self.preload_database.setToolTip(
+            "Mantiene la base de datos en memoria entre ejecuciones"
+        )
+        self.container_layout.addWidget(self.preload_database, 4, 0, 1, 1)
+
+        self.save_output = OptionWidget(
+            self,
+            "Save Output",
+        )
+        self.save_output.setToolTip(
+            "Guarda la clasificación de cada lectura en un archivo comprimido"
+        )
+        self.container_layout.addWidget(self.save_output, 5, 0, 1, 1)
+
+        self.live_counters = OptionWidget(
+            self,
+            "Live Counters",
+        )
+        self.live_counters.setToolTip(
+            "Muestra las lecturas procesadas y clasificadas durante la ejecución"
+        )
+        self.container_layout.addWidget(self.live_counters, 6, 0, 1, 1)
+
         # column 1
 
         self.confidence = DecimalSelectorOptionWidget(
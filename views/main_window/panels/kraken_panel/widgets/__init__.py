@@ -1 +1,18 @@
-from .previous_report_item_widget import PreviousReportItemWidget
+import importlib
+
+# El navegador de reportes usa NumPy: se carga la primera vez que se usa
+_LAZY_NAMES = {
+    "TaxonomyTreeModel": ".taxonomy_tree_model",
+    "ReportBrowserWidget": ".report_browser_widget",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_NAMES.get(name)
+
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
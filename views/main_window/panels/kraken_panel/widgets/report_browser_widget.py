@@ -0,0 +1,129 @@
+from typing import TYPE_CHECKING, Optional
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QSpinBox,
+    QTreeView,
+    QHeaderView,
+)
+from PySide6.QtCore import Qt, QTimer
+from .taxonomy_tree_model import TaxonomyTreeModel
+
+if TYPE_CHECKING:
+    from utils import KrakenReport
+
+
+class ReportBrowserWidget(QWidget):
+    """
+    Navegador de un reporte de Kraken2: árbol taxonómico con orden por
+    columna, búsqueda por nombre o TaxID y mínimo de lecturas.
+    No necesita Krona ni WSL.
+    """
+
+    # Con menos taxones visibles que esto, una búsqueda expande todo el árbol
+    EXPAND_LIMIT = 5000
+
+    def __init__(self, report: Optional["KrakenReport"] = None, parent: QWidget = None):
+        super().__init__(parent)
+        self.setup_ui()
+        self.set_report(report)
+
+    def setup_ui(self):
+        self.setObjectName("ReportBrowserWidget")
+
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(10, 10, 10, 10)
+        self.main_layout.setSpacing(10)
+        self.setLayout(self.main_layout)
+
+        # filters
+
+        self.filters_layout = QHBoxLayout()
+        self.filters_layout.setSpacing(10)
+        self.main_layout.addLayout(self.filters_layout)
+
+        self.search_line_edit = QLineEdit(self)
+        self.search_line_edit.setObjectName("SearchLineEdit")
+        self.search_line_edit.setPlaceholderText("Buscar taxón o TaxID...")
+        self.search_line_edit.setClearButtonEnabled(True)
+        self.filters_layout.addWidget(self.search_line_edit, 1)
+
+        self.min_reads_label = QLabel("Mínimo de lecturas", self)
+        self.filters_layout.addWidget(self.min_reads_label)
+
+        self.min_reads_spin_box = QSpinBox(self)
+        self.min_reads_spin_box.setRange(0, 2_000_000_000)
+        self.min_reads_spin_box.setGroupSeparatorShown(True)
+        self.filters_layout.addWidget(self.min_reads_spin_box)
+
+        # tree
+
+        self.model = TaxonomyTreeModel(parent=self)
+
+        self.tree_view = QTreeView(self)
+        self.tree_view.setObjectName("TaxonomyTreeView")
+        self.tree_view.setModel(self.model)
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.setSortingEnabled(True)
+        self.tree_view.sortByColumn(-1, Qt.SortOrder.AscendingOrder)
+        self.tree_view.setAlternatingRowColors(True)
+        self.tree_view.header().setStretchLastSection(False)
+        self.tree_view.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column in range(1, len(TaxonomyTreeModel.COLUMNS)):
+            self.tree_view.header().setSectionResizeMode(
+                column, QHeaderView.ResizeMode.ResizeToContents
+            )
+        self.main_layout.addWidget(self.tree_view, 1)
+
+        self.summary_label = QLabel(self)
+        self.summary_label.setObjectName("SummaryLabel")
+        self.main_layout.addWidget(self.summary_label)
+
+        # El filtro se aplica cuando se deja de escribir
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(200)
+        self.filter_timer.timeout.connect(self._apply_filter)
+
+        self.search_line_edit.textChanged.connect(lambda _: self.filter_timer.start())
+        self.min_reads_spin_box.valueChanged.connect(
+            lambda _: self.filter_timer.start()
+        )
+
+    def set_report(self, report: Optional["KrakenReport"]):
+        self.model.set_report(report)
+
+        if report is None:
+            self.summary_label.clear()
+            return
+
+        classified = int(
+            sum(
+                report.clade_reads[root]
+                for root in report.roots
+                if report.rank(int(root)) != "U"
+            )
+        )
+        total = report.total_reads
+
+        self.summary_label.setText(
+            f"{len(report):,} taxones · {total:,} lecturas · "
+            f"{(100 * classified / total if total else 0):.2f}% clasificadas"
+        )
+
+        # Se expanden las raíces (root y unclassified)
+        for row in range(self.model.rowCount()):
+            self.tree_view.expand(self.model.index(row, 0))
+
+    def _apply_filter(self):
+        text = self.search_line_edit.text()
+        self.model.set_filter(text, self.min_reads_spin_box.value())
+
+        if text.strip() and self.model.visible_count() <= self.EXPAND_LIMIT:
+            self.tree_view.expandAll()
+        else:
+            for row in range(self.model.rowCount()):
+                self.tree_view.expand(self.model.index(row, 0))
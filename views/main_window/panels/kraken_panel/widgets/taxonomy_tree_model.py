@@ -0,0 +1,321 @@
+from typing import TYPE_CHECKING, Any, Optional
+import numpy as np
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+if TYPE_CHECKING:
+    from utils import KrakenReport
+
+# Orden de los rangos de Kraken2, de más general a más específico
+RANK_ORDER = "URDKPCOFGS"
+
+
+class TaxonomyTreeModel(QAbstractItemModel):
+    """
+    Modelo de árbol sobre un `KrakenReport`.
+
+    Los nodos se identifican por su índice en los arreglos del reporte
+    (internalId del QModelIndex), así que el modelo no crea un objeto por
+    taxón. Los hijos se exponen bajo demanda con canFetchMore/fetchMore y el
+    orden y el filtro se calculan con NumPy sobre todo el árbol, por lo que
+    reportes con decenas de miles de taxones se recorren al instante.
+    """
+
+    COLUMNS = (
+        "Nombre",
+        "Rango",
+        "TaxID",
+        "Lecturas (clado)",
+        "Lecturas (directas)",
+        "%",
+    )
+
+    def __init__(self, report: Optional["KrakenReport"] = None, parent=None):
+        super().__init__(parent)
+        self._report: Optional["KrakenReport"] = None
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self._filter_text = ""
+        self._min_reads = 0
+        self._name_keys: Optional[np.ndarray] = None
+
+        self.set_report(report)
+
+    # data
+
+    @property
+    def report(self) -> Optional["KrakenReport"]:
+        return self._report
+
+    def set_report(self, report: Optional["KrakenReport"]):
+        self.beginResetModel()
+        self._report = report
+        self._name_keys = None
+        self._lower_names = (
+            np.char.lower(report.names) if report is not None else np.array([])
+        )
+        self._visible = np.ones(len(report), dtype=bool) if report is not None else None
+        self._rebuild()
+        self.endResetModel()
+
+    def set_filter(self, text: str = "", min_reads: int = 0):
+        """
+        Muestra los taxones cuyo nombre contiene `text` (o cuyo TaxID es
+        `text`) con al menos `min_reads` lecturas en el clado, junto con sus
+        ancestros. Con texto, todas las ramas visibles quedan cargadas para
+        poder expandirlas de una vez.
+        """
+        if self._report is None:
+            return
+
+        self._filter_text = text.strip().lower()
+        self._min_reads = min_reads
+
+        report = self._report
+        matches = report.clade_reads >= min_reads
+
+        if self._filter_text:
+            by_name = np.char.find(self._lower_names, self._filter_text) >= 0
+            if self._filter_text.isdigit():
+                by_name |= report.taxids == int(self._filter_text)
+            matches &= by_name
+
+        visible = matches.copy()
+        for depth in range(int(report.depths.max(initial=0)), 0, -1):
+            at_depth = np.flatnonzero(visible & (report.depths == depth))
+            parents = report.parents[at_depth]
+            visible[parents[parents >= 0]] = True
+
+        self.beginResetModel()
+        self._visible = visible
+        self._rebuild()
+        if self._filter_text:
+            self._fetched[:] = True
+        self.endResetModel()
+
+    def visible_count(self) -> int:
+        return int(self._visible.sum()) if self._visible is not None else 0
+
+    def node(self, index: QModelIndex) -> int:
+        """
+        Índice del taxón en el reporte (-1 para la raíz invisible).
+        """
+        if not index.isValid():
+            return -1
+        return int(index.internalId())
+
+    def index_of(self, node: int, column: int = 0) -> QModelIndex:
+        if node < 0 or self._report is None:
+            return QModelIndex()
+        return self.createIndex(int(self._row_of[node]), column, node)
+
+    # structure
+
+    def _children(self, node: int) -> np.ndarray:
+        if node < 0:
+            return self._roots
+        return self._child_indices[self._offsets[node] : self._offsets[node + 1]]
+
+    def _sort_keys(self) -> Optional[np.ndarray]:
+        report = self._report
+        column = self._sort_column
+
+        if column == 0:
+            if self._name_keys is None:
+                keys = np.empty(len(report), dtype=np.int64)
+                keys[np.argsort(self._lower_names, kind="stable")] = np.arange(
+                    len(report)
+                )
+                self._name_keys = keys
+            keys = self._name_keys
+        elif column == 1:
+            rank_keys = np.array(
+                [
+                    (RANK_ORDER.index(code[0]) if code[:1] in RANK_ORDER else 99) * 100
+                    + (int(code[1:]) if code[1:].isdigit() else 0)
+                    for code in report.rank_codes
+                ],
+                dtype=np.int64,
+            )
+            keys = rank_keys[report.ranks]
+        elif column == 2:
+            keys = report.taxids
+        elif column == 3 or column == 5:
+            keys = report.clade_reads
+        elif column == 4:
+            keys = report.direct_reads
+        else:
+            return None
+
+        if self._sort_order == Qt.SortOrder.DescendingOrder:
+            keys = -keys
+
+        return keys
+
+    def _rebuild(self):
+        """
+        Recalcula los hijos (CSR) de los nodos visibles en el orden actual.
+        """
+        report = self._report
+
+        if report is None:
+            self._roots = np.array([], dtype=np.int32)
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._child_indices = np.array([], dtype=np.int32)
+            self._row_of = np.array([], dtype=np.int64)
+            self._fetched = np.array([], dtype=bool)
+            return
+
+        count = len(report)
+        nodes = np.flatnonzero(self._visible)
+        parents = report.parents[nodes]
+
+        keys = self._sort_keys()
+        if keys is None:
+            order = np.argsort(parents, kind="stable")
+        else:
+            order = np.lexsort((keys[nodes], parents))
+
+        nodes = nodes[order]
+        parents = parents[order]
+
+        is_root = parents < 0
+        self._roots = nodes[is_root].astype(np.int32)
+        self._child_indices = nodes[~is_root].astype(np.int32)
+
+        child_counts = np.bincount(parents[~is_root], minlength=count)
+        self._offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(child_counts, out=self._offsets[1:])
+
+        self._row_of = np.zeros(count, dtype=np.int64)
+        self._row_of[self._roots] = np.arange(len(self._roots))
+        self._row_of[self._child_indices] = (
+            np.arange(len(self._child_indices))
+            - self._offsets[report.parents[self._child_indices]]
+        )
+
+        self._fetched = np.zeros(count, dtype=bool)
+
+    # QAbstractItemModel
+
+    def index(
+        self, row: int, column: int, parent: QModelIndex = QModelIndex()
+    ) -> QModelIndex:
+        if self._report is None:
+            return QModelIndex()
+
+        children = self._children(self.node(parent))
+
+        if row < 0 or row >= len(children) or column < 0 or column >= len(self.COLUMNS):
+            return QModelIndex()
+
+        return self.createIndex(row, column, int(children[row]))
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        node = self.node(index)
+
+        if node < 0:
+            return QModelIndex()
+
+        return self.index_of(int(self._report.parents[node]))
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if self._report is None or parent.column() > 0:
+            return 0
+
+        node = self.node(parent)
+
+        if node >= 0 and not self._fetched[node]:
+            return 0
+
+        return len(self._children(node))
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(self.COLUMNS)
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if self._report is None or parent.column() > 0:
+            return False
+        return len(self._children(self.node(parent))) > 0
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        node = self.node(parent)
+        return node >= 0 and not self._fetched[node] and len(self._children(node)) > 0
+
+    def fetchMore(self, parent: QModelIndex):
+        node = self.node(parent)
+
+        if node < 0 or self._fetched[node]:
+            return
+
+        count = len(self._children(node))
+        self.beginInsertRows(parent, 0, count - 1)
+        self._fetched[node] = True
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        node = self.node(index)
+
+        if node < 0:
+            return None
+
+        report = self._report
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return str(report.names[node])
+            if column == 1:
+                return report.rank(node)
+            if column == 2:
+                return str(report.taxids[node])
+            if column == 3:
+                return f"{int(report.clade_reads[node]):,}"
+            if column == 4:
+                return f"{int(report.direct_reads[node]):,}"
+            if column == 5:
+                return f"{float(report.percents[node]):.2f}"
+
+        if role == Qt.ItemDataRole.TextAlignmentRole and column >= 2:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return " > ".join(
+                str(report.names[ancestor]) for ancestor in report.lineage(node)
+            )
+
+        return None
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.COLUMNS[section]
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        if self._report is None:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+
+        persistent = self.persistentIndexList()
+        nodes = [(self.node(index), index.column()) for index in persistent]
+
+        self._sort_column = column
+        self._sort_order = order
+
+        fetched = self._fetched
+        self._rebuild()
+        self._fetched = fetched
+
+        self.changePersistentIndexList(
+            persistent,
+            [self.index_of(node, column) for node, column in nodes],
+        )
+        self.layoutChanged.emit()
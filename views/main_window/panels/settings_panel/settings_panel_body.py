@@ -15,6 +15,7 @@ from .widgets import (
     SimpleActionItem,
     InstalledProgramItem,
     InstalledDependencyItem,
+    CompressionSettingsItem,
 )
 
 
@@ -61,6 +62,18 @@ class SettingsPanelBody(QWidget):
         )
         self.scroll_layout.addWidget(self.manual, 0, 0)
 
+        # Workspace Section
+
+        self.workspace_area = SettingsArea(self.scroll_content, "Workspace")
+        self.scroll_layout.addWidget(self.workspace_area)
+
+        self.compression = CompressionSettingsItem(
+            icon=QIcon(":/assets/folder.svg"),
+            title="Compresión de resultados",
+            subtitle="Cómo guardan Trimmomatic y SortMeRNA sus lecturas",
+        )
+        self.workspace_area.add_item(self.compression)
+
         # Installed Programs Section
 
         self.installed_programs_area = SettingsArea(
@@ -68,6 +81,14 @@ class SettingsPanelBody(QWidget):
         )
         self.scroll_layout.addWidget(self.installed_programs_area)
 
+        self.rescan_programs = SimpleActionItem(
+            icon=QIcon(":/assets/search.svg"),
+            title="Buscar programas",
+            action="Buscar",
+            subtitle="Vuelve a buscar los programas y dependencias instalados",
+        )
+        self.installed_programs_area.add_item(self.rescan_programs)
+
         self.fastqc_program = InstalledProgramItem(
             icon=QIcon(":/assets/graphics.svg"),
             title="FastQC",
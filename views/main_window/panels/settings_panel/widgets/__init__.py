@@ -4,3 +4,4 @@ from .settings_item import SettingsItem
 from .installed_program_item import InstalledProgramItem
 from .installed_dependency_item import InstalledDependencyItem
 from .simple_action_item import SimpleActionItem
+from .compression_settings_item import CompressionSettingsItem
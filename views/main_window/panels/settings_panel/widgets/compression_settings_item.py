@@ -0,0 +1,75 @@
+from typing import Optional
+from PySide6.QtWidgets import QComboBox, QLabel, QSpinBox
+from .settings_item import SettingsItem
+
+
+class CompressionSettingsItem(SettingsItem):
+    """
+    Política de compresión del workspace: método, nivel e hilos con los que
+    las etapas guardan sus archivos de secuencias.
+    """
+
+    def setup_ui(self):
+        super().setup_ui()
+
+        self.method_combo_box = QComboBox(self)
+        self.method_combo_box.addItem("Sin comprimir", "none")
+        self.method_combo_box.addItem("gzip", "gzip")
+        self.method_combo_box.addItem("zstd", "zstd")
+        self.action_layout.addWidget(self.method_combo_box)
+
+        self.action_layout.addWidget(QLabel("Nivel", self))
+
+        # 0 = nivel por defecto del método
+        self.level_spin_box = QSpinBox(self)
+        self.level_spin_box.setRange(0, 19)
+        self.level_spin_box.setSpecialValueText("Auto")
+        self.action_layout.addWidget(self.level_spin_box)
+
+        self.action_layout.addWidget(QLabel("Hilos", self))
+
+        # 0 = todos los núcleos
+        self.threads_spin_box = QSpinBox(self)
+        self.threads_spin_box.setRange(0, 256)
+        self.threads_spin_box.setSpecialValueText("Auto")
+        self.action_layout.addWidget(self.threads_spin_box)
+
+        self.method_combo_box.currentIndexChanged.connect(self._update_level_range)
+        self._update_level_range()
+
+    def set_policy(self, method: str, level: Optional[int], threads: int):
+        for widget in (
+            self.method_combo_box,
+            self.level_spin_box,
+            self.threads_spin_box,
+        ):
+            widget.blockSignals(True)
+
+        self.method_combo_box.setCurrentIndex(self.method_combo_box.findData(method))
+        self.level_spin_box.setValue(level or 0)
+        self.threads_spin_box.setValue(threads)
+        self._update_level_range()
+
+        for widget in (
+            self.method_combo_box,
+            self.level_spin_box,
+            self.threads_spin_box,
+        ):
+            widget.blockSignals(False)
+
+    def method(self) -> str:
+        return self.method_combo_box.currentData()
+
+    def level(self) -> Optional[int]:
+        return self.level_spin_box.value() or None
+
+    def threads(self) -> int:
+        return self.threads_spin_box.value()
+
+    def _update_level_range(self):
+        # Con gzip comprimen las propias herramientas, con su nivel y un hilo:
+        # el nivel y los hilos sólo se aplican a zstd (de 1 a 19)
+        method = self.method()
+        self.level_spin_box.setMaximum(19)
+        self.level_spin_box.setEnabled(method == "zstd")
+        self.threads_spin_box.setEnabled(method == "zstd")
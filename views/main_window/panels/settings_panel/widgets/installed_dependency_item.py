@@ -26,10 +26,18 @@ class InstalledDependencyItem(SettingsItem):
         self.install_push_button.setVisible(False)  # Initially hidden
         self.action_layout.addWidget(self.install_push_button)
 
-    def set_installed(self, installed: bool):
+    def set_checking(self):
+        self.checking_indicator.setVisible(True)
+        self.installed_indicator.setVisible(False)
+        self.install_push_button.setVisible(False)
+
+    def set_installed(self, installed: bool, version: str = None):
         self.checking_indicator.setVisible(False)
 
         if installed:
+            self.installed_indicator.setText(
+                f"Instalado ({version})" if version else "Instalado"
+            )
             self.installed_indicator.setVisible(True)
             self.install_push_button.setVisible(False)
         else:
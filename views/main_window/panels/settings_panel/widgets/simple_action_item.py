@@ -1,5 +1,4 @@
 from pathlib import Path
-from turtle import st
 from typing import Optional
 from PySide6.QtWidgets import (
     QWidget,
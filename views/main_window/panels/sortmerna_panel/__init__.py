@@ -1,5 +1,3 @@
 from .sortmerna_panel import SortMeRnaPanel
 from .sortmerna_panel_head import SortMeRnaPanelHead
 from .sortmerna_panel_body import SortMeRnaPanelBody
-
-from .widgets import PreviousReportItemWidget
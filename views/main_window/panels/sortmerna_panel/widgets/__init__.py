@@ -1 +0,0 @@
-from .previous_report_item_widget import PreviousReportItemWidget
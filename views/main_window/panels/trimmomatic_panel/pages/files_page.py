@@ -11,7 +11,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QGuiApplication, QPainter
 from PySide6.QtCore import Qt, QFile, QTextStream
-from views.widgets import OperationModeWidget, SelectFilePushButton, ListWidget, LoadingWidget
+from views.widgets import OperationModeWidget, SelectFilePushButton, FileListView, LoadingWidget
 
 
 class FilesPage(QWidget):
@@ -130,9 +130,14 @@ class FilesPage(QWidget):
         )
         self.previous_reports_container_layout.addWidget(self.previous_reports_label)
 
-        self.list_widget = ListWidget(self)
+        self.previous_reports_list_widget = FileListView(
+            self,
+            actions=True,
+            open_tooltip="Abrir carpeta de reporte",
+            delete_tooltip="Eliminar reporte",
+        )
         self.previous_reports_container_layout.addWidget(
-            self.list_widget
+            self.previous_reports_list_widget
         )
 
         # loading files
@@ -40,3 +40,14 @@ class TrimmomaticPanelHead(PanelHeadBase):
         self.star_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.star_button.setVisible(False) # Initially hidden
         self.main_layout.addWidget(self.star_button)
+
+        # batch button
+
+        self.batch_button = ActionButtonWidget(
+            icon_path=":/assets/add_file_filled.svg",
+            tooltip="Procesar varias muestras en lote",
+            parent=self,
+        )
+        self.batch_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.batch_button.setVisible(False)  # Initially hidden
+        self.main_layout.addWidget(self.batch_button)
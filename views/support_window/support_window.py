@@ -4,12 +4,15 @@ from PySide6.QtGui import QPainter, QIcon
 from PySide6.QtCore import Qt, QFile, QTextStream
 from .support_window_sidebar import SupportWindowSidebar
 from .support_window_content import SupportWindowContent
+from utils import register_resource_bundle
 
 
 class SupportWindow(QDialog):
 
     def __init__(self, parent: QWidget = None):
         super().__init__(parent=parent)
+        # El manual sólo se carga cuando se abre esta ventana
+        register_resource_bundle("manual")
         self.load_stylesheet()
         self.setup_ui()
 
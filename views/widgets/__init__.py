@@ -28,7 +28,6 @@ from .item_abstract_button import ItemAbstractButton
 from .item_action_widget import ItemActionWidget
 from .panel_head_base import PanelHeadBase
 from .file_selector_dialog import FileSelectorDialog
-from .file_selector_dialog_item_widget import FileSelectorDialogItemWidget
 from .generation_page import GenerationPage
 from .saved_config_item_widget import SavedConfigItemWidget
 from .database_item_widget import DatabaseItemWidget
@@ -38,3 +37,6 @@ from .decimal_selector_suboption_widget import DecimalSelectorSuboptionWidget
 from .decimal_selector_option_widget import DecimalSelectorOptionWidget
 from .number_selector import NumberSelector
 from .loading_widget import LoadingWidget
+from .file_list_model import FileListModel, PathRole, DetailsRole, GroupRole
+from .file_item_delegate import FileItemDelegate
+from .file_list_view import FileListView
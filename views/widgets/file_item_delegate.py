@@ -0,0 +1,234 @@
+from pathlib import Path
+from PySide6.QtWidgets import (
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+    QStyle,
+    QToolTip,
+)
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QIcon, QPainter, QPalette
+from PySide6.QtCore import Qt, QEvent, QPersistentModelIndex, QRect, QSize, Signal
+from .file_list_model import PathRole, DetailsRole
+
+ICON_SIZE = 18
+ACTION_SIZE = 28
+MARGIN_H = 20
+MARGIN_V = 10
+SPACING = 5
+
+# Acciones de cada fila: nombre, icono
+ACTIONS = [("open", ":/assets/folder.svg"), ("delete", ":/assets/trash.svg")]
+
+
+class FileItemDelegate(QStyledItemDelegate):
+    """
+    Dibuja cada archivo de un `FileListView` como los antiguos widgets de
+    la lista (icono, nombre, ruta, resumen y acciones de abrir y eliminar)
+    sin crear ningún widget por fila.
+
+    El fondo se dibuja con el estilo de la vista, así las reglas
+    `QListView::item` de su hoja de estilo (fondo, hover, marcado) se
+    aplican igual que antes a cada widget.
+    """
+
+    # Nombre de la acción y archivo de la fila
+    action_triggered = Signal(str, object)
+    # Clic en la fila fuera de las acciones
+    file_clicked = Signal(object)
+
+    def __init__(
+        self,
+        parent=None,
+        icon: str = ":/assets/file.svg",
+        actions: bool = False,
+        details: bool = False,
+        tooltips: dict[str, str] = None,
+    ):
+        super().__init__(parent)
+        self.icon = QIcon(icon)
+        self.actions = ACTIONS if actions else []
+        self.details = details
+        self.tooltips = tooltips or {}
+        self._action_icons = {name: QIcon(icon) for name, icon in self.actions}
+        self._hovered: tuple[QPersistentModelIndex, str] = None
+
+    # geometría
+
+    def _fonts(self, option: QStyleOptionViewItem) -> tuple[QFont, QFont]:
+        name_font = QFont(option.font)
+        name_font.setBold(True)
+        return name_font, option.font
+
+    def sizeHint(self, option, index) -> QSize:
+        name_font, font = self._fonts(option)
+        lines = 2 if self.details else 1
+        height = (
+            MARGIN_V * 2
+            + QFontMetrics(name_font).height()
+            + lines * (SPACING + QFontMetrics(font).height())
+        )
+        return QSize(300, max(height, ACTION_SIZE + MARGIN_V * 2))
+
+    def _action_rects(self, rect: QRect) -> list[tuple[str, QRect]]:
+        rects = []
+        right = rect.right() - MARGIN_H + 1
+
+        for name, _ in reversed(self.actions):
+            right -= ACTION_SIZE
+            rects.append(
+                (
+                    name,
+                    QRect(
+                        right,
+                        rect.center().y() - ACTION_SIZE // 2,
+                        ACTION_SIZE,
+                        ACTION_SIZE,
+                    ),
+                )
+            )
+            right -= SPACING
+
+        return list(reversed(rects))
+
+    def _action_at(self, rect: QRect, pos) -> str:
+        for name, action_rect in self._action_rects(rect):
+            if action_rect.contains(pos):
+                return name
+        return None
+
+    # dibujo
+
+    def paint(self, painter: QPainter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+
+        # Los archivos marcados se ven como seleccionados (QListView::item:selected)
+        if index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked:
+            opt.state |= QStyle.StateFlag.State_Selected
+        else:
+            opt.state &= ~QStyle.StateFlag.State_Selected
+
+        widget = option.widget
+        style = widget.style() if widget is not None else None
+
+        painter.save()
+
+        if style is not None:
+            style.drawPrimitive(
+                QStyle.PrimitiveElement.PE_PanelItemViewItem, opt, painter, widget
+            )
+
+        rect = option.rect
+        self.icon.paint(
+            painter,
+            QRect(
+                rect.left() + MARGIN_H,
+                rect.center().y() - ICON_SIZE // 2,
+                ICON_SIZE,
+                ICON_SIZE,
+            ),
+        )
+
+        # texto
+
+        left = rect.left() + MARGIN_H + ICON_SIZE + MARGIN_H
+        right = rect.right() - MARGIN_H
+        if self.actions:
+            right = self._action_rects(rect)[0][1].left() - MARGIN_H
+        width = max(right - left, 0)
+
+        name_font, font = self._fonts(option)
+        color = opt.palette.color(QPalette.ColorRole.Text)
+        secondary = QColor(color)
+        secondary.setAlpha(200)
+
+        lines = [(index.data(Qt.ItemDataRole.DisplayRole), name_font, color)]
+        lines.append((str(index.data(PathRole)), font, secondary))
+        if self.details:
+            lines.append((index.data(DetailsRole), font, secondary))
+
+        top = rect.top() + MARGIN_V
+        for text, line_font, line_color in lines:
+            metrics = QFontMetrics(line_font)
+            painter.setFont(line_font)
+            painter.setPen(line_color)
+            painter.drawText(
+                QRect(left, top, width, metrics.height()),
+                Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                metrics.elidedText(text or "", Qt.TextElideMode.ElideRight, width),
+            )
+            top += metrics.height() + SPACING
+
+        # acciones
+
+        for name, action_rect in self._action_rects(rect):
+            if self._hovered is not None and self._hovered == (
+                QPersistentModelIndex(index),
+                name,
+            ):
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.setBrush(QColor("#404040"))
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+                painter.drawRoundedRect(action_rect, 5, 5)
+
+            self._action_icons[name].paint(
+                painter,
+                action_rect.adjusted(
+                    (ACTION_SIZE - ICON_SIZE) // 2,
+                    (ACTION_SIZE - ICON_SIZE) // 2,
+                    -(ACTION_SIZE - ICON_SIZE) // 2,
+                    -(ACTION_SIZE - ICON_SIZE) // 2,
+                ),
+            )
+
+        painter.restore()
+
+    # eventos
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        if event.type() == QEvent.Type.MouseMove:
+            action = self._action_at(option.rect, event.position().toPoint())
+            hovered = (QPersistentModelIndex(index), action) if action else None
+
+            if hovered != self._hovered:
+                self._hovered = hovered
+                if option.widget is not None:
+                    option.widget.viewport().update()
+            return False
+
+        if (
+            event.type() == QEvent.Type.MouseButtonRelease
+            and event.button() == Qt.MouseButton.LeftButton
+        ):
+            file: Path = index.data(PathRole)
+            action = self._action_at(option.rect, event.position().toPoint())
+
+            if action is not None:
+                self.action_triggered.emit(action, file)
+                return True
+
+            if index.flags() & Qt.ItemFlag.ItemIsUserCheckable:
+                checked = (
+                    index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+                )
+                model.setData(
+                    index,
+                    Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked,
+                    Qt.ItemDataRole.CheckStateRole,
+                )
+
+            self.file_clicked.emit(file)
+            return True
+
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index) -> bool:
+        action = self._action_at(option.rect, event.pos())
+
+        if action is not None and action in self.tooltips:
+            QToolTip.showText(event.globalPos(), self.tooltips[action], view)
+            return True
+
+        return super().helpEvent(event, view, option, index)
+
+    def clear_hover(self):
+        self._hovered = None
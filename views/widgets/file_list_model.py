@@ -0,0 +1,216 @@
+from pathlib import Path
+from typing import Callable, Optional
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal
+
+# Roles propios del modelo
+PathRole = Qt.ItemDataRole.UserRole + 1
+DetailsRole = Qt.ItemDataRole.UserRole + 2
+GroupRole = Qt.ItemDataRole.UserRole + 3
+
+
+class FileListModel(QAbstractListModel):
+    """
+    Lista de archivos para un `FileListView`.
+
+    `set_files` compara la lista nueva con la actual y sólo inserta o quita
+    las filas que cambian, así refrescar el listado no reconstruye nada y
+    la vista conserva la posición.
+
+    El resumen de cada archivo (`DetailsRole`) se pide a `describe` la
+    primera vez que la vista lo necesita, es decir, sólo para las filas
+    visibles. Si devuelve None (el archivo aún no está indexado) se emite
+    `details_missing` una vez y se espera a `set_details`.
+    """
+
+    details_missing = Signal(object)
+    checked_changed = Signal(object, bool)
+
+    def __init__(
+        self,
+        parent=None,
+        describe: Optional[Callable[[Path], Optional[str]]] = None,
+        checkable: bool = False,
+        exclusive: bool = True,
+    ):
+        super().__init__(parent)
+        self.describe = describe
+        self.checkable = checkable
+        self.exclusive = exclusive
+
+        self._files: list[Path] = []
+        self._rows: dict[Path, int] = {}
+        self._groups: dict[Path, str] = {}
+        self._details: dict[Path, Optional[str]] = {}
+        # En el orden en que se marcaron
+        self._checked: list[Path] = []
+
+    # QAbstractListModel
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._files)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        file = self._files[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return file.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return str(file)
+        if role == PathRole:
+            return file
+        if role == GroupRole:
+            return self._groups.get(file, "")
+        if role == DetailsRole:
+            return self._get_details(file) or ""
+        if role == Qt.ItemDataRole.CheckStateRole and self.checkable:
+            return (
+                Qt.CheckState.Checked
+                if file in self._checked
+                else Qt.CheckState.Unchecked
+            )
+
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole) -> bool:
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+
+        # Como un grupo de botones exclusivo: no se desmarca con un clic
+        if self.exclusive and not checked:
+            return False
+
+        self.set_checked(self._files[index.row()], checked)
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.checkable and index.isValid():
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    # archivos
+
+    def files(self) -> list[Path]:
+        return list(self._files)
+
+    def set_files(self, files: list[Path], groups: Optional[dict[Path, str]] = None):
+        """
+        Muestra `files` en ese orden. `groups` asigna a cada archivo el grupo
+        por el que se filtra (`FileListView.set_filter`).
+        """
+        target = list(dict.fromkeys(Path(file) for file in files))
+        listed = set(target)
+
+        # Quita las filas que ya no están, por tramos y desde el final
+        row = len(self._files) - 1
+        while row >= 0:
+            if self._files[row] in listed:
+                row -= 1
+                continue
+
+            last = row
+            while row >= 0 and self._files[row] not in listed:
+                row -= 1
+
+            self.beginRemoveRows(QModelIndex(), row + 1, last)
+            for file in self._files[row + 1 : last + 1]:
+                self._details.pop(file, None)
+                if file in self._checked:
+                    self._checked.remove(file)
+            del self._files[row + 1 : last + 1]
+            self.endRemoveRows()
+
+        present = set(self._files)
+
+        if [file for file in target if file in present] != self._files:
+            # Cambió el orden de los que quedan: se vuelve a cargar entero
+            self.beginResetModel()
+            self._files = target
+            self._groups = dict(groups or {})
+            self._rows = {file: row for row, file in enumerate(self._files)}
+            self.endResetModel()
+            return
+
+        # Inserta los nuevos donde les toca, por tramos
+        row = 0
+        while row < len(target):
+            if row < len(self._files) and self._files[row] == target[row]:
+                row += 1
+                continue
+
+            last = row
+            while last < len(target) and target[last] not in present:
+                last += 1
+
+            self.beginInsertRows(QModelIndex(), row, last - 1)
+            self._files[row:row] = target[row:last]
+            self.endInsertRows()
+            row = last
+
+        self._rows = {file: row for row, file in enumerate(self._files)}
+
+        # Grupos que cambiaron en archivos que ya estaban
+        groups = dict(groups or {})
+        changed = [
+            file
+            for file in present
+            if groups.get(file, "") != self._groups.get(file, "")
+        ]
+        self._groups = groups
+        for file in changed:
+            index = self.index(self._rows[file])
+            self.dataChanged.emit(index, index, [GroupRole])
+
+    def index_of(self, file: Path) -> QModelIndex:
+        row = self._rows.get(Path(file))
+        return QModelIndex() if row is None else self.index(row)
+
+    # resumen
+
+    def _get_details(self, file: Path) -> Optional[str]:
+        if file not in self._details:
+            details = self.describe(file) if self.describe is not None else ""
+            self._details[file] = details
+
+            if details is None:
+                self.details_missing.emit(file)
+
+        return self._details[file]
+
+    def set_details(self, file: Path, details: Optional[str]):
+        file = Path(file)
+        self._details[file] = details
+
+        index = self.index_of(file)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [DetailsRole])
+
+    # marcados
+
+    def checked_files(self) -> list[Path]:
+        return list(self._checked)
+
+    def set_checked(self, file: Path, checked: bool):
+        file = Path(file)
+
+        if checked == (file in self._checked):
+            return
+
+        if checked:
+            if self.exclusive:
+                for other in list(self._checked):
+                    self.set_checked(other, False)
+            self._checked.append(file)
+        else:
+            self._checked.remove(file)
+
+        index = self.index_of(file)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+
+        self.checked_changed.emit(file, checked)
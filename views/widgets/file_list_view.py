@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Callable, Optional
+from PySide6.QtWidgets import QWidget, QListView, QAbstractItemView, QSizePolicy
+from PySide6.QtGui import QGuiApplication
+from PySide6.QtCore import (
+    Qt,
+    QFile,
+    QTextStream,
+    QSortFilterProxyModel,
+    QRegularExpression,
+    Signal,
+)
+from .file_list_model import FileListModel, GroupRole
+from .file_item_delegate import FileItemDelegate
+
+
+class FileListView(QListView):
+    """
+    Lista virtualizada de archivos: un `FileListModel` filtrado por un
+    QSortFilterProxyModel y dibujado por un `FileItemDelegate`. Sólo se
+    dibujan las filas visibles, de modo que listar miles de archivos no
+    crea miles de widgets.
+    """
+
+    file_clicked = Signal(object)
+    open_requested = Signal(object)
+    delete_requested = Signal(object)
+
+    def __init__(
+        self,
+        parent: QWidget = None,
+        icon: str = ":/assets/file.svg",
+        actions: bool = False,
+        details: bool = False,
+        checkable: bool = False,
+        exclusive: bool = True,
+        describe: Optional[Callable[[Path], Optional[str]]] = None,
+        open_tooltip: str = "Abrir carpeta",
+        delete_tooltip: str = "Eliminar",
+    ):
+        super().__init__(parent)
+
+        self.files_model = FileListModel(
+            self, describe=describe, checkable=checkable, exclusive=exclusive
+        )
+
+        self.proxy_model = QSortFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.files_model)
+        self.proxy_model.setFilterRole(GroupRole)
+        self.proxy_model.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        self.delegate = FileItemDelegate(
+            self,
+            icon=icon,
+            actions=actions,
+            details=details,
+            tooltips={"open": open_tooltip, "delete": delete_tooltip},
+        )
+        self.delegate.file_clicked.connect(self.file_clicked)
+        self.delegate.action_triggered.connect(self._on_action_triggered)
+
+        self.setup_ui()
+        self.load_stylesheet(QGuiApplication.styleHints().colorScheme())
+        QGuiApplication.styleHints().colorSchemeChanged.connect(self.load_stylesheet)
+
+    def setup_ui(self):
+        self.setObjectName("FileListView")
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setModel(self.proxy_model)
+        self.setItemDelegate(self.delegate)
+
+        # Todas las filas miden lo mismo: la vista no tiene que medirlas
+        self.setUniformItemSizes(True)
+        self.setSpacing(5)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+
+    # archivos
+
+    def set_files(self, files: list[Path], groups: Optional[dict[Path, str]] = None):
+        self.files_model.set_files(files, groups)
+
+    def set_filter(self, group: Optional[str] = None):
+        """
+        Muestra sólo los archivos del grupo (todos con None o "all").
+        """
+        if not group or group == "all":
+            self.proxy_model.setFilterRegularExpression(QRegularExpression())
+        else:
+            self.proxy_model.setFilterRegularExpression(
+                QRegularExpression(
+                    f"^{QRegularExpression.escape(group)}$",
+                    QRegularExpression.PatternOption.CaseInsensitiveOption,
+                )
+            )
+
+    def _on_action_triggered(self, action: str, file: Path):
+        if action == "open":
+            self.open_requested.emit(file)
+        elif action == "delete":
+            self.delete_requested.emit(file)
+
+    def leaveEvent(self, event):
+        self.delegate.clear_hover()
+        self.viewport().update()
+        super().leaveEvent(event)
+
+    def load_stylesheet(self, scheme: Qt.ColorScheme):
+        qss_file = QFile(
+            f":/styles/{Path(__file__).stem}_{"dark" if scheme == Qt.ColorScheme.Dark else "light"}.qss"
+        )
+        if qss_file.open(QFile.ReadOnly | QFile.Text):
+            stylesheet = QTextStream(qss_file).readAll() + "\n"
+            self.setStyleSheet(stylesheet)
+            style = self.style()
+            style.unpolish(self)
+            style.polish(self)
+            self.viewport().update()
+            qss_file.close()
@@ -1,5 +1,4 @@
 from pathlib import Path
-from typing import cast
 from PySide6.QtWidgets import (
     QWidget,
     QHBoxLayout,
@@ -14,8 +13,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QGuiApplication, QPainter, QIcon
 from PySide6.QtCore import Qt, QFile, QTextStream
-from views.widgets import ListWidget
-from .file_selector_dialog_item_widget import FileSelectorDialogItemWidget
+from utils import describe_sequence_file
+from .file_list_view import FileListView
 
 
 class FileSelectorDialog(QDialog):
@@ -37,7 +36,6 @@ class FileSelectorDialog(QDialog):
         self.files = files
         self.filters = filters
         self.multiple = multiple
-        self.checked_files: list[Path] = []
         self.load_stylesheet(QGuiApplication.styleHints().colorScheme())
         self.setup_ui()
         QGuiApplication.styleHints().colorSchemeChanged.connect(self.load_stylesheet)
@@ -87,36 +85,20 @@ class FileSelectorDialog(QDialog):
                     lambda _, p=self.sorted_parents[i - 1].name: self.set_filter(p)
                 )
 
-        self.file_list_widget = ListWidget(self)
-        self.file_list_widget.setObjectName("FileListWidget")
-        self.main_layout.addWidget(self.file_list_widget)
-
-        self.file_group = QButtonGroup(self)
-        self.file_group.setObjectName("FileGroup")
-        self.file_group.setExclusive(
-            False if self.multiple else True
-        )  # Permite múltiples selecciones
-
-        for file in self.files:
-            item = FileSelectorDialogItemWidget(
-                name=file.name,
-                path=str(file),
-                icon=self.icon,
-                parent=self.file_list_widget,
-            )
-            item.toggled.connect(
-                lambda checked, f=file: (
-                    (
-                        self.checked_files.append(f)
-                        if checked
-                        else self.checked_files.remove(f)
-                    ),
-                    print(f"Checked: {checked}"),
-                    print(f"Checked files: {self.checked_files}"),
-                )
-            )
-            self.file_list_widget.scroll_content_layout.addWidget(item)
-            self.file_group.addButton(item)
+        # Sin `multiple` se marca un solo archivo, como un grupo de botones
+        # exclusivo
+        self.file_list_view = FileListView(
+            self,
+            icon=self.icon,
+            details=True,
+            checkable=True,
+            exclusive=not self.multiple,
+            describe=lambda file: describe_sequence_file(file) or "",
+        )
+        self.file_list_view.setObjectName("FileListWidget")
+        self.main_layout.addWidget(self.file_list_view)
+
+        self.load_files(self.files)
 
         # ButtonBox estándar
         button_box = QDialogButtonBox(
@@ -126,41 +108,28 @@ class FileSelectorDialog(QDialog):
         button_box.rejected.connect(self.reject)  # cierra con reject()
         self.main_layout.addWidget(button_box)
 
+    @property
+    def checked_files(self) -> list[Path]:
+        """
+        Archivos marcados, en el orden en que se marcaron.
+        """
+        return self.file_list_view.files_model.checked_files()
+
     def load_files(self, files: list[Path]):
         """
-        Carga los archivos en el widget de lista.
+        Carga los archivos en la lista. Cada archivo se agrupa por el nombre
+        de su carpeta, que es lo que filtran los botones de filtro.
         """
-        for file in self.files:
-            item = FileSelectorDialogItemWidget(
-                name=file.name,
-                path=str(file),
-                icon=self.icon,
-                parent=self.file_list_widget,
-            )
-            item.toggled.connect(
-                lambda checked, f=file, cf=self.checked_files: (
-                    (cf.append(f) if checked else cf.remove(f)),
-                    print(f"Checked: {checked}"),
-                    print(f"Checked files: {cf}"),
-                )
-            )
-            self.file_list_widget.scroll_content_layout.addWidget(item)
-            self.file_group.addButton(item)
+        self.files = files
+        self.file_list_view.set_files(
+            files, {file: file.parent.name for file in files}
+        )
 
     def set_filter(self, filter: str):
         """
-        Aplica un filtro a los archivos mostrados en el widget de lista.
+        Muestra sólo los archivos de la carpeta `filter` (todos con "all").
         """
-        for i in range(self.file_list_widget.scroll_content_layout.count()):
-            item = cast(
-                FileSelectorDialogItemWidget,
-                self.file_list_widget.scroll_content_layout.itemAt(i).widget(),
-            )
-            if item:
-                item.setVisible(
-                    filter.lower() in Path(item.path).parent.name.lower()
-                    or filter == "all"
-                )
+        self.file_list_view.set_filter(filter)
 
     def load_stylesheet(self, scheme: Qt.ColorScheme):
         qss_file = QFile(
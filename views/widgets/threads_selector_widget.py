@@ -1,4 +1,3 @@
-import os
 from pathlib import Path
 from PySide6.QtWidgets import (
     QWidget,
@@ -12,6 +11,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtGui import QGuiApplication, QPainter
 from PySide6.QtCore import Qt, QFile, QTextStream
+from utils import get_available_cpu_count
 
 
 class ThreadsSelectorWidget(QWidget):
@@ -55,7 +55,7 @@ class ThreadsSelectorWidget(QWidget):
         self.slider = QSlider(Qt.Horizontal, self)
         self.slider.setObjectName("ThreadsSlider")
         self.slider.setMinimum(1)
-        self.slider.setMaximum(1 if os.cpu_count() is None else os.cpu_count())
+        self.slider.setMaximum(get_available_cpu_count())
         self.slider.setValue(1)
         self.slider.setTickPosition(QSlider.TickPosition.TicksBelow)
         self.slider.setTickInterval(1)
@@ -1,7 +1,11 @@
 from .move_file_worker import MoveFileWorker
 from .download_worker import DownloadWorker
+from .download_extract_worker import DownloadExtractWorker
 from .untar_worker import UntarWorker
 from .ungzip_worker import UngzipWorker
 from .filename_worker import FilenameWorker
-from .check_worker import CheckWorker
+from .tool_probe_service import ToolProbeService
 from .generic_worker import GenericWorker
+from .job_supervisor import JobSupervisor
+from .batch_queue import BatchQueue, BatchJob
+from .pipeline_runner import PipelineRunner, PipelineStage
@@ -0,0 +1,393 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+from PySide6.QtCore import QObject, QThreadPool, Signal
+from jobs import ExitEvent, JobSpec, ResultCache, SupervisorPolicy
+from utils import get_available_cpu_count, get_workspace_index, split_threads
+from .generic_worker import GenericWorker
+from .job_supervisor import JobSupervisor
+
+
+@dataclass
+class BatchJob:
+    """
+    Trabajo de la cola por lotes.
+
+    `build` recibe el número de hilos asignado en el momento de la admisión
+    y devuelve el programa y sus argumentos. Si devuelve un programa vacío
+    el trabajo se marca como fallido sin lanzarse.
+
+    `stage` y `priority` permiten limitar la concurrencia por etapa y dar
+    preferencia a unos trabajos sobre otros. `outputs` lo rellena el propio
+    trabajo (al construirse o al terminar) con los archivos que genera.
+
+    Si `build` deja en `spec` la especificación del trabajo, la cola puede
+    restaurar el resultado de una ejecución idéntica desde la caché en lugar
+    de lanzar el proceso.
+
+    Los trabajos con `task` en lugar de `build` se ejecutan dentro de la
+    aplicación, en el pool de hilos, sin lanzar ningún proceso. Fallan si
+    `task` lanza una excepción.
+
+    Los procesos se ejecutan con un `JobSupervisor` bajo `policy` o, si no
+    se indica, la política de `spec` (límites de tiempo y errores fatales).
+    """
+
+    name: str
+    build: Optional[Callable[[int], tuple[str, list[str]]]] = None
+    min_threads: int = 1
+    max_threads: Optional[int] = None
+    working_directory: Optional[Path] = None
+    on_finished: Optional[Callable[[int], None]] = None
+    stage: Optional[str] = None
+    priority: int = 0
+    outputs: list[Path] = field(default_factory=list)
+    spec: Optional[JobSpec] = None
+    task: Optional[Callable[[], object]] = None
+    policy: Optional[SupervisorPolicy] = None
+    threads: int = field(default=0, init=False)
+
+
+class BatchQueue(QObject):
+    """
+    Cola de trabajos que lanza varios procesos a la vez sin superar
+    el presupuesto global de CPUs.
+
+    Los hilos se reparten entre los trabajos pendientes en el momento
+    de admitirlos, de modo que la máquina queda saturada sin sobresuscribirse.
+    """
+
+    job_started = Signal(str, int)  # nombre, hilos
+    job_output = Signal(str, str)  # nombre, texto
+    job_progress = Signal(str, object)  # nombre, ProgressEvent
+    job_finished = Signal(str, int)  # nombre, código de salida
+    progress_changed = Signal(int, int)  # terminados, total
+    finished = Signal()
+
+    def __init__(
+        self,
+        cpu_budget: Optional[int] = None,
+        max_concurrent_jobs: Optional[int] = None,
+        stage_limits: Optional[dict[str, int]] = None,
+        result_cache: Optional[ResultCache] = None,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self.cpu_budget = cpu_budget or get_available_cpu_count()
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.stage_limits: dict[str, int] = dict(stage_limits or {})
+        self.result_cache = result_cache
+
+        self._pending: list[BatchJob] = []
+        # Supervisores de los procesos y, para los trabajos con `task`, sus
+        # workers
+        self._running: dict[object, BatchJob] = {}
+        self._total = 0
+        self._done = 0
+        self._failed: list[str] = []
+        self._cancelled = False
+        # Workers que guardan resultados en la caché
+        self._storing: set[GenericWorker] = set()
+
+    # public api
+
+    @property
+    def used_threads(self) -> int:
+        return sum(job.threads for job in self._running.values())
+
+    @property
+    def failed_jobs(self) -> list[str]:
+        return list(self._failed)
+
+    def is_running(self) -> bool:
+        return bool(self._pending or self._running)
+
+    def add_job(self, job: BatchJob):
+        self._pending.append(job)
+        self._total += 1
+        self.progress_changed.emit(self._done, self._total)
+
+    def start(self):
+        self._cancelled = False
+        self._schedule()
+
+    def cancel(self):
+        """
+        Vacía la cola y termina los procesos en ejecución, con todo lo que
+        hayan lanzado.
+        """
+        self._cancelled = True
+
+        # Los pendientes terminan sin ejecutarse: cuentan para el total
+        pending, self._pending = self._pending, []
+        for job in pending:
+            self._done += 1
+            self.job_finished.emit(job.name, 1)
+        if pending:
+            self.progress_changed.emit(self._done, self._total)
+
+        for supervisor in list(self._running):
+            if isinstance(supervisor, JobSupervisor):
+                supervisor.cancel()
+
+        # Sin nada en marcha nadie más emitiría `finished`
+        self._schedule()
+
+    # scheduling
+
+    def _schedule(self):
+        if self._cancelled:
+            if not self._running:
+                self.finished.emit()
+            return
+
+        while self._pending:
+            if (
+                self.max_concurrent_jobs is not None
+                and len(self._running) >= self.max_concurrent_jobs
+            ):
+                break
+
+            job = self._next_job()
+
+            if job is None:
+                break
+
+            free = self.cpu_budget - self.used_threads
+
+            outstanding = self._outstanding_jobs()
+            if self.max_concurrent_jobs is not None:
+                outstanding = min(outstanding, self.max_concurrent_jobs)
+
+            threads = split_threads(
+                self.cpu_budget, outstanding, job.min_threads, job.max_threads
+            )
+
+            if free < threads:
+                # El último hueco se aprovecha aunque sea más pequeño que el reparto
+                if free >= job.min_threads and (
+                    not self._running or len(self._pending) == 1
+                ):
+                    threads = free
+                else:
+                    break
+
+            self._pending.remove(job)
+            self._launch(job, threads)
+
+        if not self._pending and not self._running:
+            self.finished.emit()
+
+    def _next_job(self) -> Optional[BatchJob]:
+        """
+        Devuelve el trabajo pendiente de mayor prioridad cuya etapa
+        no haya alcanzado su límite de concurrencia.
+        """
+        candidates = [
+            job
+            for job in self._pending
+            if job.stage not in self.stage_limits
+            or self._running_in_stage(job.stage) < self.stage_limits[job.stage]
+        ]
+
+        if not candidates:
+            return None
+
+        # max() devuelve el primero entre iguales: FIFO dentro de cada prioridad
+        return max(candidates, key=lambda job: job.priority)
+
+    def _running_in_stage(self, stage: str) -> int:
+        return sum(1 for job in self._running.values() if job.stage == stage)
+
+    def _outstanding_jobs(self) -> int:
+        """
+        Número de trabajos que podrían ejecutarse a la vez ahora mismo:
+        los que están en marcha más los pendientes que caben en su etapa.
+        """
+        pending_by_stage: dict[Optional[str], int] = {}
+        for job in self._pending:
+            pending_by_stage[job.stage] = pending_by_stage.get(job.stage, 0) + 1
+
+        outstanding = len(self._running)
+        for stage, count in pending_by_stage.items():
+            if stage in self.stage_limits:
+                room = self.stage_limits[stage] - self._running_in_stage(stage)
+                count = min(count, max(0, room))
+            outstanding += count
+
+        return outstanding
+
+    def _launch(self, job: BatchJob, threads: int):
+        job.threads = threads
+
+        if job.task is not None:
+            self._launch_task(job)
+            return
+
+        program, arguments = job.build(threads)
+
+        if not program:
+            print(Path(__file__).name, "-", f"Job {job.name} could not be built.")
+            self._finish_without_process(job, -1)
+            return
+
+        if job.spec is not None and self.result_cache is not None:
+            # Restaurar copia los archivos de la caché: fuera del hilo de la
+            # interfaz. Mientras tanto el trabajo cuenta como en ejecución
+            worker = GenericWorker(self.result_cache.restore, job.spec)
+            worker.signals.finished.connect(
+                lambda restored, w=worker: self._on_job_restored(
+                    w, bool(restored), program, arguments
+                )
+            )
+            worker.signals.error.connect(
+                lambda _, w=worker: self._on_job_restored(w, False, program, arguments)
+            )
+
+            self._running[worker] = job
+            QThreadPool.globalInstance().start(worker)
+            return
+
+        self._launch_process(job, program, arguments)
+
+    def _on_job_restored(
+        self, worker: GenericWorker, restored: bool, program: str, arguments: list[str]
+    ):
+        job = self._running.pop(worker, None)
+
+        if job is None:
+            return
+
+        if restored:
+            job.threads = 0
+            self.job_output.emit(job.name, "Resultado restaurado desde la caché.\n")
+            self._finish_without_process(job, 0)
+        elif self._cancelled:
+            # Cancelado mientras se consultaba la caché: termina como un
+            # proceso cancelado
+            self.job_output.emit(job.name, "Cancelled\n")
+            self._finish_without_process(job, 1)
+        else:
+            self._launch_process(job, program, arguments)
+            return
+
+        self._schedule()
+
+    def _launch_process(self, job: BatchJob, program: str, arguments: list[str]):
+        policy = job.policy
+        if policy is None and job.spec is not None:
+            policy = job.spec.supervisor_policy()
+
+        supervisor = JobSupervisor(self)
+        supervisor.log.connect(
+            lambda event, n=job.name: self.job_output.emit(n, f"{event.line}\n")
+        )
+        supervisor.progress.connect(
+            lambda event, n=job.name: self.job_progress.emit(n, event)
+        )
+        supervisor.exited.connect(
+            lambda event, s=supervisor: self._on_job_exited(s, event)
+        )
+
+        self._running[supervisor] = job
+        supervisor.start(program, arguments, policy, job.working_directory)
+
+        print(
+            Path(__file__).name,
+            "-",
+            f"Job {job.name} started with {job.threads} threads:",
+            program,
+            arguments,
+        )
+        self.job_started.emit(job.name, job.threads)
+
+    def _launch_task(self, job: BatchJob):
+        worker = GenericWorker(job.task)
+        worker.signals.finished.connect(lambda _, w=worker: self._on_job_finished(w, 0))
+        worker.signals.error.connect(
+            lambda error, w=worker, n=job.name: (
+                self.job_output.emit(n, f"{error}\n"),
+                self._on_job_finished(w, 1),
+            )
+        )
+
+        self._running[worker] = job
+        QThreadPool.globalInstance().start(worker)
+
+        print(Path(__file__).name, "-", f"Job {job.name} started in process")
+        self.job_started.emit(job.name, job.threads)
+
+    def _finish_without_process(self, job: BatchJob, exit_code: int):
+        if exit_code != 0:
+            self._failed.append(job.name)
+        else:
+            self._record_outputs(job)
+
+        self._done += 1
+        self.job_finished.emit(job.name, exit_code)
+        self.progress_changed.emit(self._done, self._total)
+
+        if job.on_finished is not None and not self._cancelled:
+            job.on_finished(exit_code)
+
+    def _store_result(self, job: BatchJob):
+        """
+        Guarda los resultados del trabajo en la caché en el pool de hilos:
+        copiarlos puede tardar con archivos grandes.
+        """
+        worker = GenericWorker(self.result_cache.store, job.spec)
+        worker.signals.finished.connect(lambda _, w=worker: self._storing.discard(w))
+        worker.signals.error.connect(
+            lambda error, w=worker, n=job.name: (
+                self._storing.discard(w),
+                print(Path(__file__).name, "-", f"Job {n} not cached: {error}"),
+            )
+        )
+
+        self._storing.add(worker)
+        QThreadPool.globalInstance().start(worker)
+
+    def _record_outputs(self, job: BatchJob):
+        """
+        Anota en el índice del workspace los archivos del trabajo y de qué
+        archivos salieron, para que los listados los vean sin esperar al
+        QFileSystemWatcher.
+        """
+        if job.spec is None:
+            return
+
+        index = get_workspace_index()
+        if index is not None:
+            index.record_outputs(job.spec.result_files(), job.spec.inputs)
+
+    def _on_job_exited(self, supervisor: JobSupervisor, event: ExitEvent):
+        if not event.ok and event.message:
+            job = self._running.get(supervisor)
+            if job is not None:
+                self.job_output.emit(job.name, f"{event.message}\n")
+
+        self._on_job_finished(supervisor, event.exit_code)
+        supervisor.deleteLater()
+
+    def _on_job_finished(self, process: object, exit_code: int):
+        job = self._running.pop(process, None)
+
+        if job is None:
+            return
+
+        if exit_code != 0:
+            self._failed.append(job.name)
+        else:
+            if job.spec is not None and self.result_cache is not None:
+                self._store_result(job)
+            self._record_outputs(job)
+
+        self._done += 1
+
+        self.job_finished.emit(job.name, exit_code)
+        self.progress_changed.emit(self._done, self._total)
+
+        if job.on_finished is not None and not self._cancelled:
+            job.on_finished(exit_code)
+
+        self._schedule()
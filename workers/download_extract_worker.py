@@ -0,0 +1,243 @@
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import shutil
+import tarfile
+import threading
+from pathlib import Path
+from typing import Optional
+import zstandard
+from PySide6.QtCore import QThread, Signal
+from jobs import iter_download, new_hasher, probe_url, verify_checksum
+from jobs.compression import GZIP_MAGIC, ZSTD_MAGIC
+
+# Tamaño de los bloques que se piden a la respuesta HTTP
+CHUNK_SIZE = 1024**2
+# Bloques que pueden esperar en memoria entre la descarga y la extracción
+QUEUE_SIZE = 16
+
+BZIP2_MAGIC = b"BZh"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+
+COMPRESSION_SUFFIXES = (".gz", ".zst", ".bz2", ".xz")
+
+
+class _ChunkReader(io.RawIOBase):
+    """
+    Lee como un archivo los bloques que el hilo de descarga deja en la cola.
+    Un `None` marca el final y una excepción se relanza al leer.
+    """
+
+    def __init__(self, chunks: queue.Queue):
+        self._chunks = chunks
+        self._chunk = memoryview(b"")
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._chunk and not self._done:
+            item = self._chunks.get()
+            if item is None:
+                self._done = True
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                self._chunk = memoryview(item)
+
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+
+class DownloadExtractWorker(QThread):
+    """
+    Descarga una base de datos y la descomprime y extrae mientras llega, sin
+    guardar el archivo descargado: un hilo lee la respuesta HTTP y la
+    extracción (gzip, zstd, bzip2 o xz y `tarfile` en modo stream) consume
+    sus bloques. Los archivos comprimidos que no son .tar se guardan ya
+    descomprimidos y el resto tal cual.
+
+    El progreso es la fracción de bytes descargados. Si se corta la conexión
+    se reanuda con una petición Range desde el último byte recibido, y el
+    checksum, si se indica, se calcula sobre los bytes según llegan.
+    """
+
+    progress_changed = Signal(int)
+    file_name_signal = Signal(str)
+    # Carpeta extraída o archivo guardado
+    finished_signal = Signal(str)
+    error = Signal(str)
+
+    def __init__(
+        self,
+        url: str,
+        dest_folder: str,
+        extract_folder: Optional[str] = None,
+        parent=None,
+        checksum: Optional[str] = None,
+    ):
+        super().__init__(parent)
+        self.url = url
+        self.dest_folder = Path(dest_folder)
+        # Carpeta donde se extraen los .tar (por defecto dest_folder)
+        self.extract_folder = (
+            Path(extract_folder) if extract_folder is not None else self.dest_folder
+        )
+        # "sha256:<hex>", "md5:<hex>"... o None para no comprobarlo
+        self.checksum = checksum
+        self._hasher = new_hasher(checksum) if checksum else None
+        self._stop = threading.Event()
+        self._last_progress = -1
+
+    def run(self):
+        # Rutas creadas por la extracción, se borran si falla o se cancela
+        created: list[Path] = []
+
+        try:
+            remote = probe_url(self.url)
+            self.file_name_signal.emit(remote.name)
+
+            chunks = queue.Queue(QUEUE_SIZE)
+            downloader = threading.Thread(
+                target=self._download, args=(remote.size, chunks), daemon=True
+            )
+            downloader.start()
+
+            try:
+                stream = io.BufferedReader(_ChunkReader(chunks), CHUNK_SIZE)
+                path = self._extract(stream, remote.name, created)
+                # Lo que queda tras el final del .tar (relleno, cola de
+                # gzip) también cuenta para el checksum
+                while stream.read(CHUNK_SIZE):
+                    pass
+            finally:
+                self._stop.set()
+                downloader.join()
+
+            if self._hasher is not None:
+                verify_checksum(self._hasher, self.checksum)
+
+            self.progress_changed.emit(100)
+            self.finished_signal.emit(path.as_posix())
+        except Exception as e:
+            self._remove(created)
+            self.error.emit(str(e))
+
+    def cancel(self):
+        self.requestInterruption()
+
+    # download
+
+    def _download(self, total: Optional[int], chunks: queue.Queue):
+        downloaded = 0
+
+        try:
+            for chunk in iter_download(
+                self.url, should_stop=self.isInterruptionRequested
+            ):
+                if self._hasher is not None:
+                    self._hasher.update(chunk)
+                if not self._put(chunks, chunk):
+                    return
+                downloaded += len(chunk)
+                if total:
+                    self._on_progress(downloaded / total)
+            self._put(chunks, None)
+        except Exception as e:
+            self._put(chunks, e)
+
+    def _put(self, chunks: queue.Queue, item) -> bool:
+        # Deja de esperar si la extracción ya terminó
+        while not self._stop.is_set():
+            try:
+                chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _on_progress(self, fraction: float):
+        # Sólo se emite cuando cambia el porcentaje
+        progress = min(int(fraction * 100), 99)
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self.progress_changed.emit(progress)
+
+    # extraction
+
+    def _extract(self, stream: io.BufferedReader, filename: str, created: list[Path]):
+        data = _decompressed(stream)
+        name = filename
+
+        if data is not stream:
+            if name.endswith(".tgz"):
+                name = name.removesuffix(".tgz") + ".tar"
+            for suffix in COMPRESSION_SUFFIXES:
+                name = name.removesuffix(suffix)
+
+        if name.endswith(".tar"):
+            return self._extract_tar(data, created)
+
+        self.dest_folder.mkdir(parents=True, exist_ok=True)
+        path = self.dest_folder / name
+        created.append(path)
+
+        with open(path, "wb") as f:
+            shutil.copyfileobj(data, f, CHUNK_SIZE)
+
+        return path
+
+    def _extract_tar(self, data: io.BufferedIOBase, created: list[Path]) -> Path:
+        folder = self.extract_folder
+
+        if not folder.exists():
+            created.append(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        # Modo stream: los miembros se extraen en orden según van llegando
+        with tarfile.open(fileobj=data, mode="r|") as tf:
+            for member in tf:
+                if self.isInterruptionRequested():
+                    raise InterruptedError("Download cancelled")
+
+                # Rechaza rutas absolutas, con .. o enlaces fuera del destino
+                target = folder / tarfile.data_filter(member, str(folder)).name
+                if not target.exists():
+                    created.append(target)
+
+                tf.extract(member, path=folder, filter="data")
+
+        return folder
+
+    def _remove(self, created: list[Path]):
+        for path in reversed(created):
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+
+def _decompressed(stream: io.BufferedReader) -> io.BufferedIOBase:
+    """
+    Descomprime la descarga según sus primeros bytes, no su extensión.
+    """
+    magic = stream.peek(6)[:6]
+
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=stream)
+    if magic.startswith(ZSTD_MAGIC):
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            stream, read_across_frames=True, closefd=False
+        )
+        return io.BufferedReader(reader, CHUNK_SIZE)
+    if magic.startswith(BZIP2_MAGIC):
+        return bz2.BZ2File(stream)
+    if magic.startswith(XZ_MAGIC):
+        return lzma.LZMAFile(stream)
+
+    return stream
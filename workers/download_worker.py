@@ -1,61 +1,66 @@
-import os
-import re
-import requests
-from urllib.parse import urlparse
+from typing import Optional
 from PySide6.QtCore import QThread, Signal
+from jobs import download_file, probe_url
 
 
 class DownloadWorker(QThread):
+    """
+    Descarga un archivo con `jobs.download_file`: reanuda las descargas
+    interrumpidas, divide los archivos grandes en rangos que se descargan
+    en paralelo y calcula el checksum mientras llegan los datos.
+    """
+
     progress_changed = Signal(int)
     file_name_signal = Signal(str)
     finished_signal = Signal(str)
     error = Signal(str)
 
-    def __init__(self, url: str, dest_folder: str, parent=None):
+    def __init__(
+        self,
+        url: str,
+        dest_folder: str,
+        parent=None,
+        checksum: Optional[str] = None,
+        segments: int = 4,
+    ):
         super().__init__(parent)
         self.url = url
         self.dest_folder = dest_folder
+        # "sha256:<hex>", "md5:<hex>"... o None para no comprobarlo
+        self.checksum = checksum
+        self.segments = segments
+        self._last_progress = -1
 
     def run(self):
         try:
-            resp = requests.get(self.url, stream=True, timeout=10)
-            resp.raise_for_status()
-
-            # Extraer nombre sugerido por Content-Disposition
-            cd = resp.headers.get("content-disposition", "")
-            filename = None
-            if cd:
-                m = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^\";]+)"?', cd)
-                if m:
-                    filename = m.group(1)
-            if not filename:
-                filename = (
-                    os.path.basename(urlparse(self.url).path) or "downloaded.file"
-                )
-            self.file_name_signal.emit(filename)
-
-            # Ruta completa de destino
-            filepath = os.path.join(self.dest_folder, filename)
-
-            # Preparar descarga
-            total = int(resp.headers.get("content-length", 0))
-            downloaded = 0
-            chunk_size = 8192
-
-            if total == 0:
-                with open(filepath, "wb") as f:
-                    f.write(resp.content)
-                self.progress_changed.emit(100)
-            else:
-                with open(filepath, "wb") as f:
-                    for chunk in resp.iter_content(chunk_size):
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        pct = int(downloaded * 100 / total)
-                        self.progress_changed.emit(pct)
-
-            self.finished_signal.emit(filepath)
+            remote = probe_url(self.url)
+            self.file_name_signal.emit(remote.name)
+
+            filepath = download_file(
+                self.url,
+                self.dest_folder,
+                checksum=self.checksum,
+                segments=self.segments,
+                on_progress=self._on_progress,
+                should_stop=self.isInterruptionRequested,
+                remote=remote,
+            )
+
+            self.progress_changed.emit(100)
+            self.finished_signal.emit(filepath.as_posix())
         except Exception as e:
             self.error.emit(str(e))
+
+    def cancel(self):
+        # La descarga se detiene en el siguiente bloque y el archivo
+        # parcial queda para reanudarla
+        self.requestInterruption()
+
+    def _on_progress(self, done: int, total: Optional[int]):
+        if not total:
+            return
+        # Sólo se emite cuando cambia el porcentaje
+        progress = min(int(done * 100 / total), 99)
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self.progress_changed.emit(progress)
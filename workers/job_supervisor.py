@@ -0,0 +1,282 @@
+from pathlib import Path
+from typing import Optional
+from PySide6.QtCore import (
+    QCoreApplication,
+    QObject,
+    QProcess,
+    QThreadPool,
+    QTimer,
+    Signal,
+)
+from jobs import (
+    ExitEvent,
+    ExitReason,
+    LogEvent,
+    OutputMonitor,
+    ProgressEvent,
+    SupervisorEvent,
+    SupervisorPolicy,
+    in_process_group,
+    kill_process_tree,
+)
+from .generic_worker import GenericWorker
+
+
+class JobSupervisor(QObject):
+    """
+    Ejecuta un programa externo con QProcess bajo una `SupervisorPolicy`
+    (ver `jobs.supervision`), con las mismas reglas para todas las
+    herramientas:
+
+    - El programa arranca en su propio grupo de procesos y, al cancelarlo
+      o al vencer un límite, se termina el árbol entero (incluido el lado
+      Linux de los programas que corren en WSL).
+    - Los dos canales se leen por separado. `output` entrega los datos tal
+      cual llegan; `log` y `progress` entregan las líneas de los canales de
+      la política ya convertidas en eventos, y `exited` el `ExitEvent` con
+      el motivo del final.
+
+    Un supervisor ejecuta un programa a la vez: `start` descarta, sin
+    emitir `exited`, el que estuviera en marcha.
+    """
+
+    started = Signal()
+    # Canal ("stdout" o "stderr") y datos (bytes) sin decodificar
+    output = Signal(str, object)
+    log = Signal(object)  # LogEvent
+    progress = Signal(object)  # ProgressEvent
+    exited = Signal(object)  # ExitEvent
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self.process: Optional[QProcess] = None
+        self.monitor: Optional[OutputMonitor] = None
+        self._stop: Optional[tuple[ExitReason, str]] = None
+        self._pid = 0
+
+        # Terminar un árbol puede lanzar procesos (taskkill, wsl), fuera del
+        # hilo de la interfaz
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+
+        # Comprueba los límites de tiempo aunque el programa no escriba nada
+        self._watchdog = QTimer(self)
+        self._watchdog.setInterval(1000)
+        self._watchdog.timeout.connect(self._check)
+
+        # Si el programa no termina tras la petición, se mata
+        self._force_timer = QTimer(self)
+        self._force_timer.setSingleShot(True)
+        self._force_timer.timeout.connect(self._force_kill)
+
+        if QCoreApplication.instance() is not None:
+            QCoreApplication.instance().aboutToQuit.connect(self._kill_on_quit)
+
+    # public api
+
+    def is_running(self) -> bool:
+        return (
+            self.process is not None
+            and self.process.state() != QProcess.ProcessState.NotRunning
+        )
+
+    def start(
+        self,
+        program: str,
+        arguments: list[str],
+        policy: Optional[SupervisorPolicy] = None,
+        working_directory: Optional[Path] = None,
+    ):
+        self._discard()
+
+        command = in_process_group(program, arguments)
+        self.monitor = OutputMonitor(
+            policy or SupervisorPolicy(), wsl=command != (program, arguments)
+        )
+        self._stop = None
+
+        # Sin padre: se libera con deleteLater al terminar aunque el
+        # supervisor se destruya antes (con padre, PySide la borraría dos veces)
+        process = QProcess()
+        process.setProcessChannelMode(QProcess.ProcessChannelMode.SeparateChannels)
+        if hasattr(QProcess, "UnixProcessFlag"):
+            # Sólo tiene efecto en POSIX: el programa lidera su propia sesión
+            process.setUnixProcessParameters(QProcess.UnixProcessFlag.CreateNewSession)
+        if working_directory is not None:
+            process.setWorkingDirectory(Path(working_directory).as_posix())
+
+        process.readyReadStandardOutput.connect(
+            lambda p=process: self._on_ready_read(p, "stdout")
+        )
+        process.readyReadStandardError.connect(
+            lambda p=process: self._on_ready_read(p, "stderr")
+        )
+        process.started.connect(lambda p=process: self._on_started(p))
+        process.finished.connect(
+            lambda exit_code, exit_status, p=process: self._on_finished(
+                p, exit_code, exit_status
+            )
+        )
+        process.errorOccurred.connect(lambda error, p=process: self._on_error(p, error))
+
+        self.process = process
+        process.start(*command)
+
+    def cancel(self):
+        """
+        Termina el programa en marcha y todo lo que haya lanzado.
+        """
+        if self.is_running():
+            self._terminate(ExitReason.CANCELLED, "Cancelled")
+
+    # process
+
+    def _on_started(self, process: QProcess):
+        if process is not self.process:
+            return
+
+        self._pid = process.processId()
+        self._watchdog.start()
+        self.started.emit()
+
+    def _on_ready_read(self, process: QProcess, stream: str):
+        if process is not self.process:
+            return
+
+        if stream == "stdout":
+            data = process.readAllStandardOutput().data()
+        else:
+            data = process.readAllStandardError().data()
+
+        forwarded, events = self.monitor.feed(stream, bytes(data))
+
+        if forwarded:
+            self.output.emit(stream, forwarded)
+        self._emit(events)
+
+        self._check()
+
+    def _on_error(self, process: QProcess, error: QProcess.ProcessError):
+        if process is not self.process:
+            return
+
+        # Sin arrancar no hay `finished`
+        if error == QProcess.ProcessError.FailedToStart:
+            self._finish(
+                process,
+                ExitEvent(127, ExitReason.FAILED_TO_START, process.errorString()),
+            )
+
+    def _on_finished(
+        self, process: QProcess, exit_code: int, exit_status: QProcess.ExitStatus
+    ):
+        if process is not self.process:
+            return
+
+        self._emit(self.monitor.flush())
+
+        if self._stop is not None:
+            event = ExitEvent(exit_code or 1, *self._stop)
+        elif exit_status == QProcess.ExitStatus.CrashExit:
+            event = ExitEvent(exit_code or 1, ExitReason.FAILED, "Crashed")
+        elif exit_code != 0:
+            event = ExitEvent(exit_code, ExitReason.FAILED, f"Exit code {exit_code}")
+        else:
+            event = ExitEvent(0, ExitReason.FINISHED)
+
+        self._finish(process, event)
+
+    def _finish(self, process: QProcess, event: ExitEvent):
+        self._watchdog.stop()
+        self._force_timer.stop()
+
+        self.process = None
+        self._pid = 0
+        process.deleteLater()
+
+        if not event.ok:
+            print(
+                Path(__file__).name,
+                "-",
+                f"Process {event.reason.value}: {event.message}",
+            )
+
+        self.exited.emit(event)
+
+    def _emit(self, events: list[SupervisorEvent]):
+        for event in events:
+            if isinstance(event, ProgressEvent):
+                self.progress.emit(event)
+            elif isinstance(event, LogEvent):
+                self.log.emit(event)
+
+    # stopping
+
+    def _check(self):
+        if self._stop is not None or not self.is_running():
+            return
+
+        stop = self.monitor.check()
+        if stop is not None:
+            self._terminate(*stop)
+
+    def _terminate(self, reason: ExitReason, message: str):
+        self._stop = (reason, message)
+        self._watchdog.stop()
+
+        self._kill_tree(self.process)
+        self._force_timer.start(int(self.monitor.policy.kill_grace * 1000))
+
+    def _force_kill(self):
+        if not self.is_running():
+            return
+
+        self._kill_tree(self.process, force=True)
+        self.process.kill()
+
+    def _discard(self):
+        """
+        Termina el programa anterior sin emitir sus eventos.
+        """
+        process, self.process = self.process, None
+        self._watchdog.stop()
+        self._force_timer.stop()
+
+        if process is None:
+            return
+
+        if process.state() != QProcess.ProcessState.NotRunning:
+            self._kill_tree(process, force=True)
+            process.kill()
+
+        self._pid = 0
+        process.deleteLater()
+
+    def _kill_on_quit(self):
+        # Al cerrar la aplicación nada debe quedar en marcha (p. ej. kraken2
+        # con la base de datos en memoria dentro de WSL)
+        if not self.is_running():
+            return
+
+        pid = self._pid or self.process.processId()
+
+        if pid > 0:
+            kill_process_tree(pid, self.monitor.wsl_group, force=True)
+        else:
+            self.process.kill()
+
+    def _kill_tree(self, process: QProcess, force: bool = False):
+        """
+        Termina el árbol del programa fuera del hilo de la interfaz. Mientras
+        arranca, el pid es el del proceso ya creado (si lo hay); sin pid no
+        hay árbol y basta con matar el proceso.
+        """
+        pid = self._pid or process.processId()
+
+        if pid <= 0:
+            process.kill()
+            return
+
+        self.thread_pool.start(
+            GenericWorker(kill_process_tree, pid, self.monitor.wsl_group, force=force)
+        )
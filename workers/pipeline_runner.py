@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+from PySide6.QtCore import QObject, Signal
+from jobs import ResultCache
+from .batch_queue import BatchQueue, BatchJob
+
+
+@dataclass
+class PipelineStage:
+    """
+    Etapa del pipeline.
+
+    `create_jobs` recibe el nombre de la muestra y los archivos de entrada
+    (las salidas de la etapa de la que depende) y devuelve los trabajos
+    de la etapa. Las salidas de la etapa son la unión de los `outputs`
+    de sus trabajos.
+    """
+
+    name: str
+    create_jobs: Callable[[str, list[Path]], list[BatchJob]]
+    depends_on: Optional[str] = None
+    max_concurrent_jobs: Optional[int] = None
+
+
+class PipelineRunner(BatchQueue):
+    """
+    Ejecuta un grafo de etapas por muestra sobre una `BatchQueue`.
+
+    Cada etapa de una muestra se encola en cuanto terminan las etapas de las
+    que depende y existen sus archivos de entrada, de modo que distintas
+    muestras pueden estar en distintas etapas a la vez. Las etapas más
+    avanzadas tienen prioridad para que las muestras terminen cuanto antes.
+    """
+
+    stage_finished = Signal(str, str, bool)  # muestra, etapa, éxito
+
+    def __init__(
+        self,
+        stages: list[PipelineStage],
+        cpu_budget: Optional[int] = None,
+        result_cache: Optional[ResultCache] = None,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(
+            cpu_budget=cpu_budget,
+            stage_limits={
+                stage.name: stage.max_concurrent_jobs
+                for stage in stages
+                if stage.max_concurrent_jobs is not None
+            },
+            result_cache=result_cache,
+            parent=parent,
+        )
+        self.stages = stages
+
+        self._remaining: dict[tuple[str, str], int] = {}
+        self._outputs: dict[tuple[str, str], list[Path]] = {}
+        self._stage_failed: set[tuple[str, str]] = set()
+
+    def add_sample(self, name: str, files: list[Path]):
+        """
+        Añade una muestra al pipeline encolando sus etapas iniciales.
+        """
+        for stage in self.stages:
+            if stage.depends_on is None:
+                self._add_stage(name, stage, files)
+
+    def _add_stage(self, sample: str, stage: PipelineStage, inputs: list[Path]):
+        key = (sample, stage.name)
+
+        missing = [file for file in inputs if not Path(file).exists()]
+        jobs = stage.create_jobs(sample, inputs) if inputs and not missing else []
+
+        if not jobs:
+            print(
+                Path(__file__).name,
+                "-",
+                f"Stage {stage.name} of {sample} skipped, missing inputs:",
+                missing or inputs,
+            )
+            self._failed.append(f"{sample} ({stage.name})")
+            self.stage_finished.emit(sample, stage.name, False)
+            return
+
+        self._remaining[key] = len(jobs)
+        self._outputs[key] = []
+
+        priority = self.stages.index(stage)
+
+        for job in jobs:
+            job.stage = stage.name
+            job.priority = priority
+            job.on_finished = self._wrap_on_finished(sample, stage, job)
+            self.add_job(job)
+
+    def _wrap_on_finished(
+        self, sample: str, stage: PipelineStage, job: BatchJob
+    ) -> Callable[[int], None]:
+        on_finished = job.on_finished
+
+        def wrapper(exit_code: int):
+            if on_finished is not None:
+                on_finished(exit_code)
+            self._on_stage_job_finished(sample, stage, job, exit_code)
+
+        return wrapper
+
+    def _on_stage_job_finished(
+        self, sample: str, stage: PipelineStage, job: BatchJob, exit_code: int
+    ):
+        key = (sample, stage.name)
+
+        if exit_code != 0:
+            self._stage_failed.add(key)
+
+        self._outputs[key].extend(job.outputs)
+        self._remaining[key] -= 1
+
+        if self._remaining[key] > 0:
+            return
+
+        success = key not in self._stage_failed
+        self.stage_finished.emit(sample, stage.name, success)
+
+        if not success:
+            return
+
+        for child in self.stages:
+            if child.depends_on == stage.name:
+                self._add_stage(sample, child, self._outputs[key])
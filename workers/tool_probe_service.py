@@ -0,0 +1,62 @@
+from typing import Iterable, Optional
+from PySide6.QtCore import QObject, QThreadPool, Signal
+from utils import TOOLS, ToolInfo, get_tool_registry
+from .generic_worker import GenericWorker
+
+
+class ToolProbeService(QObject):
+    """
+    Comprueba qué programas del registro (`utils.tool_registry.TOOLS`) están
+    disponibles, todos a la vez en su propio grupo de hilos (las búsquedas
+    dentro de WSL pueden tardar varios segundos y no deben ocupar el grupo
+    global, que usan los trabajos).
+
+    Los programas con un resultado guardado válido se emiten en el momento,
+    sin buscarlos; el resto se emite según termina cada búsqueda.
+    """
+
+    # Nombre del programa y su ToolInfo
+    probed = Signal(str, object)
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(len(TOOLS))
+        self._workers: dict[str, GenericWorker] = {}
+
+    def cached(self, name: str) -> Optional[ToolInfo]:
+        return get_tool_registry().cached(name)
+
+    def probe(self, names: Optional[Iterable[str]] = None, force: bool = False):
+        """
+        Comprueba los programas (todos por defecto). Con `force` descarta lo
+        guardado y los busca de nuevo.
+        """
+        registry = get_tool_registry()
+
+        for name in TOOLS if names is None else names:
+            # Ya se está buscando: se emitirá al terminar
+            if name in self._workers:
+                continue
+
+            if force:
+                registry.rescan(name)
+            else:
+                tool = registry.cached(name)
+                if tool is not None:
+                    self.probed.emit(name, tool)
+                    continue
+
+            worker = GenericWorker(registry.get, name)
+            worker.signals.finished.connect(
+                lambda tool, n=name: self._on_probed(n, tool)
+            )
+            worker.signals.error.connect(
+                lambda _, n=name: self._on_probed(n, ToolInfo(name=n))
+            )
+            self._workers[name] = worker
+            self.thread_pool.start(worker)
+
+    def _on_probed(self, name: str, tool: ToolInfo):
+        self._workers.pop(name, None)
+        self.probed.emit(name, tool)
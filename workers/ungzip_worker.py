@@ -1,10 +1,16 @@
-import gzip
 from pathlib import Path
 from typing import Optional
 from PySide6.QtCore import QThread, Signal
+from jobs import decompress_file
 
 
 class UngzipWorker(QThread):
+    """
+    Descomprime un archivo gzip o zstd con `jobs.decompress_file`: los
+    archivos por bloques (BGZF, zstd con varios frames) se descomprimen en
+    varios hilos y el resto leyendo, descomprimiendo y escribiendo a la vez.
+    """
+
     # Señal que emite un entero [0–100]
     progress = Signal(int)
     # Señal que avisa cuando termina
@@ -16,7 +22,7 @@ class UngzipWorker(QThread):
         self,
         src_path: Path,
         dest_path: Optional[Path] = None,
-        chunk_size: int = 1024 * 1024,
+        threads: int = 0,
     ):
         super().__init__()
         # Aseguramos que sean objetos Path
@@ -24,36 +30,29 @@ class UngzipWorker(QThread):
         self.dest_path = (
             Path(dest_path) if dest_path is not None else self.src_path.with_suffix("")
         )
-        self.chunk_size = chunk_size
+        # 0 = un hilo por núcleo
+        self.threads = threads
+        self._last_progress = -1
 
     def run(self):
-        # Creamos directorio destino si no existe
-        self.dest_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Obtenemos tamaño en bytes del .gz para el cálculo de porcentaje
-        total_size = self.src_path.stat().st_size
-
         try:
-            # Abrimos primero el archivo comprimido como fichero crudo…
-            with self.src_path.open("rb") as raw:
-                # …y lo envolvemos en GzipFile para descomprimir en streaming
-                with gzip.GzipFile(fileobj=raw, mode="rb") as src, self.dest_path.open(
-                    "wb"
-                ) as dst:
-                    while True:
-                        chunk = src.read(self.chunk_size)
-                        if not chunk:
-                            break
-                        dst.write(chunk)
-                        # Medimos cuántos bytes del .gz hemos consumido
-                        compressed_read = raw.tell()
-                        pct = int(compressed_read * 100 / total_size)
-                        self.progress.emit(pct)
+            decompress_file(
+                self.src_path,
+                self.dest_path,
+                threads=self.threads,
+                on_progress=self._on_progress,
+            )
         except Exception as e:
-            # Aquí podrías emitir una señal de error si la defines
             print(f"Error al descomprimir: {e}")
             self.error.emit(str(e))
         finally:
             # Asegúrate de emitir 100% si no lo ha hecho
             self.progress.emit(100)
             self.finished.emit(self.dest_path)
+
+    def _on_progress(self, fraction: float):
+        # Sólo se emite cuando cambia el porcentaje
+        progress = int(fraction * 100)
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self.progress.emit(progress)
@@ -19,29 +19,28 @@ class UntarWorker(QThread):
 
     def run(self):
         try:
-            # Abre el .tar (funciona con .tar, .tar.gz, .tar.bz2, ...)
-            with tarfile.open(self.tar_path, "r:*") as tf:
-                members = tf.getmembers()
-                total = len(members)
-                if total == 0:
-                    # Nada que extraer
-                    self.progress_changed.emit(100)
-                    self.finished.emit()
-                    return
-
-                # Asegurarse de que existe el destino
-                os.makedirs(self.dest_path, exist_ok=True)
-
-                for idx, member in enumerate(members, start=1):
-                    # Extrae este miembro
-                    tf.extract(member, path=self.dest_path)
-                    # Calcula y emite progreso
-                    percent = int((idx / total) * 100)
-                    self.progress_changed.emit(percent)
-
-                # Asegurar 100% al final
-                self.progress_changed.emit(100)
-                self.finished.emit(self.dest_path)
+            # Asegurarse de que existe el destino
+            os.makedirs(self.dest_path, exist_ok=True)
+
+            total = max(os.path.getsize(self.tar_path), 1)
+            last_percent = -1
+
+            with open(self.tar_path, "rb") as raw:
+                # Modo stream (.tar, .tar.gz, .tar.bz2, ...): se extrae en
+                # una sola lectura, sin recorrer antes todo el archivo
+                with tarfile.open(fileobj=raw, mode="r|*") as tf:
+                    for member in tf:
+                        # Extrae este miembro
+                        tf.extract(member, path=self.dest_path, filter="data")
+                        # El progreso son los bytes leídos del archivo
+                        percent = int(raw.tell() * 100 / total)
+                        if percent != last_percent:
+                            last_percent = percent
+                            self.progress_changed.emit(percent)
+
+            # Asegurar 100% al final
+            self.progress_changed.emit(100)
+            self.finished.emit(self.dest_path)
 
         except Exception as e:
             # En caso de cualquier fallo, emitimos la señal de error